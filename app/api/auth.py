@@ -8,6 +8,7 @@ from fastapi import (
     HTTPException,
     Response,
     Request,
+    WebSocket,
     status,
 )
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
@@ -136,6 +137,19 @@ async def get_current_user_info_from_token(
     return user
 
 
+# WebSocket handshakes cannot carry an Authorization header from browsers, so the
+# access token may also be passed as a query parameter
+async def get_current_user_info_from_websocket(
+    websocket: WebSocket, access_token: Optional[str], db: AsyncDatabase
+) -> UserModel:
+    try:
+        return await get_current_user_info_from_cookie(
+            websocket.cookies.get("access_token"), db
+        )
+    except HTTPException:
+        return await get_current_user_info_from_token(access_token, db)
+
+
 async def authenticate_user(db: AsyncDatabase, email: str, password: str) -> UserModel:
     user = await get_user_service(db, email)
     hashed_password = await get_hashed_password_service(email, db)
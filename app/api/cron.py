@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.db.client import get_db
+from app.dependencies.cron import require_cron_secret
+from app.schemas.cron import (
+    CollectDeletionsResponse,
+    DispatchRemindersResponse,
+    DrainEmailOutboxResponse,
+    RunMigrationsResponse,
+)
+from app.service.cron import (
+    collect_deletions_service,
+    dispatch_reminders_service,
+    drain_email_outbox_service,
+    run_migrations_service,
+)
+
+# Invoked by Vercel cron jobs, which always use GET
+router = APIRouter(dependencies=[Depends(require_cron_secret)])
+
+
+@router.get("/run-migrations")
+async def run_migrations(
+    db: AsyncDatabase = Depends(get_db),
+) -> RunMigrationsResponse:
+
+    return await run_migrations_service(db)
+
+
+@router.get("/collect-deletions")
+async def collect_deletions(
+    db: AsyncDatabase = Depends(get_db),
+) -> CollectDeletionsResponse:
+
+    return await collect_deletions_service(db)
+
+
+@router.get("/drain-email-outbox")
+async def drain_email_outbox(
+    db: AsyncDatabase = Depends(get_db),
+) -> DrainEmailOutboxResponse:
+
+    return await drain_email_outbox_service(db)
+
+
+@router.get("/dispatch-reminders")
+async def dispatch_reminders(
+    db: AsyncDatabase = Depends(get_db),
+) -> DispatchRemindersResponse:
+
+    return await dispatch_reminders_service(db)
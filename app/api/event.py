@@ -1,23 +1,39 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, Query, Response
 from fastapi.responses import HTMLResponse
 from pymongo.asynchronous.database import AsyncDatabase
-from pathlib import Path
 
+from app.core.common import etag_matches
+from app.core.constants import (
+    DEFAULT_PAGE_SIZE,
+    EMAIL_BACKGROUND_TIME_BUDGET_SECONDS,
+    MAX_PAGE_SIZE,
+)
+from app.core.templates import RSVP_RESPONSE_PAGE
 from app.db.client import get_db
 from app.schemas.event import (
+    GetEventGuestListResponse,
+    GetEventRSVPCountsResponse,
     GetEventRSVPsResponse,
     GetEventResponse,
+    RecomputeEventRSVPCountsResponse,
     RSVPStatus,
     SendRSVPEmailRequest,
     SendRSVPEmailResponse,
+    SendRSVPEmailsRequest,
+    SendRSVPEmailsResponse,
     UpdateEventDetailsRequest,
     UpdateEventDetailsResponse,
 )
+from app.service.cron import drain_email_outbox_service
 from app.service.event import (
+    get_event_guest_list_service,
+    get_event_rsvp_counts_service,
     get_event_rsvps_service,
     get_event_service,
+    recompute_event_rsvp_counts_service,
     reply_rsvp_service,
     send_rsvp_email_service,
+    send_rsvp_emails_service,
     update_event_details_service,
 )
 
@@ -35,31 +51,59 @@ async def get_event(
 async def send_rsvp_email(
     event_id: str,
     send_rsvp_email_request: SendRSVPEmailRequest,
+    background_tasks: BackgroundTasks,
     db: AsyncDatabase = Depends(get_db),
 ) -> SendRSVPEmailResponse:
 
-    return SendRSVPEmailResponse(
-        rsvp_id=await send_rsvp_email_service(
-            event_id, send_rsvp_email_request.email, db
-        )
+    rsvp_id = await send_rsvp_email_service(event_id, send_rsvp_email_request.email, db)
+
+    # Deliver the invite once the response is sent
+    background_tasks.add_task(
+        drain_email_outbox_service, db, EMAIL_BACKGROUND_TIME_BUDGET_SECONDS
     )
 
+    return SendRSVPEmailResponse(rsvp_id=rsvp_id)
 
-def get_rsvp_response_html():
-    html_file = Path("app/templates/rsvp_response_page.html")
-    return html_file.read_text(encoding="utf-8")
+
+@router.post("/send-rsvp-emails/{event_id}")
+async def send_rsvp_emails(
+    event_id: str,
+    send_rsvp_emails_request: SendRSVPEmailsRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncDatabase = Depends(get_db),
+) -> SendRSVPEmailsResponse:
+
+    results = await send_rsvp_emails_service(
+        event_id, send_rsvp_emails_request.emails, db
+    )
+
+    # Deliver the invites once the response is sent
+    background_tasks.add_task(
+        drain_email_outbox_service, db, EMAIL_BACKGROUND_TIME_BUDGET_SECONDS
+    )
+
+    return SendRSVPEmailsResponse(results=results)
 
 
 @router.get("/reply-rsvp/{rsvp_id}/{rsvp_status}")
 async def reply_rsvp(
     rsvp_id: str,
     rsvp_status: RSVPStatus,
+    expires: int | None = None,
+    signature: str | None = None,
+    if_none_match: str | None = Header(None),
     db: AsyncDatabase = Depends(get_db),
-) -> HTMLResponse:
+) -> Response:
 
-    await reply_rsvp_service(rsvp_id, rsvp_status, db)
+    await reply_rsvp_service(rsvp_id, rsvp_status, expires, signature, db)
 
-    return HTMLResponse(content=get_rsvp_response_html(), status_code=200)
+    # The page is the same for every reply. no-cache keeps a repeat click coming
+    # back here to be recorded, while the ETag spares it the body.
+    headers = {"ETag": RSVP_RESPONSE_PAGE.etag, "Cache-Control": "public, no-cache"}
+    if etag_matches(RSVP_RESPONSE_PAGE.etag, if_none_match):
+        return Response(status_code=304, headers=headers)
+
+    return HTMLResponse(content=RSVP_RESPONSE_PAGE.body, headers=headers)
 
 
 @router.get("/get-event-rsvps/{event_id}")
@@ -70,6 +114,38 @@ async def get_event_rsvps(
     return GetEventRSVPsResponse(rsvps=await get_event_rsvps_service(event_id, db))
 
 
+@router.get("/get-event-rsvp-counts/{event_id}")
+async def get_event_rsvp_counts(
+    event_id: str, db: AsyncDatabase = Depends(get_db)
+) -> GetEventRSVPCountsResponse:
+
+    return GetEventRSVPCountsResponse(
+        counts=await get_event_rsvp_counts_service(event_id, db)
+    )
+
+
+@router.post("/recompute-event-rsvp-counts/{event_id}")
+async def recompute_event_rsvp_counts(
+    event_id: str, db: AsyncDatabase = Depends(get_db)
+) -> RecomputeEventRSVPCountsResponse:
+
+    return RecomputeEventRSVPCountsResponse(
+        counts=await recompute_event_rsvp_counts_service(event_id, db)
+    )
+
+
+@router.get("/get-event-guest-list/{event_id}")
+async def get_event_guest_list(
+    event_id: str,
+    rsvp_status: RSVPStatus | None = Query(None, alias="status"),
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncDatabase = Depends(get_db),
+) -> GetEventGuestListResponse:
+
+    return await get_event_guest_list_service(event_id, rsvp_status, cursor, limit, db)
+
+
 @router.post("/update-event-details/{event_id}")
 async def update_event_details(
     event_id: str,
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException
 
+from app.core.metrics import metrics
 from app.db.client import ping
 
 router = APIRouter()
@@ -13,3 +14,8 @@ async def db_health():
     except Exception as e:
         # Surface the exact error to help diagnose Atlas issues in Vercel logs
         raise HTTPException(status_code=503, detail=f"Mongo ping failed: {e}")
+
+
+@router.get("/metrics")
+async def get_metrics():
+    return {"counters": metrics.snapshot()}
@@ -1,7 +1,22 @@
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+from typing import AsyncIterator
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from pymongo.asynchronous.database import AsyncDatabase
 
-from app.api.auth import get_current_user_info
+from app.api.auth import get_current_user_info, get_current_user_info_from_websocket
+from app.core.constants import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core.realtime import Subscription, hub, project_topic
 from app.db.client import get_db
 from app.dependencies.project import (
     require_standard_project_access,
@@ -13,19 +28,28 @@ from app.schemas.project import (
     AddTodoStatusRequest,
     AddTodoStatusResponse,
     ApproveTodoResponse,
+    ArchiveTodosRequest,
+    ArchiveTodosResponse,
     AssignTodoRequest,
     AssignTodoResponse,
+    CountProposedTodosResponse,
     DeleteTodoRequest,
     DeleteTodoResponse,
     DeleteTodoStatusRequest,
     DeleteTodoStatusResponse,
+    GetArchivedTodosResponse,
     GetProjectResponse,
     GetProposedTodosResponse,
+    GetTodoCountsResponse,
     GetTodoItemsResponse,
+    RecomputeTodoCountsResponse,
     ReorderTodoItemsRequest,
     ReorderTodoItemsResponse,
     ReorderTodoStatusesRequest,
     ReorderTodoStatusesResponse,
+    ReviewProposedTodosRequest,
+    ReviewProposedTodosResponse,
+    SearchTodosResponse,
     UpdateTodoRequest,
     UpdateTodoResponse,
     UpdateTodoStatusRequest,
@@ -36,15 +60,22 @@ from app.service.project import (
     add_todo_service,
     add_todo_status_service,
     approve_todo_service,
+    archive_todos_service,
     assign_todo_service,
+    count_proposed_todos_service,
     delete_todo_service,
     delete_todo_status_service,
+    get_archived_todos_service,
     get_project_service,
     get_proposed_todos_service,
+    get_todo_counts_service,
     get_todo_items_service,
     increase_budget_service,
+    recompute_todo_counts_service,
     reorder_todo_items_service,
     reorder_todo_statuses_service,
+    review_proposed_todos_service,
+    search_todos_service,
     spend_budget_service,
     update_todo_service,
     update_todo_status_service,
@@ -180,15 +211,15 @@ async def assign_todo(
     return AssignTodoResponse()
 
 
-# TODO: Make sure this actually works, because project_id is not in signature
-@router.post("/approve-todo/{project_id}/{todo_id}")  # project_id is used in dependency
+@router.post("/approve-todo/{project_id}/{todo_id}")
 async def approve_todo(
+    project_id: str,
     todo_id: str,
     _: None = Depends(require_executive_project_access),
     db: AsyncDatabase = Depends(get_db),
 ) -> ApproveTodoResponse:
 
-    await approve_todo_service(todo_id, db)
+    await approve_todo_service(project_id, todo_id, db)
 
     return ApproveTodoResponse()
 
@@ -205,6 +236,84 @@ async def get_proposed_todos(
     )
 
 
+@router.get("/count-proposed-todos/{project_id}")
+async def count_proposed_todos(
+    project_id: str,
+    _: None = Depends(require_standard_project_access),
+    db: AsyncDatabase = Depends(get_db),
+) -> CountProposedTodosResponse:
+
+    return await count_proposed_todos_service(project_id, db)
+
+
+@router.post("/review-proposed-todos/{project_id}")
+async def review_proposed_todos(
+    project_id: str,
+    review_proposed_todos_request: ReviewProposedTodosRequest,
+    _: None = Depends(require_executive_project_access),
+    db: AsyncDatabase = Depends(get_db),
+) -> ReviewProposedTodosResponse:
+
+    return await review_proposed_todos_service(
+        project_id, review_proposed_todos_request, db
+    )
+
+
+@router.get("/get-todo-counts/{project_id}")
+async def get_todo_counts(
+    project_id: str,
+    _: None = Depends(require_standard_project_access),
+    db: AsyncDatabase = Depends(get_db),
+) -> GetTodoCountsResponse:
+
+    return await get_todo_counts_service(project_id, db)
+
+
+@router.post("/recompute-todo-counts/{project_id}")
+async def recompute_todo_counts(
+    project_id: str,
+    _: None = Depends(require_executive_project_access),
+    db: AsyncDatabase = Depends(get_db),
+) -> RecomputeTodoCountsResponse:
+
+    return await recompute_todo_counts_service(project_id, db)
+
+
+@router.get("/search-todos")
+async def search_todos(
+    q: str = Query(..., min_length=1),
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: UserModel = Depends(get_current_user_info),
+    db: AsyncDatabase = Depends(get_db),
+) -> SearchTodosResponse:
+
+    return await search_todos_service(current_user.id, q, cursor, limit, db)
+
+
+@router.post("/archive-todos/{project_id}")
+async def archive_todos(
+    project_id: str,
+    archive_todos_request: ArchiveTodosRequest,
+    _: None = Depends(require_executive_project_access),
+    db: AsyncDatabase = Depends(get_db),
+) -> ArchiveTodosResponse:
+
+    return await archive_todos_service(project_id, archive_todos_request, db)
+
+
+@router.get("/get-archived-todos/{project_id}")
+async def get_archived_todos(
+    project_id: str,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    _: None = Depends(require_standard_project_access),
+    db: AsyncDatabase = Depends(get_db),
+) -> GetArchivedTodosResponse:
+
+    return await get_archived_todos_service(project_id, cursor, limit, db)
+
+
 @router.post("/increase-budget/{project_id}")
 async def increase_budget(
     project_id: str,
@@ -225,3 +334,90 @@ async def spend_budget(
 ) -> None:
 
     await spend_budget_service(project_id, amount, db)
+
+
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+async def _project_event_stream(subscription: Subscription) -> AsyncIterator[str]:
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    subscription.get(), timeout=SSE_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+
+            # Evicted for falling behind, the client should refetch and reconnect
+            if message is None:
+                yield "event: evicted\ndata: {}\n\n"
+                return
+
+            yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+    finally:
+        hub.unsubscribe(subscription)
+
+
+@router.get("/stream/{project_id}")
+async def stream_project_events(
+    project_id: str,
+    _: None = Depends(require_standard_project_access),
+) -> StreamingResponse:
+
+    subscription = hub.subscribe(project_topic(project_id))
+
+    return StreamingResponse(
+        _project_event_stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _forward_project_events(
+    subscription: Subscription, websocket: WebSocket
+) -> None:
+    async for message in subscription:
+        await websocket.send_json(message)
+
+    await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="evicted")
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+
+
+@router.websocket("/subscribe/{project_id}")
+async def subscribe_project_events(
+    websocket: WebSocket,
+    project_id: str,
+    token: str | None = None,
+    db: AsyncDatabase = Depends(get_db),
+) -> None:
+
+    try:
+        current_user = await get_current_user_info_from_websocket(websocket, token, db)
+        await require_standard_project_access(project_id, current_user, db)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscription = hub.subscribe(project_topic(project_id))
+
+    # Stop forwarding as soon as the client goes away, not at the next message
+    tasks = [
+        asyncio.create_task(_forward_project_events(subscription, websocket)),
+        asyncio.create_task(_wait_for_disconnect(websocket)),
+    ]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        hub.unsubscribe(subscription)
@@ -1,7 +1,14 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, Query, Response
 from pymongo.asynchronous.database import AsyncDatabase
 
 from app.api.auth import get_current_user_info
+from app.core.constants import (
+    DEFAULT_PAGE_SIZE,
+    DELETION_BACKGROUND_TIME_BUDGET_SECONDS,
+    MAX_PAGE_SIZE,
+)
 from app.db.client import get_db
 from app.schemas.team import (
     CreateEventRequest,
@@ -15,7 +22,10 @@ from app.schemas.team import (
     DeleteProjectRequest,
     DeleteProjectResponse,
     DeleteTeamResponse,
+    GetTeamCalendarUrlResponse,
+    GetTeamDashboardResponse,
     GetTeamEventsResponse,
+    GetTeamMembersResponse,
     GetTeamResponse,
     JoinTeamByShortIdResponse,
     JoinTeamResponse,
@@ -24,8 +34,11 @@ from app.schemas.team import (
     LeaveTeamResponse,
     PromoteTeamMemberRequest,
     PromoteTeamMemberResponse,
+    RegenerateTeamCalendarUrlResponse,
+    TeamRole,
 )
 from app.schemas.user import UserModel
+from app.service.cron import collect_deletions_service
 from app.service.team import (
     create_event_for_team_service,
     create_project_service,
@@ -33,13 +46,19 @@ from app.service.team import (
     delete_event_service,
     delete_project_service,
     delete_team_service,
+    get_team_calendar_service,
+    get_team_calendar_url_service,
+    get_team_dashboard_service,
+    get_team_events_page_service,
     get_team_events_service,
+    get_team_members_service,
     get_team_service,
     join_team_by_short_id_service,
     join_team_service,
     kick_team_member_service,
     leave_team_service,
     promote_team_member_service,
+    regenerate_team_calendar_url_service,
 )
 
 router = APIRouter()
@@ -83,6 +102,29 @@ async def get_team(
     return await get_team_service(team_id, current_user, db)
 
 
+@router.get("/dashboard/{team_id}")
+async def get_team_dashboard(
+    team_id: str,
+    current_user: UserModel = Depends(get_current_user_info),
+    db: AsyncDatabase = Depends(get_db),
+) -> GetTeamDashboardResponse:
+    return await get_team_dashboard_service(team_id, current_user.id, db)
+
+
+@router.get("/get-team-members/{team_id}")
+async def get_team_members(
+    team_id: str,
+    role: TeamRole | None = None,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: UserModel = Depends(get_current_user_info),
+    db: AsyncDatabase = Depends(get_db),
+) -> GetTeamMembersResponse:
+    return await get_team_members_service(
+        team_id, current_user.id, role, cursor, limit, db
+    )
+
+
 @router.post("/promote-team-member/{team_id}")
 async def promote_team_member(
     team_id: str,
@@ -98,19 +140,34 @@ async def promote_team_member(
 @router.post("/leave-team/{team_id}")
 async def leave_team(
     team_id: str,
+    background_tasks: BackgroundTasks,
     current_user: UserModel = Depends(get_current_user_info),
     db: AsyncDatabase = Depends(get_db),
 ) -> LeaveTeamResponse:
-    return await leave_team_service(team_id, current_user.id, db)
+    leave_team_response = await leave_team_service(team_id, current_user.id, db)
+
+    # The last executive leaving deletes the team
+    if leave_team_response.team_deleted:
+        background_tasks.add_task(
+            collect_deletions_service, db, DELETION_BACKGROUND_TIME_BUDGET_SECONDS
+        )
+
+    return leave_team_response
 
 
 @router.post("/delete-team/{team_id}")
 async def delete_team(
     team_id: str,
+    background_tasks: BackgroundTasks,
     current_user: UserModel = Depends(get_current_user_info),
     db: AsyncDatabase = Depends(get_db),
 ) -> DeleteTeamResponse:
-    await delete_team_service(team_id, current_user.id, db)
+    # Start on the cascade once the response is sent, the cron job picks up whatever
+    # is left
+    if await delete_team_service(team_id, current_user.id, db):
+        background_tasks.add_task(
+            collect_deletions_service, db, DELETION_BACKGROUND_TIME_BUDGET_SECONDS
+        )
 
     return DeleteTeamResponse()
 
@@ -140,6 +197,7 @@ async def create_project(
 async def delete_project(
     team_id: str,
     delete_project_request: DeleteProjectRequest,
+    background_tasks: BackgroundTasks,
     current_user: UserModel = Depends(get_current_user_info),
     db: AsyncDatabase = Depends(get_db),
 ) -> DeleteProjectResponse:
@@ -148,6 +206,10 @@ async def delete_project(
         team_id, delete_project_request.project_id, current_user.id, db
     )
 
+    background_tasks.add_task(
+        collect_deletions_service, db, DELETION_BACKGROUND_TIME_BUDGET_SECONDS
+    )
+
     return DeleteProjectResponse()
 
 
@@ -166,15 +228,37 @@ async def create_event(
 async def delete_event(
     team_id: str,
     delete_event_request: DeleteEventRequest,
+    background_tasks: BackgroundTasks,
     current_user: UserModel = Depends(get_current_user_info),
     db: AsyncDatabase = Depends(get_db),
 ) -> DeleteEventResponse:
     await delete_event_service(
         team_id, delete_event_request.event_id, current_user.id, db
     )
+
+    background_tasks.add_task(
+        collect_deletions_service, db, DELETION_BACKGROUND_TIME_BUDGET_SECONDS
+    )
     return DeleteEventResponse()
 
 
+@router.get("/get-team-events/{team_id}")
+async def get_team_events_page(
+    team_id: str,
+    start_from: datetime | None = Query(None, alias="from"),
+    start_to: datetime | None = Query(None, alias="to"),
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: UserModel = Depends(get_current_user_info),
+    db: AsyncDatabase = Depends(get_db),
+) -> GetTeamEventsResponse:
+
+    return await get_team_events_page_service(
+        team_id, current_user.id, start_from, start_to, cursor, limit, db
+    )
+
+
+# Returns every event of the team, kept for clients which predate the paginated GET
 @router.post("/get-team-events/{team_id}")
 async def get_team_events(
     team_id: str,
@@ -185,3 +269,45 @@ async def get_team_events(
     return GetTeamEventsResponse(
         events=await get_team_events_service(team_id, current_user.id, db)
     )
+
+
+@router.get("/calendar-url/{team_id}")
+async def get_team_calendar_url(
+    team_id: str,
+    current_user: UserModel = Depends(get_current_user_info),
+    db: AsyncDatabase = Depends(get_db),
+) -> GetTeamCalendarUrlResponse:
+    return GetTeamCalendarUrlResponse(
+        url=await get_team_calendar_url_service(team_id, current_user.id, db)
+    )
+
+
+@router.post("/regenerate-calendar-url/{team_id}")
+async def regenerate_team_calendar_url(
+    team_id: str,
+    current_user: UserModel = Depends(get_current_user_info),
+    db: AsyncDatabase = Depends(get_db),
+) -> RegenerateTeamCalendarUrlResponse:
+    return RegenerateTeamCalendarUrlResponse(
+        url=await regenerate_team_calendar_url_service(team_id, current_user.id, db)
+    )
+
+
+# Polled by calendar apps, which authenticate with the signature in the URL
+@router.get("/calendar/{team_id}.ics")
+async def get_team_calendar(
+    team_id: str,
+    signature: str,
+    if_none_match: str | None = Header(None),
+    db: AsyncDatabase = Depends(get_db),
+) -> Response:
+
+    feed = await get_team_calendar_service(team_id, signature, if_none_match, db)
+    headers = {"ETag": feed.etag, "Cache-Control": "private, no-cache"}
+
+    if feed.body is None:
+        return Response(status_code=304, headers=headers)
+
+    return Response(
+        content=feed.body, media_type="text/calendar; charset=utf-8", headers=headers
+    )
@@ -0,0 +1,93 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.cron import (
+    collect_deletions,
+    dispatch_reminders,
+    drain_email_outbox,
+    run_migrations,
+)
+from app.dependencies.cron import require_cron_secret
+from app.schemas.cron import (
+    CollectDeletionsResponse,
+    DispatchRemindersResponse,
+    DrainEmailOutboxResponse,
+    MigrationStatus,
+    RunMigrationsResponse,
+)
+
+
+@pytest.mark.asyncio
+@patch("app.api.cron.run_migrations_service")
+async def test_run_migrations_success(mock_run_migrations_service):
+    mock_db = AsyncMock()
+    mock_run_migrations_service.return_value = RunMigrationsResponse(
+        complete=True,
+        migrations=[
+            MigrationStatus(version=1, name="project_child_refs", state="done")
+        ],
+    )
+
+    result = await run_migrations(mock_db)
+
+    assert result.complete is True
+    mock_run_migrations_service.assert_called_once_with(mock_db)
+
+
+@pytest.mark.asyncio
+@patch("app.api.cron.collect_deletions_service")
+async def test_collect_deletions_success(mock_collect_deletions_service):
+    mock_db = AsyncMock()
+    mock_collect_deletions_service.return_value = CollectDeletionsResponse(
+        complete=False, pending_jobs=3
+    )
+
+    result = await collect_deletions(mock_db)
+
+    assert result.pending_jobs == 3
+    mock_collect_deletions_service.assert_called_once_with(mock_db)
+
+
+@pytest.mark.asyncio
+@patch("app.api.cron.drain_email_outbox_service")
+async def test_drain_email_outbox_success(mock_drain_email_outbox_service):
+    mock_db = AsyncMock()
+    mock_drain_email_outbox_service.return_value = DrainEmailOutboxResponse(
+        complete=True, pending_emails=0
+    )
+
+    result = await drain_email_outbox(mock_db)
+
+    assert result.complete is True
+    mock_drain_email_outbox_service.assert_called_once_with(mock_db)
+
+
+@pytest.mark.asyncio
+@patch("app.api.cron.dispatch_reminders_service")
+async def test_dispatch_reminders_success(mock_dispatch_reminders_service):
+    mock_db = AsyncMock()
+    mock_dispatch_reminders_service.return_value = DispatchRemindersResponse(
+        complete=True, due_reminders=0
+    )
+
+    result = await dispatch_reminders(mock_db)
+
+    assert result.complete is True
+    mock_dispatch_reminders_service.assert_called_once_with(mock_db)
+
+
+@pytest.mark.asyncio
+@patch.dict("os.environ", {"CRON_SECRET": "secret"})
+async def test_require_cron_secret_success():
+    await require_cron_secret("Bearer secret")
+
+
+@pytest.mark.asyncio
+@patch.dict("os.environ", {"CRON_SECRET": "secret"})
+async def test_require_cron_secret_failure_wrong_secret():
+    with pytest.raises(HTTPException) as exc_info:
+        await require_cron_secret("Bearer wrong")
+
+    assert exc_info.value.status_code == 401
@@ -1,21 +1,33 @@
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from fastapi.responses import HTMLResponse
 import pytest
 
 from app.api.event import (
     get_event,
+    get_event_guest_list,
+    get_event_rsvp_counts,
     get_event_rsvps,
     reply_rsvp,
     send_rsvp_email,
+    send_rsvp_emails,
     update_event_details,
 )
+from app.core.templates import RSVP_RESPONSE_PAGE
 from app.schemas.event import (
     Event,
+    GetEventGuestListResponse,
+    GetEventRSVPCountsResponse,
     GetEventRSVPsResponse,
     GetEventResponse,
     SendRSVPEmailRequest,
+    RSVPCounts,
+    RSVPInviteResult,
+    RSVPInviteStatus,
+    RSVPStatus,
     SendRSVPEmailResponse,
+    SendRSVPEmailsRequest,
+    SendRSVPEmailsResponse,
     UpdateEventDetailsRequest,
     UpdateEventDetailsResponse,
 )
@@ -63,9 +75,41 @@ async def test_send_rsvp_email_service_success(mock_send_rsvp_email_service):
     mock_send_rsvp_email_service.return_value = MOCK_RSVP_ID
     mock_send_rsvp_email_request = SendRSVPEmailRequest(email=MOCK_USER_EMAIL)
 
-    result = await send_rsvp_email(MOCK_EVENT_ID, mock_send_rsvp_email_request, mock_db)
+    mock_background_tasks = MagicMock()
+
+    result = await send_rsvp_email(
+        MOCK_EVENT_ID, mock_send_rsvp_email_request, mock_background_tasks, mock_db
+    )
 
     assert isinstance(result, SendRSVPEmailResponse)
+    assert result.rsvp_id == MOCK_RSVP_ID
+    mock_background_tasks.add_task.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("app.api.event.send_rsvp_emails_service")
+async def test_send_rsvp_emails_success(mock_send_rsvp_emails_service):
+    mock_db = AsyncMock()
+    mock_background_tasks = MagicMock()
+    mock_send_rsvp_emails_service.return_value = [
+        RSVPInviteResult(
+            email=MOCK_USER_EMAIL, status=RSVPInviteStatus.INVITED, rsvp_id=MOCK_RSVP_ID
+        )
+    ]
+
+    result = await send_rsvp_emails(
+        MOCK_EVENT_ID,
+        SendRSVPEmailsRequest(emails=[MOCK_USER_EMAIL]),
+        mock_background_tasks,
+        mock_db,
+    )
+
+    assert isinstance(result, SendRSVPEmailsResponse)
+    assert result.results[0].rsvp_id == MOCK_RSVP_ID
+    mock_send_rsvp_emails_service.assert_called_once_with(
+        MOCK_EVENT_ID, [MOCK_USER_EMAIL], mock_db
+    )
+    mock_background_tasks.add_task.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -74,9 +118,36 @@ async def test_reply_rsvp_service_success(mock_reply_rsvp_service):
     mock_db = AsyncMock()
     mock_reply_rsvp_service.return_value = None
 
-    result = await reply_rsvp(mock_reply_rsvp_service, mock_db)
+    result = await reply_rsvp(
+        MOCK_RSVP_ID, RSVPStatus.ACCEPTED, 1700000000, "signature", None, mock_db
+    )
 
     assert isinstance(result, HTMLResponse)
+    assert result.body == RSVP_RESPONSE_PAGE.body
+    assert result.headers["ETag"] == RSVP_RESPONSE_PAGE.etag
+    mock_reply_rsvp_service.assert_called_once_with(
+        MOCK_RSVP_ID, RSVPStatus.ACCEPTED, 1700000000, "signature", mock_db
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.api.event.reply_rsvp_service")
+async def test_reply_rsvp_not_modified(mock_reply_rsvp_service):
+    mock_db = AsyncMock()
+
+    result = await reply_rsvp(
+        MOCK_RSVP_ID,
+        RSVPStatus.DECLINED,
+        1700000000,
+        "signature",
+        RSVP_RESPONSE_PAGE.etag,
+        mock_db,
+    )
+
+    assert result.status_code == 304
+    assert result.body == b""
+    # The reply is still recorded
+    mock_reply_rsvp_service.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -91,6 +162,37 @@ async def test_get_event_rsvps_service_success(mock_get_event_rsvps_service):
     assert result.rsvps == []
 
 
+@pytest.mark.asyncio
+@patch("app.api.event.get_event_rsvp_counts_service")
+async def test_get_event_rsvp_counts_success(mock_get_event_rsvp_counts_service):
+    mock_db = AsyncMock()
+    mock_get_event_rsvp_counts_service.return_value = RSVPCounts(accepted=3)
+
+    result = await get_event_rsvp_counts(MOCK_EVENT_ID, mock_db)
+
+    assert isinstance(result, GetEventRSVPCountsResponse)
+    assert result.counts.accepted == 3
+    mock_get_event_rsvp_counts_service.assert_called_once_with(MOCK_EVENT_ID, mock_db)
+
+
+@pytest.mark.asyncio
+@patch("app.api.event.get_event_guest_list_service")
+async def test_get_event_guest_list_success(mock_get_event_guest_list_service):
+    mock_db = AsyncMock()
+    mock_get_event_guest_list_service.return_value = GetEventGuestListResponse(
+        rsvps=[], next_cursor=None
+    )
+
+    result = await get_event_guest_list(
+        MOCK_EVENT_ID, RSVPStatus.ACCEPTED, None, 20, mock_db
+    )
+
+    assert isinstance(result, GetEventGuestListResponse)
+    mock_get_event_guest_list_service.assert_called_once_with(
+        MOCK_EVENT_ID, RSVPStatus.ACCEPTED, None, 20, mock_db
+    )
+
+
 @pytest.mark.asyncio
 @patch("app.api.event.update_event_details_service")
 async def test_update_event_details_service_success(mock_update_event_details_service):
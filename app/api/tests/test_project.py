@@ -1,8 +1,13 @@
+import json
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, patch
 import pytest
 
 from app.api.project import (
+    _project_event_stream,
     approve_todo,
+    archive_todos,
+    get_archived_todos,
     get_project,
     add_todo,
     get_proposed_todos,
@@ -16,6 +21,11 @@ from app.api.project import (
     delete_todo_status,
     reorder_todo_statuses,
     assign_todo,
+    count_proposed_todos,
+    get_todo_counts,
+    recompute_todo_counts,
+    review_proposed_todos,
+    search_todos,
 )
 from app.schemas.project import (
     AddTodoRequest,
@@ -23,22 +33,38 @@ from app.schemas.project import (
     AddTodoStatusRequest,
     AddTodoStatusResponse,
     ApproveTodoResponse,
+    ArchiveTodosRequest,
+    ArchiveTodosResponse,
     AssignTodoRequest,
     AssignTodoResponse,
+    CountProposedTodosResponse,
     DeleteTodoRequest,
     DeleteTodoResponse,
     DeleteTodoStatusRequest,
     DeleteTodoStatusResponse,
+    GetArchivedTodosResponse,
     GetProjectResponse,
     GetProposedTodosResponse,
+    GetTodoCountsResponse,
     GetTodoItemsResponse,
+    RecomputeTodoCountsResponse,
     ReorderTodoItemsRequest,
     ReorderTodoItemsResponse,
     ReorderTodoStatusesRequest,
     ReorderTodoStatusesResponse,
+    ReviewProposedTodosRequest,
+    ReviewProposedTodosResponse,
+    SearchTodosResponse,
     UpdateTodoRequest,
     UpdateTodoResponse,
     Project,
+    TodoCounts,
+)
+from app.core.realtime import (
+    EventHub,
+    LocalBroker,
+    project_topic,
+    publish_project_event,
 )
 from app.test_shared.constants import (
     MOCK_PROJECT_ID,
@@ -220,7 +246,7 @@ async def test_approve_todo_success(mock_approve_todo_service):
     mock_db = AsyncMock()
     mock_approve_todo_service.return_value = None
 
-    result = await approve_todo(MOCK_TODO_ID, db=mock_db)
+    result = await approve_todo(MOCK_PROJECT_ID, MOCK_TODO_ID, db=mock_db)
 
     assert isinstance(result, ApproveTodoResponse)
 
@@ -236,6 +262,103 @@ async def test_get_proposed_todos_success(mock_get_proposed_todos_service):
     assert isinstance(result, GetProposedTodosResponse)
 
 
+@pytest.mark.asyncio
+@patch("app.api.project.count_proposed_todos_service")
+async def test_count_proposed_todos_success(mock_count_proposed_todos_service):
+    mock_db = AsyncMock()
+    mock_count_proposed_todos_service.return_value = CountProposedTodosResponse(count=3)
+
+    result = await count_proposed_todos(MOCK_PROJECT_ID, db=mock_db)
+
+    assert isinstance(result, CountProposedTodosResponse)
+    assert result.count == 3
+
+
+@pytest.mark.asyncio
+@patch("app.api.project.review_proposed_todos_service")
+async def test_review_proposed_todos_success(mock_review_proposed_todos_service):
+    mock_db = AsyncMock()
+    mock_review_proposed_todos_service.return_value = ReviewProposedTodosResponse(
+        approved_count=1, rejected_count=0
+    )
+    review_proposed_todos_request = ReviewProposedTodosRequest(
+        approve_todo_ids=[MOCK_TODO_ID]
+    )
+
+    result = await review_proposed_todos(
+        MOCK_PROJECT_ID, review_proposed_todos_request, db=mock_db
+    )
+
+    assert isinstance(result, ReviewProposedTodosResponse)
+    assert result.approved_count == 1
+
+
+@pytest.mark.asyncio
+@patch("app.api.project.get_todo_counts_service")
+async def test_get_todo_counts_success(mock_get_todo_counts_service):
+    mock_db = AsyncMock()
+    mock_get_todo_counts_service.return_value = GetTodoCountsResponse(
+        todo_counts=TodoCounts(by_status={MOCK_TODO_ID: 1})
+    )
+
+    result = await get_todo_counts(MOCK_PROJECT_ID, db=mock_db)
+
+    assert isinstance(result, GetTodoCountsResponse)
+
+
+@pytest.mark.asyncio
+@patch("app.api.project.recompute_todo_counts_service")
+async def test_recompute_todo_counts_success(mock_recompute_todo_counts_service):
+    mock_db = AsyncMock()
+    mock_recompute_todo_counts_service.return_value = RecomputeTodoCountsResponse(
+        todo_counts=TodoCounts()
+    )
+
+    result = await recompute_todo_counts(MOCK_PROJECT_ID, db=mock_db)
+
+    assert isinstance(result, RecomputeTodoCountsResponse)
+
+
+@pytest.mark.asyncio
+@patch("app.api.project.search_todos_service")
+async def test_search_todos_success(mock_search_todos_service):
+    mock_db = AsyncMock()
+    mock_user = AsyncMock()
+    mock_search_todos_service.return_value = SearchTodosResponse(results=[])
+
+    result = await search_todos(
+        "mock", cursor=None, limit=20, current_user=mock_user, db=mock_db
+    )
+
+    assert isinstance(result, SearchTodosResponse)
+    assert result.results == []
+
+
+@pytest.mark.asyncio
+@patch("app.api.project.archive_todos_service")
+async def test_archive_todos_success(mock_archive_todos_service):
+    mock_db = AsyncMock()
+    mock_archive_todos_service.return_value = ArchiveTodosResponse(archived_count=1)
+
+    result = await archive_todos(MOCK_PROJECT_ID, ArchiveTodosRequest(), db=mock_db)
+
+    assert isinstance(result, ArchiveTodosResponse)
+    assert result.archived_count == 1
+
+
+@pytest.mark.asyncio
+@patch("app.api.project.get_archived_todos_service")
+async def test_get_archived_todos_success(mock_get_archived_todos_service):
+    mock_db = AsyncMock()
+    mock_get_archived_todos_service.return_value = GetArchivedTodosResponse(todos=[])
+
+    result = await get_archived_todos(
+        MOCK_PROJECT_ID, cursor=None, limit=20, db=mock_db
+    )
+
+    assert isinstance(result, GetArchivedTodosResponse)
+
+
 @pytest.mark.asyncio
 @patch("app.api.project.increase_budget_service")
 async def test_increase_budget_success(mock_increase_budget_service):
@@ -256,3 +379,35 @@ async def test_spend_budget_success(mock_spend_budget_service):
     result = await spend_budget(MOCK_PROJECT_ID, 50.0, db=mock_db)
 
     assert result is None
+
+
+@pytest.mark.asyncio
+async def test_project_event_stream_todo_added_success():
+    test_hub = EventHub(LocalBroker())
+    await test_hub.start()
+    subscription = test_hub.subscribe(project_topic(MOCK_PROJECT_ID))
+    stream = _project_event_stream(subscription)
+
+    # Todos carry datetimes, which the stream must still be able to send
+    with patch("app.core.realtime.hub", test_hub):
+        await publish_project_event(
+            MOCK_PROJECT_ID,
+            "todo_added",
+            {
+                "_id": MOCK_TODO_ID,
+                "updated_at": datetime(2023, 10, 10, tzinfo=timezone.utc),
+            },
+        )
+
+    with patch("app.api.project.hub", test_hub):
+        frame = await stream.__anext__()
+        await stream.aclose()
+
+    event_line, data_line = frame.strip().split("\n")
+    assert event_line == "event: todo_added"
+    assert json.loads(data_line.removeprefix("data: ")) == {
+        "type": "todo_added",
+        "project_id": MOCK_PROJECT_ID,
+        "data": {"_id": MOCK_TODO_ID, "updated_at": "2023-10-10T00:00:00+00:00"},
+    }
+    assert test_hub.subscriber_count(project_topic(MOCK_PROJECT_ID)) == 0
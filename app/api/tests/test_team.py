@@ -1,7 +1,8 @@
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi import HTTPException
+from pydantic import ValidationError
 
 from app.api.team import (
     create_event,
@@ -9,12 +10,18 @@ from app.api.team import (
     delete_event,
     delete_project,
     delete_team,
+    get_team_calendar,
+    get_team_dashboard,
     get_team_events,
+    get_team_events_page,
+    get_team_members,
     join_team,
     kick_team_member,
     leave_team,
     promote_team_member,
+    regenerate_team_calendar_url,
 )
+from app.core.constants import DELETION_BACKGROUND_TIME_BUDGET_SECONDS
 from app.schemas.event import Event
 from app.schemas.team import (
     CreateEventRequest,
@@ -26,17 +33,24 @@ from app.schemas.team import (
     DeleteProjectRequest,
     DeleteProjectResponse,
     DeleteTeamResponse,
+    GetTeamDashboardResponse,
     GetTeamEventsResponse,
+    GetTeamMembersResponse,
     JoinTeamResponse,
     KickTeamMemberRequest,
     KickTeamMemberResponse,
     LeaveTeamResponse,
     PromoteTeamMemberRequest,
     PromoteTeamMemberResponse,
+    TeamMember,
+    TeamCalendarFeed,
     TeamModel,
+    TeamRole,
+    TeamSummary,
 )
 from app.schemas.user import UserModel
 
+from app.service.cron import collect_deletions_service
 from app.service.team import delete_team_service
 from app.test_shared.constants import (
     MOCK_EVENT_COLOUR,
@@ -170,21 +184,48 @@ async def test_promote_team_member_failure(mock_promote_team_member_service):
 @patch("app.api.team.leave_team_service")
 async def test_leave_team_success(mock_leave_team_service):
     mock_db = AsyncMock()
+    mock_background_tasks = MagicMock()
     mock_current_user = UserModel(
         id=MOCK_USER_ID,
         email=MOCK_USER_EMAIL,
     )
     mock_leave_team_service.return_value = LeaveTeamResponse()
 
-    result = await leave_team(MOCK_TEAM_ID, mock_current_user, mock_db)
+    result = await leave_team(
+        MOCK_TEAM_ID, mock_background_tasks, mock_current_user, mock_db
+    )
 
     assert isinstance(result, LeaveTeamResponse)
+    # No team was deleted, so there is nothing to collect
+    mock_background_tasks.add_task.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.api.team.leave_team_service")
+async def test_leave_team_last_executive_success(mock_leave_team_service):
+    mock_db = AsyncMock()
+    mock_background_tasks = MagicMock()
+    mock_current_user = UserModel(
+        id=MOCK_USER_ID,
+        email=MOCK_USER_EMAIL,
+    )
+    mock_leave_team_service.return_value = LeaveTeamResponse(team_deleted=True)
+
+    result = await leave_team(
+        MOCK_TEAM_ID, mock_background_tasks, mock_current_user, mock_db
+    )
+
+    assert result.team_deleted is True
+    mock_background_tasks.add_task.assert_called_once_with(
+        collect_deletions_service, mock_db, DELETION_BACKGROUND_TIME_BUDGET_SECONDS
+    )
 
 
 @pytest.mark.asyncio
 @patch("app.api.team.leave_team_service")
 async def test_leave_team_failure(mock_leave_team_service):
     mock_db = AsyncMock()
+    mock_background_tasks = MagicMock()
     mock_current_user = UserModel(
         id=MOCK_USER_ID,
         email=MOCK_USER_EMAIL,
@@ -194,7 +235,9 @@ async def test_leave_team_failure(mock_leave_team_service):
     )
 
     with pytest.raises(HTTPException) as exc_info:
-        await leave_team(MOCK_TEAM_ID, mock_current_user, mock_db)
+        await leave_team(
+            MOCK_TEAM_ID, mock_background_tasks, mock_current_user, mock_db
+        )
 
     assert exc_info.value.status_code == 404
     assert exc_info.value.detail == f"Team does not exist: team_id={MOCK_TEAM_ID}"
@@ -204,15 +247,21 @@ async def test_leave_team_failure(mock_leave_team_service):
 @patch("app.api.team.delete_team_service")
 async def test_delete_team_success(mock_delete_team_service):
     mock_db = AsyncMock()
+    mock_background_tasks = MagicMock()
     mock_current_user = UserModel(
         id=MOCK_USER_ID,
         email=MOCK_USER_EMAIL,
     )
-    mock_delete_team_service.return_value = DeleteTeamResponse()
+    mock_delete_team_service.return_value = True
 
-    result = await delete_team(MOCK_TEAM_ID, mock_current_user, mock_db)
+    result = await delete_team(
+        MOCK_TEAM_ID, mock_background_tasks, mock_current_user, mock_db
+    )
 
     assert isinstance(result, DeleteTeamResponse)
+    mock_background_tasks.add_task.assert_called_once_with(
+        collect_deletions_service, mock_db, DELETION_BACKGROUND_TIME_BUDGET_SECONDS
+    )
 
 
 @pytest.mark.asyncio
@@ -259,6 +308,7 @@ async def test_kick_team_member_failure(mock_kick_team_member_service):
 @patch("app.api.team.delete_project_service")
 async def test_delete_project_success(mock_delete_project_service):
     mock_db = AsyncMock()
+    mock_background_tasks = MagicMock()
     mock_delete_project_service.return_value = None
     mock_current_user = UserModel(
         id=MOCK_USER_ID,
@@ -267,10 +317,15 @@ async def test_delete_project_success(mock_delete_project_service):
     mock_delete_project_request = DeleteProjectRequest(project_id=MOCK_PROJECT_ID)
 
     result = await delete_project(
-        MOCK_TEAM_ID, mock_delete_project_request, mock_current_user, mock_db
+        MOCK_TEAM_ID,
+        mock_delete_project_request,
+        mock_background_tasks,
+        mock_current_user,
+        mock_db,
     )
 
     assert isinstance(result, DeleteProjectResponse)
+    mock_background_tasks.add_task.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -306,10 +361,23 @@ async def test_create_event_success(mock_create_event_for_team_service):
     assert result.event.rsvp_ids == []
 
 
+def test_create_event_request_failure_end_before_start():
+    with pytest.raises(ValidationError):
+        CreateEventRequest(
+            name=MOCK_EVENT_NAME,
+            description=MOCK_EVENT_DESCRIPTION,
+            start=MOCK_EVENT_END,
+            end=MOCK_EVENT_START,
+            colour=MOCK_EVENT_COLOUR,
+            location=MOCK_EVENT_LOCATION,
+        )
+
+
 @pytest.mark.asyncio
 @patch("app.api.team.delete_event_service")
 async def test_delete_event_success(mock_delete_event_service):
     mock_db = AsyncMock()
+    mock_background_tasks = MagicMock()
     mock_current_user = UserModel(
         id=MOCK_USER_ID,
         email=MOCK_USER_EMAIL,
@@ -318,10 +386,15 @@ async def test_delete_event_success(mock_delete_event_service):
     mock_delete_event_request = DeleteEventRequest(event_id=MOCK_EVENT_ID)
 
     result = await delete_event(
-        MOCK_TEAM_ID, mock_delete_event_request, mock_current_user, mock_db
+        MOCK_TEAM_ID,
+        mock_delete_event_request,
+        mock_background_tasks,
+        mock_current_user,
+        mock_db,
     )
 
     assert isinstance(result, DeleteEventResponse)
+    mock_background_tasks.add_task.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -353,3 +426,122 @@ async def test_get_team_events_success(mock_get_team_events_service):
     assert result.events[0].name == MOCK_EVENT_NAME
     assert result.events[0].description == MOCK_EVENT_DESCRIPTION
     assert result.events[0].rsvp_ids == []
+
+
+@pytest.mark.asyncio
+@patch("app.api.team.get_team_members_service")
+async def test_get_team_members_success(mock_get_team_members_service):
+    mock_db = AsyncMock()
+    mock_current_user = UserModel(id=MOCK_USER_ID, email=MOCK_USER_EMAIL)
+    mock_get_team_members_service.return_value = GetTeamMembersResponse(
+        members=[TeamMember(user_id=MOCK_USER_ID, role=TeamRole.EXEC)]
+    )
+
+    result = await get_team_members(
+        MOCK_TEAM_ID, TeamRole.EXEC, None, 20, mock_current_user, mock_db
+    )
+
+    assert isinstance(result, GetTeamMembersResponse)
+    assert result.members[0].role == TeamRole.EXEC
+    mock_get_team_members_service.assert_called_once_with(
+        MOCK_TEAM_ID, MOCK_USER_ID, TeamRole.EXEC, None, 20, mock_db
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.api.team.get_team_dashboard_service")
+async def test_get_team_dashboard_success(mock_get_team_dashboard_service):
+    mock_db = AsyncMock()
+    mock_current_user = UserModel(id=MOCK_USER_ID, email=MOCK_USER_EMAIL)
+    mock_get_team_dashboard_service.return_value = GetTeamDashboardResponse(
+        team=TeamSummary(
+            id=MOCK_TEAM_ID,
+            short_id="abcdef",
+            name="Team",
+            member_count=1,
+            role=TeamRole.EXEC,
+        ),
+        projects=[],
+        upcoming_events=[],
+        member_preview=[],
+    )
+
+    result = await get_team_dashboard(MOCK_TEAM_ID, mock_current_user, mock_db)
+
+    assert isinstance(result, GetTeamDashboardResponse)
+    mock_get_team_dashboard_service.assert_called_once_with(
+        MOCK_TEAM_ID, MOCK_USER_ID, mock_db
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.api.team.get_team_events_page_service")
+async def test_get_team_events_page_success(mock_get_team_events_page_service):
+    mock_db = AsyncMock()
+    mock_current_user = UserModel(id=MOCK_USER_ID, email=MOCK_USER_EMAIL)
+    mock_get_team_events_page_service.return_value = GetTeamEventsResponse(
+        events=[], next_cursor="next"
+    )
+
+    result = await get_team_events_page(
+        MOCK_TEAM_ID, None, None, None, 20, mock_current_user, mock_db
+    )
+
+    assert result.next_cursor == "next"
+    mock_get_team_events_page_service.assert_called_once_with(
+        MOCK_TEAM_ID, MOCK_USER_ID, None, None, None, 20, mock_db
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.api.team.get_team_calendar_service")
+async def test_get_team_calendar_success(mock_get_team_calendar_service):
+    mock_db = AsyncMock()
+    mock_get_team_calendar_service.return_value = TeamCalendarFeed(
+        etag='"etag"', body="BEGIN:VCALENDAR\r\nEND:VCALENDAR\r\n"
+    )
+
+    result = await get_team_calendar(MOCK_TEAM_ID, "signature", None, mock_db)
+
+    assert result.status_code == 200
+    assert result.headers["etag"] == '"etag"'
+    assert result.media_type.startswith("text/calendar")
+    assert result.body == b"BEGIN:VCALENDAR\r\nEND:VCALENDAR\r\n"
+
+
+@pytest.mark.asyncio
+@patch("app.api.team.get_team_calendar_service")
+async def test_get_team_calendar_not_modified(mock_get_team_calendar_service):
+    mock_db = AsyncMock()
+    mock_get_team_calendar_service.return_value = TeamCalendarFeed(etag='"etag"')
+
+    result = await get_team_calendar(MOCK_TEAM_ID, "signature", '"etag"', mock_db)
+
+    assert result.status_code == 304
+    assert result.headers["etag"] == '"etag"'
+    assert result.body == b""
+    mock_get_team_calendar_service.assert_called_once_with(
+        MOCK_TEAM_ID, "signature", '"etag"', mock_db
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.api.team.regenerate_team_calendar_url_service")
+async def test_regenerate_team_calendar_url_success(
+    mock_regenerate_team_calendar_url_service,
+):
+    mock_db = AsyncMock()
+    mock_current_user = UserModel(
+        id=MOCK_USER_ID,
+        email=MOCK_USER_EMAIL,
+    )
+    mock_regenerate_team_calendar_url_service.return_value = "url"
+
+    result = await regenerate_team_calendar_url(
+        MOCK_TEAM_ID, mock_current_user, mock_db
+    )
+
+    assert result.url == "url"
+    mock_regenerate_team_calendar_url_service.assert_called_once_with(
+        MOCK_TEAM_ID, MOCK_USER_ID, mock_db
+    )
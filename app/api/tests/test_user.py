@@ -1,4 +1,4 @@
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -7,9 +7,11 @@ from app.api.user import (
     create_user,
     get_current_user,
     get_current_user_teams,
+    get_my_todos,
     get_user_by_id,
     verify_code,
 )
+from app.schemas.project import GetMyTodosResponse
 from app.schemas.team import TeamModel
 from app.schemas.user import (
     ChangePasswordRequest,
@@ -40,9 +42,12 @@ async def test_create_user_success(mock_create_user_service):
     mock_create_user_response = CreateUserResponse()
     mock_create_user_service.return_value = mock_create_user_response
 
-    result = await create_user(create_user_request, mock_db)
+    mock_background_tasks = MagicMock()
+
+    result = await create_user(create_user_request, mock_background_tasks, mock_db)
 
     assert isinstance(result, CreateUserResponse)
+    mock_background_tasks.add_task.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -152,3 +157,20 @@ async def test_change_password_success(mock_change_password_service):
     )
 
     assert isinstance(result, ChangePasswordResponse)
+
+
+@pytest.mark.asyncio
+@patch("app.api.user.get_my_todos_service")
+async def test_get_my_todos_success(mock_get_my_todos_service):
+    mock_db = AsyncMock()
+    mock_user = UserModel(id=MOCK_USER_ID, email=MOCK_USER_EMAIL)
+    mock_get_my_todos_service.return_value = GetMyTodosResponse(todos=[])
+
+    result = await get_my_todos(
+        status_id=None, cursor=None, limit=20, current_user=mock_user, db=mock_db
+    )
+
+    assert isinstance(result, GetMyTodosResponse)
+    mock_get_my_todos_service.assert_called_once_with(
+        MOCK_USER_ID, None, None, 20, mock_db
+    )
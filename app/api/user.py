@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
 from pymongo.asynchronous.database import AsyncDatabase
 
 from app.api.auth import get_current_user_info
+from app.core.constants import (
+    DEFAULT_PAGE_SIZE,
+    EMAIL_BACKGROUND_TIME_BUDGET_SECONDS,
+    MAX_PAGE_SIZE,
+)
 from app.db.client import get_db
+from app.schemas.project import GetMyTodosResponse
 from app.schemas.user import (
     ChangePasswordRequest,
     ChangePasswordResponse,
@@ -15,6 +21,7 @@ from app.schemas.user import (
     VerifyCodeRequest,
     VerifyCodeResponse,
 )
+from app.service.cron import drain_email_outbox_service
 from app.service.user import (
     change_password_service,
     create_user_service,
@@ -23,6 +30,7 @@ from app.service.user import (
     verify_code_service,
 )
 from app.service.user import get_users_by_ids_service
+from app.service.project import get_my_todos_service
 from typing import List
 from fastapi import Body
 
@@ -31,9 +39,18 @@ router = APIRouter()
 
 @router.post("/register")
 async def create_user(
-    create_user_request: CreateUserRequest, db: AsyncDatabase = Depends(get_db)
+    create_user_request: CreateUserRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncDatabase = Depends(get_db),
 ) -> CreateUserResponse:
-    return await create_user_service(create_user_request, db)
+    response = await create_user_service(create_user_request, db)
+
+    # Deliver the verification email once the response is sent
+    background_tasks.add_task(
+        drain_email_outbox_service, db, EMAIL_BACKGROUND_TIME_BUDGET_SECONDS
+    )
+
+    return response
 
 
 @router.post("/verify-code")
@@ -76,6 +93,17 @@ async def get_users_by_ids(
     return await get_users_by_ids_service(user_ids, db)
 
 
+@router.get("/my-todos")
+async def get_my_todos(
+    status_id: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: UserModel = Depends(get_current_user_info),
+    db: AsyncDatabase = Depends(get_db),
+) -> GetMyTodosResponse:
+    return await get_my_todos_service(current_user.id, status_id, cursor, limit, db)
+
+
 @router.post("/change-password")
 async def change_password(
     change_password_request: ChangePasswordRequest,
@@ -0,0 +1,128 @@
+"""Read and write latency of a large project before and after the child refs move.
+
+Seeds a scratch database with one project of TODO_COUNT todos twice, once in the
+legacy layout (todos only listed in projects.todo_ids) and once migrated (todos
+carry project_id), then times the DB layer against both.
+
+    MONGODB_URI=... python -m app.benchmarks.child_refs
+"""
+
+import asyncio
+import os
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List
+
+from bson import ObjectId
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import PROJECTS_COLLECTION, TODOS_COLLECTION
+from app.db.client import client
+from app.db.indexes import db_ensure_indexes
+from app.db.project import db_add_todo, db_delete_todo, db_get_todo_items
+from app.schemas.project import AddTodoRequest
+
+BENCHMARK_DB_NAME = os.getenv("BENCHMARK_DB", "benchmark_child_refs")
+TODO_COUNT = int(os.getenv("BENCHMARK_TODO_COUNT", "5000"))
+ROUNDS = int(os.getenv("BENCHMARK_ROUNDS", "20"))
+
+
+async def seed_project(db: AsyncDatabase, migrated: bool) -> str:
+    project_id = ObjectId()
+    status_id = ObjectId()
+    now = datetime.now(timezone.utc)
+
+    todos = [
+        {
+            "_id": ObjectId(),
+            "name": f"Todo {i}",
+            "description": "Seeded by the child refs benchmark",
+            "status_id": status_id,
+            "assignee_id": None,
+            "approved": True,
+            "updated_at": now,
+        }
+        for i in range(TODO_COUNT)
+    ]
+    if migrated:
+        for todo in todos:
+            todo["project_id"] = project_id
+    await db[TODOS_COLLECTION].insert_many(todos)
+
+    await db[PROJECTS_COLLECTION].insert_one(
+        {
+            "_id": project_id,
+            "name": "Benchmark",
+            "description": "",
+            "todo_statuses": [{"id": status_id, "name": "To Do", "color": "#000000"}],
+            "todo_ids": [todo["_id"] for todo in todos],
+            "budget_available": 0.0,
+            "budget_spent": 0.0,
+            "child_refs_migrated": migrated,
+        }
+    )
+
+    return str(project_id)
+
+
+async def time_ms(operation: Callable[[], Awaitable[object]]) -> List[float]:
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        await operation()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: List[float]) -> None:
+    print(
+        f"{label:<32} median={statistics.median(timings):8.2f}ms "
+        f"max={max(timings):8.2f}ms"
+    )
+
+
+async def benchmark_layout(db: AsyncDatabase, migrated: bool) -> None:
+    layout = "migrated" if migrated else "legacy"
+    project_id = await seed_project(db, migrated)
+    project = await db[PROJECTS_COLLECTION].find_one({"_id": ObjectId(project_id)})
+    status_id = str(project["todo_statuses"][0]["id"])
+
+    report(
+        f"{layout} read todos",
+        await time_ms(lambda: db_get_todo_items(project_id, db)),
+    )
+
+    added_todo_ids = []
+
+    async def add_todo() -> None:
+        todo = await db_add_todo(
+            project_id,
+            AddTodoRequest(name="Benchmark write", description="", status_id=status_id),
+            True,
+            db,
+        )
+        added_todo_ids.append(todo["_id"])
+
+    report(f"{layout} add todo", await time_ms(add_todo))
+    report(
+        f"{layout} delete todo",
+        await time_ms(lambda: db_delete_todo(project_id, added_todo_ids.pop(), db)),
+    )
+
+
+async def main() -> None:
+    await client.drop_database(BENCHMARK_DB_NAME)
+    db = client.get_database(BENCHMARK_DB_NAME)
+    await db_ensure_indexes(db)
+
+    print(f"{TODO_COUNT} todos per project, {ROUNDS} rounds per operation")
+    try:
+        await benchmark_layout(db, migrated=False)
+        await benchmark_layout(db, migrated=True)
+    finally:
+        await client.drop_database(BENCHMARK_DB_NAME)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
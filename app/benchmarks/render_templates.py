@@ -0,0 +1,52 @@
+"""Times rendering of the email templates from the precompiled environment.
+
+python -m app.benchmarks.render_templates [--renders N]
+"""
+
+import argparse
+import timeit
+
+from app.core.templates import env
+
+# Representative context for each email template
+TEMPLATE_CONTEXTS = {
+    "verification_code_email.html": {
+        "verification_code": "123456",
+        "expiry_minutes": 10,
+    },
+    "rsvp_request_email.html": {
+        "event_name": "Annual General Meeting",
+        "event_description": "Elections for next year's committee, then pizza.",
+        "event_start": "Tuesday, October 10, 2023 at 06:00 PM UTC",
+        "event_end": "Tuesday, October 10, 2023 at 08:00 PM UTC",
+        "event_location": "Building 5, Room 101",
+        "accept_url": "https://clubsync.club/events/reply-rsvp/-rsvp_id-/accepted",
+        "decline_url": "https://clubsync.club/events/reply-rsvp/-rsvp_id-/declined",
+    },
+    "event_reminder_email.html": {
+        "event_name": "Annual General Meeting",
+        "when": "1 hour",
+        "event_location": "Building 5, Room 101",
+        "event_time": "Tuesday, October 10, 2023 at 06:00 PM UTC",
+    },
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.benchmarks.render_templates")
+    parser.add_argument(
+        "--renders", type=int, default=10000, help="renders timed per template"
+    )
+    args = parser.parse_args()
+
+    for name, context in TEMPLATE_CONTEXTS.items():
+        template = env.get_template(name)
+        seconds = timeit.timeit(lambda: template.render(**context), number=args.renders)
+        print(
+            f"{name:<32} {seconds / args.renders * 1e6:8.1f} us/render "
+            f"{args.renders / seconds:10.0f} renders/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
-from typing import Any
+import base64
+import json
+import random
+import string
+from typing import Any, Dict
 from bson import ObjectId
 
+from app.core.constants import TEAM_SHORT_ID_LENGTH
+
 
 def stringify_object_ids(obj: Any) -> Any:
     if isinstance(obj, ObjectId):
@@ -10,3 +16,42 @@ def stringify_object_ids(obj: Any) -> Any:
     elif isinstance(obj, dict):
         return {key: stringify_object_ids(value) for key, value in obj.items()}
     return obj
+
+
+# Opaque pagination cursors handed to clients, so the keyset fields behind a page
+# can change without changing the API
+def encode_cursor(cursor: Dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(decoded, dict):
+        raise ValueError("Invalid cursor")
+
+    return decoded
+
+
+# An id read from a cursor or query param, as an ObjectId string. Raises
+# ValueError for anything else, so it is rejected before reaching Mongo.
+def parse_object_id(value: Any) -> str:
+    if not isinstance(value, str) or not ObjectId.is_valid(value):
+        raise ValueError(f"Invalid ObjectId: {value!r}")
+    return value
+
+
+# Whether an If-None-Match header names etag, so a 304 can be sent instead
+def etag_matches(etag: str, if_none_match: str | None) -> bool:
+    if not if_none_match:
+        return False
+
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def generate_team_short_id() -> str:
+    return "".join(random.choices(string.ascii_lowercase, k=TEAM_SHORT_ID_LENGTH))
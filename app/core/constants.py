@@ -13,11 +13,96 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_HOURS = 48
 VERIFICATION_CODE_EXPIRE_MINUTES = 15
 
+TEAM_SHORT_ID_LENGTH = 6
+# With 26^6 ids a collision is rare, so running out of attempts means something
+# other than bad luck is wrong
+TEAM_SHORT_ID_MAX_ATTEMPTS = 5
+# A team keeps its short id for life, so a resolved id only goes stale when the
+# team is deleted. A bad code is remembered briefly, a new team may claim it.
+TEAM_SHORT_ID_CACHE_SIZE = 1024
+TEAM_SHORT_ID_CACHE_TTL_SECONDS = 600
+TEAM_SHORT_ID_NEGATIVE_CACHE_TTL_SECONDS = 30
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+TEAM_DASHBOARD_UPCOMING_EVENTS_LIMIT = 5
+TEAM_DASHBOARD_MEMBER_PREVIEW_LIMIT = 10
+
+# Calendar apps poll feeds every few minutes, a cached feed is still checked
+# against the team's calendar_version on every poll
+TEAM_CALENDAR_CACHE_SIZE = 256
+TEAM_CALENDAR_CACHE_TTL_SECONDS = 600
+
+ARCHIVE_TODOS_BATCH_SIZE = 500
+ARCHIVE_TODOS_DEFAULT_AGE_DAYS = 30
+
+# Every project starts with these statuses, as (name, color)
+DEFAULT_TODO_STATUSES = [
+    ("To Do", "#6B7280"),
+    ("In Progress", "#F59E0B"),
+    ("Done", "#10B981"),
+]
+DEFAULT_TODO_STATUS_COLOR = "#6B7280"
+
+MIGRATION_BATCH_SIZE = 500
+MIGRATION_THROTTLE_SECONDS = 0.05
+MIGRATION_LEASE_SECONDS = 60
+# Leaves headroom under the 10 second function limit for the batch in flight
+MIGRATION_CRON_TIME_BUDGET_SECONDS = 6
+
+DELETION_BATCH_SIZE = 500
+DELETION_THROTTLE_SECONDS = 0.05
+DELETION_LEASE_SECONDS = 60
+DELETION_CRON_TIME_BUDGET_SECONDS = 6
+# Shorter than the cron budget, a background collection shares its invocation
+# with the request which enqueued the deletion
+DELETION_BACKGROUND_TIME_BUDGET_SECONDS = 3
+DELETION_JOB_RETENTION_DAYS = 7
+# An invite is inserted a moment before its event lists it, so the orphan sweep
+# leaves RSVPs younger than this alone
+ORPHAN_RSVP_GRACE_SECONDS = 10 * 60
+
+EMAIL_FROM_ADDRESS = "admin@clubsync.club"
+EMAIL_CLAIM_BATCH_SIZE = 20
+EMAIL_WORKER_COUNT = 4
+# Spread across all workers of one drain, concurrent drains each get their own
+EMAIL_RATE_LIMIT_PER_SECOND = 10
+EMAIL_SEND_TIMEOUT_SECONDS = 5
+EMAIL_MAX_ATTEMPTS = 5
+# Doubled after every failed attempt, up to the max
+EMAIL_RETRY_BASE_SECONDS = 30
+EMAIL_RETRY_MAX_SECONDS = 60 * 60
+EMAIL_LEASE_SECONDS = 60
+EMAIL_CRON_TIME_BUDGET_SECONDS = 6
+EMAIL_BACKGROUND_TIME_BUDGET_SECONDS = 3
+EMAIL_OUTBOX_RETENTION_DAYS = 7
+# SendGrid takes at most 1000 personalizations per request
+EMAIL_BATCH_MAX_RECIPIENTS = 1000
+
+RSVP_BULK_INVITE_MAX_EMAILS = 500
+# Reply links keep working this long after the event ends
+RSVP_REPLY_LINK_GRACE_DAYS = 7
+
+REMINDER_CLAIM_BATCH_SIZE = 20
+REMINDER_MAX_ATTEMPTS = 5
+REMINDER_LEASE_SECONDS = 60
+# Leaves room in the invocation to drain the reminder emails afterwards
+REMINDER_CRON_TIME_BUDGET_SECONDS = 4
+REMINDER_RETENTION_DAYS = 7
+
 USERS_COLLECTION = "users"
 TEAMS_COLLECTION = "teams"
+MEMBERSHIPS_COLLECTION = "memberships"
 KANBANS_COLLECTION = "kanbans"
 PROJECTS_COLLECTION = "projects"
 TODOS_COLLECTION = "todos"
+ARCHIVED_TODOS_COLLECTION = "archived_todos"
 EVENTS_COLLECTION = "events"
 VERIFICATION_CODES_COLLECTION = "verification_codes"
 RSVPS_COLLECTION = "rsvps"
+REALTIME_EVENTS_COLLECTION = "realtime_events"
+SCHEMA_MIGRATIONS_COLLECTION = "schema_migrations"
+DELETION_JOBS_COLLECTION = "deletion_jobs"
+EMAIL_OUTBOX_COLLECTION = "email_outbox"
+REMINDERS_COLLECTION = "reminders"
@@ -0,0 +1,81 @@
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from bson import ObjectId
+
+# Lines longer than this many octets are folded, per RFC 5545
+ICAL_LINE_LIMIT = 75
+ICAL_UID_DOMAIN = "clubsync.club"
+
+
+def _escape_text(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _format_time(time: datetime) -> str:
+    if time.tzinfo is None:
+        time = time.replace(tzinfo=timezone.utc)
+    return time.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+# Continuation lines start with a space, which counts towards their limit. Splits
+# on characters rather than octets so a multibyte character is never cut.
+def _fold(line: str) -> str:
+    chunks, chunk, chunk_octets = [], "", 0
+    for character in line:
+        octets = len(character.encode())
+        if chunk_octets + octets > ICAL_LINE_LIMIT:
+            chunks.append(chunk)
+            chunk, chunk_octets = " ", 1
+        chunk += character
+        chunk_octets += octets
+    chunks.append(chunk)
+    return "\r\n".join(chunks) + "\r\n"
+
+
+def render_calendar_header(calendar_name: str) -> str:
+    return "".join(
+        _fold(line)
+        for line in [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:-//{ICAL_UID_DOMAIN}//Team events//EN",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            f"X-WR-CALNAME:{_escape_text(calendar_name)}",
+        ]
+    )
+
+
+def render_calendar_footer() -> str:
+    return _fold("END:VCALENDAR")
+
+
+def render_calendar_event(event: Dict[str, Any]) -> str:
+    """Renders one event document as a VEVENT.
+
+    DTSTAMP is taken from the event's creation time, so a feed renders the same
+    bytes until one of its events changes.
+    """
+    event_id = str(event["_id"])
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{event_id}@{ICAL_UID_DOMAIN}",
+        f"DTSTAMP:{_format_time(ObjectId(event_id).generation_time)}",
+        f"DTSTART:{_format_time(event['start'])}",
+        f"DTEND:{_format_time(event['end'])}",
+        f"SUMMARY:{_escape_text(event.get('name', ''))}",
+    ]
+    if event.get("description"):
+        lines.append(f"DESCRIPTION:{_escape_text(event['description'])}")
+    if event.get("location"):
+        lines.append(f"LOCATION:{_escape_text(event['location'])}")
+    lines.append("END:VEVENT")
+
+    return "".join(_fold(line) for line in lines)
@@ -0,0 +1,177 @@
+import asyncio
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+
+from app.core.constants import EMAIL_FROM_ADDRESS, EMAIL_SEND_TIMEOUT_SECONDS
+
+SENDGRID_SEND_URL = "https://api.sendgrid.com/v3/mail/send"
+
+
+class EmailDeliveryError(Exception):
+    """Raised by a transport which could not deliver an email.
+
+    A retryable error, e.g. a timeout or a rate limit, is worth another attempt
+    later, anything else fails the email for good. For a batch, delivered counts
+    the leading recipients which were sent before the failure.
+    """
+
+    def __init__(
+        self, message: str, retryable: bool = True, delivered: int = 0
+    ) -> None:
+        super().__init__(message)
+        self.retryable = retryable
+        self.delivered = delivered
+
+
+def apply_substitutions(html_content: str, substitutions: Dict[str, str]) -> str:
+    for tag, value in substitutions.items():
+        html_content = html_content.replace(tag, value)
+    return html_content
+
+
+class EmailTransport(ABC):
+    @abstractmethod
+    async def send(self, to_email: str, subject: str, html_content: str) -> None: ...
+
+    # Each recipient carries to_email and the substitutions to apply to the
+    # content for them. By default they are sent one at a time, and a failure
+    # part way through reports how many were delivered so only the rest retry.
+    async def send_batch(
+        self, recipients: List[Dict[str, Any]], subject: str, html_content: str
+    ) -> None:
+        for delivered, recipient in enumerate(recipients):
+            try:
+                await self.send(
+                    recipient["to_email"],
+                    subject,
+                    apply_substitutions(
+                        html_content, recipient.get("substitutions", {})
+                    ),
+                )
+            except EmailDeliveryError as e:
+                raise EmailDeliveryError(str(e), e.retryable, delivered) from e
+
+    async def close(self) -> None:
+        pass
+
+
+class SendGridTransport(EmailTransport):
+    """Sends through the SendGrid v3 API on one HTTP session, so connections are
+    reused across emails instead of opened per send."""
+
+    def __init__(self, api_key: str, client: httpx.AsyncClient | None = None) -> None:
+        self._client = client or httpx.AsyncClient(
+            timeout=EMAIL_SEND_TIMEOUT_SECONDS,
+            headers={"Authorization": f"Bearer {api_key}"},
+        )
+
+    async def _post(self, payload: Dict[str, Any]) -> None:
+        try:
+            response = await self._client.post(SENDGRID_SEND_URL, json=payload)
+        except httpx.HTTPError as e:
+            raise EmailDeliveryError(f"SendGrid request failed: {e!r}") from e
+
+        if response.is_success:
+            return
+
+        raise EmailDeliveryError(
+            f"SendGrid rejected the email: status={response.status_code} body={response.text}",
+            retryable=response.status_code == 429 or response.status_code >= 500,
+        )
+
+    async def send(self, to_email: str, subject: str, html_content: str) -> None:
+        await self._post(
+            {
+                "personalizations": [{"to": [{"email": to_email}]}],
+                "from": {"email": EMAIL_FROM_ADDRESS},
+                "subject": subject,
+                "content": [{"type": "text/html", "value": html_content}],
+            }
+        )
+
+    # One request for the whole batch, SendGrid applies each personalization's
+    # substitutions to the content
+    async def send_batch(
+        self, recipients: List[Dict[str, Any]], subject: str, html_content: str
+    ) -> None:
+        await self._post(
+            {
+                "personalizations": [
+                    {
+                        "to": [{"email": recipient["to_email"]}],
+                        "substitutions": recipient.get("substitutions", {}),
+                    }
+                    for recipient in recipients
+                ],
+                "from": {"email": EMAIL_FROM_ADDRESS},
+                "subject": subject,
+                "content": [{"type": "text/html", "value": html_content}],
+            }
+        )
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class FileTransport(EmailTransport):
+    """Writes each email to a .eml file in a directory instead of sending it, for
+    local development and tests."""
+
+    def __init__(self, directory: str) -> None:
+        self._directory = Path(directory)
+
+    def _write(self, message: EmailMessage) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        path = self._directory / f"{time.time_ns()}-{uuid.uuid4().hex}.eml"
+        path.write_bytes(message.as_bytes())
+
+    async def send(self, to_email: str, subject: str, html_content: str) -> None:
+        message = EmailMessage()
+        message["From"] = EMAIL_FROM_ADDRESS
+        message["To"] = to_email
+        message["Subject"] = subject
+        message.set_content(html_content, subtype="html")
+
+        await asyncio.to_thread(self._write, message)
+
+
+def create_transport() -> EmailTransport:
+    if os.getenv("EMAIL_TRANSPORT", "sendgrid") == "file":
+        return FileTransport(os.getenv("EMAIL_FILE_DIR", "sent_emails"))
+    return SendGridTransport(os.environ["SENDGRID_KEY"])
+
+
+_transport: EmailTransport | None = None
+
+
+# Created on first use so the API key is only required once an email is sent
+def get_transport() -> EmailTransport:
+    global _transport
+    if _transport is None:
+        _transport = create_transport()
+    return _transport
+
+
+class RateLimiter:
+    """Spaces out callers of wait() so at most rate_per_second get through each
+    second, across every task sharing the limiter."""
+
+    def __init__(self, rate_per_second: float) -> None:
+        self._interval = 1 / rate_per_second
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            self._next_at = max(now, self._next_at) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
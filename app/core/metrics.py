@@ -0,0 +1,40 @@
+from collections import defaultdict
+from typing import Dict
+
+
+class Metrics:
+    """Process local counters.
+
+    Counters start from zero whenever a worker starts, so they describe recent
+    behaviour of one worker rather than all time totals.
+    """
+
+    def __init__(self) -> None:
+        self._counters: Dict[str, int] = defaultdict(int)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        self._counters[name] += amount
+
+    def get(self, name: str) -> int:
+        return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, int]:
+        return dict(self._counters)
+
+    def reset(self) -> None:
+        self._counters.clear()
+
+
+metrics = Metrics()
+
+TEAM_SHORT_ID_ALLOCATED = "team_short_id.allocated"
+TEAM_SHORT_ID_COLLISIONS = "team_short_id.collisions"
+TEAM_SHORT_ID_EXHAUSTED = "team_short_id.exhausted"
+TEAM_SHORT_ID_CACHE_HITS = "team_short_id.cache_hits"
+TEAM_SHORT_ID_CACHE_MISSES = "team_short_id.cache_misses"
+
+EMAIL_SENT = "email.sent"
+EMAIL_RETRIED = "email.retried"
+EMAIL_FAILED = "email.failed"
+
+RSVP_REPLY_REJECTED = "rsvp.reply_rejected"
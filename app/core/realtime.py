@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Set
+
+from fastapi.encoders import jsonable_encoder
+from pymongo import CursorType
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+from app.core.common import stringify_object_ids
+from app.core.constants import REALTIME_EVENTS_COLLECTION
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("REALTIME_SUBSCRIBER_QUEUE_SIZE", "100"))
+MONGO_BROKER_CAPPED_SIZE_BYTES = 16 * 1024 * 1024
+MONGO_BROKER_RETRY_SECONDS = 1.0
+
+# Queued in place of a message to tell a subscriber it has been evicted
+_EVICTED = object()
+
+
+class Subscription:
+    def __init__(self, topic: str, max_queue_size: int) -> None:
+        self.topic = topic
+        self.evicted = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+
+    def offer(self, message: Dict[str, Any]) -> bool:
+        try:
+            self._queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def evict(self) -> None:
+        # Drop whatever the consumer did not get to, it has to resync anyway
+        self.evicted = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(_EVICTED)
+
+    async def get(self) -> Dict[str, Any] | None:
+        message = await self._queue.get()
+        return None if message is _EVICTED else message
+
+    async def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        while True:
+            message = await self.get()
+            if message is None:
+                return
+            yield message
+
+
+class Broker(ABC):
+    """Carries published messages to the hub of every worker."""
+
+    @abstractmethod
+    async def publish(self, topic: str, message: Dict[str, Any]) -> None: ...
+
+    async def start(self, hub: "EventHub") -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class EventHub:
+    """In-process fan-out of messages to subscribers of a topic.
+
+    Every subscriber gets a bounded queue. A subscriber whose queue is full when a
+    message arrives is evicted instead of blocking delivery to everyone else.
+    """
+
+    def __init__(
+        self, broker: Broker, max_queue_size: int = SUBSCRIBER_QUEUE_SIZE
+    ) -> None:
+        self.broker = broker
+        self.max_queue_size = max_queue_size
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+
+    def subscribe(self, topic: str) -> Subscription:
+        subscription = Subscription(topic, self.max_queue_size)
+        self._subscriptions.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.topic)
+        if subscriptions is None:
+            return
+
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.topic]
+
+    def subscriber_count(self, topic: str) -> int:
+        return len(self._subscriptions.get(topic, ()))
+
+    def deliver(self, topic: str, message: Dict[str, Any]) -> None:
+        for subscription in list(self._subscriptions.get(topic, ())):
+            if not subscription.offer(message):
+                logger.warning(
+                    "Evicting slow realtime subscriber | topic=%s", subscription.topic
+                )
+                subscription.evict()
+                self.unsubscribe(subscription)
+
+    async def publish(self, topic: str, message: Dict[str, Any]) -> None:
+        await self.broker.publish(topic, message)
+
+    async def start(self) -> None:
+        await self.broker.start(self)
+
+    async def stop(self) -> None:
+        await self.broker.stop()
+
+
+class LocalBroker(Broker):
+    """Delivers straight to the hub of this process, for single worker deployments."""
+
+    def __init__(self) -> None:
+        self._hub: EventHub | None = None
+
+    async def start(self, hub: EventHub) -> None:
+        self._hub = hub
+
+    async def publish(self, topic: str, message: Dict[str, Any]) -> None:
+        if self._hub is not None:
+            self._hub.deliver(topic, message)
+
+
+class MongoBroker(Broker):
+    """Shares messages between workers through a capped collection.
+
+    Publishing inserts into the collection, and every worker tails it with a
+    tailable await cursor and delivers new documents to its own hub.
+    """
+
+    def __init__(self, db: AsyncDatabase) -> None:
+        self._db = db
+        self._task: asyncio.Task | None = None
+
+    async def publish(self, topic: str, message: Dict[str, Any]) -> None:
+        await self._db[REALTIME_EVENTS_COLLECTION].insert_one(
+            {
+                "topic": topic,
+                "message": message,
+                "created_at": datetime.now(timezone.utc),
+            }
+        )
+
+    async def start(self, hub: EventHub) -> None:
+        try:
+            await self._db.create_collection(
+                REALTIME_EVENTS_COLLECTION,
+                capped=True,
+                size=MONGO_BROKER_CAPPED_SIZE_BYTES,
+            )
+        except CollectionInvalid:
+            pass
+
+        self._task = asyncio.create_task(self._tail(hub))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _tail(self, hub: EventHub) -> None:
+        collection = self._db[REALTIME_EVENTS_COLLECTION]
+        started = False
+        last_id = None
+
+        while True:
+            try:
+                # Only deliver messages published after this worker started
+                if not started:
+                    latest = await collection.find_one({}, sort=[("$natural", -1)])
+                    last_id = latest["_id"] if latest else None
+                    started = True
+
+                query = {"_id": {"$gt": last_id}} if last_id else {}
+                cursor = collection.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+                while cursor.alive:
+                    async for document in cursor:
+                        last_id = document["_id"]
+                        hub.deliver(
+                            document["topic"], stringify_object_ids(document["message"])
+                        )
+                    await asyncio.sleep(0)
+            except PyMongoError as e:
+                logger.warning("Realtime broker cursor failed, retrying | error=%s", e)
+
+            # Tailable cursors die when the collection is empty, so reopen
+            await asyncio.sleep(MONGO_BROKER_RETRY_SECONDS)
+
+
+def create_broker() -> Broker:
+    if os.getenv("REALTIME_BROKER", "local") == "mongo":
+        from app.db.client import get_db
+
+        return MongoBroker(get_db())
+    return LocalBroker()
+
+
+hub = EventHub(create_broker())
+
+
+def project_topic(project_id: str) -> str:
+    return f"project:{project_id}"
+
+
+# Realtime updates are best effort, so a failed publish must never fail the
+# mutation which produced it. Messages are encoded to plain JSON types here, as
+# subscribers send them on with json.dumps and send_json.
+async def publish_project_event(
+    project_id: str, event_type: str, data: Dict[str, Any] | None = None
+) -> None:
+    message = {"type": event_type, "project_id": project_id, "data": data or {}}
+    try:
+        await hub.publish(
+            project_topic(project_id), jsonable_encoder(stringify_object_ids(message))
+        )
+    except Exception as e:
+        logger.warning(
+            "Failed to publish realtime event | project_id=%s type=%s error=%s",
+            project_id,
+            event_type,
+            e,
+        )
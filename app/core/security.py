@@ -1,3 +1,5 @@
+import hashlib
+import hmac
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict
 
@@ -58,3 +60,36 @@ def create_token_pair(data: Dict[str, Any]) -> TokenPair:
         refresh_expires_at=refresh_token_expires.total_seconds(),
         token_type="Bearer",
     )
+
+
+# Calendar apps cannot send credentials, so a team's feed URL carries a signature
+# of the team id and the team's calendar_token_version. The URL does not expire,
+# but bumping the version, when a member leaves or is kicked or a new link is
+# generated, revokes every URL signed before.
+def sign_team_calendar(team_id: str, token_version: int) -> str:
+    return hmac.new(
+        SECRET_KEY.encode(),
+        f"team-calendar:{team_id}:{token_version}".encode(),
+        hashlib.sha256,
+    ).hexdigest()
+
+
+def verify_team_calendar_signature(
+    team_id: str, token_version: int, signature: str
+) -> bool:
+    return hmac.compare_digest(sign_team_calendar(team_id, token_version), signature)
+
+
+# Reply links in invite emails are followed without credentials, so each carries
+# a signature of the RSVP id and the link's expiry, a unix timestamp. Checking it
+# costs no database read, which turns away link scanners guessing at ids.
+def sign_rsvp_reply(rsvp_id: str, expires: int) -> str:
+    return hmac.new(
+        SECRET_KEY.encode(), f"rsvp-reply:{rsvp_id}:{expires}".encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def verify_rsvp_reply_signature(rsvp_id: str, expires: int, signature: str) -> bool:
+    if expires <= datetime.now(timezone.utc).timestamp():
+        return False
+    return hmac.compare_digest(sign_rsvp_reply(rsvp_id, expires), signature)
@@ -1,9 +1,38 @@
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+import hashlib
 import os
+from typing import NamedTuple
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 templates_dir = os.path.join(os.path.dirname(__file__), "..", "templates")
 
+# Templates only change with a deploy, so once compiled they are never checked
+# against the files again
 env = Environment(
     loader=FileSystemLoader(templates_dir),
     autoescape=select_autoescape(["html", "xml"]),
+    auto_reload=False,
 )
+
+
+# Compiles every template up front, so the first email of each kind after a cold
+# start does not pay for it
+def precompile_templates() -> None:
+    for name in env.list_templates(extensions=["html"]):
+        env.get_template(name)
+
+
+class StaticPage(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def load_static_page(name: str) -> StaticPage:
+    with open(os.path.join(templates_dir, name), "rb") as f:
+        body = f.read()
+    return StaticPage(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:16]}"')
+
+
+precompile_templates()
+
+RSVP_RESPONSE_PAGE = load_static_page("rsvp_response_page.html")
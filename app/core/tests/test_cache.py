@@ -0,0 +1,46 @@
+from unittest.mock import patch
+
+from app.core.cache import TTLCache
+
+
+def test_ttl_cache_get_success():
+    cache = TTLCache(maxsize=2, ttl_seconds=60)
+
+    cache.set("team", "feed")
+
+    assert cache.get("team") == "feed"
+    assert cache.get("other") is None
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(maxsize=2, ttl_seconds=60)
+
+    with patch("app.core.cache.time.monotonic", return_value=0):
+        cache.set("team", "feed")
+    with patch("app.core.cache.time.monotonic", return_value=60):
+        assert cache.get("team") is None
+
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl_seconds=60)
+    cache.set("first", 1)
+    cache.set("second", 2)
+
+    cache.get("first")
+    cache.set("third", 3)
+
+    assert cache.get("first") == 1
+    assert cache.get("second") is None
+    assert cache.get("third") == 3
+
+
+def test_ttl_cache_invalidate_success():
+    cache = TTLCache(maxsize=2, ttl_seconds=60)
+    cache.set("team", "feed")
+
+    cache.invalidate("team")
+    cache.invalidate("missing")
+
+    assert cache.get("team") is None
@@ -1,6 +1,14 @@
 from bson import ObjectId
+import pytest
 
-from app.core.common import stringify_object_ids
+from app.core.common import (
+    decode_cursor,
+    encode_cursor,
+    etag_matches,
+    generate_team_short_id,
+    parse_object_id,
+    stringify_object_ids,
+)
 
 
 def test_stringify_object_ids_success():
@@ -17,3 +25,48 @@ def test_stringify_object_ids_success():
         for item in input_data
     ]
     assert stringify_object_ids(input_data) == expected_output
+
+
+def test_encode_decode_cursor_success():
+    cursor = {"score": 1.5, "id": str(ObjectId())}
+
+    assert decode_cursor(encode_cursor(cursor)) == cursor
+
+
+def test_decode_cursor_invalid_failure():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_parse_object_id_success():
+    object_id = str(ObjectId())
+
+    assert parse_object_id(object_id) == object_id
+
+
+@pytest.mark.parametrize("value", ["not-an-id", 123, None, {"$gt": ""}])
+def test_parse_object_id_invalid_failure(value):
+    with pytest.raises(ValueError):
+        parse_object_id(value)
+
+
+def test_generate_team_short_id_success():
+    short_id = generate_team_short_id()
+
+    assert len(short_id) == 6
+    assert short_id.isalpha() and short_id.islower()
+
+
+@pytest.mark.parametrize(
+    "if_none_match, expected",
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"other", "abc"', True),
+        ("*", True),
+        ('"other"', False),
+    ],
+)
+def test_etag_matches(if_none_match, expected):
+    assert etag_matches('"abc"', if_none_match) is expected
@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+from app.core.ical import (
+    ICAL_LINE_LIMIT,
+    render_calendar_event,
+    render_calendar_footer,
+    render_calendar_header,
+)
+
+
+def test_render_calendar_event_success():
+    event_id = str(ObjectId())
+
+    result = render_calendar_event(
+        {
+            "_id": event_id,
+            "name": "Meeting; planning, Q4",
+            "description": "Line one\nLine two",
+            "start": datetime(2023, 10, 10, 10),
+            "end": datetime(2023, 10, 10, 12, tzinfo=timezone.utc),
+            "location": "",
+        }
+    )
+
+    lines = result.split("\r\n")
+    assert lines[0] == "BEGIN:VEVENT"
+    assert f"UID:{event_id}@clubsync.club" in lines
+    assert "DTSTART:20231010T100000Z" in lines
+    assert "DTEND:20231010T120000Z" in lines
+    assert "SUMMARY:Meeting\\; planning\\, Q4" in lines
+    assert "DESCRIPTION:Line one\\nLine two" in lines
+    assert not any(line.startswith("LOCATION") for line in lines)
+    assert result.endswith("END:VEVENT\r\n")
+
+
+def test_render_calendar_event_folds_long_lines():
+    result = render_calendar_event(
+        {
+            "_id": str(ObjectId()),
+            "name": "é" * 100,
+            "start": datetime(2023, 10, 10, 10),
+            "end": datetime(2023, 10, 10, 12),
+        }
+    )
+
+    lines = result.split("\r\n")
+    assert all(len(line.encode()) <= ICAL_LINE_LIMIT for line in lines)
+    summary_index = next(
+        index for index, line in enumerate(lines) if line.startswith("SUMMARY:")
+    )
+    assert lines[summary_index + 1].startswith(" ")
+
+
+def test_render_calendar_wraps_events():
+    header = render_calendar_header("Team, One")
+
+    assert header.startswith("BEGIN:VCALENDAR\r\n")
+    assert "X-WR-CALNAME:Team\\, One\r\n" in header
+    assert render_calendar_footer() == "END:VCALENDAR\r\n"
@@ -0,0 +1,115 @@
+import json
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+
+from app.core.mail import (
+    SENDGRID_SEND_URL,
+    EmailDeliveryError,
+    FileTransport,
+    SendGridTransport,
+)
+from app.test_shared.constants import MOCK_USER_2_EMAIL, MOCK_USER_EMAIL
+
+
+def _sendgrid_transport(status_code):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(status_code)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return SendGridTransport("key", client), requests
+
+
+@pytest.mark.asyncio
+async def test_sendgrid_transport_send_success():
+    transport, requests = _sendgrid_transport(202)
+
+    await transport.send(MOCK_USER_EMAIL, "Subject", "<p>Body</p>")
+
+    assert len(requests) == 1
+    assert str(requests[0].url) == SENDGRID_SEND_URL
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "status_code, retryable", [(429, True), (503, True), (400, False)]
+)
+async def test_sendgrid_transport_send_failure(status_code, retryable):
+    transport, _ = _sendgrid_transport(status_code)
+
+    with pytest.raises(EmailDeliveryError) as exc_info:
+        await transport.send(MOCK_USER_EMAIL, "Subject", "<p>Body</p>")
+
+    assert exc_info.value.retryable is retryable
+
+
+@pytest.mark.asyncio
+async def test_sendgrid_transport_send_batch_success():
+    transport, requests = _sendgrid_transport(202)
+
+    await transport.send_batch(
+        [
+            {"to_email": MOCK_USER_EMAIL, "substitutions": {"-name-": "a"}},
+            {"to_email": MOCK_USER_2_EMAIL, "substitutions": {"-name-": "b"}},
+        ],
+        "Subject",
+        "<p>-name-</p>",
+    )
+
+    assert len(requests) == 1
+    personalizations = json.loads(requests[0].content)["personalizations"]
+    assert personalizations == [
+        {"to": [{"email": MOCK_USER_EMAIL}], "substitutions": {"-name-": "a"}},
+        {"to": [{"email": MOCK_USER_2_EMAIL}], "substitutions": {"-name-": "b"}},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_file_transport_send_success(tmp_path):
+    transport = FileTransport(str(tmp_path))
+
+    await transport.send(MOCK_USER_EMAIL, "Subject", "<p>Body</p>")
+
+    (path,) = tmp_path.iterdir()
+    content = path.read_text()
+    assert f"To: {MOCK_USER_EMAIL}" in content
+    assert "Subject: Subject" in content
+
+
+@pytest.mark.asyncio
+async def test_file_transport_send_batch_success(tmp_path):
+    transport = FileTransport(str(tmp_path))
+
+    await transport.send_batch(
+        [
+            {"to_email": MOCK_USER_EMAIL, "substitutions": {"-name-": "first"}},
+            {"to_email": MOCK_USER_2_EMAIL, "substitutions": {"-name-": "second"}},
+        ],
+        "Subject",
+        "<p>-name-</p>",
+    )
+
+    contents = sorted(path.read_text() for path in tmp_path.iterdir())
+    assert len(contents) == 2
+    assert any("first" in c and f"To: {MOCK_USER_EMAIL}" in c for c in contents)
+    assert any("second" in c and f"To: {MOCK_USER_2_EMAIL}" in c for c in contents)
+
+
+@pytest.mark.asyncio
+async def test_file_transport_send_batch_failure_reports_delivered(tmp_path):
+    transport = FileTransport(str(tmp_path))
+    transport.send = AsyncMock(side_effect=[None, EmailDeliveryError("Timed out")])
+
+    with pytest.raises(EmailDeliveryError) as exc_info:
+        await transport.send_batch(
+            [{"to_email": MOCK_USER_EMAIL}, {"to_email": MOCK_USER_2_EMAIL}],
+            "Subject",
+            "<p>Body</p>",
+        )
+
+    assert exc_info.value.delivered == 1
+    assert exc_info.value.retryable is True
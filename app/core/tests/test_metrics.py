@@ -0,0 +1,21 @@
+from app.core.metrics import Metrics
+
+
+def test_metrics_increment_success():
+    metrics = Metrics()
+
+    metrics.increment("allocated")
+    metrics.increment("allocated", 2)
+
+    assert metrics.get("allocated") == 3
+    assert metrics.get("collisions") == 0
+    assert metrics.snapshot() == {"allocated": 3}
+
+
+def test_metrics_reset_success():
+    metrics = Metrics()
+    metrics.increment("allocated")
+
+    metrics.reset()
+
+    assert metrics.snapshot() == {}
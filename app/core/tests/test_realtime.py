@@ -0,0 +1,103 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from pymongo import CursorType
+from pymongo.errors import PyMongoError
+
+from app.core.realtime import (
+    EventHub,
+    LocalBroker,
+    MongoBroker,
+    project_topic,
+    publish_project_event,
+)
+from app.test_shared.constants import MOCK_PROJECT_ID, MOCK_TODO_ID
+
+
+@pytest.mark.asyncio
+async def test_event_hub_publish_delivers_to_topic_subscribers_success():
+    hub = EventHub(LocalBroker())
+    await hub.start()
+    subscription = hub.subscribe(project_topic(MOCK_PROJECT_ID))
+    other_subscription = hub.subscribe(project_topic(MOCK_TODO_ID))
+
+    await hub.publish(project_topic(MOCK_PROJECT_ID), {"type": "todo_added"})
+
+    assert await subscription.get() == {"type": "todo_added"}
+    assert other_subscription._queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_event_hub_evicts_slow_subscriber_success():
+    hub = EventHub(LocalBroker(), max_queue_size=1)
+    await hub.start()
+    topic = project_topic(MOCK_PROJECT_ID)
+    subscription = hub.subscribe(topic)
+
+    await hub.publish(topic, {"type": "first"})
+    await hub.publish(topic, {"type": "second"})
+
+    assert subscription.evicted is True
+    assert hub.subscriber_count(topic) == 0
+    assert await subscription.get() is None
+
+
+@pytest.mark.asyncio
+async def test_event_hub_unsubscribe_success():
+    hub = EventHub(LocalBroker())
+    await hub.start()
+    topic = project_topic(MOCK_PROJECT_ID)
+    subscription = hub.subscribe(topic)
+
+    hub.unsubscribe(subscription)
+    await hub.publish(topic, {"type": "todo_added"})
+
+    assert hub.subscriber_count(topic) == 0
+    assert subscription._queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_mongo_broker_publish_success():
+    mock_collection = AsyncMock()
+    mock_db = MagicMock()
+    mock_db.__getitem__.return_value = mock_collection
+    broker = MongoBroker(mock_db)
+
+    await broker.publish(project_topic(MOCK_PROJECT_ID), {"type": "todo_added"})
+
+    inserted = mock_collection.insert_one.call_args.args[0]
+    assert inserted["topic"] == project_topic(MOCK_PROJECT_ID)
+    assert inserted["message"] == {"type": "todo_added"}
+
+
+@pytest.mark.asyncio
+@patch("app.core.realtime.asyncio.sleep")
+async def test_mongo_broker_tail_retries_failed_start_success(mock_sleep):
+    mock_collection = MagicMock()
+    # The first read of the latest message fails, the retry finds none
+    mock_collection.find_one = AsyncMock(side_effect=[PyMongoError("down"), None])
+    mock_collection.find.return_value = MagicMock(alive=False)
+    mock_db = MagicMock()
+    mock_db.__getitem__.return_value = mock_collection
+    broker = MongoBroker(mock_db)
+    # Stops the loop once the reopened cursor has been tailed
+    mock_sleep.side_effect = [None, asyncio.CancelledError()]
+
+    with pytest.raises(asyncio.CancelledError):
+        await broker._tail(EventHub(LocalBroker()))
+
+    assert mock_collection.find_one.call_count == 2
+    mock_collection.find.assert_called_once_with(
+        {}, cursor_type=CursorType.TAILABLE_AWAIT
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.core.realtime.hub")
+async def test_publish_project_event_swallows_errors_success(mock_hub):
+    mock_hub.publish = AsyncMock(side_effect=RuntimeError("broker down"))
+
+    await publish_project_event(MOCK_PROJECT_ID, "todo_deleted", {"todo_id": "x"})
+
+    mock_hub.publish.assert_called_once()
@@ -0,0 +1,15 @@
+from app.core.templates import env, load_static_page
+
+
+def test_templates_precompiled():
+    # Compiled at import, so rendering never goes back to the loader
+    cached_names = {name for _, name in env.cache.keys()}
+    assert set(env.list_templates(extensions=["html"])) <= cached_names
+
+
+def test_load_static_page_etag_follows_content():
+    page = load_static_page("rsvp_response_page.html")
+
+    assert page.body.startswith(b"<!DOCTYPE html>")
+    assert page.etag == load_static_page("rsvp_response_page.html").etag
+    assert page.etag != load_static_page("base_email.html").etag
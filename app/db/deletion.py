@@ -0,0 +1,433 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import (
+    ARCHIVED_TODOS_COLLECTION,
+    DELETION_BATCH_SIZE,
+    DELETION_JOBS_COLLECTION,
+    DELETION_LEASE_SECONDS,
+    DELETION_THROTTLE_SECONDS,
+    EVENTS_COLLECTION,
+    MEMBERSHIPS_COLLECTION,
+    ORPHAN_RSVP_GRACE_SECONDS,
+    PROJECTS_COLLECTION,
+    REMINDERS_COLLECTION,
+    RSVPS_COLLECTION,
+    TODOS_COLLECTION,
+)
+
+DELETION_TEAM = "team"
+DELETION_PROJECT = "project"
+DELETION_EVENT = "event"
+
+DELETION_PENDING = "pending"
+DELETION_DONE = "done"
+
+# What a deletion job needs from the deleted document to find its descendants.
+# Only legacy projects ship todo_ids, migrated ones find their todos by project_id.
+TEAM_DELETION_PROJECTION = {"project_ids": 1, "event_ids": 1}
+PROJECT_DELETION_PROJECTION = {
+    "todo_ids": {
+        "$cond": [{"$eq": ["$child_refs_migrated", True]}, "$$REMOVE", "$todo_ids"]
+    }
+}
+EVENT_DELETION_PROJECTION = {"rsvp_ids": 1}
+
+
+def _deletion_job(
+    kind: str, document: Dict[str, Any], refs: Dict[str, List[ObjectId]]
+) -> Dict[str, Any]:
+    return {
+        "kind": kind,
+        "target_id": document["_id"],
+        "refs": refs,
+        "state": DELETION_PENDING,
+        "phase": 0,
+        "deleted_counts": {},
+        "created_at": datetime.now(timezone.utc),
+        "lease_expires_at": None,
+    }
+
+
+def _team_deletion_job(team: Dict[str, Any]) -> Dict[str, Any]:
+    return _deletion_job(
+        DELETION_TEAM,
+        team,
+        {
+            "project_ids": team.get("project_ids", []),
+            "event_ids": team.get("event_ids", []),
+        },
+    )
+
+
+def _project_deletion_job(project: Dict[str, Any]) -> Dict[str, Any]:
+    return _deletion_job(
+        DELETION_PROJECT, project, {"todo_ids": project.get("todo_ids", [])}
+    )
+
+
+def _event_deletion_job(event: Dict[str, Any]) -> Dict[str, Any]:
+    # rsvp_ids are stored as strings on the event
+    return _deletion_job(
+        DELETION_EVENT,
+        event,
+        {"rsvp_ids": [ObjectId(rsvp_id) for rsvp_id in event.get("rsvp_ids", [])]},
+    )
+
+
+_DELETION_JOB_BUILDERS = {
+    DELETION_TEAM: _team_deletion_job,
+    DELETION_PROJECT: _project_deletion_job,
+    DELETION_EVENT: _event_deletion_job,
+}
+
+
+# Takes the deleted document itself, read with the matching *_DELETION_PROJECTION,
+# since its descendants can no longer be looked up through it
+async def db_enqueue_deletions(
+    kind: str, documents: List[Dict[str, Any]], db: AsyncDatabase
+) -> None:
+    if not documents:
+        return
+
+    await db[DELETION_JOBS_COLLECTION].insert_many(
+        [_DELETION_JOB_BUILDERS[kind](document) for document in documents]
+    )
+
+
+# Deletes up to batch_size documents matching query and returns how many went. With
+# a job_kind, every deleted document first gets a deletion job of its own, so
+# descendants further down are collected in batches too.
+async def _delete_batch(
+    collection: str,
+    query: Dict[str, Any],
+    batch_size: int,
+    db: AsyncDatabase,
+    job_kind: str | None = None,
+    projection: Dict[str, Any] | None = None,
+) -> int:
+    documents = (
+        await db[collection]
+        .find(query, projection or {"_id": 1})
+        .limit(batch_size)
+        .to_list(None)
+    )
+    if not documents:
+        return 0
+
+    if job_kind is not None:
+        await db_enqueue_deletions(job_kind, documents, db)
+
+    await db[collection].delete_many(
+        {"_id": {"$in": [document["_id"] for document in documents]}}
+    )
+    return len(documents)
+
+
+# Children which predate parent references are only found through the id array
+# captured on the job
+def _children_query(
+    job: Dict[str, Any], parent_field: str, child_ids_ref: str
+) -> Dict[str, Any]:
+    return {
+        "$or": [
+            {parent_field: job["target_id"]},
+            {"_id": {"$in": job["refs"].get(child_ids_ref, [])}},
+        ]
+    }
+
+
+async def _delete_team_memberships(
+    job: Dict[str, Any], batch_size: int, db: AsyncDatabase
+) -> int:
+    return await _delete_batch(
+        MEMBERSHIPS_COLLECTION, {"team_id": job["target_id"]}, batch_size, db
+    )
+
+
+async def _delete_team_projects(
+    job: Dict[str, Any], batch_size: int, db: AsyncDatabase
+) -> int:
+    return await _delete_batch(
+        PROJECTS_COLLECTION,
+        _children_query(job, "team_id", "project_ids"),
+        batch_size,
+        db,
+        DELETION_PROJECT,
+        PROJECT_DELETION_PROJECTION,
+    )
+
+
+async def _delete_team_events(
+    job: Dict[str, Any], batch_size: int, db: AsyncDatabase
+) -> int:
+    return await _delete_batch(
+        EVENTS_COLLECTION,
+        _children_query(job, "team_id", "event_ids"),
+        batch_size,
+        db,
+        DELETION_EVENT,
+        EVENT_DELETION_PROJECTION,
+    )
+
+
+async def _delete_project_todos(
+    job: Dict[str, Any], batch_size: int, db: AsyncDatabase
+) -> int:
+    return await _delete_batch(
+        TODOS_COLLECTION,
+        _children_query(job, "project_id", "todo_ids"),
+        batch_size,
+        db,
+    )
+
+
+async def _delete_project_archived_todos(
+    job: Dict[str, Any], batch_size: int, db: AsyncDatabase
+) -> int:
+    return await _delete_batch(
+        ARCHIVED_TODOS_COLLECTION, {"project_id": job["target_id"]}, batch_size, db
+    )
+
+
+async def _delete_event_rsvps(
+    job: Dict[str, Any], batch_size: int, db: AsyncDatabase
+) -> int:
+    return await _delete_batch(
+        RSVPS_COLLECTION,
+        {"_id": {"$in": job["refs"].get("rsvp_ids", [])}},
+        batch_size,
+        db,
+    )
+
+
+async def _delete_event_reminders(
+    job: Dict[str, Any], batch_size: int, db: AsyncDatabase
+) -> int:
+    return await _delete_batch(
+        REMINDERS_COLLECTION, {"event_id": job["target_id"]}, batch_size, db
+    )
+
+
+DeletionPhase = Tuple[
+    str, Callable[[Dict[str, Any], int, AsyncDatabase], Awaitable[int]]
+]
+
+# Run in order, each until it deletes a short batch. The phase name keys the
+# job's deleted_counts.
+_DELETION_PHASES: Dict[str, List[DeletionPhase]] = {
+    DELETION_TEAM: [
+        ("memberships", _delete_team_memberships),
+        ("projects", _delete_team_projects),
+        ("events", _delete_team_events),
+    ],
+    DELETION_PROJECT: [
+        ("todos", _delete_project_todos),
+        ("archived_todos", _delete_project_archived_todos),
+    ],
+    DELETION_EVENT: [
+        ("rsvps", _delete_event_rsvps),
+        ("reminders", _delete_event_reminders),
+    ],
+}
+
+
+def _lease_expiry(now: datetime) -> datetime:
+    return now + timedelta(seconds=DELETION_LEASE_SECONDS)
+
+
+async def _claim_deletion_job(db: AsyncDatabase) -> Dict[str, Any] | None:
+    now = datetime.now(timezone.utc)
+    return await db[DELETION_JOBS_COLLECTION].find_one_and_update(
+        {
+            "state": DELETION_PENDING,
+            "$or": [
+                {"lease_expires_at": None},
+                {"lease_expires_at": {"$lte": now}},
+            ],
+        },
+        {"$set": {"lease_expires_at": _lease_expiry(now)}},
+        sort=[("created_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+# Returns True once every phase of the job is done, or False when the deadline is
+# reached first. The phase and counts are saved after every batch, so the next
+# claim of the job carries on from there.
+async def _collect_deletion_job(
+    job: Dict[str, Any], deadline: float | None, db: AsyncDatabase
+) -> bool:
+    phases = _DELETION_PHASES[job["kind"]]
+    phase = job["phase"]
+
+    while phase < len(phases):
+        if deadline is not None and time.monotonic() >= deadline:
+            await db[DELETION_JOBS_COLLECTION].update_one(
+                {"_id": job["_id"]}, {"$set": {"lease_expires_at": None}}
+            )
+            return False
+
+        phase_name, delete_batch = phases[phase]
+        deleted_count = await delete_batch(job, DELETION_BATCH_SIZE, db)
+        if deleted_count < DELETION_BATCH_SIZE:
+            phase += 1
+
+        now = datetime.now(timezone.utc)
+        await db[DELETION_JOBS_COLLECTION].update_one(
+            {"_id": job["_id"]},
+            {
+                "$set": {"phase": phase, "lease_expires_at": _lease_expiry(now)},
+                "$inc": {f"deleted_counts.{phase_name}": deleted_count},
+            },
+        )
+
+        if deleted_count:
+            # Yield capacity to live traffic between batches
+            await asyncio.sleep(DELETION_THROTTLE_SECONDS)
+
+    await db[DELETION_JOBS_COLLECTION].update_one(
+        {"_id": job["_id"]},
+        {
+            "$set": {
+                "state": DELETION_DONE,
+                "completed_at": datetime.now(timezone.utc),
+                "lease_expires_at": None,
+            }
+        },
+    )
+    return True
+
+
+async def db_collect_deletions(
+    db: AsyncDatabase, time_budget_seconds: float | None = None
+) -> bool:
+    """Works through pending deletion jobs, oldest first.
+
+    Jobs held by another collector are skipped. Returns True when no job was left
+    to claim, or False when the time budget ran out first.
+    """
+    deadline = (
+        time.monotonic() + time_budget_seconds
+        if time_budget_seconds is not None
+        else None
+    )
+
+    while deadline is None or time.monotonic() < deadline:
+        job = await _claim_deletion_job(db)
+        if job is None:
+            return True
+
+        if not await _collect_deletion_job(job, deadline, db):
+            return False
+
+    return False
+
+
+async def db_count_pending_deletions(db: AsyncDatabase) -> int:
+    return await db[DELETION_JOBS_COLLECTION].count_documents(
+        {"state": DELETION_PENDING}
+    )
+
+
+# For the orphan sweep migrations. Deletes the documents of a batch whose parent
+# is gone, or which carry no parent reference at all, since the child refs
+# migrations stamped one onto every child of a live parent. Returns how many went.
+async def db_delete_orphans(
+    documents: List[Dict[str, Any]],
+    collection: str,
+    parent_field: str,
+    parent_collection: str,
+    db: AsyncDatabase,
+    job_kind: str | None = None,
+) -> int:
+    parent_ids = list(
+        {document[parent_field] for document in documents if document.get(parent_field)}
+    )
+    live_parent_ids = {
+        parent["_id"]
+        for parent in await db[parent_collection]
+        .find({"_id": {"$in": parent_ids}}, {"_id": 1})
+        .to_list(None)
+    }
+
+    orphans = [
+        document
+        for document in documents
+        if document.get(parent_field) not in live_parent_ids
+    ]
+    if not orphans:
+        return 0
+
+    if job_kind is not None:
+        await db_enqueue_deletions(job_kind, orphans, db)
+
+    await db[collection].delete_many(
+        {"_id": {"$in": [orphan["_id"] for orphan in orphans]}}
+    )
+    return len(orphans)
+
+
+# An RSVP is an orphan when the event its event_id points at is gone. RSVPs from
+# before event_id was stamped are orphans when no event lists them in rsvp_ids.
+# An invite is written before its event's rsvp_ids, so RSVPs younger than the
+# grace window are never swept.
+async def db_delete_orphan_rsvps(rsvps: List[Dict[str, Any]], db: AsyncDatabase) -> int:
+    cutoff = ObjectId.from_datetime(
+        datetime.now(timezone.utc) - timedelta(seconds=ORPHAN_RSVP_GRACE_SECONDS)
+    )
+    rsvps = [rsvp for rsvp in rsvps if rsvp["_id"] < cutoff]
+    stamped = [rsvp for rsvp in rsvps if rsvp.get("event_id") is not None]
+    legacy_ids = [rsvp["_id"] for rsvp in rsvps if rsvp.get("event_id") is None]
+
+    orphan_ids = []
+    if stamped:
+        events = (
+            await db[EVENTS_COLLECTION]
+            .find(
+                {"_id": {"$in": list({rsvp["event_id"] for rsvp in stamped})}},
+                {"_id": 1},
+            )
+            .to_list(None)
+        )
+        live_event_ids = {event["_id"] for event in events}
+        orphan_ids += [
+            rsvp["_id"] for rsvp in stamped if rsvp["event_id"] not in live_event_ids
+        ]
+
+    if legacy_ids:
+        # Match both forms, rsvp_ids have been written as strings
+        candidate_ids = legacy_ids + [str(rsvp_id) for rsvp_id in legacy_ids]
+        events = (
+            await db[EVENTS_COLLECTION]
+            .find(
+                {"rsvp_ids": {"$in": candidate_ids}},
+                {
+                    "rsvp_ids": {
+                        "$filter": {
+                            "input": "$rsvp_ids",
+                            "cond": {"$in": ["$$this", candidate_ids]},
+                        }
+                    }
+                },
+            )
+            .to_list(None)
+        )
+        referenced_ids = {
+            str(rsvp_id) for event in events for rsvp_id in event.get("rsvp_ids", [])
+        }
+        orphan_ids += [
+            rsvp_id for rsvp_id in legacy_ids if str(rsvp_id) not in referenced_ids
+        ]
+
+    if not orphan_ids:
+        return 0
+
+    await db[RSVPS_COLLECTION].delete_many({"_id": {"$in": orphan_ids}})
+    return len(orphan_ids)
@@ -1,11 +1,16 @@
-from typing import Any, Dict, List
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List
 from bson import ObjectId
 from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.collation import Collation, CollationStrength
 
 from app.core.common import stringify_object_ids
-from app.core.constants import EVENTS_COLLECTION, RSVPS_COLLECTION
+from app.core.constants import EVENTS_COLLECTION, RSVPS_COLLECTION, TEAMS_COLLECTION
 from app.schemas.event import RSVPStatus
 
+# Compares strings ignoring case, but not accents
+_CASE_INSENSITIVE = Collation(locale="en", strength=CollationStrength.SECONDARY)
+
 
 async def db_get_event_or_none(
     event_id: str, db: AsyncDatabase
@@ -14,8 +19,14 @@ async def db_get_event_or_none(
     return stringify_object_ids(result)
 
 
-async def db_create_rsvp_invite(email: str, db: AsyncDatabase) -> Dict[str, Any]:
-    rsvp_dict = {"email": email, "status": RSVPStatus.PENDING}
+async def db_create_rsvp_invite(
+    event_id: str, email: str, db: AsyncDatabase
+) -> Dict[str, Any]:
+    rsvp_dict = {
+        "event_id": ObjectId(event_id),
+        "email": email.lower(),
+        "status": RSVPStatus.PENDING,
+    }
 
     result = await db[RSVPS_COLLECTION].insert_one(rsvp_dict)
 
@@ -28,17 +39,176 @@ async def db_add_rsvp_id_to_event(
 ) -> None:
     await db[EVENTS_COLLECTION].update_one(
         {"_id": ObjectId(event_id)},
-        {"$addToSet": {"rsvp_ids": rsvp_id}},
+        {
+            "$addToSet": {"rsvp_ids": rsvp_id},
+            "$inc": {f"rsvp_counts.{RSVPStatus.PENDING.value}": 1},
+        },
+    )
+
+
+# The event's existing RSVPs for any of emails, keyed by lower-cased email. RSVPs
+# store their email lower-cased, but older ones kept the case they were sent to,
+# so the match ignores case.
+async def db_get_rsvp_ids_by_email(
+    rsvp_ids: List[str], emails: List[str], db: AsyncDatabase
+) -> Dict[str, str]:
+    if not rsvp_ids or not emails:
+        return {}
+
+    results = (
+        await db[RSVPS_COLLECTION]
+        .find(
+            {
+                "_id": {"$in": [ObjectId(rsvp_id) for rsvp_id in rsvp_ids]},
+                "email": {"$in": [email.lower() for email in emails]},
+            },
+            {"email": 1},
+            collation=_CASE_INSENSITIVE,
+        )
+        .to_list(None)
     )
+    return {result["email"].lower(): str(result["_id"]) for result in results}
+
 
+# One insert for the RSVPs and one update to list them all on the event. Returns
+# the RSVPs in the order of emails.
+async def db_create_rsvp_invites(
+    event_id: str, emails: List[str], db: AsyncDatabase
+) -> List[Dict[str, Any]]:
+    if not emails:
+        return []
 
+    rsvp_dicts = [
+        {
+            "event_id": ObjectId(event_id),
+            "email": email.lower(),
+            "status": RSVPStatus.PENDING,
+        }
+        for email in emails
+    ]
+    result = await db[RSVPS_COLLECTION].insert_many(rsvp_dicts)
+
+    rsvp_ids = [str(inserted_id) for inserted_id in result.inserted_ids]
+    await db[EVENTS_COLLECTION].update_one(
+        {"_id": ObjectId(event_id)},
+        {
+            "$addToSet": {"rsvp_ids": {"$each": rsvp_ids}},
+            "$inc": {f"rsvp_counts.{RSVPStatus.PENDING.value}": len(rsvp_ids)},
+        },
+    )
+
+    return [
+        stringify_object_ids({**rsvp_dict, "_id": rsvp_id})
+        for rsvp_dict, rsvp_id in zip(rsvp_dicts, rsvp_ids)
+    ]
+
+
+# Moves the RSVP to rsvp_status and its count on the event along with it. The
+# status it moved from is read in the same write, so concurrent replies each
+# shift the count they actually changed. RSVPs which predate event_id find their
+# event through its rsvp_ids.
 async def db_record_rsvp_response(
     rsvp_id: str, rsvp_status: RSVPStatus, db: AsyncDatabase
 ) -> None:
-    await db[RSVPS_COLLECTION].update_one(
-        {"_id": ObjectId(rsvp_id)},
+    rsvp_status = RSVPStatus(rsvp_status)
+    rsvp = await db[RSVPS_COLLECTION].find_one_and_update(
+        {"_id": ObjectId(rsvp_id), "status": {"$ne": rsvp_status}},
         {"$set": {"status": rsvp_status}},
+        projection={"status": 1, "event_id": 1},
+    )
+    if rsvp is None:
+        # Unknown, or already at this status
+        return
+
+    await db[EVENTS_COLLECTION].update_one(
+        {"_id": rsvp["event_id"]} if rsvp.get("event_id") else {"rsvp_ids": rsvp_id},
+        {
+            "$inc": {
+                f"rsvp_counts.{RSVPStatus(rsvp['status']).value}": -1,
+                f"rsvp_counts.{rsvp_status.value}": 1,
+            }
+        },
+    )
+
+
+# Reads an event for its RSVP counts and guest list. rsvp_ids are only shipped for
+# events whose RSVPs predate event_id and rsvp_counts.
+async def db_get_event_for_rsvp_reads(
+    event_id: str, db: AsyncDatabase
+) -> Dict[str, Any] | None:
+    result = await db[EVENTS_COLLECTION].find_one(
+        {"_id": ObjectId(event_id)},
+        {
+            "rsvp_counts": 1,
+            "rsvp_ids": {
+                "$cond": [
+                    {"$eq": ["$rsvp_refs_migrated", True]},
+                    "$$REMOVE",
+                    "$rsvp_ids",
+                ]
+            },
+        },
     )
+    return stringify_object_ids(result)
+
+
+async def db_count_rsvps_by_status(
+    rsvp_ids: List[str], db: AsyncDatabase
+) -> Dict[str, int]:
+    pipeline = [
+        {"$match": {"_id": {"$in": [ObjectId(rsvp_id) for rsvp_id in rsvp_ids]}}},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+    ]
+    results = await (await db[RSVPS_COLLECTION].aggregate(pipeline)).to_list(None)
+    return {result["_id"]: result["count"] for result in results}
+
+
+# Rebuilds rsvp_counts from the event's RSVPs, for the backfill and for events
+# whose counters have drifted, such as from a reply landing mid count
+async def db_recompute_rsvp_counts(event_id: str, db: AsyncDatabase) -> Dict[str, int]:
+    pipeline = [
+        {"$match": {"event_id": ObjectId(event_id)}},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+    ]
+    counts = {status.value: 0 for status in RSVPStatus}
+    for result in await (await db[RSVPS_COLLECTION].aggregate(pipeline)).to_list(None):
+        counts[result["_id"]] = result["count"]
+
+    await db[EVENTS_COLLECTION].update_one(
+        {"_id": ObjectId(event_id)}, {"$set": {"rsvp_counts": counts}}
+    )
+    return counts
+
+
+# A page of an event's RSVPs in _id order, optionally of one status. Events whose
+# RSVPs predate event_id pass their rsvp_ids instead.
+async def db_get_event_rsvps_page(
+    event_id: str,
+    rsvp_ids: List[str] | None,
+    rsvp_status: RSVPStatus | None,
+    limit: int,
+    db: AsyncDatabase,
+    after_rsvp_id: str | None = None,
+) -> List[Dict[str, Any]]:
+
+    query: Dict[str, Any] = (
+        {"_id": {"$in": [ObjectId(rsvp_id) for rsvp_id in rsvp_ids]}}
+        if rsvp_ids is not None
+        else {"event_id": ObjectId(event_id)}
+    )
+    if rsvp_status is not None:
+        query["status"] = rsvp_status
+    if after_rsvp_id is not None:
+        query.setdefault("_id", {})["$gt"] = ObjectId(after_rsvp_id)
+
+    results = (
+        await db[RSVPS_COLLECTION]
+        .find(query, {"email": 1, "status": 1})
+        .sort("_id", 1)
+        .limit(limit)
+        .to_list(None)
+    )
+    return [stringify_object_ids(result) for result in results]
 
 
 async def db_get_rsvps_by_ids(
@@ -52,6 +222,36 @@ async def db_get_rsvps_by_ids(
     return [stringify_object_ids(result) for result in results]
 
 
+# The event's accepted RSVPs, filtered in Mongo and streamed in lists of up to
+# batch_size so a large guest list is never held in memory at once. Streamed in
+# _id order, so a retried send sees the same batches. Events whose RSVPs predate
+# event_id pass their rsvp_ids instead.
+async def db_iter_accepted_rsvp_batches(
+    event_id: str, rsvp_ids: List[str] | None, batch_size: int, db: AsyncDatabase
+) -> AsyncIterator[List[Dict[str, Any]]]:
+
+    query: Dict[str, Any] = (
+        {"_id": {"$in": [ObjectId(rsvp_id) for rsvp_id in rsvp_ids]}}
+        if rsvp_ids is not None
+        else {"event_id": ObjectId(event_id)}
+    )
+    query["status"] = RSVPStatus.ACCEPTED
+
+    batch = []
+    async for rsvp in (
+        db[RSVPS_COLLECTION]
+        .find(query, {"email": 1}, batch_size=batch_size)
+        .sort("_id", 1)
+    ):
+        batch.append(stringify_object_ids(rsvp))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
 async def db_get_events_by_ids(
     event_ids: List[str], db: AsyncDatabase
 ) -> List[Dict[str, Any]]:
@@ -63,13 +263,102 @@ async def db_get_events_by_ids(
     return [stringify_object_ids(result) for result in results]
 
 
+async def db_get_events_by_team_id(
+    team_id: str, db: AsyncDatabase
+) -> List[Dict[str, Any]]:
+
+    results = await db[EVENTS_COLLECTION].find({"team_id": ObjectId(team_id)}).to_list()
+    return [stringify_object_ids(result) for result in results]
+
+
 async def db_update_event_details(
     event_id: str,
     new_event_details: Dict[str, Any],
     db: AsyncDatabase,
 ) -> None:
 
-    await db[EVENTS_COLLECTION].update_one(
+    event = await db[EVENTS_COLLECTION].find_one_and_update(
         {"_id": ObjectId(event_id)},
         {"$set": new_event_details},
+        projection={"team_id": 1},
     )
+    if event is None:
+        return
+
+    # Outdates the team's cached calendar feed. Events which predate team_id are
+    # only found through the team's event_ids.
+    await db[TEAMS_COLLECTION].update_one(
+        (
+            {"_id": event["team_id"]}
+            if event.get("team_id")
+            else {"event_ids": ObjectId(event_id)}
+        ),
+        {"$inc": {"calendar_version": 1}},
+    )
+
+
+# One page of a team's events in start order, keyset paginated on (start, _id).
+# Teams whose events predate team_id pass their event_ids instead.
+async def db_get_team_events_page(
+    team_id: str,
+    event_ids: List[str] | None,
+    start_from: datetime | None,
+    start_to: datetime | None,
+    limit: int,
+    db: AsyncDatabase,
+    after_start: datetime | None = None,
+    after_event_id: str | None = None,
+) -> List[Dict[str, Any]]:
+
+    query: Dict[str, Any] = (
+        {"_id": {"$in": [ObjectId(event_id) for event_id in event_ids]}}
+        if event_ids is not None
+        else {"team_id": ObjectId(team_id)}
+    )
+
+    # Keyset paging needs one sort type, so events whose times are still strings
+    # are left out until the event datetimes migration converts them
+    start_range: Dict[str, Any] = {"$type": "date"}
+    if start_from is not None:
+        start_range["$gte"] = start_from
+    if start_to is not None:
+        start_range["$lt"] = start_to
+    query["start"] = start_range
+
+    if after_start is not None and after_event_id is not None:
+        query["$or"] = [
+            {"start": {"$gt": after_start}},
+            {"start": after_start, "_id": {"$gt": ObjectId(after_event_id)}},
+        ]
+
+    results = (
+        await db[EVENTS_COLLECTION]
+        .find(query)
+        .sort([("start", 1), ("_id", 1)])
+        .limit(limit)
+        .to_list(None)
+    )
+    return [stringify_object_ids(result) for result in results]
+
+
+# A team's events in start order, streamed so a calendar feed is rendered one
+# event at a time. Teams whose events predate team_id pass their event_ids instead.
+async def db_iter_team_calendar_events(
+    team_id: str, event_ids: List[str] | None, db: AsyncDatabase
+) -> AsyncIterator[Dict[str, Any]]:
+
+    query = (
+        {"_id": {"$in": [ObjectId(event_id) for event_id in event_ids]}}
+        if event_ids is not None
+        else {"team_id": ObjectId(team_id)}
+    )
+
+    async for event in (
+        db[EVENTS_COLLECTION]
+        .find(
+            query,
+            {"name": 1, "description": 1, "start": 1, "end": 1, "location": 1},
+        )
+        .sort([("start", 1), ("_id", 1)])
+    ):
+        yield stringify_object_ids(event)
@@ -0,0 +1,160 @@
+import logging
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import OperationFailure
+
+from app.core.constants import (
+    ARCHIVED_TODOS_COLLECTION,
+    DELETION_JOB_RETENTION_DAYS,
+    DELETION_JOBS_COLLECTION,
+    EMAIL_OUTBOX_COLLECTION,
+    EMAIL_OUTBOX_RETENTION_DAYS,
+    EVENTS_COLLECTION,
+    MEMBERSHIPS_COLLECTION,
+    PROJECTS_COLLECTION,
+    REMINDER_RETENTION_DAYS,
+    REMINDERS_COLLECTION,
+    RSVPS_COLLECTION,
+    TEAMS_COLLECTION,
+    TODOS_COLLECTION,
+)
+
+logger = logging.getLogger(__name__)
+
+# Indexes backing the query paths in the DB layer, keyed by collection.
+# create_indexes is a no-op for indexes which already exist, so this is safe to
+# run on every startup.
+INDEXES = {
+    TEAMS_COLLECTION: [
+        IndexModel([("short_id", ASCENDING)], unique=True, name="short_id_unique"),
+        IndexModel([("member_ids", ASCENDING)], name="member_ids"),
+    ],
+    MEMBERSHIPS_COLLECTION: [
+        IndexModel(
+            [("team_id", ASCENDING), ("user_id", ASCENDING)],
+            unique=True,
+            name="team_id_user_id_unique",
+        ),
+        IndexModel(
+            [("team_id", ASCENDING), ("role", ASCENDING), ("user_id", ASCENDING)],
+            name="team_id_role_user_id",
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("team_id", ASCENDING)], name="user_id_team_id"
+        ),
+    ],
+    PROJECTS_COLLECTION: [
+        IndexModel([("team_id", ASCENDING)], name="team_id"),
+    ],
+    EVENTS_COLLECTION: [
+        # Also serves plain team_id lookups
+        IndexModel(
+            [("team_id", ASCENDING), ("start", ASCENDING), ("_id", ASCENDING)],
+            name="team_id_start",
+        ),
+        IndexModel([("rsvp_ids", ASCENDING)], name="rsvp_ids"),
+    ],
+    RSVPS_COLLECTION: [
+        # Guest lists, in _id order with or without a status filter
+        IndexModel([("event_id", ASCENDING), ("_id", ASCENDING)], name="event_id_id"),
+        IndexModel(
+            [("event_id", ASCENDING), ("status", ASCENDING), ("_id", ASCENDING)],
+            name="event_id_status_id",
+        ),
+    ],
+    TODOS_COLLECTION: [
+        IndexModel(
+            [("project_id", ASCENDING), ("approved", ASCENDING)],
+            name="project_id_approved",
+        ),
+        IndexModel(
+            [("name", TEXT), ("description", TEXT)],
+            weights={"name": 3, "description": 1},
+            name="name_description_text",
+        ),
+        # My todos pages in _id order, with and without a status filter
+        IndexModel(
+            [("assignee_id", ASCENDING), ("_id", ASCENDING)],
+            name="assignee_id_id",
+        ),
+        IndexModel(
+            [("assignee_id", ASCENDING), ("status_id", ASCENDING), ("_id", ASCENDING)],
+            name="assignee_id_status_id",
+        ),
+        IndexModel(
+            [
+                ("project_id", ASCENDING),
+                ("status_id", ASCENDING),
+                ("updated_at", ASCENDING),
+            ],
+            name="project_id_status_id_updated_at",
+        ),
+    ],
+    ARCHIVED_TODOS_COLLECTION: [
+        IndexModel(
+            [("project_id", ASCENDING), ("_id", DESCENDING)],
+            name="project_id_id",
+        ),
+    ],
+    DELETION_JOBS_COLLECTION: [
+        IndexModel(
+            [("state", ASCENDING), ("created_at", ASCENDING)],
+            name="state_created_at",
+        ),
+        # Finished jobs are only kept around for inspection
+        IndexModel(
+            [("completed_at", ASCENDING)],
+            expireAfterSeconds=DELETION_JOB_RETENTION_DAYS * 24 * 60 * 60,
+            name="completed_at_ttl",
+        ),
+    ],
+    EMAIL_OUTBOX_COLLECTION: [
+        IndexModel(
+            [("state", ASCENDING), ("next_attempt_at", ASCENDING)],
+            name="state_next_attempt_at",
+        ),
+        IndexModel(
+            [("dedupe_key", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"dedupe_key": {"$exists": True}},
+            name="dedupe_key_unique",
+        ),
+        # Sent and failed emails are only kept around for inspection
+        IndexModel(
+            [("completed_at", ASCENDING)],
+            expireAfterSeconds=EMAIL_OUTBOX_RETENTION_DAYS * 24 * 60 * 60,
+            name="completed_at_ttl",
+        ),
+    ],
+    REMINDERS_COLLECTION: [
+        IndexModel(
+            [("state", ASCENDING), ("due_at", ASCENDING)],
+            name="state_due_at",
+        ),
+        IndexModel(
+            [("event_id", ASCENDING), ("label", ASCENDING)],
+            unique=True,
+            name="event_id_label",
+        ),
+        # Sent reminders are only kept around for inspection
+        IndexModel(
+            [("completed_at", ASCENDING)],
+            expireAfterSeconds=REMINDER_RETENTION_DAYS * 24 * 60 * 60,
+            name="completed_at_ttl",
+        ),
+    ],
+}
+
+
+# A failed index, e.g. a unique index over data which still has duplicates, is
+# logged rather than raised so it cannot keep the app from starting. Migrations
+# which clean such data up call this again once they are done.
+async def db_ensure_indexes(db: AsyncDatabase) -> None:
+    for collection_name, index_models in INDEXES.items():
+        try:
+            await db[collection_name].create_indexes(index_models)
+        except OperationFailure as e:
+            logger.error(
+                "Failed to create indexes | collection=%s error=%s", collection_name, e
+            )
@@ -0,0 +1,179 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import (
+    EMAIL_LEASE_SECONDS,
+    EMAIL_MAX_ATTEMPTS,
+    EMAIL_OUTBOX_COLLECTION,
+)
+
+EMAIL_PENDING = "pending"
+EMAIL_SENT = "sent"
+EMAIL_FAILED = "failed"
+
+
+async def db_enqueue_emails(messages: List[Dict[str, Any]], db: AsyncDatabase) -> None:
+    """Queues emails for the outbox drain.
+
+    Each message carries subject, html_content and either to_email or, for a
+    batch, recipients with their own substitutions. A message with a dedupe_key
+    is queued at most once, so a caller which retries after a partial failure
+    does not send the same email twice.
+    """
+    if not messages:
+        return
+
+    now = datetime.now(timezone.utc)
+    documents = [
+        {
+            **message,
+            "state": EMAIL_PENDING,
+            "attempts": 0,
+            "created_at": now,
+            "next_attempt_at": now,
+            "lease_expires_at": None,
+        }
+        for message in messages
+    ]
+
+    keyed = [document for document in documents if "dedupe_key" in document]
+    unkeyed = [document for document in documents if "dedupe_key" not in document]
+    if keyed:
+        await db[EMAIL_OUTBOX_COLLECTION].bulk_write(
+            [
+                UpdateOne(
+                    {"dedupe_key": document["dedupe_key"]},
+                    {"$setOnInsert": document},
+                    upsert=True,
+                )
+                for document in keyed
+            ],
+            ordered=False,
+        )
+    if unkeyed:
+        await db[EMAIL_OUTBOX_COLLECTION].insert_many(unkeyed)
+
+
+# Leases up to limit due emails, oldest due first. The claim counts as an
+# attempt, so a drain which dies mid send leaves its lease to expire and the
+# email is delivered at least once, until it has been claimed
+# EMAIL_MAX_ATTEMPTS times.
+async def db_claim_emails(limit: int, db: AsyncDatabase) -> List[Dict[str, Any]]:
+    now = datetime.now(timezone.utc)
+    emails = []
+    for _ in range(limit):
+        email = await db[EMAIL_OUTBOX_COLLECTION].find_one_and_update(
+            {
+                "state": EMAIL_PENDING,
+                "next_attempt_at": {"$lte": now},
+                "attempts": {"$lt": EMAIL_MAX_ATTEMPTS},
+                "$or": [
+                    {"lease_expires_at": None},
+                    {"lease_expires_at": {"$lte": now}},
+                ],
+            },
+            {
+                "$set": {
+                    "lease_expires_at": now + timedelta(seconds=EMAIL_LEASE_SECONDS)
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if email is None:
+            break
+        emails.append(email)
+
+    return emails
+
+
+# Fails the emails whose last allowed claim ran out its lease without an outcome
+# being recorded, so they stop counting as pending
+async def db_fail_exhausted_emails(db: AsyncDatabase) -> int:
+    now = datetime.now(timezone.utc)
+    result = await db[EMAIL_OUTBOX_COLLECTION].update_many(
+        {
+            "state": EMAIL_PENDING,
+            "attempts": {"$gte": EMAIL_MAX_ATTEMPTS},
+            "lease_expires_at": {"$lte": now},
+        },
+        {
+            "$set": {
+                "state": EMAIL_FAILED,
+                "last_error": "Lease expired on the last attempt",
+                "completed_at": now,
+                "lease_expires_at": None,
+            }
+        },
+    )
+    return result.modified_count
+
+
+async def db_mark_email_sent(email_id: ObjectId, db: AsyncDatabase) -> None:
+    await db[EMAIL_OUTBOX_COLLECTION].update_one(
+        {"_id": email_id},
+        {
+            "$set": {
+                "state": EMAIL_SENT,
+                "completed_at": datetime.now(timezone.utc),
+                "lease_expires_at": None,
+            },
+        },
+    )
+
+
+# Moves the recipients a batch has already reached out of recipients, so a retry
+# only sends to the rest and the email records who it was delivered to
+async def db_record_delivered_recipients(
+    email_id: ObjectId,
+    delivered: List[Dict[str, Any]],
+    remaining: List[Dict[str, Any]],
+    db: AsyncDatabase,
+) -> None:
+    await db[EMAIL_OUTBOX_COLLECTION].update_one(
+        {"_id": email_id},
+        {
+            "$set": {"recipients": remaining},
+            "$push": {"delivered_recipients": {"$each": delivered}},
+        },
+    )
+
+
+async def db_schedule_email_retry(
+    email_id: ObjectId, next_attempt_at: datetime, error: str, db: AsyncDatabase
+) -> None:
+    await db[EMAIL_OUTBOX_COLLECTION].update_one(
+        {"_id": email_id},
+        {
+            "$set": {
+                "next_attempt_at": next_attempt_at,
+                "last_error": error,
+                "lease_expires_at": None,
+            },
+        },
+    )
+
+
+async def db_mark_email_failed(
+    email_id: ObjectId, error: str, db: AsyncDatabase
+) -> None:
+    await db[EMAIL_OUTBOX_COLLECTION].update_one(
+        {"_id": email_id},
+        {
+            "$set": {
+                "state": EMAIL_FAILED,
+                "last_error": error,
+                "completed_at": datetime.now(timezone.utc),
+                "lease_expires_at": None,
+            },
+        },
+    )
+
+
+async def db_count_pending_emails(db: AsyncDatabase) -> int:
+    return await db[EMAIL_OUTBOX_COLLECTION].count_documents({"state": EMAIL_PENDING})
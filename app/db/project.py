@@ -1,9 +1,16 @@
+from datetime import datetime, timezone
 from typing import Any, Dict, List
 from bson import ObjectId
+from pymongo import ReplaceOne, ReturnDocument
 from pymongo.asynchronous.database import AsyncDatabase
 
 from app.core.common import stringify_object_ids
-from app.core.constants import PROJECTS_COLLECTION, TEAMS_COLLECTION, TODOS_COLLECTION
+from app.core.constants import (
+    ARCHIVED_TODOS_COLLECTION,
+    PROJECTS_COLLECTION,
+    TEAMS_COLLECTION,
+    TODOS_COLLECTION,
+)
 from app.schemas.project import AddTodoRequest, UpdateTodoRequest
 
 
@@ -16,13 +23,35 @@ async def db_get_project(project_id: str, db: AsyncDatabase) -> Dict[str, Any]:
     return stringify_object_ids(result)
 
 
+# Per-status and per-assignee todo counts are kept on the project document under
+# todo_counts, and every write which changes a todo's status or assignee adjusts them
+def _todo_count_increments(
+    status_id: ObjectId | None, assignee_id: ObjectId | None, amount: int
+) -> Dict[str, int]:
+    increments = {}
+    if status_id is not None:
+        increments[f"todo_counts.by_status.{status_id}"] = amount
+    if assignee_id is not None:
+        increments[f"todo_counts.by_assignee.{assignee_id}"] = amount
+    return increments
+
+
+def _merge_increments(*increments_list: Dict[str, int]) -> Dict[str, int]:
+    merged: Dict[str, int] = {}
+    for increments in increments_list:
+        for field, amount in increments.items():
+            merged[field] = merged.get(field, 0) + amount
+    return {field: amount for field, amount in merged.items() if amount != 0}
+
+
 async def db_add_todo(
     project_id: str,
     add_todo_request: AddTodoRequest,
     auto_approved: bool,
     db: AsyncDatabase,
-) -> None:
+) -> Dict[str, Any]:
     todo_dict = {
+        "project_id": ObjectId(project_id),
         "name": add_todo_request.name,
         "description": add_todo_request.description,
         "status_id": ObjectId(add_todo_request.status_id),
@@ -32,53 +61,115 @@ async def db_add_todo(
             else None
         ),
         "approved": auto_approved,
+        "updated_at": datetime.now(timezone.utc),
     }
     result = await db[TODOS_COLLECTION].insert_one(todo_dict)
 
     todo_dict["_id"] = result.inserted_id
+    project_update: Dict[str, Any] = {"$addToSet": {"todo_ids": todo_dict["_id"]}}
+    increments = _todo_count_increments(
+        todo_dict["status_id"], todo_dict["assignee_id"], 1
+    )
+    if increments:
+        project_update["$inc"] = increments
+
     await db[PROJECTS_COLLECTION].update_one(
-        {"_id": ObjectId(project_id)},
-        {"$addToSet": {"todo_ids": todo_dict["_id"]}},
+        {"_id": ObjectId(project_id)}, project_update
     )
 
+    return stringify_object_ids(todo_dict)
+
 
 async def db_update_todo(
     project_id: str, update_todo_request: UpdateTodoRequest, db: AsyncDatabase
 ) -> None:
 
-    await db[TODOS_COLLECTION].update_one(
+    new_status_id = ObjectId(update_todo_request.status_id)
+    new_assignee_id = ObjectId(update_todo_request.assignee_id)
+
+    # The pre-image tells us which counters the update moves the todo between
+    todo_before = await db[TODOS_COLLECTION].find_one_and_update(
         {"_id": ObjectId(update_todo_request.todo_id)},
         {
             "$set": {
                 "name": update_todo_request.name,
                 "description": update_todo_request.description,
-                "status_id": ObjectId(update_todo_request.status_id),
-                "assignee_id": ObjectId(update_todo_request.assignee_id),
+                "status_id": new_status_id,
+                "assignee_id": new_assignee_id,
+                "updated_at": datetime.now(timezone.utc),
             }
         },
+        projection={"status_id": 1, "assignee_id": 1},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if not todo_before:
+        return
+
+    increments = _merge_increments(
+        _todo_count_increments(
+            todo_before.get("status_id"), todo_before.get("assignee_id"), -1
+        ),
+        _todo_count_increments(new_status_id, new_assignee_id, 1),
     )
+    if increments:
+        await db[PROJECTS_COLLECTION].update_one(
+            {"_id": ObjectId(project_id)}, {"$inc": increments}
+        )
 
 
 async def db_delete_todo(project_id: str, todo_id: str, db: AsyncDatabase) -> None:
 
-    await db[TODOS_COLLECTION].delete_one({"_id": ObjectId(todo_id)})
+    deleted_todo = await db[TODOS_COLLECTION].find_one_and_delete(
+        {"_id": ObjectId(todo_id)},
+        projection={"status_id": 1, "assignee_id": 1},
+    )
+
+    project_update: Dict[str, Any] = {"$pull": {"todo_ids": ObjectId(todo_id)}}
+    if deleted_todo:
+        project_update["$inc"] = _todo_count_increments(
+            deleted_todo.get("status_id"), deleted_todo.get("assignee_id"), -1
+        )
+
     await db[PROJECTS_COLLECTION].update_one(
+        {"_id": ObjectId(project_id)}, project_update
+    )
+
+
+# The query matching a project's todos, or None when the project does not exist.
+# Only legacy projects ship their todo_ids array, migrated ones are read by
+# reference from the todos collection.
+async def _get_project_todo_query(
+    project_id: str, db: AsyncDatabase
+) -> Dict[str, Any] | None:
+
+    project = await db[PROJECTS_COLLECTION].find_one(
         {"_id": ObjectId(project_id)},
-        {"$pull": {"todo_ids": ObjectId(todo_id)}},
+        {
+            "child_refs_migrated": 1,
+            "todo_ids": {
+                "$cond": [
+                    {"$eq": ["$child_refs_migrated", True]},
+                    "$$REMOVE",
+                    "$todo_ids",
+                ]
+            },
+        },
     )
+    if not project:
+        return None
+
+    if project.get("child_refs_migrated"):
+        return {"project_id": ObjectId(project_id)}
+    return {"_id": {"$in": project.get("todo_ids", [])}}
 
 
 async def db_get_todo_items(project_id: str, db: AsyncDatabase) -> List[Dict[str, Any]]:
 
-    project = await db[PROJECTS_COLLECTION].find_one({"_id": ObjectId(project_id)})
-    if not project:
+    todo_query = await _get_project_todo_query(project_id, db)
+    if todo_query is None:
         raise ValueError(f"Project with ID {project_id} not found")
 
-    todo_ids = project["todo_ids"]
-    if not todo_ids:
-        return []
-
-    todos = await db[TODOS_COLLECTION].find({"_id": {"$in": todo_ids}}).to_list(None)
+    todos = await db[TODOS_COLLECTION].find(todo_query).to_list(None)
 
     # Turn all ObjectIDs into strings
     return stringify_object_ids(todos)
@@ -94,15 +185,19 @@ async def db_reorder_todo_items(
     )
 
 
-async def db_add_todo_status(project_id: str, name: str, color: str, db: AsyncDatabase) -> None:
+async def db_add_todo_status(
+    project_id: str, name: str, color: str, db: AsyncDatabase
+) -> Dict[str, Any]:
 
     todo_status_dict = {"id": ObjectId(), "name": name, "color": color}
-    
+
     await db[PROJECTS_COLLECTION].update_one(
         {"_id": ObjectId(project_id)},
         {"$addToSet": {"todo_statuses": todo_status_dict}},
     )
 
+    return stringify_object_ids(todo_status_dict)
+
 
 async def db_delete_todo_status(
     project_id: str, status_id: str, db: AsyncDatabase
@@ -110,22 +205,37 @@ async def db_delete_todo_status(
 
     await db[PROJECTS_COLLECTION].update_one(
         {"_id": ObjectId(project_id)},
-        {"$pull": {"todo_statuses": {"id": ObjectId(status_id)}}},
+        {
+            "$pull": {"todo_statuses": {"id": ObjectId(status_id)}},
+            "$unset": {f"todo_counts.by_status.{status_id}": ""},
+        },
     )
 
     # Find all todos with matching status_ids
     # Delete them from the TODOS_COLLECTION table and remove their IDs from the project
     todos_to_delete = (
         await db[TODOS_COLLECTION]
-        .find({"status_id": ObjectId(status_id)})
+        .find({"status_id": ObjectId(status_id)}, {"assignee_id": 1})
         .to_list(None)
     )
     todo_ids_to_delete = [todo["_id"] for todo in todos_to_delete]
     if todo_ids_to_delete:
         await db[TODOS_COLLECTION].delete_many({"_id": {"$in": todo_ids_to_delete}})
+
+        project_update: Dict[str, Any] = {
+            "$pull": {"todo_ids": {"$in": todo_ids_to_delete}}
+        }
+        assignee_increments = _merge_increments(
+            *(
+                _todo_count_increments(None, todo.get("assignee_id"), -1)
+                for todo in todos_to_delete
+            )
+        )
+        if assignee_increments:
+            project_update["$inc"] = assignee_increments
+
         await db[PROJECTS_COLLECTION].update_one(
-            {"_id": ObjectId(project_id)},
-            {"$pull": {"todo_ids": {"$in": todo_ids_to_delete}}},
+            {"_id": ObjectId(project_id)}, project_update
         )
 
 
@@ -133,10 +243,7 @@ async def db_reorder_todo_statuses(
     project_id: str, new_statuses: List[Dict[str, Any]], db: AsyncDatabase
 ) -> None:
 
-    new_statuses = [
-        {"id": ObjectId(status["id"]), "name": status["name"]}
-        for status in new_statuses
-    ]
+    new_statuses = [{**status, "id": ObjectId(status["id"])} for status in new_statuses]
 
     await db[PROJECTS_COLLECTION].update_one(
         {"_id": ObjectId(project_id)},
@@ -154,28 +261,437 @@ async def db_update_todo_statuses(
     )
 
 
-async def db_assign_todo(todo_id: str, assignee_id: str, db: AsyncDatabase) -> None:
+async def db_assign_todo(
+    project_id: str, todo_id: str, assignee_id: str, db: AsyncDatabase
+) -> None:
 
-    await db[TODOS_COLLECTION].update_one(
+    todo_before = await db[TODOS_COLLECTION].find_one_and_update(
         {"_id": ObjectId(todo_id)},
-        {"$set": {"assignee_id": ObjectId(assignee_id)}},
+        {
+            "$set": {
+                "assignee_id": ObjectId(assignee_id),
+                "updated_at": datetime.now(timezone.utc),
+            }
+        },
+        projection={"assignee_id": 1},
+        return_document=ReturnDocument.BEFORE,
     )
+    if not todo_before:
+        return
 
+    increments = _merge_increments(
+        _todo_count_increments(None, todo_before.get("assignee_id"), -1),
+        _todo_count_increments(None, ObjectId(assignee_id), 1),
+    )
+    if increments:
+        await db[PROJECTS_COLLECTION].update_one(
+            {"_id": ObjectId(project_id)}, {"$inc": increments}
+        )
+
+
+async def db_project_has_todo(project_id: str, todo_id: str, db: AsyncDatabase) -> bool:
+
+    todo = await db[TODOS_COLLECTION].find_one(
+        {"_id": ObjectId(todo_id), "project_id": ObjectId(project_id)}, {"_id": 1}
+    )
+    if todo:
+        return True
+
+    # Fall back to the embedded array for todos which predate project_id
+    project = await db[PROJECTS_COLLECTION].find_one(
+        {"_id": ObjectId(project_id), "todo_ids": ObjectId(todo_id)}, {"_id": 1}
+    )
+    return project is not None
 
-async def db_get_team_by_project_id(
-    project_id: str, db: AsyncDatabase
-) -> Dict[str, Any] | None:
-    team = await db[TEAMS_COLLECTION].find_one({"project_ids": ObjectId(project_id)})
-    return stringify_object_ids(team)
+
+async def db_get_project_team_id(project_id: str, db: AsyncDatabase) -> str | None:
+    project = await db[PROJECTS_COLLECTION].find_one(
+        {"_id": ObjectId(project_id)}, {"team_id": 1}
+    )
+    if project and project.get("team_id"):
+        return str(project["team_id"])
+
+    # Fall back to the embedded array for projects which predate team_id
+    team = await db[TEAMS_COLLECTION].find_one(
+        {"project_ids": ObjectId(project_id)}, {"_id": 1}
+    )
+    return str(team["_id"]) if team else None
 
 
 async def db_approve_todo(todo_id: str, db: AsyncDatabase) -> None:
 
     await db[TODOS_COLLECTION].update_one(
         {"_id": ObjectId(todo_id)},
-        {"$set": {"approved": True}},
+        {"$set": {"approved": True, "updated_at": datetime.now(timezone.utc)}},
+    )
+
+
+# Projects the child refs migration has not reached yet find their proposed
+# todos through todo_ids, since their todos carry no project_id
+async def db_get_proposed_todos(
+    project_id: str, db: AsyncDatabase
+) -> List[Dict[str, Any]]:
+
+    todo_query = await _get_project_todo_query(project_id, db)
+    if todo_query is None:
+        return []
+
+    todos = (
+        await db[TODOS_COLLECTION].find({**todo_query, "approved": False}).to_list(None)
+    )
+
+    return stringify_object_ids(todos)
+
+
+async def db_count_proposed_todos(project_id: str, db: AsyncDatabase) -> int:
+
+    todo_query = await _get_project_todo_query(project_id, db)
+    if todo_query is None:
+        return 0
+
+    return await db[TODOS_COLLECTION].count_documents({**todo_query, "approved": False})
+
+
+async def db_approve_todos(
+    project_id: str, todo_ids: List[str], db: AsyncDatabase
+) -> int:
+
+    todo_query = await _get_project_todo_query(project_id, db)
+    if todo_query is None:
+        return 0
+
+    result = await db[TODOS_COLLECTION].update_many(
+        {
+            "$and": [
+                todo_query,
+                {
+                    "_id": {"$in": [ObjectId(todo_id) for todo_id in todo_ids]},
+                    "approved": False,
+                },
+            ]
+        },
+        {"$set": {"approved": True, "updated_at": datetime.now(timezone.utc)}},
+    )
+
+    return result.modified_count
+
+
+async def db_reject_todos(
+    project_id: str, todo_ids: List[str], db: AsyncDatabase
+) -> int:
+
+    todo_query = await _get_project_todo_query(project_id, db)
+    if todo_query is None:
+        return 0
+
+    # Only proposed todos in this project can be rejected
+    todos_to_reject = (
+        await db[TODOS_COLLECTION]
+        .find(
+            {
+                "$and": [
+                    todo_query,
+                    {
+                        "_id": {"$in": [ObjectId(todo_id) for todo_id in todo_ids]},
+                        "approved": False,
+                    },
+                ]
+            },
+            {"status_id": 1, "assignee_id": 1},
+        )
+        .to_list(None)
+    )
+    todo_object_ids = [todo["_id"] for todo in todos_to_reject]
+    if not todo_object_ids:
+        return 0
+
+    result = await db[TODOS_COLLECTION].delete_many(
+        {"_id": {"$in": todo_object_ids}, "approved": False}
     )
 
+    project_update: Dict[str, Any] = {"$pull": {"todo_ids": {"$in": todo_object_ids}}}
+    increments = _merge_increments(
+        *(
+            _todo_count_increments(todo.get("status_id"), todo.get("assignee_id"), -1)
+            for todo in todos_to_reject
+        )
+    )
+    if increments:
+        project_update["$inc"] = increments
+
+    await db[PROJECTS_COLLECTION].update_one(
+        {"_id": ObjectId(project_id)}, project_update
+    )
+
+    return result.deleted_count
+
+
+async def db_get_todo_counts(
+    project_id: str, db: AsyncDatabase
+) -> Dict[str, Any] | None:
+
+    project = await db[PROJECTS_COLLECTION].find_one(
+        {"_id": ObjectId(project_id)}, {"todo_counts": 1}
+    )
+    if not project:
+        return None
+
+    return stringify_object_ids(project.get("todo_counts", {}))
+
+
+# Rebuilds todo_counts from the todos themselves, for projects created before the
+# counters existed or whose counters have drifted
+# Returns None when the project does not exist
+async def db_recompute_todo_counts(
+    project_id: str, db: AsyncDatabase
+) -> Dict[str, Any] | None:
+
+    todo_query = await _get_project_todo_query(project_id, db)
+    if todo_query is None:
+        return None
+
+    pipeline = [
+        {"$match": todo_query},
+        {
+            "$facet": {
+                "by_status": [{"$group": {"_id": "$status_id", "count": {"$sum": 1}}}],
+                "by_assignee": [
+                    {"$match": {"assignee_id": {"$ne": None}}},
+                    {"$group": {"_id": "$assignee_id", "count": {"$sum": 1}}},
+                ],
+            }
+        },
+    ]
+    facets = await (await db[TODOS_COLLECTION].aggregate(pipeline)).to_list(None)
+    facet = facets[0] if facets else {"by_status": [], "by_assignee": []}
+
+    todo_counts = {
+        "by_status": {
+            str(group["_id"]): group["count"]
+            for group in facet["by_status"]
+            if group["_id"] is not None
+        },
+        "by_assignee": {
+            str(group["_id"]): group["count"] for group in facet["by_assignee"]
+        },
+    }
+
+    await db[PROJECTS_COLLECTION].update_one(
+        {"_id": ObjectId(project_id)},
+        {"$set": {"todo_counts": todo_counts}},
+    )
+
+    return todo_counts
+
+
+async def db_search_todos(
+    project_ids: List[str],
+    query: str,
+    limit: int,
+    db: AsyncDatabase,
+    after_score: float | None = None,
+    after_todo_id: str | None = None,
+) -> List[Dict[str, Any]]:
+
+    pipeline: List[Dict[str, Any]] = [
+        {
+            "$match": {
+                "$text": {"$search": query},
+                "project_id": {"$in": [ObjectId(pid) for pid in project_ids]},
+            }
+        },
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+    ]
+
+    # Keyset pagination on (score desc, _id asc), so pages stay stable
+    if after_score is not None and after_todo_id is not None:
+        pipeline.append(
+            {
+                "$match": {
+                    "$or": [
+                        {"score": {"$lt": after_score}},
+                        {"score": after_score, "_id": {"$gt": ObjectId(after_todo_id)}},
+                    ]
+                }
+            }
+        )
+
+    pipeline += [{"$sort": {"score": -1, "_id": 1}}, {"$limit": limit}]
+
+    todos = await (await db[TODOS_COLLECTION].aggregate(pipeline)).to_list(None)
+
+    return stringify_object_ids(todos)
+
+
+async def db_get_todos_by_assignee(
+    assignee_id: str,
+    project_ids: List[str],
+    limit: int,
+    db: AsyncDatabase,
+    status_id: str | None = None,
+    after_todo_id: str | None = None,
+) -> List[Dict[str, Any]]:
+
+    query: Dict[str, Any] = {
+        "assignee_id": ObjectId(assignee_id),
+        "project_id": {"$in": [ObjectId(pid) for pid in project_ids]},
+    }
+    if status_id is not None:
+        query["status_id"] = ObjectId(status_id)
+    if after_todo_id is not None:
+        query["_id"] = {"$gt": ObjectId(after_todo_id)}
+
+    todos = (
+        await db[TODOS_COLLECTION].find(query).sort("_id", 1).limit(limit).to_list(None)
+    )
+
+    return stringify_object_ids(todos)
+
+
+async def db_get_projects_by_ids(
+    project_ids: List[str], projection: Dict[str, Any], db: AsyncDatabase
+) -> List[Dict[str, Any]]:
+
+    projects = (
+        await db[PROJECTS_COLLECTION]
+        .find({"_id": {"$in": [ObjectId(pid) for pid in project_ids]}}, projection)
+        .to_list(None)
+    )
+
+    return stringify_object_ids(projects)
+
+
+# Stamps project_id onto the todos of legacy projects, then flags each project so
+# its todos are read by reference instead of through todo_ids
+async def db_backfill_project_child_refs(
+    projects: List[Dict[str, Any]], db: AsyncDatabase
+) -> None:
+
+    for project in projects:
+        if project.get("todo_ids"):
+            await db[TODOS_COLLECTION].update_many(
+                {"_id": {"$in": project["todo_ids"]}},
+                {"$set": {"project_id": project["_id"]}},
+            )
+
+        await db[PROJECTS_COLLECTION].update_one(
+            {"_id": project["_id"]}, {"$set": {"child_refs_migrated": True}}
+        )
+
+
+async def db_archive_todos(
+    project_id: str,
+    status_id: str,
+    cutoff: datetime,
+    batch_size: int,
+    db: AsyncDatabase,
+) -> int:
+
+    query = {
+        "project_id": ObjectId(project_id),
+        "status_id": ObjectId(status_id),
+        "$or": [
+            {"updated_at": {"$lt": cutoff}},
+            # Todos written before updated_at existed fall back to their creation time
+            {
+                "updated_at": {"$exists": False},
+                "_id": {"$lt": ObjectId.from_datetime(cutoff)},
+            },
+        ],
+    }
+
+    archived_count = 0
+    while True:
+        todos_to_archive = (
+            await db[TODOS_COLLECTION].find(query).limit(batch_size).to_list(None)
+        )
+        if not todos_to_archive:
+            break
+
+        # Upserts keep a batch which was copied but not yet deleted safe to retry
+        archived_at = datetime.now(timezone.utc)
+        await db[ARCHIVED_TODOS_COLLECTION].bulk_write(
+            [
+                ReplaceOne(
+                    {"_id": todo["_id"]},
+                    {**todo, "archived_at": archived_at},
+                    upsert=True,
+                )
+                for todo in todos_to_archive
+            ],
+            ordered=False,
+        )
+
+        # Only deleted while still matching, so a todo moved or edited since it was
+        # read stays live
+        todo_object_ids = [todo["_id"] for todo in todos_to_archive]
+        await db[TODOS_COLLECTION].delete_many(
+            {"$and": [query, {"_id": {"$in": todo_object_ids}}]}
+        )
+
+        surviving_ids = {
+            todo["_id"]
+            for todo in await db[TODOS_COLLECTION]
+            .find({"_id": {"$in": todo_object_ids}}, {"_id": 1})
+            .to_list(None)
+        }
+        if surviving_ids:
+            await db[ARCHIVED_TODOS_COLLECTION].delete_many(
+                {"_id": {"$in": list(surviving_ids)}}
+            )
+            todos_to_archive = [
+                todo for todo in todos_to_archive if todo["_id"] not in surviving_ids
+            ]
+            todo_object_ids = [todo["_id"] for todo in todos_to_archive]
+
+        if todos_to_archive:
+            project_update: Dict[str, Any] = {
+                "$pull": {"todo_ids": {"$in": todo_object_ids}}
+            }
+            increments = _merge_increments(
+                *(
+                    _todo_count_increments(
+                        todo.get("status_id"), todo.get("assignee_id"), -1
+                    )
+                    for todo in todos_to_archive
+                )
+            )
+            if increments:
+                project_update["$inc"] = increments
+
+            await db[PROJECTS_COLLECTION].update_one(
+                {"_id": ObjectId(project_id)}, project_update
+            )
+
+        archived_count += len(todos_to_archive)
+        if len(todos_to_archive) + len(surviving_ids) < batch_size:
+            break
+
+    return archived_count
+
+
+async def db_get_archived_todos(
+    project_id: str,
+    limit: int,
+    db: AsyncDatabase,
+    before_todo_id: str | None = None,
+) -> List[Dict[str, Any]]:
+
+    query: Dict[str, Any] = {"project_id": ObjectId(project_id)}
+    if before_todo_id is not None:
+        query["_id"] = {"$lt": ObjectId(before_todo_id)}
+
+    # Newest first, which is what the archive view pages through
+    todos = (
+        await db[ARCHIVED_TODOS_COLLECTION]
+        .find(query)
+        .sort("_id", -1)
+        .limit(limit)
+        .to_list(None)
+    )
+
+    return stringify_object_ids(todos)
+
 
 async def db_update_budget_available(
     project_id: str, budget_available: float, db: AsyncDatabase
@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import (
+    REMINDER_LEASE_SECONDS,
+    REMINDER_MAX_ATTEMPTS,
+    REMINDERS_COLLECTION,
+)
+
+REMINDER_PENDING = "pending"
+REMINDER_SENT = "sent"
+
+
+# One reminder per event and label, so scheduling an event again moves its
+# reminders rather than adding more
+async def db_schedule_reminders(
+    event_id: str, reminders: List[Tuple[str, datetime]], db: AsyncDatabase
+) -> None:
+    if not reminders:
+        return
+
+    await db[REMINDERS_COLLECTION].bulk_write(
+        [
+            UpdateOne(
+                {"event_id": ObjectId(event_id), "label": label},
+                {
+                    "$set": {
+                        "due_at": due_at,
+                        "state": REMINDER_PENDING,
+                        "attempts": 0,
+                        "lease_expires_at": None,
+                    },
+                    "$unset": {"completed_at": ""},
+                },
+                upsert=True,
+            )
+            for label, due_at in reminders
+        ],
+        ordered=False,
+    )
+
+
+# The event's reminders of any state, keyed by label
+async def db_get_event_reminders(
+    event_id: str, db: AsyncDatabase
+) -> Dict[str, Dict[str, Any]]:
+    reminders = (
+        await db[REMINDERS_COLLECTION]
+        .find({"event_id": ObjectId(event_id)}, {"label": 1, "due_at": 1, "state": 1})
+        .to_list(None)
+    )
+    return {reminder["label"]: reminder for reminder in reminders}
+
+
+async def db_cancel_reminders(
+    event_id: str, labels: List[str], db: AsyncDatabase
+) -> None:
+    if not labels:
+        return
+
+    await db[REMINDERS_COLLECTION].delete_many(
+        {
+            "event_id": ObjectId(event_id),
+            "label": {"$in": labels},
+            "state": REMINDER_PENDING,
+        }
+    )
+
+
+# Leases up to limit due reminders, earliest first. A dispatch which dies part
+# way leaves its lease to expire for another to pick up, until the reminder has
+# been claimed REMINDER_MAX_ATTEMPTS times.
+async def db_claim_reminders(limit: int, db: AsyncDatabase) -> List[Dict[str, Any]]:
+    now = datetime.now(timezone.utc)
+    reminders = []
+    for _ in range(limit):
+        reminder = await db[REMINDERS_COLLECTION].find_one_and_update(
+            {
+                "state": REMINDER_PENDING,
+                "due_at": {"$lte": now},
+                "attempts": {"$lt": REMINDER_MAX_ATTEMPTS},
+                "$or": [
+                    {"lease_expires_at": None},
+                    {"lease_expires_at": {"$lte": now}},
+                ],
+            },
+            {
+                "$set": {
+                    "lease_expires_at": now + timedelta(seconds=REMINDER_LEASE_SECONDS)
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("due_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if reminder is None:
+            break
+        reminders.append(reminder)
+
+    return reminders
+
+
+async def db_mark_reminder_sent(reminder_id: ObjectId, db: AsyncDatabase) -> None:
+    await db[REMINDERS_COLLECTION].update_one(
+        {"_id": reminder_id},
+        {
+            "$set": {
+                "state": REMINDER_SENT,
+                "completed_at": datetime.now(timezone.utc),
+                "lease_expires_at": None,
+            }
+        },
+    )
+
+
+async def db_count_due_reminders(db: AsyncDatabase) -> int:
+    return await db[REMINDERS_COLLECTION].count_documents(
+        {
+            "state": REMINDER_PENDING,
+            "due_at": {"$lte": datetime.now(timezone.utc)},
+            "attempts": {"$lt": REMINDER_MAX_ATTEMPTS},
+        }
+    )
@@ -1,11 +1,30 @@
+from datetime import datetime, timezone
 from typing import Any, Dict, List
 
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
 from pymongo.asynchronous.database import AsyncDatabase
 
 from app.core.common import stringify_object_ids
-from app.core.constants import EVENTS_COLLECTION, PROJECTS_COLLECTION, TEAMS_COLLECTION
-from app.schemas.team import CreateEventRequest, CreateProjectRequest
+from app.core.constants import (
+    DEFAULT_TODO_STATUSES,
+    EVENTS_COLLECTION,
+    MEMBERSHIPS_COLLECTION,
+    PROJECTS_COLLECTION,
+    TEAMS_COLLECTION,
+    USERS_COLLECTION,
+)
+from app.db.deletion import (
+    DELETION_EVENT,
+    DELETION_PROJECT,
+    DELETION_TEAM,
+    EVENT_DELETION_PROJECTION,
+    PROJECT_DELETION_PROJECTION,
+    TEAM_DELETION_PROJECTION,
+    db_enqueue_deletions,
+)
+from app.schemas.event import RSVPStatus
+from app.schemas.team import CreateEventRequest, CreateProjectRequest, TeamRole
 
 
 async def db_create_team(
@@ -18,27 +37,433 @@ async def db_create_team(
         "exec_member_ids": [ObjectId(creator_id)],
         "project_ids": [],
         "event_ids": [],
+        "child_refs_migrated": True,
+        "memberships_migrated": True,
     }
 
     result = await db[TEAMS_COLLECTION].insert_one(team_dict)
     team_dict["_id"] = result.inserted_id
 
+    await db[MEMBERSHIPS_COLLECTION].insert_one(
+        {
+            "team_id": team_dict["_id"],
+            "user_id": ObjectId(creator_id),
+            "role": TeamRole.EXEC.value,
+            "joined_at": datetime.now(timezone.utc),
+        }
+    )
+
     return stringify_object_ids(team_dict)
 
 
-async def db_join_team(team_id: str, user_id: str, db: AsyncDatabase) -> None:
-    await db[TEAMS_COLLECTION].update_one(
+# Returns None when the team does not exist, False when the user is already a
+# member and True when they joined, all from the one update
+async def db_join_team(team_id: str, user_id: str, db: AsyncDatabase) -> bool | None:
+    result = await db[TEAMS_COLLECTION].update_one(
         {"_id": ObjectId(team_id)}, {"$addToSet": {"member_ids": ObjectId(user_id)}}
     )
+    if result.matched_count == 0:
+        return None
+    if result.modified_count == 0:
+        return False
+
+    await db[MEMBERSHIPS_COLLECTION].update_one(
+        {"team_id": ObjectId(team_id), "user_id": ObjectId(user_id)},
+        {
+            "$setOnInsert": {
+                "role": TeamRole.MEMBER.value,
+                "joined_at": datetime.now(timezone.utc),
+            }
+        },
+        upsert=True,
+    )
+    return True
 
 
-async def db_get_team_by_id(team_id: str, db: AsyncDatabase) -> Dict[str, Any]:
-    team_dict = await db[TEAMS_COLLECTION].find_one({"_id": ObjectId(team_id)})
+async def db_get_team_by_id(
+    team_id: str, db: AsyncDatabase, projection: Dict[str, Any] | None = None
+) -> Dict[str, Any]:
+    team_dict = await db[TEAMS_COLLECTION].find_one(
+        {"_id": ObjectId(team_id)}, projection
+    )
     return stringify_object_ids(team_dict)
 
 
+# Returns the team only when user_id is one of its members, so a read can be
+# authorised without shipping the member arrays
+async def db_get_team_for_member(
+    team_id: str,
+    user_id: str,
+    db: AsyncDatabase,
+    projection: Dict[str, Any] | None = None,
+) -> Dict[str, Any] | None:
+    if not await db_get_team_membership(team_id, user_id, db):
+        return None
+
+    team_dict = await db[TEAMS_COLLECTION].find_one(
+        {"_id": ObjectId(team_id)}, projection
+    )
+    return stringify_object_ids(team_dict) if team_dict else None
+
+
+# Everything the team page shows, in one aggregation which only matches when
+# user_id is a member. Teams whose memberships are backfilled are read from the
+# memberships collection, the rest from their member arrays. The team's id
+# arrays are joined on server side and never shipped.
+async def db_get_team_dashboard(
+    team_id: str,
+    user_id: str,
+    upcoming_after: datetime,
+    events_limit: int,
+    members_limit: int,
+    db: AsyncDatabase,
+) -> Dict[str, Any] | None:
+    migrated = {"$eq": ["$memberships_migrated", True]}
+    pipeline = [
+        {"$match": {"_id": ObjectId(team_id)}},
+        {
+            "$lookup": {
+                "from": MEMBERSHIPS_COLLECTION,
+                "localField": "_id",
+                "foreignField": "team_id",
+                "pipeline": [
+                    {"$match": {"user_id": ObjectId(user_id)}},
+                    {"$project": {"role": 1}},
+                ],
+                "as": "viewer_membership",
+            }
+        },
+        {
+            "$match": {
+                "$or": [
+                    {"memberships_migrated": True, "viewer_membership": {"$ne": []}},
+                    {
+                        "memberships_migrated": {"$ne": True},
+                        "member_ids": ObjectId(user_id),
+                    },
+                ]
+            }
+        },
+        {
+            "$lookup": {
+                "from": PROJECTS_COLLECTION,
+                "localField": "project_ids",
+                "foreignField": "_id",
+                "pipeline": [
+                    {
+                        "$project": {
+                            "name": 1,
+                            "description": 1,
+                            "todo_count": {
+                                "$sum": {
+                                    "$map": {
+                                        "input": {
+                                            "$objectToArray": {
+                                                "$ifNull": [
+                                                    "$todo_counts.by_status",
+                                                    {},
+                                                ]
+                                            }
+                                        },
+                                        "in": "$$this.v",
+                                    }
+                                }
+                            },
+                        }
+                    },
+                ],
+                "as": "projects",
+            }
+        },
+        {
+            "$lookup": {
+                "from": EVENTS_COLLECTION,
+                "localField": "event_ids",
+                "foreignField": "_id",
+                "pipeline": [
+                    {"$match": {"start": {"$gte": upcoming_after}}},
+                    {"$sort": {"start": 1}},
+                    {"$limit": events_limit},
+                ],
+                "as": "upcoming_events",
+            }
+        },
+        {
+            "$lookup": {
+                "from": MEMBERSHIPS_COLLECTION,
+                "localField": "_id",
+                "foreignField": "team_id",
+                "pipeline": [
+                    {"$sort": {"user_id": 1}},
+                    {"$limit": members_limit},
+                    {"$project": {"user_id": 1, "role": 1}},
+                ],
+                "as": "preview_memberships",
+            }
+        },
+        {
+            "$lookup": {
+                "from": MEMBERSHIPS_COLLECTION,
+                "localField": "_id",
+                "foreignField": "team_id",
+                "pipeline": [{"$count": "count"}],
+                "as": "membership_count",
+            }
+        },
+        {
+            "$addFields": {
+                "member_preview_ids": {
+                    "$cond": [
+                        migrated,
+                        "$preview_memberships.user_id",
+                        {
+                            "$slice": [
+                                {"$ifNull": ["$member_ids", []]},
+                                members_limit,
+                            ]
+                        },
+                    ]
+                },
+                "preview_exec_ids": {
+                    "$cond": [
+                        migrated,
+                        {
+                            "$map": {
+                                "input": {
+                                    "$filter": {
+                                        "input": "$preview_memberships",
+                                        "cond": {
+                                            "$eq": [
+                                                "$$this.role",
+                                                TeamRole.EXEC.value,
+                                            ]
+                                        },
+                                    }
+                                },
+                                "in": "$$this.user_id",
+                            }
+                        },
+                        {"$ifNull": ["$exec_member_ids", []]},
+                    ]
+                },
+            }
+        },
+        {
+            "$lookup": {
+                "from": USERS_COLLECTION,
+                "localField": "member_preview_ids",
+                "foreignField": "_id",
+                "pipeline": [
+                    {"$project": {"email": 1, "first_name": 1, "last_name": 1}}
+                ],
+                "as": "member_preview",
+            }
+        },
+        {
+            "$project": {
+                "short_id": 1,
+                "name": 1,
+                "member_count": {
+                    "$cond": [
+                        migrated,
+                        {"$ifNull": [{"$first": "$membership_count.count"}, 0]},
+                        {"$size": {"$ifNull": ["$member_ids", []]}},
+                    ]
+                },
+                "role": {
+                    "$cond": [
+                        migrated,
+                        {"$first": "$viewer_membership.role"},
+                        {
+                            "$cond": [
+                                {
+                                    "$in": [
+                                        ObjectId(user_id),
+                                        {"$ifNull": ["$exec_member_ids", []]},
+                                    ]
+                                },
+                                TeamRole.EXEC.value,
+                                TeamRole.MEMBER.value,
+                            ]
+                        },
+                    ]
+                },
+                "projects": 1,
+                "upcoming_events": 1,
+                "member_preview": {
+                    "$map": {
+                        "input": "$member_preview",
+                        "as": "user",
+                        "in": {
+                            "user_id": "$$user._id",
+                            "email": "$$user.email",
+                            "first_name": "$$user.first_name",
+                            "last_name": "$$user.last_name",
+                            "role": {
+                                "$cond": [
+                                    {"$in": ["$$user._id", "$preview_exec_ids"]},
+                                    TeamRole.EXEC.value,
+                                    TeamRole.MEMBER.value,
+                                ]
+                            },
+                        },
+                    }
+                },
+            }
+        },
+    ]
+
+    teams = await (await db[TEAMS_COLLECTION].aggregate(pipeline)).to_list(None)
+    return stringify_object_ids(teams[0]) if teams else None
+
+
+async def db_get_team_membership(
+    team_id: str, user_id: str, db: AsyncDatabase
+) -> Dict[str, Any] | None:
+    membership = await db[MEMBERSHIPS_COLLECTION].find_one(
+        {"team_id": ObjectId(team_id), "user_id": ObjectId(user_id)}
+    )
+    if membership:
+        return stringify_object_ids(membership)
+
+    # Fall back to the member arrays for teams whose memberships are not backfilled
+    team = await db[TEAMS_COLLECTION].find_one(
+        {
+            "_id": ObjectId(team_id),
+            "member_ids": ObjectId(user_id),
+            "memberships_migrated": {"$ne": True},
+        },
+        {"exec_member_ids": {"$elemMatch": {"$eq": ObjectId(user_id)}}},
+    )
+    if not team:
+        return None
+
+    return {
+        "team_id": team_id,
+        "user_id": user_id,
+        "role": (
+            TeamRole.EXEC.value
+            if team.get("exec_member_ids")
+            else TeamRole.MEMBER.value
+        ),
+        "joined_at": None,
+    }
+
+
+# For children which predate team_id and are only listed in the team's id arrays
+async def db_team_lists_child(
+    team_id: str, child_ids_field: str, child_id: str, db: AsyncDatabase
+) -> bool:
+    team = await db[TEAMS_COLLECTION].find_one(
+        {"_id": ObjectId(team_id), child_ids_field: ObjectId(child_id)}, {"_id": 1}
+    )
+    return team is not None
+
+
+async def db_count_team_members_by_role(
+    team_id: str, role: TeamRole, db: AsyncDatabase
+) -> int:
+    team = await db[TEAMS_COLLECTION].find_one(
+        {"_id": ObjectId(team_id)},
+        {
+            "memberships_migrated": 1,
+            "member_count": {"$size": {"$ifNull": ["$member_ids", []]}},
+            "exec_count": {"$size": {"$ifNull": ["$exec_member_ids", []]}},
+        },
+    )
+    if not team:
+        return 0
+
+    if not team.get("memberships_migrated"):
+        if role == TeamRole.EXEC:
+            return team["exec_count"]
+        return team["member_count"] - team["exec_count"]
+
+    return await db[MEMBERSHIPS_COLLECTION].count_documents(
+        {"team_id": ObjectId(team_id), "role": role.value}
+    )
+
+
+async def db_get_team_members(
+    team_id: str,
+    role: TeamRole | None,
+    limit: int,
+    db: AsyncDatabase,
+    after_user_id: str | None = None,
+) -> List[Dict[str, Any]]:
+    # Only legacy teams ship their member arrays, migrated ones are read from the
+    # memberships collection
+    team = await db[TEAMS_COLLECTION].find_one(
+        {"_id": ObjectId(team_id)},
+        {
+            "memberships_migrated": 1,
+            **{
+                field: {
+                    "$cond": [
+                        {"$eq": ["$memberships_migrated", True]},
+                        "$$REMOVE",
+                        f"${field}",
+                    ]
+                }
+                for field in ("member_ids", "exec_member_ids")
+            },
+        },
+    )
+    if not team:
+        return []
+
+    if not team.get("memberships_migrated"):
+        return _get_legacy_team_members(team, role, limit, after_user_id)
+
+    query: Dict[str, Any] = {"team_id": ObjectId(team_id)}
+    if role is not None:
+        query["role"] = role.value
+    if after_user_id is not None:
+        query["user_id"] = {"$gt": ObjectId(after_user_id)}
+
+    memberships = (
+        await db[MEMBERSHIPS_COLLECTION]
+        .find(query)
+        .sort("user_id", 1)
+        .limit(limit)
+        .to_list(length=None)
+    )
+    return [stringify_object_ids(membership) for membership in memberships]
+
+
+def _get_legacy_team_members(
+    team: Dict[str, Any],
+    role: TeamRole | None,
+    limit: int,
+    after_user_id: str | None,
+) -> List[Dict[str, Any]]:
+    exec_member_ids = set(team.get("exec_member_ids", []))
+
+    members = []
+    for user_id in sorted(team.get("member_ids", [])):
+        if after_user_id is not None and user_id <= ObjectId(after_user_id):
+            continue
+
+        member_role = TeamRole.EXEC if user_id in exec_member_ids else TeamRole.MEMBER
+        if role is not None and member_role != role:
+            continue
+
+        members.append(
+            {
+                "team_id": str(team["_id"]),
+                "user_id": str(user_id),
+                "role": member_role.value,
+                "joined_at": None,
+            }
+        )
+        if len(members) == limit:
+            break
+
+    return members
+
+
 async def db_get_team_id_by_short_id(short_id: str, db: AsyncDatabase) -> str | None:
-    team_dict = await db[TEAMS_COLLECTION].find_one({"short_id": short_id})
+    team_dict = await db[TEAMS_COLLECTION].find_one({"short_id": short_id}, {"_id": 1})
     return str(team_dict["_id"]) if team_dict else None
 
 
@@ -49,13 +474,28 @@ async def db_get_team_by_short_id(
     return stringify_object_ids(team_dict) if team_dict else None
 
 
+# The guarded mutations below only apply when the caller is an executive of the
+# team, checked against the dual-written member arrays in the same update. They
+# return False when the guard matched nothing.
 async def db_promote_team_member(
-    team_id: str, promote_member_id: str, db: AsyncDatabase
-) -> None:
-    await db[TEAMS_COLLECTION].update_one(
-        {"_id": ObjectId(team_id)},
+    team_id: str, promote_member_id: str, caller_id: str, db: AsyncDatabase
+) -> bool:
+    result = await db[TEAMS_COLLECTION].update_one(
+        {
+            "_id": ObjectId(team_id),
+            "exec_member_ids": ObjectId(caller_id),
+            "member_ids": ObjectId(promote_member_id),
+        },
         {"$addToSet": {"exec_member_ids": ObjectId(promote_member_id)}},
     )
+    if result.matched_count == 0:
+        return False
+
+    await db[MEMBERSHIPS_COLLECTION].update_one(
+        {"team_id": ObjectId(team_id), "user_id": ObjectId(promote_member_id)},
+        {"$set": {"role": TeamRole.EXEC.value}},
+    )
+    return True
 
 
 async def db_leave_team(team_id: str, user_id: str, db: AsyncDatabase) -> None:
@@ -65,22 +505,69 @@ async def db_leave_team(team_id: str, user_id: str, db: AsyncDatabase) -> None:
             "$pull": {
                 "member_ids": ObjectId(user_id),
                 "exec_member_ids": ObjectId(user_id),
-            }
+            },
+            # Revokes the calendar URLs the member was given
+            "$inc": {"calendar_token_version": 1},
         },
     )
+    await db[MEMBERSHIPS_COLLECTION].delete_one(
+        {"team_id": ObjectId(team_id), "user_id": ObjectId(user_id)}
+    )
 
 
-async def db_delete_team(team_id: str, db: AsyncDatabase) -> None:
-    await db[TEAMS_COLLECTION].delete_one({"_id": ObjectId(team_id)})
+# Only the team document goes straight away. Its memberships, projects, events and
+# their descendants are left to a deletion job, which the collector works through
+# in batches. Returns whether a job was queued.
+async def db_delete_team(team_id: str, db: AsyncDatabase) -> bool:
+    team = await db[TEAMS_COLLECTION].find_one_and_delete(
+        {"_id": ObjectId(team_id)}, projection=TEAM_DELETION_PROJECTION
+    )
+    if not team:
+        return False
+
+    await db_enqueue_deletions(DELETION_TEAM, [team], db)
+    return True
 
 
+# Executives cannot be kicked, so the guard also requires the kicked member to be a
+# plain member
 async def db_kick_team_member(
-    team_id: str, kick_member_id: str, db: AsyncDatabase
-) -> None:
-    await db[TEAMS_COLLECTION].update_one(
+    team_id: str, kick_member_id: str, caller_id: str, db: AsyncDatabase
+) -> bool:
+    result = await db[TEAMS_COLLECTION].update_one(
+        {
+            "_id": ObjectId(team_id),
+            "exec_member_ids": {
+                "$eq": ObjectId(caller_id),
+                "$ne": ObjectId(kick_member_id),
+            },
+            "member_ids": ObjectId(kick_member_id),
+        },
+        {
+            "$pull": {"member_ids": ObjectId(kick_member_id)},
+            # Revokes the calendar URLs the member was given
+            "$inc": {"calendar_token_version": 1},
+        },
+    )
+    if result.matched_count == 0:
+        return False
+
+    await db[MEMBERSHIPS_COLLECTION].delete_one(
+        {"team_id": ObjectId(team_id), "user_id": ObjectId(kick_member_id)}
+    )
+    return True
+
+
+# Bumps the version signed into the team's calendar URLs, revoking all of them.
+# Returns the new version, or None when the team does not exist.
+async def db_rotate_team_calendar_token(team_id: str, db: AsyncDatabase) -> int | None:
+    team = await db[TEAMS_COLLECTION].find_one_and_update(
         {"_id": ObjectId(team_id)},
-        {"$pull": {"member_ids": ObjectId(kick_member_id)}},
+        {"$inc": {"calendar_token_version": 1}},
+        projection={"calendar_token_version": 1},
+        return_document=ReturnDocument.AFTER,
     )
+    return team["calendar_token_version"] if team else None
 
 
 async def db_create_project(
@@ -88,16 +575,17 @@ async def db_create_project(
 ) -> Dict[str, Any]:
 
     project_dict = {
+        "team_id": ObjectId(team_id),
         "name": create_project_request.name,
         "description": create_project_request.description,
         "todo_statuses": [
-            {"id": ObjectId(), "name": "To Do", "color": "#6B7280"},
-            {"id": ObjectId(), "name": "In Progress", "color": "#F59E0B"},
-            {"id": ObjectId(), "name": "Done", "color": "#10B981"},
+            {"id": ObjectId(), "name": name, "color": color}
+            for name, color in DEFAULT_TODO_STATUSES
         ],
         "todo_ids": [],
         "budget_available": 0.0,
         "budget_spent": 0.0,
+        "child_refs_migrated": True,
     }
 
     result = await db[PROJECTS_COLLECTION].insert_one(project_dict)
@@ -131,18 +619,35 @@ async def db_get_project_ids_by_team_id(
         return []
 
 
-async def db_delete_project(project_id: str, db: AsyncDatabase) -> None:
-    await db[PROJECTS_COLLECTION].delete_one({"_id": ObjectId(project_id)})
-    await db[TEAMS_COLLECTION].update_many(
-        {"project_ids": ObjectId(project_id)},
+# Every project is listed in its team's project_ids, whether or not it carries
+# team_id, so the guard doubles as the ownership check
+async def db_delete_project(
+    team_id: str, project_id: str, caller_id: str, db: AsyncDatabase
+) -> bool:
+    result = await db[TEAMS_COLLECTION].update_one(
+        {
+            "_id": ObjectId(team_id),
+            "exec_member_ids": ObjectId(caller_id),
+            "project_ids": ObjectId(project_id),
+        },
         {"$pull": {"project_ids": ObjectId(project_id)}},
     )
+    if result.matched_count == 0:
+        return False
+
+    project = await db[PROJECTS_COLLECTION].find_one_and_delete(
+        {"_id": ObjectId(project_id)}, projection=PROJECT_DELETION_PROJECTION
+    )
+    if project:
+        await db_enqueue_deletions(DELETION_PROJECT, [project], db)
+    return True
 
 
 async def db_create_event_for_team(
     team_id: str, create_event_request: CreateEventRequest, db: AsyncDatabase
 ) -> Dict[str, Any]:
     event_dict = {
+        "team_id": ObjectId(team_id),
         "name": create_event_request.name,
         "description": create_event_request.description,
         "start": create_event_request.start,
@@ -150,6 +655,9 @@ async def db_create_event_for_team(
         "colour": create_event_request.colour,
         "location": create_event_request.location,
         "rsvp_ids": [],
+        "rsvp_counts": {status.value: 0 for status in RSVPStatus},
+        # Its RSVPs carry event_id and are counted in rsvp_counts
+        "rsvp_refs_migrated": True,
     }
 
     result = await db[EVENTS_COLLECTION].insert_one(event_dict)
@@ -157,7 +665,10 @@ async def db_create_event_for_team(
 
     await db[TEAMS_COLLECTION].update_one(
         {"_id": ObjectId(team_id)},
-        {"$addToSet": {"event_ids": event_dict["_id"]}},
+        {
+            "$addToSet": {"event_ids": event_dict["_id"]},
+            "$inc": {"calendar_version": 1},
+        },
     )
 
     return stringify_object_ids(event_dict)
@@ -168,9 +679,82 @@ async def db_get_event_by_id(event_id: str, db: AsyncDatabase) -> Dict[str, Any]
     return stringify_object_ids(event_dict)
 
 
-async def db_delete_event(team_id: str, event_id: str, db: AsyncDatabase) -> None:
-    await db[EVENTS_COLLECTION].delete_one({"_id": ObjectId(event_id)})
-    await db[TEAMS_COLLECTION].update_one(
-        {"_id": ObjectId(team_id)},
-        {"$pull": {"event_ids": ObjectId(event_id)}},
+async def db_delete_event(
+    team_id: str, event_id: str, caller_id: str, db: AsyncDatabase
+) -> bool:
+    result = await db[TEAMS_COLLECTION].update_one(
+        {
+            "_id": ObjectId(team_id),
+            "exec_member_ids": ObjectId(caller_id),
+            "event_ids": ObjectId(event_id),
+        },
+        {
+            "$pull": {"event_ids": ObjectId(event_id)},
+            "$inc": {"calendar_version": 1},
+        },
     )
+    if result.matched_count == 0:
+        return False
+
+    event = await db[EVENTS_COLLECTION].find_one_and_delete(
+        {"_id": ObjectId(event_id)}, projection=EVENT_DELETION_PROJECTION
+    )
+    if event:
+        await db_enqueue_deletions(DELETION_EVENT, [event], db)
+    return True
+
+
+# Stamps team_id onto the projects and events of legacy teams, then flags each team
+# so its children are read by reference instead of through the id arrays
+async def db_backfill_team_child_refs(
+    teams: List[Dict[str, Any]], db: AsyncDatabase
+) -> None:
+
+    for team in teams:
+        if team.get("project_ids"):
+            await db[PROJECTS_COLLECTION].update_many(
+                {"_id": {"$in": team["project_ids"]}},
+                {"$set": {"team_id": team["_id"]}},
+            )
+        if team.get("event_ids"):
+            await db[EVENTS_COLLECTION].update_many(
+                {"_id": {"$in": team["event_ids"]}},
+                {"$set": {"team_id": team["_id"]}},
+            )
+
+        await db[TEAMS_COLLECTION].update_one(
+            {"_id": team["_id"]}, {"$set": {"child_refs_migrated": True}}
+        )
+
+
+# Creates the memberships of legacy teams from their member arrays, then flags
+# each team so membership is read from the memberships collection
+async def db_backfill_team_memberships(
+    teams: List[Dict[str, Any]], db: AsyncDatabase
+) -> None:
+
+    for team in teams:
+        exec_member_ids = set(team.get("exec_member_ids", []))
+        upserts = [
+            UpdateOne(
+                {"team_id": team["_id"], "user_id": user_id},
+                {
+                    "$set": {
+                        "role": (
+                            TeamRole.EXEC.value
+                            if user_id in exec_member_ids
+                            else TeamRole.MEMBER.value
+                        )
+                    },
+                    "$setOnInsert": {"joined_at": None},
+                },
+                upsert=True,
+            )
+            for user_id in team.get("member_ids", [])
+        ]
+        if upserts:
+            await db[MEMBERSHIPS_COLLECTION].bulk_write(upserts, ordered=False)
+
+        await db[TEAMS_COLLECTION].update_one(
+            {"_id": team["_id"]}, {"$set": {"memberships_migrated": True}}
+        )
@@ -0,0 +1,262 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bson import ObjectId
+
+from app.core.constants import (
+    ARCHIVED_TODOS_COLLECTION,
+    DELETION_JOBS_COLLECTION,
+    EVENTS_COLLECTION,
+    PROJECTS_COLLECTION,
+    REMINDERS_COLLECTION,
+    RSVPS_COLLECTION,
+    TEAMS_COLLECTION,
+    TODOS_COLLECTION,
+)
+from app.db.deletion import (
+    DELETION_DONE,
+    DELETION_EVENT,
+    DELETION_PENDING,
+    DELETION_PROJECT,
+    db_collect_deletions,
+    db_delete_orphan_rsvps,
+    db_delete_orphans,
+)
+from app.test_shared.constants import MOCK_EVENT_ID, MOCK_PROJECT_ID, MOCK_TEAM_ID
+
+
+def _mock_cursor(batches):
+    mock_cursor = MagicMock()
+    mock_cursor.limit.return_value = mock_cursor
+    mock_cursor.to_list = AsyncMock(side_effect=batches)
+    return mock_cursor
+
+
+def _mock_collection(batches=None):
+    mock_collection = MagicMock()
+    mock_collection.find.return_value = _mock_cursor(batches or [])
+    mock_collection.find_one_and_update = AsyncMock()
+    mock_collection.update_one = AsyncMock()
+    mock_collection.insert_many = AsyncMock()
+    mock_collection.delete_many = AsyncMock()
+    return mock_collection
+
+
+def _mock_db(collections):
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: collections[name]
+    return mock_db
+
+
+def _project_job(**fields):
+    return {
+        "_id": ObjectId(),
+        "kind": DELETION_PROJECT,
+        "target_id": ObjectId(MOCK_PROJECT_ID),
+        "refs": {"todo_ids": []},
+        "state": DELETION_PENDING,
+        "phase": 0,
+        **fields,
+    }
+
+
+@pytest.mark.asyncio
+@patch("app.db.deletion.DELETION_BATCH_SIZE", 2)
+async def test_db_collect_deletions_success():
+    todo_ids = [ObjectId(), ObjectId(), ObjectId()]
+    job = _project_job()
+    mock_jobs_collection = _mock_collection()
+    mock_jobs_collection.find_one_and_update.side_effect = [job, None]
+    mock_todos_collection = _mock_collection(
+        [[{"_id": todo_ids[0]}, {"_id": todo_ids[1]}], [{"_id": todo_ids[2]}]]
+    )
+    mock_archived_collection = _mock_collection([[]])
+    mock_db = _mock_db(
+        {
+            DELETION_JOBS_COLLECTION: mock_jobs_collection,
+            TODOS_COLLECTION: mock_todos_collection,
+            ARCHIVED_TODOS_COLLECTION: mock_archived_collection,
+        }
+    )
+
+    with patch("app.db.deletion.asyncio.sleep", AsyncMock()):
+        result = await db_collect_deletions(mock_db)
+
+    assert result is True
+    # Todos go in batches, the short second batch ends the phase
+    assert mock_todos_collection.delete_many.call_count == 2
+    progress = [call.args[1] for call in mock_jobs_collection.update_one.call_args_list]
+    assert progress[0]["$inc"] == {"deleted_counts.todos": 2}
+    assert progress[1]["$set"]["phase"] == 1
+    assert progress[-1]["$set"]["state"] == DELETION_DONE
+
+
+@pytest.mark.asyncio
+async def test_db_collect_deletions_resumes_at_saved_phase():
+    job = _project_job(phase=1)
+    mock_jobs_collection = _mock_collection()
+    mock_jobs_collection.find_one_and_update.side_effect = [job, None]
+    mock_todos_collection = _mock_collection()
+    mock_archived_collection = _mock_collection([[]])
+    mock_db = _mock_db(
+        {
+            DELETION_JOBS_COLLECTION: mock_jobs_collection,
+            TODOS_COLLECTION: mock_todos_collection,
+            ARCHIVED_TODOS_COLLECTION: mock_archived_collection,
+        }
+    )
+
+    result = await db_collect_deletions(mock_db)
+
+    assert result is True
+    mock_todos_collection.find.assert_not_called()
+    mock_archived_collection.find.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_db_collect_deletions_event_cancels_reminders():
+    rsvp_id, reminder_id = ObjectId(), ObjectId()
+    job = {
+        "_id": ObjectId(),
+        "kind": DELETION_EVENT,
+        "target_id": ObjectId(MOCK_EVENT_ID),
+        "refs": {"rsvp_ids": [rsvp_id]},
+        "state": DELETION_PENDING,
+        "phase": 0,
+    }
+    mock_jobs_collection = _mock_collection()
+    mock_jobs_collection.find_one_and_update.side_effect = [job, None]
+    mock_rsvps_collection = _mock_collection([[{"_id": rsvp_id}]])
+    mock_reminders_collection = _mock_collection([[{"_id": reminder_id}]])
+    mock_db = _mock_db(
+        {
+            DELETION_JOBS_COLLECTION: mock_jobs_collection,
+            RSVPS_COLLECTION: mock_rsvps_collection,
+            REMINDERS_COLLECTION: mock_reminders_collection,
+        }
+    )
+
+    with patch("app.db.deletion.asyncio.sleep", AsyncMock()):
+        result = await db_collect_deletions(mock_db)
+
+    assert result is True
+    assert mock_reminders_collection.find.call_args.args[0] == {
+        "event_id": ObjectId(MOCK_EVENT_ID)
+    }
+    mock_reminders_collection.delete_many.assert_called_once_with(
+        {"_id": {"$in": [reminder_id]}}
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_collect_deletions_stops_at_time_budget():
+    job = _project_job()
+    mock_jobs_collection = _mock_collection()
+    mock_jobs_collection.find_one_and_update.return_value = job
+    mock_todos_collection = _mock_collection()
+    mock_db = _mock_db(
+        {
+            DELETION_JOBS_COLLECTION: mock_jobs_collection,
+            TODOS_COLLECTION: mock_todos_collection,
+        }
+    )
+
+    result = await db_collect_deletions(mock_db, time_budget_seconds=0)
+
+    assert result is False
+    mock_todos_collection.find.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_db_delete_orphans_cascades_orphaned_projects():
+    live_team_id, deleted_team_id = ObjectId(MOCK_TEAM_ID), ObjectId()
+    live_project = {"_id": ObjectId(), "team_id": live_team_id}
+    orphaned_project = {"_id": ObjectId(), "team_id": deleted_team_id}
+    unreferenced_project = {"_id": ObjectId(), "todo_ids": [ObjectId()]}
+    mock_teams_collection = _mock_collection([[{"_id": live_team_id}]])
+    mock_projects_collection = _mock_collection()
+    mock_jobs_collection = _mock_collection()
+    mock_db = _mock_db(
+        {
+            TEAMS_COLLECTION: mock_teams_collection,
+            PROJECTS_COLLECTION: mock_projects_collection,
+            DELETION_JOBS_COLLECTION: mock_jobs_collection,
+        }
+    )
+
+    result = await db_delete_orphans(
+        [live_project, orphaned_project, unreferenced_project],
+        PROJECTS_COLLECTION,
+        "team_id",
+        TEAMS_COLLECTION,
+        mock_db,
+        DELETION_PROJECT,
+    )
+
+    assert result == 2
+    mock_projects_collection.delete_many.assert_called_once_with(
+        {"_id": {"$in": [orphaned_project["_id"], unreferenced_project["_id"]]}}
+    )
+    (jobs,) = mock_jobs_collection.insert_many.call_args.args
+    assert [job["target_id"] for job in jobs] == [
+        orphaned_project["_id"],
+        unreferenced_project["_id"],
+    ]
+
+
+def _old_object_id(minutes_ago):
+    return ObjectId.from_datetime(
+        datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_delete_orphan_rsvps_success():
+    live_event_id, deleted_event_id = _old_object_id(60), _old_object_id(61)
+    kept_id, orphan_id = _old_object_id(30), _old_object_id(31)
+    mock_events_collection = _mock_collection([[{"_id": live_event_id}]])
+    mock_rsvps_collection = _mock_collection()
+    mock_db = _mock_db(
+        {
+            EVENTS_COLLECTION: mock_events_collection,
+            RSVPS_COLLECTION: mock_rsvps_collection,
+        }
+    )
+
+    result = await db_delete_orphan_rsvps(
+        [
+            {"_id": kept_id, "event_id": live_event_id},
+            {"_id": orphan_id, "event_id": deleted_event_id},
+            # Inserted moments ago, its event may not list it yet
+            {"_id": ObjectId(), "event_id": deleted_event_id},
+        ],
+        mock_db,
+    )
+
+    assert result == 1
+    mock_rsvps_collection.delete_many.assert_called_once_with(
+        {"_id": {"$in": [orphan_id]}}
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_delete_orphan_rsvps_legacy_rsvps():
+    kept_id, orphan_id = _old_object_id(30), _old_object_id(31)
+    mock_events_collection = _mock_collection([[{"rsvp_ids": [str(kept_id)]}]])
+    mock_rsvps_collection = _mock_collection()
+    mock_db = _mock_db(
+        {
+            EVENTS_COLLECTION: mock_events_collection,
+            RSVPS_COLLECTION: mock_rsvps_collection,
+        }
+    )
+
+    result = await db_delete_orphan_rsvps(
+        [{"_id": kept_id}, {"_id": orphan_id}], mock_db
+    )
+
+    assert result == 1
+    mock_rsvps_collection.delete_many.assert_called_once_with(
+        {"_id": {"$in": [orphan_id]}}
+    )
@@ -4,22 +4,35 @@ import pytest
 
 from app.db.event import (
     db_create_rsvp_invite,
+    db_create_rsvp_invites,
     db_get_event_or_none,
     db_get_events_by_ids,
+    db_get_event_rsvps_page,
+    db_get_events_by_team_id,
+    db_get_rsvp_ids_by_email,
     db_get_rsvps_by_ids,
+    db_get_team_events_page,
+    db_iter_accepted_rsvp_batches,
+    db_iter_team_calendar_events,
+    db_recompute_rsvp_counts,
     db_record_rsvp_response,
     db_update_event_details,
 )
+from app.core.constants import EVENTS_COLLECTION, RSVPS_COLLECTION, TEAMS_COLLECTION
 from app.schemas.event import RSVPStatus
 from app.test_shared.constants import (
     MOCK_EVENT_DESCRIPTION,
     MOCK_EVENT_ID,
     MOCK_EVENT_NAME,
+    MOCK_EVENT_START,
     MOCK_INSERTED_ID,
     MOCK_NEW_EVENT_DESCRIPTION,
     MOCK_NEW_EVENT_NAME,
+    MOCK_RSVP_2_ID,
     MOCK_RSVP_ID,
     MOCK_RSVP_STATUS,
+    MOCK_TEAM_ID,
+    MOCK_USER_2_EMAIL,
     MOCK_USER_EMAIL,
 )
 
@@ -52,25 +65,76 @@ async def test_db_create_rsvp_invite_success():
     )
     mock_db.__getitem__.return_value = mock_rsvps_collection
 
-    result = await db_create_rsvp_invite(MOCK_USER_EMAIL, mock_db)
+    result = await db_create_rsvp_invite(MOCK_EVENT_ID, MOCK_USER_EMAIL, mock_db)
 
     assert isinstance(result, dict)
     assert result["_id"] == MOCK_INSERTED_ID
+    assert result["event_id"] == MOCK_EVENT_ID
     assert result["email"] == MOCK_USER_EMAIL
     assert result["status"] == RSVPStatus.PENDING
 
 
 @pytest.mark.asyncio
 async def test_db_record_rsvp_response_success():
-    mock_db = AsyncMock()
     mock_rsvps_collection = AsyncMock()
-    mock_db.__getitem__.return_value = mock_rsvps_collection
+    mock_rsvps_collection.find_one_and_update.return_value = {
+        "_id": ObjectId(MOCK_RSVP_ID),
+        "status": RSVPStatus.PENDING.value,
+        "event_id": ObjectId(MOCK_EVENT_ID),
+    }
+    mock_events_collection = AsyncMock()
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: {
+        RSVPS_COLLECTION: mock_rsvps_collection,
+        EVENTS_COLLECTION: mock_events_collection,
+    }.get(name)
 
-    result = await db_record_rsvp_response(
-        MOCK_INSERTED_ID, RSVPStatus.ACCEPTED, mock_db
-    )
+    result = await db_record_rsvp_response(MOCK_RSVP_ID, RSVPStatus.ACCEPTED, mock_db)
 
     assert result is None
+    mock_events_collection.update_one.assert_called_once_with(
+        {"_id": ObjectId(MOCK_EVENT_ID)},
+        {"$inc": {"rsvp_counts.pending": -1, "rsvp_counts.accepted": 1}},
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_record_rsvp_response_legacy_rsvp():
+    mock_rsvps_collection = AsyncMock()
+    mock_rsvps_collection.find_one_and_update.return_value = {
+        "_id": ObjectId(MOCK_RSVP_ID),
+        "status": RSVPStatus.ACCEPTED.value,
+    }
+    mock_events_collection = AsyncMock()
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: {
+        RSVPS_COLLECTION: mock_rsvps_collection,
+        EVENTS_COLLECTION: mock_events_collection,
+    }.get(name)
+
+    await db_record_rsvp_response(MOCK_RSVP_ID, RSVPStatus.DECLINED, mock_db)
+
+    # Found through the event's rsvp_ids, which hold strings
+    assert mock_events_collection.update_one.call_args.args[0] == {
+        "rsvp_ids": MOCK_RSVP_ID
+    }
+
+
+@pytest.mark.asyncio
+async def test_db_record_rsvp_response_unchanged():
+    mock_rsvps_collection = AsyncMock()
+    mock_rsvps_collection.find_one_and_update.return_value = None
+    mock_events_collection = AsyncMock()
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: {
+        RSVPS_COLLECTION: mock_rsvps_collection,
+        EVENTS_COLLECTION: mock_events_collection,
+    }.get(name)
+
+    await db_record_rsvp_response(MOCK_RSVP_ID, RSVPStatus.ACCEPTED, mock_db)
+
+    # A repeated reply leaves the counts alone
+    mock_events_collection.update_one.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -140,11 +204,45 @@ async def test_db_get_events_by_ids_success():
 
 
 @pytest.mark.asyncio
-async def test_db_update_event_details_success():
+async def test_db_get_events_by_team_id_success():
     mock_db = AsyncMock()
-    mock_events_collection = AsyncMock()
-    mock_events_collection.update_one.return_value = None
+    mock_events_collection = MagicMock()
     mock_db.__getitem__.return_value = mock_events_collection
+    mock_cursor = MagicMock()
+    mock_cursor.to_list = AsyncMock(
+        return_value=[
+            {
+                "_id": ObjectId(MOCK_EVENT_ID),
+                "team_id": ObjectId(MOCK_TEAM_ID),
+                "name": MOCK_EVENT_NAME,
+            }
+        ]
+    )
+    mock_events_collection.find.return_value = mock_cursor
+
+    result = await db_get_events_by_team_id(MOCK_TEAM_ID, mock_db)
+
+    assert result == [
+        {"_id": MOCK_EVENT_ID, "team_id": MOCK_TEAM_ID, "name": MOCK_EVENT_NAME}
+    ]
+    mock_events_collection.find.assert_called_once_with(
+        {"team_id": ObjectId(MOCK_TEAM_ID)}
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_update_event_details_success():
+    mock_events_collection = AsyncMock()
+    mock_events_collection.find_one_and_update.return_value = {
+        "_id": ObjectId(MOCK_EVENT_ID),
+        "team_id": ObjectId(MOCK_TEAM_ID),
+    }
+    mock_teams_collection = AsyncMock()
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: {
+        EVENTS_COLLECTION: mock_events_collection,
+        TEAMS_COLLECTION: mock_teams_collection,
+    }.get(name)
     mock_update_event_details_request = {
         "name": MOCK_NEW_EVENT_NAME,
         "description": MOCK_NEW_EVENT_DESCRIPTION,
@@ -158,3 +256,300 @@ async def test_db_update_event_details_success():
     )
 
     assert result is None
+    mock_teams_collection.update_one.assert_called_once_with(
+        {"_id": ObjectId(MOCK_TEAM_ID)}, {"$inc": {"calendar_version": 1}}
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_iter_team_calendar_events_success():
+    mock_cursor = MagicMock()
+    mock_cursor.sort.return_value = mock_cursor
+    mock_cursor.__aiter__.return_value = [
+        {"_id": ObjectId(MOCK_EVENT_ID), "name": MOCK_EVENT_NAME}
+    ]
+    mock_events_collection = MagicMock()
+    mock_events_collection.find.return_value = mock_cursor
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_events_collection
+
+    result = [
+        event
+        async for event in db_iter_team_calendar_events(MOCK_TEAM_ID, None, mock_db)
+    ]
+
+    assert result == [{"_id": MOCK_EVENT_ID, "name": MOCK_EVENT_NAME}]
+    assert mock_events_collection.find.call_args.args[0] == {
+        "team_id": ObjectId(MOCK_TEAM_ID)
+    }
+
+
+@pytest.mark.asyncio
+async def test_db_get_team_events_page_success():
+    mock_cursor = MagicMock()
+    mock_cursor.sort.return_value = mock_cursor
+    mock_cursor.limit.return_value = mock_cursor
+    mock_cursor.to_list = AsyncMock(
+        return_value=[{"_id": ObjectId(MOCK_EVENT_ID), "start": MOCK_EVENT_START}]
+    )
+    mock_events_collection = MagicMock()
+    mock_events_collection.find.return_value = mock_cursor
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_events_collection
+    after_event_id = str(ObjectId())
+
+    result = await db_get_team_events_page(
+        MOCK_TEAM_ID,
+        None,
+        "2023-10-01T00:00:00",
+        "2023-11-01T00:00:00",
+        21,
+        mock_db,
+        "2023-10-05T00:00:00Z",
+        after_event_id,
+    )
+
+    assert result == [{"_id": MOCK_EVENT_ID, "start": MOCK_EVENT_START}]
+    query = mock_events_collection.find.call_args.args[0]
+    assert query["team_id"] == ObjectId(MOCK_TEAM_ID)
+    assert query["start"] == {
+        "$type": "date",
+        "$gte": "2023-10-01T00:00:00",
+        "$lt": "2023-11-01T00:00:00",
+    }
+    assert query["$or"][1] == {
+        "start": "2023-10-05T00:00:00Z",
+        "_id": {"$gt": ObjectId(after_event_id)},
+    }
+    mock_cursor.sort.assert_called_once_with([("start", 1), ("_id", 1)])
+    mock_cursor.limit.assert_called_once_with(21)
+
+
+@pytest.mark.asyncio
+async def test_db_get_team_events_page_legacy_team():
+    mock_cursor = MagicMock()
+    mock_cursor.sort.return_value = mock_cursor
+    mock_cursor.limit.return_value = mock_cursor
+    mock_cursor.to_list = AsyncMock(return_value=[])
+    mock_events_collection = MagicMock()
+    mock_events_collection.find.return_value = mock_cursor
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_events_collection
+
+    await db_get_team_events_page(MOCK_TEAM_ID, [MOCK_EVENT_ID], None, None, 5, mock_db)
+
+    query = mock_events_collection.find.call_args.args[0]
+    assert query == {
+        "_id": {"$in": [ObjectId(MOCK_EVENT_ID)]},
+        "start": {"$type": "date"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_db_create_rsvp_invites_success():
+    rsvp_ids = [ObjectId(), ObjectId()]
+    mock_rsvps_collection = AsyncMock()
+    mock_rsvps_collection.insert_many.return_value = MagicMock(inserted_ids=rsvp_ids)
+    mock_events_collection = AsyncMock()
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: {
+        RSVPS_COLLECTION: mock_rsvps_collection,
+        EVENTS_COLLECTION: mock_events_collection,
+    }.get(name)
+
+    result = await db_create_rsvp_invites(
+        MOCK_EVENT_ID, [MOCK_USER_EMAIL, "Second@Example.com"], mock_db
+    )
+
+    # Stored lower-cased, so a later invite matches whatever its case
+    assert [rsvp["email"] for rsvp in result] == [MOCK_USER_EMAIL, "second@example.com"]
+    assert [rsvp["_id"] for rsvp in result] == [str(rsvp_id) for rsvp_id in rsvp_ids]
+    mock_rsvps_collection.insert_many.assert_called_once()
+    mock_events_collection.update_one.assert_called_once_with(
+        {"_id": ObjectId(MOCK_EVENT_ID)},
+        {
+            "$addToSet": {
+                "rsvp_ids": {"$each": [str(rsvp_id) for rsvp_id in rsvp_ids]}
+            },
+            "$inc": {"rsvp_counts.pending": 2},
+        },
+    )
+    (rsvp_dicts,) = mock_rsvps_collection.insert_many.call_args.args
+    assert rsvp_dicts[0]["event_id"] == ObjectId(MOCK_EVENT_ID)
+
+
+@pytest.mark.asyncio
+async def test_db_get_rsvp_ids_by_email_success():
+    mock_cursor = MagicMock()
+    mock_cursor.to_list = AsyncMock(
+        return_value=[{"_id": ObjectId(MOCK_RSVP_ID), "email": MOCK_USER_EMAIL}]
+    )
+    mock_rsvps_collection = MagicMock()
+    mock_rsvps_collection.find.return_value = mock_cursor
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_rsvps_collection
+
+    result = await db_get_rsvp_ids_by_email(
+        [MOCK_RSVP_ID], [MOCK_USER_EMAIL, "second@example.com"], mock_db
+    )
+
+    assert result == {MOCK_USER_EMAIL: MOCK_RSVP_ID}
+
+
+@pytest.mark.asyncio
+async def test_db_get_rsvp_ids_by_email_ignores_case_success():
+    mock_cursor = MagicMock()
+    # Stored before emails were lower-cased on insert
+    mock_cursor.to_list = AsyncMock(
+        return_value=[{"_id": ObjectId(MOCK_RSVP_ID), "email": "Alice@Example.com"}]
+    )
+    mock_rsvps_collection = MagicMock()
+    mock_rsvps_collection.find.return_value = mock_cursor
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_rsvps_collection
+
+    result = await db_get_rsvp_ids_by_email(
+        [MOCK_RSVP_ID], ["ALICE@example.com"], mock_db
+    )
+
+    assert result == {"alice@example.com": MOCK_RSVP_ID}
+    query = mock_rsvps_collection.find.call_args.args[0]
+    assert query["email"] == {"$in": ["alice@example.com"]}
+    collation = mock_rsvps_collection.find.call_args.kwargs["collation"]
+    assert collation.document == {"locale": "en", "strength": 2}
+
+
+@pytest.mark.asyncio
+async def test_db_iter_accepted_rsvp_batches_success():
+    mock_cursor = MagicMock()
+    mock_cursor.__aiter__.return_value = [
+        {"_id": ObjectId(MOCK_RSVP_ID), "email": MOCK_USER_EMAIL},
+        {"_id": ObjectId(MOCK_RSVP_2_ID), "email": MOCK_USER_2_EMAIL},
+        {"_id": ObjectId(MOCK_INSERTED_ID), "email": MOCK_USER_EMAIL},
+    ]
+    mock_cursor.sort.return_value = mock_cursor
+    mock_rsvps_collection = MagicMock()
+    mock_rsvps_collection.find.return_value = mock_cursor
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_rsvps_collection
+
+    result = [
+        batch
+        async for batch in db_iter_accepted_rsvp_batches(
+            MOCK_EVENT_ID, None, 2, mock_db
+        )
+    ]
+
+    assert [[rsvp["_id"] for rsvp in batch] for batch in result] == [
+        [MOCK_RSVP_ID, MOCK_RSVP_2_ID],
+        [MOCK_INSERTED_ID],
+    ]
+    query = mock_rsvps_collection.find.call_args.args[0]
+    assert query == {
+        "event_id": ObjectId(MOCK_EVENT_ID),
+        "status": RSVPStatus.ACCEPTED,
+    }
+    mock_cursor.sort.assert_called_once_with("_id", 1)
+
+
+@pytest.mark.asyncio
+async def test_db_iter_accepted_rsvp_batches_legacy_event():
+    mock_cursor = MagicMock()
+    mock_cursor.__aiter__.return_value = []
+    mock_cursor.sort.return_value = mock_cursor
+    mock_rsvps_collection = MagicMock()
+    mock_rsvps_collection.find.return_value = mock_cursor
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_rsvps_collection
+
+    result = [
+        batch
+        async for batch in db_iter_accepted_rsvp_batches(
+            MOCK_EVENT_ID, [MOCK_RSVP_ID], 2, mock_db
+        )
+    ]
+
+    assert result == []
+    query = mock_rsvps_collection.find.call_args.args[0]
+    assert query == {
+        "_id": {"$in": [ObjectId(MOCK_RSVP_ID)]},
+        "status": RSVPStatus.ACCEPTED,
+    }
+
+
+@pytest.mark.asyncio
+async def test_db_get_event_rsvps_page_success():
+    mock_cursor = MagicMock()
+    mock_cursor.sort.return_value = mock_cursor
+    mock_cursor.limit.return_value = mock_cursor
+    mock_cursor.to_list = AsyncMock(
+        return_value=[
+            {
+                "_id": ObjectId(MOCK_RSVP_2_ID),
+                "email": MOCK_USER_EMAIL,
+                "status": RSVPStatus.ACCEPTED.value,
+            }
+        ]
+    )
+    mock_rsvps_collection = MagicMock()
+    mock_rsvps_collection.find.return_value = mock_cursor
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_rsvps_collection
+
+    result = await db_get_event_rsvps_page(
+        MOCK_EVENT_ID, None, RSVPStatus.ACCEPTED, 3, mock_db, MOCK_RSVP_ID
+    )
+
+    assert result[0]["_id"] == MOCK_RSVP_2_ID
+    assert mock_rsvps_collection.find.call_args.args[0] == {
+        "event_id": ObjectId(MOCK_EVENT_ID),
+        "status": RSVPStatus.ACCEPTED,
+        "_id": {"$gt": ObjectId(MOCK_RSVP_ID)},
+    }
+    mock_cursor.limit.assert_called_once_with(3)
+
+
+@pytest.mark.asyncio
+async def test_db_get_event_rsvps_page_legacy_event():
+    mock_cursor = MagicMock()
+    mock_cursor.sort.return_value = mock_cursor
+    mock_cursor.limit.return_value = mock_cursor
+    mock_cursor.to_list = AsyncMock(return_value=[])
+    mock_rsvps_collection = MagicMock()
+    mock_rsvps_collection.find.return_value = mock_cursor
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_rsvps_collection
+
+    await db_get_event_rsvps_page(
+        MOCK_EVENT_ID, [MOCK_RSVP_ID, MOCK_RSVP_2_ID], None, 3, mock_db, MOCK_RSVP_ID
+    )
+
+    assert mock_rsvps_collection.find.call_args.args[0] == {
+        "_id": {
+            "$in": [ObjectId(MOCK_RSVP_ID), ObjectId(MOCK_RSVP_2_ID)],
+            "$gt": ObjectId(MOCK_RSVP_ID),
+        }
+    }
+
+
+@pytest.mark.asyncio
+async def test_db_recompute_rsvp_counts_success():
+    mock_cursor = AsyncMock()
+    mock_cursor.to_list.return_value = [{"_id": "accepted", "count": 1}]
+    mock_rsvps_collection = AsyncMock()
+    mock_rsvps_collection.aggregate.return_value = mock_cursor
+    mock_events_collection = AsyncMock()
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: {
+        RSVPS_COLLECTION: mock_rsvps_collection,
+        EVENTS_COLLECTION: mock_events_collection,
+    }.get(name)
+
+    result = await db_recompute_rsvp_counts(MOCK_EVENT_ID, mock_db)
+
+    assert result == {"pending": 0, "accepted": 1, "declined": 0}
+    pipeline = mock_rsvps_collection.aggregate.call_args.args[0]
+    assert pipeline[0] == {"$match": {"event_id": ObjectId(MOCK_EVENT_ID)}}
+    mock_events_collection.update_one.assert_called_once_with(
+        {"_id": ObjectId(MOCK_EVENT_ID)}, {"$set": {"rsvp_counts": result}}
+    )
@@ -0,0 +1,107 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from bson import ObjectId
+
+from app.core.constants import EMAIL_MAX_ATTEMPTS
+from app.db.outbox import (
+    EMAIL_FAILED,
+    EMAIL_PENDING,
+    db_claim_emails,
+    db_enqueue_emails,
+    db_fail_exhausted_emails,
+)
+from app.test_shared.constants import MOCK_USER_EMAIL
+
+
+@pytest.mark.asyncio
+async def test_db_enqueue_emails_success():
+    mock_db = AsyncMock()
+    mock_outbox_collection = AsyncMock()
+    mock_db.__getitem__.return_value = mock_outbox_collection
+
+    await db_enqueue_emails(
+        [
+            {
+                "to_email": MOCK_USER_EMAIL,
+                "subject": "Verify your account",
+                "html_content": "<p>123456</p>",
+            }
+        ],
+        mock_db,
+    )
+
+    (emails,) = mock_outbox_collection.insert_many.call_args.args
+    assert emails[0]["to_email"] == MOCK_USER_EMAIL
+    assert emails[0]["state"] == EMAIL_PENDING
+    assert emails[0]["attempts"] == 0
+
+
+@pytest.mark.asyncio
+async def test_db_enqueue_emails_dedupe_key():
+    mock_db = AsyncMock()
+    mock_outbox_collection = AsyncMock()
+    mock_db.__getitem__.return_value = mock_outbox_collection
+
+    await db_enqueue_emails(
+        [
+            {
+                "recipients": [{"to_email": MOCK_USER_EMAIL}],
+                "subject": "Reminder",
+                "html_content": "<p>Soon</p>",
+                "dedupe_key": "reminder:1:0:0",
+            }
+        ],
+        mock_db,
+    )
+
+    (updates,) = mock_outbox_collection.bulk_write.call_args.args
+    assert updates[0]._filter == {"dedupe_key": "reminder:1:0:0"}
+    assert updates[0]._doc["$setOnInsert"]["state"] == EMAIL_PENDING
+    assert updates[0]._upsert is True
+    mock_outbox_collection.insert_many.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_db_enqueue_emails_skips_empty():
+    mock_db = AsyncMock()
+    mock_outbox_collection = AsyncMock()
+    mock_db.__getitem__.return_value = mock_outbox_collection
+
+    await db_enqueue_emails([], mock_db)
+
+    mock_outbox_collection.insert_many.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_db_claim_emails_stops_when_none_due():
+    mock_db = AsyncMock()
+    mock_outbox_collection = AsyncMock()
+    email = {"_id": ObjectId(), "to_email": MOCK_USER_EMAIL}
+    mock_outbox_collection.find_one_and_update.side_effect = [email, None]
+    mock_db.__getitem__.return_value = mock_outbox_collection
+
+    result = await db_claim_emails(5, mock_db)
+
+    assert result == [email]
+    assert mock_outbox_collection.find_one_and_update.call_count == 2
+    query, update = mock_outbox_collection.find_one_and_update.call_args.args
+    # Each claim is an attempt, so an email which keeps crashing the drain runs out
+    assert query["attempts"] == {"$lt": EMAIL_MAX_ATTEMPTS}
+    assert update["$inc"] == {"attempts": 1}
+
+
+@pytest.mark.asyncio
+async def test_db_fail_exhausted_emails_success():
+    mock_db = AsyncMock()
+    mock_outbox_collection = AsyncMock()
+    mock_outbox_collection.update_many.return_value.modified_count = 1
+    mock_db.__getitem__.return_value = mock_outbox_collection
+
+    result = await db_fail_exhausted_emails(mock_db)
+
+    assert result == 1
+    query, update = mock_outbox_collection.update_many.call_args.args
+    assert query["state"] == EMAIL_PENDING
+    assert query["attempts"] == {"$gte": EMAIL_MAX_ATTEMPTS}
+    assert update["$set"]["state"] == EMAIL_FAILED
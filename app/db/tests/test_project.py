@@ -1,11 +1,30 @@
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock
 import pytest
 from bson import ObjectId
 
-from app.core.constants import PROJECTS_COLLECTION, TODOS_COLLECTION
+from app.core.constants import (
+    ARCHIVED_TODOS_COLLECTION,
+    PROJECTS_COLLECTION,
+    TODOS_COLLECTION,
+)
 from app.db.project import (
     db_approve_todo,
+    db_approve_todos,
+    db_archive_todos,
+    db_backfill_project_child_refs,
     db_assign_todo,
+    db_count_proposed_todos,
+    db_get_archived_todos,
+    db_get_projects_by_ids,
+    db_get_proposed_todos,
+    db_get_project_team_id,
+    db_get_todo_counts,
+    db_get_todos_by_assignee,
+    db_project_has_todo,
+    db_recompute_todo_counts,
+    db_reject_todos,
+    db_search_todos,
     db_get_project,
     db_add_todo,
     db_update_budget_available,
@@ -24,6 +43,7 @@ from app.test_shared.constants import (
     MOCK_PROJECT_NAME,
     MOCK_STATUS_2_ID,
     MOCK_STATUS_ID,
+    MOCK_TEAM_ID,
     MOCK_TODO_DESCRIPTION,
     MOCK_TODO_ID,
     MOCK_TODO_NAME,
@@ -91,16 +111,33 @@ async def test_db_update_todo_success():
         todo_id=MOCK_TODO_ID,
         name=MOCK_TODO_NAME,
         description=MOCK_TODO_DESCRIPTION,
-        status_id=MOCK_STATUS_ID,
+        status_id=MOCK_STATUS_2_ID,
         assignee_id=MOCK_USER_ID,
     )
     mock_todos_collection = AsyncMock()
+    mock_todos_collection.find_one_and_update.return_value = {
+        "_id": ObjectId(MOCK_TODO_ID),
+        "status_id": ObjectId(MOCK_STATUS_ID),
+        "assignee_id": ObjectId(MOCK_USER_ID),
+    }
+    mock_projects_collection = AsyncMock()
     mock_db = AsyncMock()
-    mock_db.__getitem__.return_value = mock_todos_collection
+    mock_db.__getitem__.side_effect = lambda name: (
+        mock_todos_collection if name == TODOS_COLLECTION else mock_projects_collection
+    )
 
     await db_update_todo(MOCK_PROJECT_ID, update_req, mock_db)
 
-    mock_todos_collection.update_one.assert_called_once()
+    mock_todos_collection.find_one_and_update.assert_called_once()
+    mock_projects_collection.update_one.assert_called_once_with(
+        {"_id": ObjectId(MOCK_PROJECT_ID)},
+        {
+            "$inc": {
+                f"todo_counts.by_status.{MOCK_STATUS_ID}": -1,
+                f"todo_counts.by_status.{MOCK_STATUS_2_ID}": 1,
+            }
+        },
+    )
 
 
 @pytest.mark.asyncio
@@ -108,7 +145,11 @@ async def test_db_delete_todo_success():
     todo_id = MOCK_TODO_ID
     mock_todos_collection = AsyncMock()
     mock_projects_collection = AsyncMock()
-    mock_todos_collection.delete_one.return_value = None
+    mock_todos_collection.find_one_and_delete.return_value = {
+        "_id": ObjectId(MOCK_TODO_ID),
+        "status_id": ObjectId(MOCK_STATUS_ID),
+        "assignee_id": None,
+    }
     mock_projects_collection.update_one.return_value = None
     mock_db = AsyncMock()
 
@@ -121,8 +162,14 @@ async def test_db_delete_todo_success():
 
     await db_delete_todo(MOCK_PROJECT_ID, todo_id, mock_db)
 
-    mock_todos_collection.delete_one.assert_called_once()
-    mock_projects_collection.update_one.assert_called_once()
+    mock_todos_collection.find_one_and_delete.assert_called_once()
+    mock_projects_collection.update_one.assert_called_once_with(
+        {"_id": ObjectId(MOCK_PROJECT_ID)},
+        {
+            "$pull": {"todo_ids": ObjectId(MOCK_TODO_ID)},
+            "$inc": {f"todo_counts.by_status.{MOCK_STATUS_ID}": -1},
+        },
+    )
 
 
 @pytest.mark.asyncio
@@ -159,6 +206,98 @@ async def test_db_get_todo_items_success():
     assert result[0]["_id"] == MOCK_TODO_ID
 
 
+@pytest.mark.asyncio
+async def test_db_get_todo_items_migrated_project_success():
+    mock_projects_collection = AsyncMock()
+    mock_projects_collection.find_one.return_value = {
+        "_id": ObjectId(MOCK_PROJECT_ID),
+        "child_refs_migrated": True,
+    }
+    mock_todos_collection = MagicMock()
+    mock_cursor = MagicMock()
+    mock_cursor.to_list = AsyncMock(
+        return_value=[{"_id": ObjectId(MOCK_TODO_ID), "name": MOCK_TODO_NAME}]
+    )
+    mock_todos_collection.find.return_value = mock_cursor
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: (
+        mock_projects_collection
+        if name == PROJECTS_COLLECTION
+        else mock_todos_collection
+    )
+
+    result = await db_get_todo_items(MOCK_PROJECT_ID, mock_db)
+
+    assert result[0]["_id"] == MOCK_TODO_ID
+    mock_todos_collection.find.assert_called_once_with(
+        {"project_id": ObjectId(MOCK_PROJECT_ID)}
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_project_has_todo_legacy_fallback_success():
+    mock_todos_collection = AsyncMock()
+    mock_todos_collection.find_one.return_value = None
+    mock_projects_collection = AsyncMock()
+    mock_projects_collection.find_one.return_value = {"_id": ObjectId(MOCK_PROJECT_ID)}
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: (
+        mock_projects_collection
+        if name == PROJECTS_COLLECTION
+        else mock_todos_collection
+    )
+
+    result = await db_project_has_todo(MOCK_PROJECT_ID, MOCK_TODO_ID, mock_db)
+
+    assert result is True
+    mock_projects_collection.find_one.assert_called_once_with(
+        {"_id": ObjectId(MOCK_PROJECT_ID), "todo_ids": ObjectId(MOCK_TODO_ID)},
+        {"_id": 1},
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_get_project_team_id_success():
+    mock_projects_collection = AsyncMock()
+    mock_projects_collection.find_one.return_value = {
+        "_id": ObjectId(MOCK_PROJECT_ID),
+        "team_id": ObjectId(MOCK_TEAM_ID),
+    }
+    mock_teams_collection = AsyncMock()
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: (
+        mock_projects_collection
+        if name == PROJECTS_COLLECTION
+        else mock_teams_collection
+    )
+
+    result = await db_get_project_team_id(MOCK_PROJECT_ID, mock_db)
+
+    assert result == MOCK_TEAM_ID
+    mock_teams_collection.find_one.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_db_get_project_team_id_legacy_project_success():
+    mock_projects_collection = AsyncMock()
+    mock_projects_collection.find_one.return_value = {"_id": ObjectId(MOCK_PROJECT_ID)}
+    mock_teams_collection = AsyncMock()
+    mock_teams_collection.find_one.return_value = {"_id": ObjectId(MOCK_TEAM_ID)}
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: (
+        mock_projects_collection
+        if name == PROJECTS_COLLECTION
+        else mock_teams_collection
+    )
+
+    result = await db_get_project_team_id(MOCK_PROJECT_ID, mock_db)
+
+    assert result == MOCK_TEAM_ID
+    mock_teams_collection.find_one.assert_called_once_with(
+        {"project_ids": ObjectId(MOCK_PROJECT_ID)}, {"_id": 1}
+    )
+
+
 @pytest.mark.asyncio
 async def test_db_add_todo_status_success():
     mock_projects_collection = AsyncMock()
@@ -220,18 +359,59 @@ async def test_db_reorder_todo_statuses_success():
     mock_projects_collection.update_one.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_db_reorder_todo_statuses_keeps_color_success():
+    new_statuses = [
+        {
+            "id": MOCK_STATUS_ID,
+            "name": MOCK_TODO_STATUS_NAME,
+            "color": MOCK_TODO_STATUS_COLOUR,
+        },
+    ]
+    mock_projects_collection = AsyncMock()
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_projects_collection
+
+    await db_reorder_todo_statuses(MOCK_PROJECT_ID, new_statuses, mock_db)
+
+    mock_projects_collection.update_one.assert_called_once_with(
+        {"_id": ObjectId(MOCK_PROJECT_ID)},
+        {
+            "$set": {
+                "todo_statuses": [
+                    {
+                        "id": ObjectId(MOCK_STATUS_ID),
+                        "name": MOCK_TODO_STATUS_NAME,
+                        "color": MOCK_TODO_STATUS_COLOUR,
+                    }
+                ]
+            }
+        },
+    )
+
+
 @pytest.mark.asyncio
 async def test_db_assign_todo_success():
     todo_id = MOCK_TODO_ID
     assignee_id = MOCK_USER_ID
     mock_todos_collection = AsyncMock()
-    mock_todos_collection.update_one.return_value = None
+    mock_todos_collection.find_one_and_update.return_value = {
+        "_id": ObjectId(MOCK_TODO_ID),
+        "assignee_id": None,
+    }
+    mock_projects_collection = AsyncMock()
     mock_db = AsyncMock()
-    mock_db.__getitem__.return_value = mock_todos_collection
+    mock_db.__getitem__.side_effect = lambda name: (
+        mock_todos_collection if name == TODOS_COLLECTION else mock_projects_collection
+    )
 
-    result = await db_assign_todo(todo_id, assignee_id, mock_db)
+    result = await db_assign_todo(MOCK_PROJECT_ID, todo_id, assignee_id, mock_db)
 
     assert result is None
+    mock_projects_collection.update_one.assert_called_once_with(
+        {"_id": ObjectId(MOCK_PROJECT_ID)},
+        {"$inc": {f"todo_counts.by_assignee.{MOCK_USER_ID}": 1}},
+    )
 
 
 @pytest.mark.asyncio
@@ -268,3 +448,443 @@ async def test_db_update_budget_spent_success():
     result = await db_update_budget_spent(MOCK_PROJECT_ID, 50.0, mock_db)
 
     assert result is None
+
+
+@pytest.mark.asyncio
+async def test_db_get_proposed_todos_success():
+    mock_todos_collection = MagicMock()
+    mock_cursor = MagicMock()
+    mock_cursor.to_list = AsyncMock(
+        return_value=[
+            {
+                "_id": ObjectId(MOCK_TODO_ID),
+                "project_id": ObjectId(MOCK_PROJECT_ID),
+                "name": MOCK_TODO_NAME,
+                "approved": False,
+            }
+        ]
+    )
+    mock_todos_collection.find.return_value = mock_cursor
+    mock_projects_collection = AsyncMock()
+    mock_projects_collection.find_one.return_value = {
+        "_id": ObjectId(MOCK_PROJECT_ID),
+        "child_refs_migrated": True,
+    }
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: (
+        mock_todos_collection if name == TODOS_COLLECTION else mock_projects_collection
+    )
+
+    result = await db_get_proposed_todos(MOCK_PROJECT_ID, mock_db)
+
+    assert result[0]["_id"] == MOCK_TODO_ID
+    mock_todos_collection.find.assert_called_once_with(
+        {"project_id": ObjectId(MOCK_PROJECT_ID), "approved": False}
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_get_proposed_todos_legacy_project():
+    mock_todos_collection = MagicMock()
+    mock_cursor = MagicMock()
+    mock_cursor.to_list = AsyncMock(return_value=[])
+    mock_todos_collection.find.return_value = mock_cursor
+    mock_projects_collection = AsyncMock()
+    # Not yet reached by the child refs migration, its todos have no project_id
+    mock_projects_collection.find_one.return_value = {
+        "_id": ObjectId(MOCK_PROJECT_ID),
+        "todo_ids": [ObjectId(MOCK_TODO_ID)],
+    }
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: (
+        mock_todos_collection if name == TODOS_COLLECTION else mock_projects_collection
+    )
+
+    await db_get_proposed_todos(MOCK_PROJECT_ID, mock_db)
+
+    mock_todos_collection.find.assert_called_once_with(
+        {"_id": {"$in": [ObjectId(MOCK_TODO_ID)]}, "approved": False}
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_count_proposed_todos_success():
+    mock_todos_collection = AsyncMock()
+    mock_todos_collection.count_documents.return_value = 4
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_todos_collection
+
+    result = await db_count_proposed_todos(MOCK_PROJECT_ID, mock_db)
+
+    assert result == 4
+
+
+@pytest.mark.asyncio
+async def test_db_approve_todos_success():
+    mock_todos_collection = AsyncMock()
+    mock_todos_collection.update_many.return_value = MagicMock(modified_count=1)
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_todos_collection
+
+    result = await db_approve_todos(MOCK_PROJECT_ID, [MOCK_TODO_ID], mock_db)
+
+    assert result == 1
+
+
+@pytest.mark.asyncio
+async def test_db_reject_todos_success():
+    mock_todos_collection = MagicMock()
+    mock_cursor = MagicMock()
+    mock_cursor.to_list = AsyncMock(
+        return_value=[
+            {
+                "_id": ObjectId(MOCK_TODO_ID),
+                "status_id": ObjectId(MOCK_STATUS_ID),
+                "assignee_id": ObjectId(MOCK_USER_ID),
+            }
+        ]
+    )
+    mock_todos_collection.find.return_value = mock_cursor
+    mock_todos_collection.delete_many = AsyncMock(
+        return_value=MagicMock(deleted_count=1)
+    )
+    mock_projects_collection = AsyncMock()
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: (
+        mock_todos_collection if name == TODOS_COLLECTION else mock_projects_collection
+    )
+
+    result = await db_reject_todos(MOCK_PROJECT_ID, [MOCK_TODO_ID], mock_db)
+
+    assert result == 1
+    mock_projects_collection.update_one.assert_called_once_with(
+        {"_id": ObjectId(MOCK_PROJECT_ID)},
+        {
+            "$pull": {"todo_ids": {"$in": [ObjectId(MOCK_TODO_ID)]}},
+            "$inc": {
+                f"todo_counts.by_status.{MOCK_STATUS_ID}": -1,
+                f"todo_counts.by_assignee.{MOCK_USER_ID}": -1,
+            },
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_get_todo_counts_success():
+    mock_projects_collection = AsyncMock()
+    mock_projects_collection.find_one.return_value = {
+        "_id": ObjectId(MOCK_PROJECT_ID),
+        "todo_counts": {"by_status": {MOCK_STATUS_ID: 2}, "by_assignee": {}},
+    }
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_projects_collection
+
+    result = await db_get_todo_counts(MOCK_PROJECT_ID, mock_db)
+
+    assert result["by_status"][MOCK_STATUS_ID] == 2
+    mock_projects_collection.find_one.assert_called_once_with(
+        {"_id": ObjectId(MOCK_PROJECT_ID)}, {"todo_counts": 1}
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_recompute_todo_counts_success():
+    mock_cursor = MagicMock()
+    mock_cursor.to_list = AsyncMock(
+        return_value=[
+            {
+                "by_status": [{"_id": ObjectId(MOCK_STATUS_ID), "count": 3}],
+                "by_assignee": [{"_id": ObjectId(MOCK_USER_ID), "count": 1}],
+            }
+        ]
+    )
+    mock_todos_collection = AsyncMock()
+    mock_todos_collection.aggregate.return_value = mock_cursor
+    mock_projects_collection = AsyncMock()
+    mock_projects_collection.find_one.return_value = {
+        "_id": ObjectId(MOCK_PROJECT_ID),
+        "child_refs_migrated": True,
+    }
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: (
+        mock_todos_collection if name == TODOS_COLLECTION else mock_projects_collection
+    )
+
+    result = await db_recompute_todo_counts(MOCK_PROJECT_ID, mock_db)
+
+    assert result == {
+        "by_status": {MOCK_STATUS_ID: 3},
+        "by_assignee": {MOCK_USER_ID: 1},
+    }
+    pipeline = mock_todos_collection.aggregate.call_args.args[0]
+    assert pipeline[0]["$match"] == {"project_id": ObjectId(MOCK_PROJECT_ID)}
+    mock_projects_collection.update_one.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_db_recompute_todo_counts_legacy_project_success():
+    mock_cursor = MagicMock()
+    mock_cursor.to_list = AsyncMock(
+        return_value=[
+            {
+                "by_status": [{"_id": ObjectId(MOCK_STATUS_ID), "count": 1}],
+                "by_assignee": [],
+            }
+        ]
+    )
+    mock_todos_collection = AsyncMock()
+    mock_todos_collection.aggregate.return_value = mock_cursor
+    mock_projects_collection = AsyncMock()
+    # Not reached by the child refs migration, so its todos have no project_id
+    mock_projects_collection.find_one.return_value = {
+        "_id": ObjectId(MOCK_PROJECT_ID),
+        "todo_ids": [ObjectId(MOCK_TODO_ID)],
+    }
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: (
+        mock_todos_collection if name == TODOS_COLLECTION else mock_projects_collection
+    )
+
+    result = await db_recompute_todo_counts(MOCK_PROJECT_ID, mock_db)
+
+    assert result == {"by_status": {MOCK_STATUS_ID: 1}, "by_assignee": {}}
+    pipeline = mock_todos_collection.aggregate.call_args.args[0]
+    assert pipeline[0]["$match"] == {"_id": {"$in": [ObjectId(MOCK_TODO_ID)]}}
+
+
+@pytest.mark.asyncio
+async def test_db_recompute_todo_counts_missing_project():
+    mock_todos_collection = AsyncMock()
+    mock_projects_collection = AsyncMock()
+    mock_projects_collection.find_one.return_value = None
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: (
+        mock_todos_collection if name == TODOS_COLLECTION else mock_projects_collection
+    )
+
+    result = await db_recompute_todo_counts(MOCK_PROJECT_ID, mock_db)
+
+    assert result is None
+    mock_todos_collection.aggregate.assert_not_called()
+    mock_projects_collection.update_one.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_db_search_todos_success():
+    mock_cursor = MagicMock()
+    mock_cursor.to_list = AsyncMock(
+        return_value=[
+            {
+                "_id": ObjectId(MOCK_TODO_ID),
+                "project_id": ObjectId(MOCK_PROJECT_ID),
+                "name": MOCK_TODO_NAME,
+                "score": 1.5,
+            }
+        ]
+    )
+    mock_todos_collection = AsyncMock()
+    mock_todos_collection.aggregate.return_value = mock_cursor
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_todos_collection
+
+    result = await db_search_todos(
+        [MOCK_PROJECT_ID], "mock", 10, mock_db, 2.0, MOCK_TODO_ID
+    )
+
+    assert result[0]["_id"] == MOCK_TODO_ID
+    assert result[0]["project_id"] == MOCK_PROJECT_ID
+    pipeline = mock_todos_collection.aggregate.call_args.args[0]
+    assert pipeline[0]["$match"]["$text"] == {"$search": "mock"}
+    assert pipeline[-1] == {"$limit": 10}
+
+
+@pytest.mark.asyncio
+async def test_db_get_projects_by_ids_success():
+    mock_cursor = MagicMock()
+    mock_cursor.to_list = AsyncMock(
+        return_value=[{"_id": ObjectId(MOCK_PROJECT_ID), "name": MOCK_PROJECT_NAME}]
+    )
+    mock_projects_collection = MagicMock()
+    mock_projects_collection.find.return_value = mock_cursor
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_projects_collection
+
+    result = await db_get_projects_by_ids([MOCK_PROJECT_ID], {"name": 1}, mock_db)
+
+    assert result == [{"_id": MOCK_PROJECT_ID, "name": MOCK_PROJECT_NAME}]
+
+
+@pytest.mark.asyncio
+async def test_db_get_todos_by_assignee_success():
+    mock_cursor = MagicMock()
+    mock_cursor.sort.return_value = mock_cursor
+    mock_cursor.limit.return_value = mock_cursor
+    mock_cursor.to_list = AsyncMock(
+        return_value=[
+            {
+                "_id": ObjectId(MOCK_TODO_ID),
+                "project_id": ObjectId(MOCK_PROJECT_ID),
+                "assignee_id": ObjectId(MOCK_USER_ID),
+            }
+        ]
+    )
+    mock_todos_collection = MagicMock()
+    mock_todos_collection.find.return_value = mock_cursor
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_todos_collection
+
+    result = await db_get_todos_by_assignee(
+        MOCK_USER_ID, [MOCK_PROJECT_ID], 10, mock_db, status_id=MOCK_STATUS_ID
+    )
+
+    assert result[0]["assignee_id"] == MOCK_USER_ID
+    mock_todos_collection.find.assert_called_once_with(
+        {
+            "assignee_id": ObjectId(MOCK_USER_ID),
+            "project_id": {"$in": [ObjectId(MOCK_PROJECT_ID)]},
+            "status_id": ObjectId(MOCK_STATUS_ID),
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_archive_todos_success():
+    mock_cursor = MagicMock()
+    mock_cursor.limit.return_value = mock_cursor
+    mock_cursor.to_list = AsyncMock(
+        side_effect=[
+            [
+                {
+                    "_id": ObjectId(MOCK_TODO_ID),
+                    "project_id": ObjectId(MOCK_PROJECT_ID),
+                    "status_id": ObjectId(MOCK_STATUS_ID),
+                    "assignee_id": None,
+                }
+            ],
+            # None survived the delete
+            [],
+        ]
+    )
+    mock_todos_collection = MagicMock()
+    mock_todos_collection.find.return_value = mock_cursor
+    mock_todos_collection.delete_many = AsyncMock()
+    mock_archived_todos_collection = AsyncMock()
+    mock_projects_collection = AsyncMock()
+    collections = {
+        TODOS_COLLECTION: mock_todos_collection,
+        ARCHIVED_TODOS_COLLECTION: mock_archived_todos_collection,
+        PROJECTS_COLLECTION: mock_projects_collection,
+    }
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: collections[name]
+
+    result = await db_archive_todos(
+        MOCK_PROJECT_ID,
+        MOCK_STATUS_ID,
+        datetime.now(timezone.utc),
+        10,
+        mock_db,
+    )
+
+    assert result == 1
+    mock_archived_todos_collection.bulk_write.assert_called_once()
+    (delete_filter,) = mock_todos_collection.delete_many.call_args.args
+    query, ids = delete_filter["$and"]
+    assert query["status_id"] == ObjectId(MOCK_STATUS_ID)
+    assert ids == {"_id": {"$in": [ObjectId(MOCK_TODO_ID)]}}
+    mock_archived_todos_collection.delete_many.assert_not_called()
+    mock_projects_collection.update_one.assert_called_once_with(
+        {"_id": ObjectId(MOCK_PROJECT_ID)},
+        {
+            "$pull": {"todo_ids": {"$in": [ObjectId(MOCK_TODO_ID)]}},
+            "$inc": {f"todo_counts.by_status.{MOCK_STATUS_ID}": -1},
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_archive_todos_keeps_todo_moved_mid_archive():
+    moved_todo = {
+        "_id": ObjectId(MOCK_TODO_ID),
+        "project_id": ObjectId(MOCK_PROJECT_ID),
+        "status_id": ObjectId(MOCK_STATUS_ID),
+        "assignee_id": None,
+    }
+    mock_cursor = MagicMock()
+    mock_cursor.limit.return_value = mock_cursor
+    mock_cursor.to_list = AsyncMock(
+        side_effect=[[moved_todo], [{"_id": moved_todo["_id"]}]]
+    )
+    mock_todos_collection = MagicMock()
+    mock_todos_collection.find.return_value = mock_cursor
+    mock_todos_collection.delete_many = AsyncMock()
+    mock_archived_todos_collection = AsyncMock()
+    mock_projects_collection = AsyncMock()
+    collections = {
+        TODOS_COLLECTION: mock_todos_collection,
+        ARCHIVED_TODOS_COLLECTION: mock_archived_todos_collection,
+        PROJECTS_COLLECTION: mock_projects_collection,
+    }
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: collections[name]
+
+    result = await db_archive_todos(
+        MOCK_PROJECT_ID,
+        MOCK_STATUS_ID,
+        datetime.now(timezone.utc),
+        10,
+        mock_db,
+    )
+
+    # The todo left Done before the delete, so its archive copy is dropped
+    assert result == 0
+    mock_archived_todos_collection.delete_many.assert_called_once_with(
+        {"_id": {"$in": [moved_todo["_id"]]}}
+    )
+    mock_projects_collection.update_one.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_db_get_archived_todos_success():
+    mock_cursor = MagicMock()
+    mock_cursor.sort.return_value = mock_cursor
+    mock_cursor.limit.return_value = mock_cursor
+    mock_cursor.to_list = AsyncMock(
+        return_value=[
+            {"_id": ObjectId(MOCK_TODO_ID), "project_id": ObjectId(MOCK_PROJECT_ID)}
+        ]
+    )
+    mock_archived_todos_collection = MagicMock()
+    mock_archived_todos_collection.find.return_value = mock_cursor
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_archived_todos_collection
+
+    result = await db_get_archived_todos(MOCK_PROJECT_ID, 10, mock_db)
+
+    assert result[0]["_id"] == MOCK_TODO_ID
+    mock_cursor.sort.assert_called_once_with("_id", -1)
+
+
+@pytest.mark.asyncio
+async def test_db_backfill_project_child_refs_success():
+    mock_projects_collection = AsyncMock()
+    mock_todos_collection = AsyncMock()
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: (
+        mock_projects_collection
+        if name == PROJECTS_COLLECTION
+        else mock_todos_collection
+    )
+
+    await db_backfill_project_child_refs(
+        [{"_id": ObjectId(MOCK_PROJECT_ID), "todo_ids": [ObjectId(MOCK_TODO_ID)]}],
+        mock_db,
+    )
+
+    mock_todos_collection.update_many.assert_called_once_with(
+        {"_id": {"$in": [ObjectId(MOCK_TODO_ID)]}},
+        {"$set": {"project_id": ObjectId(MOCK_PROJECT_ID)}},
+    )
+    mock_projects_collection.update_one.assert_called_once_with(
+        {"_id": ObjectId(MOCK_PROJECT_ID)}, {"$set": {"child_refs_migrated": True}}
+    )
@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+from bson import ObjectId
+
+from app.db.reminder import (
+    REMINDER_PENDING,
+    db_cancel_reminders,
+    db_claim_reminders,
+    db_schedule_reminders,
+)
+from app.test_shared.constants import MOCK_EVENT_ID
+
+
+@pytest.mark.asyncio
+async def test_db_schedule_reminders_success():
+    mock_db = AsyncMock()
+    mock_reminders_collection = AsyncMock()
+    mock_db.__getitem__.return_value = mock_reminders_collection
+    due_at = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+    await db_schedule_reminders(MOCK_EVENT_ID, [("1 hour", due_at)], mock_db)
+
+    (update,) = mock_reminders_collection.bulk_write.call_args.args[0]
+    assert update._filter == {"event_id": ObjectId(MOCK_EVENT_ID), "label": "1 hour"}
+    assert update._doc["$set"]["due_at"] == due_at
+    assert update._doc["$set"]["state"] == REMINDER_PENDING
+    assert update._upsert is True
+
+
+@pytest.mark.asyncio
+async def test_db_schedule_reminders_skips_empty():
+    mock_db = AsyncMock()
+    mock_reminders_collection = AsyncMock()
+    mock_db.__getitem__.return_value = mock_reminders_collection
+
+    await db_schedule_reminders(MOCK_EVENT_ID, [], mock_db)
+
+    mock_reminders_collection.bulk_write.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_db_claim_reminders_stops_when_none_due():
+    mock_db = AsyncMock()
+    mock_reminders_collection = AsyncMock()
+    reminder = {"_id": ObjectId(), "event_id": ObjectId(MOCK_EVENT_ID)}
+    mock_reminders_collection.find_one_and_update.side_effect = [reminder, None]
+    mock_db.__getitem__.return_value = mock_reminders_collection
+
+    result = await db_claim_reminders(5, mock_db)
+
+    assert result == [reminder]
+    assert mock_reminders_collection.find_one_and_update.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_db_cancel_reminders_success():
+    mock_db = AsyncMock()
+    mock_reminders_collection = AsyncMock()
+    mock_db.__getitem__.return_value = mock_reminders_collection
+
+    await db_cancel_reminders(MOCK_EVENT_ID, ["1 week"], mock_db)
+
+    # Reminders already sent are kept
+    mock_reminders_collection.delete_many.assert_called_once_with(
+        {
+            "event_id": ObjectId(MOCK_EVENT_ID),
+            "label": {"$in": ["1 week"]},
+            "state": REMINDER_PENDING,
+        }
+    )
@@ -1,10 +1,20 @@
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from bson import ObjectId
 
-from app.core.constants import EVENTS_COLLECTION, PROJECTS_COLLECTION, TEAMS_COLLECTION
+from app.core.constants import (
+    DELETION_JOBS_COLLECTION,
+    EVENTS_COLLECTION,
+    MEMBERSHIPS_COLLECTION,
+    PROJECTS_COLLECTION,
+    TEAMS_COLLECTION,
+)
 from app.db.team import (
+    db_backfill_team_memberships,
+    db_get_team_members,
+    db_get_team_membership,
+    db_get_team_for_member,
     db_create_event_for_team,
     db_create_project,
     db_create_team,
@@ -15,12 +25,14 @@ from app.db.team import (
     db_get_project_by_id,
     db_join_team,
     db_get_team_by_id,
+    db_get_team_dashboard,
     db_promote_team_member,
     db_leave_team,
     db_kick_team_member,
+    db_rotate_team_calendar_token,
 )
 
-from app.schemas.team import CreateEventRequest, CreateProjectRequest
+from app.schemas.team import CreateEventRequest, CreateProjectRequest, TeamRole
 from app.test_shared.constants import (
     MOCK_EVENT_COLOUR,
     MOCK_EVENT_DESCRIPTION,
@@ -68,6 +80,40 @@ async def test_db_create_team_success():
 async def test_db_join_team_success():
     mock_db = AsyncMock()
     mock_teams_collection = AsyncMock()
+    mock_teams_collection.update_one.return_value = MagicMock(
+        matched_count=1, modified_count=1
+    )
+    mock_db.__getitem__.return_value = mock_teams_collection
+
+    result = await db_join_team(MOCK_TEAM_ID, MOCK_USER_ID, mock_db)
+
+    assert result is True
+    # The team update and the membership upsert
+    assert mock_teams_collection.update_one.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_db_join_team_already_member():
+    mock_db = AsyncMock()
+    mock_teams_collection = AsyncMock()
+    mock_teams_collection.update_one.return_value = MagicMock(
+        matched_count=1, modified_count=0
+    )
+    mock_db.__getitem__.return_value = mock_teams_collection
+
+    result = await db_join_team(MOCK_TEAM_ID, MOCK_USER_ID, mock_db)
+
+    assert result is False
+    mock_teams_collection.update_one.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_db_join_team_team_not_found():
+    mock_db = AsyncMock()
+    mock_teams_collection = AsyncMock()
+    mock_teams_collection.update_one.return_value = MagicMock(
+        matched_count=0, modified_count=0
+    )
     mock_db.__getitem__.return_value = mock_teams_collection
 
     result = await db_join_team(MOCK_TEAM_ID, MOCK_USER_ID, mock_db)
@@ -102,18 +148,33 @@ async def test_db_get_team_by_id_success():
 async def test_db_promote_team_member_success():
     mock_db = AsyncMock()
     mock_teams_collection = AsyncMock()
-    mock_teams_collection.find_one.return_value = {
-        "_id": ObjectId(MOCK_TEAM_ID),
-        "name": MOCK_TEAM_NAME,
-        "member_ids": [MOCK_USER_ID, MOCK_USER_2_ID],
-        "exec_member_ids": [MOCK_USER_ID],
-        "project_ids": [],
-    }
+    mock_teams_collection.update_one.return_value = MagicMock(matched_count=1)
     mock_db.__getitem__.return_value = mock_teams_collection
 
-    result = await db_promote_team_member(MOCK_TEAM_ID, MOCK_USER_2_ID, mock_db)
+    result = await db_promote_team_member(
+        MOCK_TEAM_ID, MOCK_USER_2_ID, MOCK_USER_ID, mock_db
+    )
+
+    assert result is True
+    guard = mock_teams_collection.update_one.call_args_list[0].args[0]
+    assert guard["exec_member_ids"] == ObjectId(MOCK_USER_ID)
+    assert guard["member_ids"] == ObjectId(MOCK_USER_2_ID)
 
-    assert result is None
+
+@pytest.mark.asyncio
+async def test_db_promote_team_member_guard_miss():
+    mock_db = AsyncMock()
+    mock_teams_collection = AsyncMock()
+    mock_teams_collection.update_one.return_value = MagicMock(matched_count=0)
+    mock_db.__getitem__.return_value = mock_teams_collection
+
+    result = await db_promote_team_member(
+        MOCK_TEAM_ID, MOCK_USER_2_ID, MOCK_USER_ID, mock_db
+    )
+
+    assert result is False
+    # The membership is left alone when the guard fails
+    mock_teams_collection.update_one.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -132,34 +193,95 @@ async def test_db_leave_team_success():
     result = await db_leave_team(MOCK_TEAM_ID, MOCK_USER_ID, mock_db)
 
     assert result is None
+    update = mock_teams_collection.update_one.call_args.args[1]
+    assert update["$inc"] == {"calendar_token_version": 1}
 
 
 @pytest.mark.asyncio
 async def test_db_delete_team_success():
     mock_db = AsyncMock()
     mock_teams_collection = AsyncMock()
+    mock_deletion_jobs_collection = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: {
+        TEAMS_COLLECTION: mock_teams_collection,
+        DELETION_JOBS_COLLECTION: mock_deletion_jobs_collection,
+    }.get(name)
+    mock_teams_collection.find_one_and_delete.return_value = {
+        "_id": ObjectId(MOCK_TEAM_ID),
+        "project_ids": [ObjectId(MOCK_PROJECT_ID)],
+        "event_ids": [],
+    }
+
+    result = await db_delete_team(MOCK_TEAM_ID, mock_db)
+
+    assert result is True
+    # Descendants are left to the deletion job
+    (jobs,) = mock_deletion_jobs_collection.insert_many.call_args.args
+    assert jobs[0]["kind"] == "team"
+    assert jobs[0]["target_id"] == ObjectId(MOCK_TEAM_ID)
+    assert jobs[0]["refs"]["project_ids"] == [ObjectId(MOCK_PROJECT_ID)]
+
+
+@pytest.mark.asyncio
+async def test_db_delete_team_missing_team():
+    mock_db = AsyncMock()
+    mock_teams_collection = AsyncMock()
+    mock_teams_collection.find_one_and_delete.return_value = None
     mock_db.__getitem__.return_value = mock_teams_collection
-    mock_teams_collection.delete_one.return_value = None
 
     result = await db_delete_team(MOCK_TEAM_ID, mock_db)
 
-    assert result is None
+    assert result is False
+    mock_teams_collection.insert_many.assert_not_called()
 
 
 @pytest.mark.asyncio
 async def test_db_kick_team_member_success():
     mock_db = AsyncMock()
     mock_teams_collection = AsyncMock()
-    mock_teams_collection.find_one.return_value = {
+    mock_teams_collection.update_one.return_value = MagicMock(matched_count=1)
+    mock_db.__getitem__.return_value = mock_teams_collection
+
+    result = await db_kick_team_member(
+        MOCK_TEAM_ID, MOCK_USER_2_ID, MOCK_USER_ID, mock_db
+    )
+
+    assert result is True
+    guard = mock_teams_collection.update_one.call_args.args[0]
+    assert guard["exec_member_ids"] == {
+        "$eq": ObjectId(MOCK_USER_ID),
+        "$ne": ObjectId(MOCK_USER_2_ID),
+    }
+    update = mock_teams_collection.update_one.call_args.args[1]
+    assert update["$inc"] == {"calendar_token_version": 1}
+    mock_teams_collection.delete_one.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_db_rotate_team_calendar_token_success():
+    mock_db = AsyncMock()
+    mock_teams_collection = AsyncMock()
+    mock_teams_collection.find_one_and_update.return_value = {
         "_id": ObjectId(MOCK_TEAM_ID),
-        "name": MOCK_TEAM_NAME,
-        "member_ids": [MOCK_USER_ID, MOCK_USER_2_ID],
-        "exec_member_ids": [MOCK_USER_ID],
-        "project_ids": [],
+        "calendar_token_version": 2,
     }
     mock_db.__getitem__.return_value = mock_teams_collection
 
-    result = await db_kick_team_member(MOCK_TEAM_ID, MOCK_USER_2_ID, mock_db)
+    result = await db_rotate_team_calendar_token(MOCK_TEAM_ID, mock_db)
+
+    assert result == 2
+    update = mock_teams_collection.find_one_and_update.call_args.args[1]
+    assert update == {"$inc": {"calendar_token_version": 1}}
+
+
+@pytest.mark.asyncio
+async def test_db_rotate_team_calendar_token_missing_team():
+    mock_db = AsyncMock()
+    mock_teams_collection = AsyncMock()
+    mock_teams_collection.find_one_and_update.return_value = None
+    mock_db.__getitem__.return_value = mock_teams_collection
+
+    result = await db_rotate_team_calendar_token(MOCK_TEAM_ID, mock_db)
 
     assert result is None
 
@@ -223,14 +345,45 @@ async def test_db_delete_project_success():
     mock_projects_collection = AsyncMock()
     mock_teams_collection = AsyncMock()
 
+    mock_deletion_jobs_collection = AsyncMock()
     mock_db.__getitem__.side_effect = lambda name: {
         PROJECTS_COLLECTION: mock_projects_collection,
         TEAMS_COLLECTION: mock_teams_collection,
+        DELETION_JOBS_COLLECTION: mock_deletion_jobs_collection,
     }.get(name)
+    mock_teams_collection.update_one.return_value = MagicMock(matched_count=1)
+    mock_projects_collection.find_one_and_delete.return_value = {
+        "_id": ObjectId(MOCK_PROJECT_ID)
+    }
 
-    result = await db_delete_project(MOCK_PROJECT_ID, mock_db)
+    result = await db_delete_project(
+        MOCK_TEAM_ID, MOCK_PROJECT_ID, MOCK_USER_ID, mock_db
+    )
 
-    assert result is None
+    assert result is True
+    (jobs,) = mock_deletion_jobs_collection.insert_many.call_args.args
+    assert jobs[0]["kind"] == "project"
+    assert jobs[0]["refs"] == {"todo_ids": []}
+
+
+@pytest.mark.asyncio
+async def test_db_delete_project_guard_miss():
+    mock_db = AsyncMock()
+    mock_projects_collection = AsyncMock()
+    mock_teams_collection = AsyncMock()
+
+    mock_db.__getitem__.side_effect = lambda name: {
+        PROJECTS_COLLECTION: mock_projects_collection,
+        TEAMS_COLLECTION: mock_teams_collection,
+    }.get(name)
+    mock_teams_collection.update_one.return_value = MagicMock(matched_count=0)
+
+    result = await db_delete_project(
+        MOCK_TEAM_ID, MOCK_PROJECT_ID, MOCK_USER_ID, mock_db
+    )
+
+    assert result is False
+    mock_projects_collection.find_one_and_delete.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -288,11 +441,268 @@ async def test_db_delete_event_success():
     mock_events_collection = AsyncMock()
     mock_teams_collection = AsyncMock()
 
+    mock_deletion_jobs_collection = AsyncMock()
     mock_db.__getitem__.side_effect = lambda name: {
         EVENTS_COLLECTION: mock_events_collection,
         TEAMS_COLLECTION: mock_teams_collection,
+        DELETION_JOBS_COLLECTION: mock_deletion_jobs_collection,
     }.get(name)
+    mock_teams_collection.update_one.return_value = MagicMock(matched_count=1)
+    rsvp_id = ObjectId()
+    mock_events_collection.find_one_and_delete.return_value = {
+        "_id": ObjectId(MOCK_EVENT_ID),
+        "rsvp_ids": [str(rsvp_id)],
+    }
 
-    result = await db_delete_event(MOCK_TEAM_ID, MOCK_EVENT_ID, mock_db)
+    result = await db_delete_event(MOCK_TEAM_ID, MOCK_EVENT_ID, MOCK_USER_ID, mock_db)
+
+    assert result is True
+    guard = mock_teams_collection.update_one.call_args.args[0]
+    assert guard["event_ids"] == ObjectId(MOCK_EVENT_ID)
+    (jobs,) = mock_deletion_jobs_collection.insert_many.call_args.args
+    assert jobs[0]["refs"] == {"rsvp_ids": [rsvp_id]}
+
+
+def _mock_teams_and_memberships_db(mock_teams_collection, mock_memberships_collection):
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: (
+        mock_memberships_collection
+        if name == MEMBERSHIPS_COLLECTION
+        else mock_teams_collection
+    )
+    return mock_db
+
+
+@pytest.mark.asyncio
+async def test_db_get_team_membership_success():
+    mock_memberships_collection = AsyncMock()
+    mock_memberships_collection.find_one.return_value = {
+        "team_id": ObjectId(MOCK_TEAM_ID),
+        "user_id": ObjectId(MOCK_USER_ID),
+        "role": TeamRole.EXEC.value,
+    }
+    mock_teams_collection = AsyncMock()
+    mock_db = _mock_teams_and_memberships_db(
+        mock_teams_collection, mock_memberships_collection
+    )
+
+    result = await db_get_team_membership(MOCK_TEAM_ID, MOCK_USER_ID, mock_db)
+
+    assert result == {
+        "team_id": MOCK_TEAM_ID,
+        "user_id": MOCK_USER_ID,
+        "role": TeamRole.EXEC.value,
+    }
+    mock_teams_collection.find_one.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_db_get_team_membership_legacy_team_success():
+    mock_memberships_collection = AsyncMock()
+    mock_memberships_collection.find_one.return_value = None
+    mock_teams_collection = AsyncMock()
+    mock_teams_collection.find_one.return_value = {
+        "_id": ObjectId(MOCK_TEAM_ID),
+        "exec_member_ids": [],
+    }
+    mock_db = _mock_teams_and_memberships_db(
+        mock_teams_collection, mock_memberships_collection
+    )
+
+    result = await db_get_team_membership(MOCK_TEAM_ID, MOCK_USER_ID, mock_db)
+
+    assert result["role"] == TeamRole.MEMBER.value
+    assert result["joined_at"] is None
+
+
+@pytest.mark.asyncio
+async def test_db_get_team_for_member_success():
+    mock_memberships_collection = AsyncMock()
+    mock_memberships_collection.find_one.return_value = {
+        "team_id": ObjectId(MOCK_TEAM_ID),
+        "user_id": ObjectId(MOCK_USER_ID),
+        "role": TeamRole.MEMBER.value,
+    }
+    mock_teams_collection = AsyncMock()
+    mock_teams_collection.find_one.return_value = {"_id": ObjectId(MOCK_TEAM_ID)}
+    mock_db = _mock_teams_and_memberships_db(
+        mock_teams_collection, mock_memberships_collection
+    )
+
+    result = await db_get_team_for_member(
+        MOCK_TEAM_ID, MOCK_USER_ID, mock_db, {"_id": 1}
+    )
+
+    assert result == {"_id": MOCK_TEAM_ID}
+    # Membership comes from the memberships collection, not the member arrays
+    mock_teams_collection.find_one.assert_called_once_with(
+        {"_id": ObjectId(MOCK_TEAM_ID)}, {"_id": 1}
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_get_team_for_member_not_member():
+    mock_memberships_collection = AsyncMock()
+    mock_memberships_collection.find_one.return_value = None
+    mock_teams_collection = AsyncMock()
+    mock_teams_collection.find_one.return_value = None
+    mock_db = _mock_teams_and_memberships_db(
+        mock_teams_collection, mock_memberships_collection
+    )
+
+    result = await db_get_team_for_member(MOCK_TEAM_ID, MOCK_USER_2_ID, mock_db)
+
+    assert result is None
+
+
+@pytest.mark.asyncio
+async def test_db_get_team_members_success():
+    mock_teams_collection = AsyncMock()
+    mock_teams_collection.find_one.return_value = {
+        "_id": ObjectId(MOCK_TEAM_ID),
+        "memberships_migrated": True,
+    }
+    mock_cursor = MagicMock()
+    mock_cursor.sort.return_value = mock_cursor
+    mock_cursor.limit.return_value = mock_cursor
+    mock_cursor.to_list = AsyncMock(
+        return_value=[
+            {
+                "team_id": ObjectId(MOCK_TEAM_ID),
+                "user_id": ObjectId(MOCK_USER_2_ID),
+                "role": TeamRole.MEMBER.value,
+            }
+        ]
+    )
+    mock_memberships_collection = MagicMock()
+    mock_memberships_collection.find.return_value = mock_cursor
+    mock_db = _mock_teams_and_memberships_db(
+        mock_teams_collection, mock_memberships_collection
+    )
+
+    result = await db_get_team_members(
+        MOCK_TEAM_ID, TeamRole.MEMBER, 10, mock_db, after_user_id=MOCK_USER_ID
+    )
+
+    assert [member["user_id"] for member in result] == [MOCK_USER_2_ID]
+    mock_memberships_collection.find.assert_called_once_with(
+        {
+            "team_id": ObjectId(MOCK_TEAM_ID),
+            "role": TeamRole.MEMBER.value,
+            "user_id": {"$gt": ObjectId(MOCK_USER_ID)},
+        }
+    )
+    mock_cursor.limit.assert_called_once_with(10)
+
+
+@pytest.mark.asyncio
+async def test_db_get_team_members_legacy_team_success():
+    first_user_id, second_user_id = sorted([ObjectId(), ObjectId()])
+    mock_teams_collection = AsyncMock()
+    mock_teams_collection.find_one.return_value = {
+        "_id": ObjectId(MOCK_TEAM_ID),
+        "member_ids": [second_user_id, first_user_id],
+        "exec_member_ids": [first_user_id],
+    }
+    mock_memberships_collection = MagicMock()
+    mock_db = _mock_teams_and_memberships_db(
+        mock_teams_collection, mock_memberships_collection
+    )
+
+    result = await db_get_team_members(MOCK_TEAM_ID, None, 10, mock_db)
+
+    assert [(member["user_id"], member["role"]) for member in result] == [
+        (str(first_user_id), TeamRole.EXEC.value),
+        (str(second_user_id), TeamRole.MEMBER.value),
+    ]
+    mock_memberships_collection.find.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_db_backfill_team_memberships_success():
+    mock_teams_collection = AsyncMock()
+    mock_memberships_collection = AsyncMock()
+    mock_db = _mock_teams_and_memberships_db(
+        mock_teams_collection, mock_memberships_collection
+    )
+
+    await db_backfill_team_memberships(
+        [
+            {
+                "_id": ObjectId(MOCK_TEAM_ID),
+                "member_ids": [ObjectId(MOCK_USER_ID), ObjectId(MOCK_USER_2_ID)],
+                "exec_member_ids": [ObjectId(MOCK_USER_ID)],
+            }
+        ],
+        mock_db,
+    )
+
+    upserts = mock_memberships_collection.bulk_write.call_args.args[0]
+    assert [upsert._doc["$set"]["role"] for upsert in upserts] == [
+        TeamRole.EXEC.value,
+        TeamRole.MEMBER.value,
+    ]
+    mock_teams_collection.update_one.assert_called_once_with(
+        {"_id": ObjectId(MOCK_TEAM_ID)}, {"$set": {"memberships_migrated": True}}
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_get_team_dashboard_success():
+    mock_cursor = MagicMock()
+    mock_cursor.to_list = AsyncMock(
+        return_value=[
+            {
+                "_id": ObjectId(MOCK_TEAM_ID),
+                "name": MOCK_TEAM_NAME,
+                "projects": [{"_id": ObjectId(MOCK_PROJECT_ID), "todo_count": 2}],
+                "member_preview": [
+                    {"user_id": ObjectId(MOCK_USER_ID), "role": TeamRole.EXEC.value}
+                ],
+            }
+        ]
+    )
+    mock_teams_collection = AsyncMock()
+    mock_teams_collection.aggregate.return_value = mock_cursor
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_teams_collection
+
+    result = await db_get_team_dashboard(
+        MOCK_TEAM_ID, MOCK_USER_ID, "2023-10-10T00:00:00", 5, 10, mock_db
+    )
+
+    assert result["_id"] == MOCK_TEAM_ID
+    assert result["projects"][0]["_id"] == MOCK_PROJECT_ID
+    assert result["member_preview"][0]["user_id"] == MOCK_USER_ID
+    pipeline = mock_teams_collection.aggregate.call_args.args[0]
+    # The membership check is part of the aggregation itself, read from the
+    # memberships collection once the team is backfilled
+    assert pipeline[0]["$match"] == {"_id": ObjectId(MOCK_TEAM_ID)}
+    assert pipeline[1]["$lookup"]["from"] == MEMBERSHIPS_COLLECTION
+    assert pipeline[2]["$match"] == {
+        "$or": [
+            {"memberships_migrated": True, "viewer_membership": {"$ne": []}},
+            {
+                "memberships_migrated": {"$ne": True},
+                "member_ids": ObjectId(MOCK_USER_ID),
+            },
+        ]
+    }
+    # Only the joined documents leave the server, not the id arrays
+    assert "member_ids" not in pipeline[-1]["$project"]
+
+
+@pytest.mark.asyncio
+async def test_db_get_team_dashboard_not_member():
+    mock_cursor = MagicMock()
+    mock_cursor.to_list = AsyncMock(return_value=[])
+    mock_teams_collection = AsyncMock()
+    mock_teams_collection.aggregate.return_value = mock_cursor
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_teams_collection
+
+    result = await db_get_team_dashboard(
+        MOCK_TEAM_ID, MOCK_USER_2_ID, "2023-10-10T00:00:00", 5, 10, mock_db
+    )
 
     assert result is None
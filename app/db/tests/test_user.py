@@ -1,10 +1,10 @@
 from datetime import datetime
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 from bson import ObjectId
 import pytest
 
-from app.core.constants import TEAMS_COLLECTION
+from app.core.constants import PROJECTS_COLLECTION, TEAMS_COLLECTION
 from app.db.user import (
     db_create_pending_verification,
     db_create_user,
@@ -12,6 +12,7 @@ from app.db.user import (
     db_get_pending_verification,
     db_get_user_by_email,
     db_get_user_by_id,
+    db_get_user_project_ids,
     db_get_user_teams_by_id,
     db_update_password,
 )
@@ -207,3 +208,55 @@ async def test_db_update_password_success():
     )
 
     assert result is None
+
+
+@pytest.mark.asyncio
+async def test_db_get_user_project_ids_success():
+    mock_cursor = MagicMock()
+    mock_cursor.to_list = AsyncMock(
+        return_value=[
+            {"_id": ObjectId(MOCK_TEAM_ID), "project_ids": [ObjectId(MOCK_PROJECT_ID)]},
+            {"_id": ObjectId(MOCK_TEAM_2_ID), "project_ids": []},
+        ]
+    )
+    mock_teams_collection = MagicMock()
+    mock_teams_collection.find.return_value = mock_cursor
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_teams_collection
+
+    result = await db_get_user_project_ids(MOCK_USER_ID, mock_db)
+
+    assert result == [MOCK_PROJECT_ID]
+    mock_teams_collection.find.assert_called_once_with(
+        {"member_ids": ObjectId(MOCK_USER_ID)},
+        {"child_refs_migrated": 1, "project_ids": 1},
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_get_user_project_ids_migrated_team_success():
+    mock_teams_cursor = MagicMock()
+    mock_teams_cursor.to_list = AsyncMock(
+        return_value=[{"_id": ObjectId(MOCK_TEAM_ID), "child_refs_migrated": True}]
+    )
+    mock_teams_collection = MagicMock()
+    mock_teams_collection.find.return_value = mock_teams_cursor
+    mock_projects_cursor = MagicMock()
+    mock_projects_cursor.to_list = AsyncMock(
+        return_value=[{"_id": ObjectId(MOCK_PROJECT_ID)}]
+    )
+    mock_projects_collection = MagicMock()
+    mock_projects_collection.find.return_value = mock_projects_cursor
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: (
+        mock_projects_collection
+        if name == PROJECTS_COLLECTION
+        else mock_teams_collection
+    )
+
+    result = await db_get_user_project_ids(MOCK_USER_ID, mock_db)
+
+    assert result == [MOCK_PROJECT_ID]
+    mock_projects_collection.find.assert_called_once_with(
+        {"team_id": {"$in": [ObjectId(MOCK_TEAM_ID)]}}, {"_id": 1}
+    )
@@ -6,6 +6,7 @@ from pymongo.asynchronous.database import AsyncDatabase
 
 from app.core.common import stringify_object_ids
 from app.core.constants import (
+    PROJECTS_COLLECTION,
     USERS_COLLECTION,
     TEAMS_COLLECTION,
     VERIFICATION_CODES_COLLECTION,
@@ -39,11 +40,57 @@ async def db_get_user_teams_by_id(
     return [stringify_object_ids(team) for team in teams]
 
 
+async def db_get_user_project_ids(user_id: str, db: AsyncDatabase) -> List[str]:
+    teams = (
+        await db[TEAMS_COLLECTION]
+        .find(
+            {"member_ids": ObjectId(user_id)},
+            {"child_refs_migrated": 1, "project_ids": 1},
+        )
+        .to_list(length=None)
+    )
+
+    # Teams which predate team_id on projects still need their project_ids array
+    project_ids = [
+        str(project_id)
+        for team in teams
+        if not team.get("child_refs_migrated")
+        for project_id in team.get("project_ids", [])
+    ]
+
+    migrated_team_ids = [
+        team["_id"] for team in teams if team.get("child_refs_migrated")
+    ]
+    if migrated_team_ids:
+        projects = (
+            await db[PROJECTS_COLLECTION]
+            .find({"team_id": {"$in": migrated_team_ids}}, {"_id": 1})
+            .to_list(length=None)
+        )
+        project_ids += [str(project["_id"]) for project in projects]
+
+    return project_ids
+
+
 async def db_get_user_by_id(user_id: str, db: AsyncDatabase) -> Dict[str, Any]:
     user_dict = await db[USERS_COLLECTION].find_one({"_id": ObjectId(user_id)})
     return stringify_object_ids(user_dict)
 
 
+async def db_get_users_by_ids(
+    user_ids: List[str], db: AsyncDatabase
+) -> List[Dict[str, Any]]:
+    users = (
+        await db[USERS_COLLECTION]
+        .find(
+            {"_id": {"$in": [ObjectId(user_id) for user_id in user_ids]}},
+            {"email": 1, "first_name": 1, "last_name": 1},
+        )
+        .to_list(length=None)
+    )
+    return [stringify_object_ids(user) for user in users]
+
+
 async def db_get_user_by_email(email: str, db: AsyncDatabase) -> Dict[str, Any]:
     user_dict = await db[USERS_COLLECTION].find_one({"email": email})
     return stringify_object_ids(user_dict)
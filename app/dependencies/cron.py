@@ -0,0 +1,14 @@
+import hmac
+import os
+
+from fastapi import Header, HTTPException
+
+
+# Vercel sends the project's CRON_SECRET as a bearer token on every cron invocation
+async def require_cron_secret(authorization: str | None = Header(None)) -> None:
+    cron_secret = os.getenv("CRON_SECRET")
+    if not cron_secret or not authorization:
+        raise HTTPException(status_code=401, detail="Missing cron credentials")
+
+    if not hmac.compare_digest(authorization, f"Bearer {cron_secret}"):
+        raise HTTPException(status_code=401, detail="Invalid cron credentials")
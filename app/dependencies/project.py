@@ -1,11 +1,24 @@
+from typing import Any, Dict
+
 from fastapi import Depends, HTTPException
 from app.api.auth import get_current_user_info
 from app.db.client import get_db
+from app.db.project import db_get_project_team_id
+from app.db.team import db_get_team_membership
+from app.schemas.team import TeamRole
 from app.schemas.user import UserModel
 
 from pymongo.asynchronous.database import AsyncDatabase
 
-from app.service.user import get_current_user_teams_service
+
+async def _get_project_membership(
+    project_id: str, user_id: str, db: AsyncDatabase
+) -> Dict[str, Any] | None:
+    team_id = await db_get_project_team_id(project_id, db)
+    if not team_id:
+        return None
+
+    return await db_get_team_membership(team_id, user_id, db)
 
 
 async def require_standard_project_access(
@@ -13,15 +26,9 @@ async def require_standard_project_access(
     current_user: UserModel = Depends(get_current_user_info),
     db: AsyncDatabase = Depends(get_db),
 ) -> None:
-    user_teams = (await get_current_user_teams_service(current_user.id, db)).teams
+    membership = await _get_project_membership(project_id, current_user.id, db)
 
-    found_access = False
-    for team in user_teams:
-        if project_id in team.project_ids:
-            found_access = True
-            break
-
-    if not found_access:
+    if not membership:
         raise HTTPException(
             status_code=403,
             detail=f"Not enough permissions to perform operation on project: project_id={project_id}",
@@ -33,15 +40,9 @@ async def require_executive_project_access(
     current_user: UserModel = Depends(get_current_user_info),
     db: AsyncDatabase = Depends(get_db),
 ) -> None:
-    user_teams = (await get_current_user_teams_service(current_user.id, db)).teams
-
-    found_access = False
-    for team in user_teams:
-        if project_id in team.project_ids and current_user.id in team.exec_member_ids:
-            found_access = True
-            break
+    membership = await _get_project_membership(project_id, current_user.id, db)
 
-    if not found_access:
+    if not membership or membership["role"] != TeamRole.EXEC:
         raise HTTPException(
             status_code=403,
             detail=f"Not enough permissions to perform operation on project: project_id={project_id}",
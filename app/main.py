@@ -14,7 +14,10 @@ from app.api.user import router as user_router
 from app.api.project import router as project_router
 from app.api.event import router as event_router
 from app.api.health import router as health_router
-from app.core.scheduler import scheduler
+from app.api.cron import router as cron_router
+from app.core.realtime import hub
+from app.db.client import get_db
+from app.db.indexes import db_ensure_indexes
 
 
 class TimeoutMiddleware(BaseHTTPMiddleware):
@@ -33,9 +36,10 @@ class TimeoutMiddleware(BaseHTTPMiddleware):
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    scheduler.start()
+    await db_ensure_indexes(get_db())
+    await hub.start()
     yield
-    scheduler.shutdown()
+    await hub.stop()
 
 
 # Logger setup
@@ -104,5 +108,6 @@ api_router.include_router(team_router, prefix="/teams")
 api_router.include_router(project_router, prefix="/projects")
 api_router.include_router(event_router, prefix="/events")
 api_router.include_router(health_router)
+api_router.include_router(cron_router, prefix="/cron")
 
 app.include_router(api_router)
@@ -0,0 +1,33 @@
+from app.migrations.v0001_project_child_refs import ProjectChildRefs
+from app.migrations.v0002_team_child_refs import TeamChildRefs
+from app.migrations.v0003_todo_status_colors import TodoStatusColors
+from app.migrations.v0004_todo_counts import TodoCounts
+from app.migrations.v0005_unique_team_short_ids import UniqueTeamShortIds
+from app.migrations.v0006_team_memberships import TeamMemberships
+from app.migrations.v0007_orphan_projects import OrphanProjects
+from app.migrations.v0008_orphan_events import OrphanEvents
+from app.migrations.v0009_orphan_todos import OrphanTodos
+from app.migrations.v0010_orphan_archived_todos import OrphanArchivedTodos
+from app.migrations.v0011_orphan_rsvps import OrphanRsvps
+from app.migrations.v0012_event_datetimes import EventDatetimes
+from app.migrations.v0013_event_reminders import EventReminders
+from app.migrations.v0014_event_rsvp_counts import EventRsvpCounts
+
+# Applied in this order. Append new migrations with the next version, never
+# renumber or remove one which may already have run.
+MIGRATIONS = [
+    ProjectChildRefs(),
+    TeamChildRefs(),
+    TodoStatusColors(),
+    TodoCounts(),
+    UniqueTeamShortIds(),
+    TeamMemberships(),
+    OrphanProjects(),
+    OrphanEvents(),
+    OrphanTodos(),
+    OrphanArchivedTodos(),
+    OrphanRsvps(),
+    EventDatetimes(),
+    EventReminders(),
+    EventRsvpCounts(),
+]
@@ -0,0 +1,44 @@
+"""Runs pending schema migrations against MONGODB_URI.
+
+python -m app.migrations [--status] [--time-budget SECONDS]
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.db.client import get_db
+from app.migrations import MIGRATIONS
+from app.migrations.runner import get_migration_records, run_migrations
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.migrations")
+    parser.add_argument(
+        "--status", action="store_true", help="print migration progress and exit"
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=None,
+        help="pause after this many seconds, resuming on the next run",
+    )
+    args = parser.parse_args()
+
+    db = get_db()
+    if not args.status:
+        await run_migrations(MIGRATIONS, db, args.time_budget)
+
+    records = {record["_id"]: record for record in await get_migration_records(db)}
+    for migration in MIGRATIONS:
+        record = records.get(migration.version, {})
+        print(
+            f"{migration.version:04d} {migration.name:<24} "
+            f"{record.get('state', 'pending'):<8} "
+            f"processed={record.get('processed_count', 0)}"
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    asyncio.run(main())
@@ -0,0 +1,34 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import MIGRATION_BATCH_SIZE, MIGRATION_THROTTLE_SECONDS
+
+
+class Migration(ABC):
+    """A versioned change to existing documents of one collection.
+
+    The runner walks the documents matched by query() in _id order, handing them
+    to migrate_batch() batch_size at a time. migrate_batch() must be idempotent,
+    since a batch interrupted before its checkpoint is saved runs again.
+    """
+
+    version: int
+    name: str
+    collection: str
+    projection: Dict[str, Any] | None = None
+    batch_size: int = MIGRATION_BATCH_SIZE
+    throttle_seconds: float = MIGRATION_THROTTLE_SECONDS
+
+    def query(self) -> Dict[str, Any]:
+        return {}
+
+    # Runs once after the last batch, before the migration is marked done
+    async def complete(self, db: AsyncDatabase) -> None:
+        pass
+
+    @abstractmethod
+    async def migrate_batch(
+        self, documents: List[Dict[str, Any]], db: AsyncDatabase
+    ) -> None: ...
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from pymongo import ReturnDocument
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import DuplicateKeyError
+
+from app.core.constants import MIGRATION_LEASE_SECONDS, SCHEMA_MIGRATIONS_COLLECTION
+from app.migrations.base import Migration
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_PENDING = "pending"
+MIGRATION_RUNNING = "running"
+MIGRATION_DONE = "done"
+
+
+def _check_versions(migrations: List[Migration]) -> None:
+    versions = [migration.version for migration in migrations]
+    if versions != sorted(set(versions)):
+        raise ValueError(f"Migration versions must be unique and ascending: {versions}")
+
+
+# Takes the lease on a migration's record, creating the record on its first run.
+# Returns None when another runner holds an unexpired lease.
+async def _claim_migration(
+    migration: Migration, db: AsyncDatabase
+) -> Dict[str, Any] | None:
+    now = datetime.now(timezone.utc)
+    try:
+        return await db[SCHEMA_MIGRATIONS_COLLECTION].find_one_and_update(
+            {
+                "_id": migration.version,
+                "state": {"$ne": MIGRATION_DONE},
+                "$or": [
+                    {"lease_expires_at": None},
+                    {"lease_expires_at": {"$lte": now}},
+                ],
+            },
+            {
+                "$set": {
+                    "name": migration.name,
+                    "lease_expires_at": now
+                    + timedelta(seconds=MIGRATION_LEASE_SECONDS),
+                },
+                "$setOnInsert": {
+                    "state": MIGRATION_PENDING,
+                    "checkpoint_id": None,
+                    "processed_count": 0,
+                    "started_at": now,
+                },
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        return None
+
+
+async def _release_migration(migration: Migration, db: AsyncDatabase) -> None:
+    await db[SCHEMA_MIGRATIONS_COLLECTION].update_one(
+        {"_id": migration.version}, {"$set": {"lease_expires_at": None}}
+    )
+
+
+# Returns True once every matching document has been migrated, or False when the
+# deadline is reached first. Progress is checkpointed after every batch, so the
+# next run resumes after the last migrated _id.
+async def _run_migration(
+    migration: Migration,
+    record: Dict[str, Any],
+    deadline: float | None,
+    db: AsyncDatabase,
+) -> bool:
+    checkpoint_id = record.get("checkpoint_id")
+
+    while True:
+        if deadline is not None and time.monotonic() >= deadline:
+            await _release_migration(migration, db)
+            return False
+
+        query = migration.query()
+        if checkpoint_id is not None:
+            query = {"$and": [query, {"_id": {"$gt": checkpoint_id}}]}
+
+        documents = (
+            await db[migration.collection]
+            .find(query, migration.projection)
+            .sort("_id", 1)
+            .limit(migration.batch_size)
+            .to_list(length=None)
+        )
+
+        now = datetime.now(timezone.utc)
+        if not documents:
+            await migration.complete(db)
+            await db[SCHEMA_MIGRATIONS_COLLECTION].update_one(
+                {"_id": migration.version},
+                {
+                    "$set": {
+                        "state": MIGRATION_DONE,
+                        "completed_at": now,
+                        "lease_expires_at": None,
+                    }
+                },
+            )
+            logger.info(
+                "Migration complete | version=%s name=%s",
+                migration.version,
+                migration.name,
+            )
+            return True
+
+        await migration.migrate_batch(documents, db)
+
+        checkpoint_id = documents[-1]["_id"]
+        await db[SCHEMA_MIGRATIONS_COLLECTION].update_one(
+            {"_id": migration.version},
+            {
+                "$set": {
+                    "state": MIGRATION_RUNNING,
+                    "checkpoint_id": checkpoint_id,
+                    "updated_at": now,
+                    "lease_expires_at": now
+                    + timedelta(seconds=MIGRATION_LEASE_SECONDS),
+                },
+                "$inc": {"processed_count": len(documents)},
+            },
+        )
+
+        # Yield capacity to live traffic between batches
+        await asyncio.sleep(migration.throttle_seconds)
+
+
+async def run_migrations(
+    migrations: List[Migration],
+    db: AsyncDatabase,
+    time_budget_seconds: float | None = None,
+) -> bool:
+    """Applies pending migrations in version order.
+
+    Stops at the first migration which cannot finish, either because the time
+    budget ran out or because another runner holds it, since later migrations may
+    depend on it. Returns True when every migration is done.
+    """
+    _check_versions(migrations)
+    deadline = (
+        time.monotonic() + time_budget_seconds
+        if time_budget_seconds is not None
+        else None
+    )
+
+    done_versions = {
+        record["_id"]
+        async for record in db[SCHEMA_MIGRATIONS_COLLECTION].find(
+            {"state": MIGRATION_DONE}, {"_id": 1}
+        )
+    }
+
+    for migration in migrations:
+        if migration.version in done_versions:
+            continue
+
+        record = await _claim_migration(migration, db)
+        if record is None:
+            logger.info(
+                "Migration is held by another runner | version=%s name=%s",
+                migration.version,
+                migration.name,
+            )
+            return False
+
+        if not await _run_migration(migration, record, deadline, db):
+            logger.info(
+                "Migration paused at time budget | version=%s name=%s",
+                migration.version,
+                migration.name,
+            )
+            return False
+
+    return True
+
+
+async def get_migration_records(db: AsyncDatabase) -> List[Dict[str, Any]]:
+    return (
+        await db[SCHEMA_MIGRATIONS_COLLECTION]
+        .find({})
+        .sort("_id", 1)
+        .to_list(length=None)
+    )
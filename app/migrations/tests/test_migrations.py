@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from bson import ObjectId
+
+from app.core.constants import EVENTS_COLLECTION, RSVPS_COLLECTION
+from app.migrations import MIGRATIONS
+from app.migrations.v0003_todo_status_colors import TodoStatusColors
+from app.migrations.v0012_event_datetimes import EventDatetimes
+from app.migrations.v0013_event_reminders import EventReminders
+from app.migrations.v0014_event_rsvp_counts import EventRsvpCounts
+from app.test_shared.constants import (
+    MOCK_EVENT_END,
+    MOCK_EVENT_ID,
+    MOCK_EVENT_START,
+    MOCK_PROJECT_ID,
+    MOCK_STATUS_ID,
+)
+
+
+def test_migrations_versions_ascending():
+    versions = [migration.version for migration in MIGRATIONS]
+
+    assert versions == sorted(set(versions))
+
+
+@pytest.mark.asyncio
+async def test_todo_status_colors_migrate_batch_success():
+    legacy_statuses = [
+        {"id": ObjectId(MOCK_STATUS_ID), "name": "Done"},
+        {"id": ObjectId(), "name": "Blocked", "color": "#FF0000"},
+    ]
+    mock_projects_collection = AsyncMock()
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_projects_collection
+
+    await TodoStatusColors().migrate_batch(
+        [{"_id": ObjectId(MOCK_PROJECT_ID), "todo_statuses": legacy_statuses}],
+        mock_db,
+    )
+
+    (update,) = mock_projects_collection.bulk_write.call_args.args[0]
+    assert update._filter == {
+        "_id": ObjectId(MOCK_PROJECT_ID),
+        "todo_statuses": legacy_statuses,
+    }
+    new_statuses = update._doc["$set"]["todo_statuses"]
+    assert [status["color"] for status in new_statuses] == ["#10B981", "#FF0000"]
+
+
+@pytest.mark.asyncio
+async def test_event_datetimes_migrate_batch_success():
+    mock_events_collection = AsyncMock()
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_events_collection
+
+    await EventDatetimes().migrate_batch(
+        [
+            {
+                "_id": ObjectId(MOCK_EVENT_ID),
+                "start": MOCK_EVENT_START,
+                "end": MOCK_EVENT_END,
+            },
+            {"_id": ObjectId(), "start": "next tuesday", "end": MOCK_EVENT_END},
+        ],
+        mock_db,
+    )
+
+    # The unparseable event is skipped
+    (update,) = mock_events_collection.bulk_write.call_args.args[0]
+    assert update._filter == {
+        "_id": ObjectId(MOCK_EVENT_ID),
+        "start": MOCK_EVENT_START,
+        "end": MOCK_EVENT_END,
+    }
+    assert update._doc["$set"] == {
+        "start": datetime(2023, 10, 10, 10, tzinfo=timezone.utc),
+        "end": datetime(2023, 10, 10, 12, tzinfo=timezone.utc),
+    }
+
+
+@pytest.mark.asyncio
+async def test_event_reminders_migrate_batch_success():
+    mock_reminders_collection = AsyncMock()
+    mock_db = AsyncMock()
+    mock_db.__getitem__.return_value = mock_reminders_collection
+    start = datetime.now(timezone.utc) + timedelta(hours=2)
+
+    await EventReminders().migrate_batch(
+        [{"_id": ObjectId(MOCK_EVENT_ID), "start": start}], mock_db
+    )
+
+    updates = mock_reminders_collection.bulk_write.call_args.args[0]
+    assert [update._filter["label"] for update in updates] == [
+        "10 minutes",
+        "1 hour",
+    ]
+    assert updates[1]._doc["$setOnInsert"]["due_at"] == start - timedelta(hours=1)
+
+
+@pytest.mark.asyncio
+@patch("app.migrations.v0014_event_rsvp_counts.db_recompute_rsvp_counts")
+async def test_event_rsvp_counts_migrate_batch_success(mock_db_recompute_rsvp_counts):
+    rsvp_id = ObjectId()
+    mock_rsvps_collection = AsyncMock()
+    mock_events_collection = AsyncMock()
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: {
+        RSVPS_COLLECTION: mock_rsvps_collection,
+        EVENTS_COLLECTION: mock_events_collection,
+    }.get(name)
+
+    await EventRsvpCounts().migrate_batch(
+        [{"_id": ObjectId(MOCK_EVENT_ID), "rsvp_ids": [str(rsvp_id)]}], mock_db
+    )
+
+    mock_rsvps_collection.update_many.assert_called_once_with(
+        {"_id": {"$in": [rsvp_id]}}, {"$set": {"event_id": ObjectId(MOCK_EVENT_ID)}}
+    )
+    mock_db_recompute_rsvp_counts.assert_called_once_with(MOCK_EVENT_ID, mock_db)
+    mock_events_collection.update_one.assert_called_once_with(
+        {"_id": ObjectId(MOCK_EVENT_ID)}, {"$set": {"rsvp_refs_migrated": True}}
+    )
@@ -0,0 +1,140 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from app.core.constants import SCHEMA_MIGRATIONS_COLLECTION
+from app.migrations.base import Migration
+from app.migrations.runner import MIGRATION_DONE, MIGRATION_PENDING, run_migrations
+
+MOCK_COLLECTION = "things"
+
+
+class RecordingMigration(Migration):
+    collection = MOCK_COLLECTION
+    throttle_seconds = 0
+
+    def __init__(self, version: int) -> None:
+        self.version = version
+        self.name = f"migration_{version}"
+        self.batches = []
+
+    async def migrate_batch(self, documents, db) -> None:
+        self.batches.append(documents)
+
+
+def _async_iter(items):
+    async def iterate():
+        for item in items:
+            yield item
+
+    return iterate()
+
+
+def _mock_db(done_records, batches, claimed_record=None):
+    mock_migrations_collection = MagicMock()
+    mock_migrations_collection.find.return_value = _async_iter(done_records)
+    mock_migrations_collection.find_one_and_update = AsyncMock(
+        return_value=claimed_record
+        or {"_id": 1, "state": MIGRATION_PENDING, "checkpoint_id": None}
+    )
+    mock_migrations_collection.update_one = AsyncMock()
+
+    mock_cursor = MagicMock()
+    mock_cursor.sort.return_value = mock_cursor
+    mock_cursor.limit.return_value = mock_cursor
+    mock_cursor.to_list = AsyncMock(side_effect=batches)
+    mock_things_collection = MagicMock()
+    mock_things_collection.find.return_value = mock_cursor
+
+    mock_db = AsyncMock()
+    mock_db.__getitem__.side_effect = lambda name: (
+        mock_migrations_collection
+        if name == SCHEMA_MIGRATIONS_COLLECTION
+        else mock_things_collection
+    )
+    return mock_db, mock_migrations_collection, mock_things_collection
+
+
+@pytest.mark.asyncio
+async def test_run_migrations_success():
+    first_id, second_id = ObjectId(), ObjectId()
+    migration = RecordingMigration(1)
+    mock_db, mock_migrations_collection, _ = _mock_db(
+        [], [[{"_id": first_id}], [{"_id": second_id}], []]
+    )
+
+    result = await run_migrations([migration], mock_db)
+
+    assert result is True
+    assert migration.batches == [[{"_id": first_id}], [{"_id": second_id}]]
+    final_update = mock_migrations_collection.update_one.call_args_list[-1]
+    assert final_update.args[1]["$set"]["state"] == MIGRATION_DONE
+
+
+@pytest.mark.asyncio
+async def test_run_migrations_resumes_from_checkpoint():
+    checkpoint_id = ObjectId()
+    migration = RecordingMigration(1)
+    mock_db, _, mock_things_collection = _mock_db(
+        [],
+        [[]],
+        claimed_record={"_id": 1, "state": "running", "checkpoint_id": checkpoint_id},
+    )
+
+    await run_migrations([migration], mock_db)
+
+    mock_things_collection.find.assert_called_once_with(
+        {"$and": [{}, {"_id": {"$gt": checkpoint_id}}]}, None
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_migrations_skips_done_migrations():
+    done_migration = RecordingMigration(1)
+    pending_migration = RecordingMigration(2)
+    mock_db, mock_migrations_collection, _ = _mock_db(
+        [{"_id": 1}], [[]], claimed_record={"_id": 2, "checkpoint_id": None}
+    )
+
+    await run_migrations([done_migration, pending_migration], mock_db)
+
+    mock_migrations_collection.find_one_and_update.assert_called_once()
+    claim_filter = mock_migrations_collection.find_one_and_update.call_args.args[0]
+    assert claim_filter["_id"] == 2
+
+
+@pytest.mark.asyncio
+async def test_run_migrations_stops_at_time_budget():
+    migration = RecordingMigration(1)
+    mock_db, _, mock_things_collection = _mock_db([], [[{"_id": ObjectId()}]])
+
+    result = await run_migrations([migration], mock_db, time_budget_seconds=0)
+
+    assert result is False
+    assert migration.batches == []
+    mock_things_collection.find.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_migrations_stops_when_leased_elsewhere():
+    first_migration = RecordingMigration(1)
+    second_migration = RecordingMigration(2)
+    mock_db, mock_migrations_collection, _ = _mock_db([], [])
+    mock_migrations_collection.find_one_and_update.side_effect = DuplicateKeyError(
+        "duplicate key"
+    )
+
+    result = await run_migrations([first_migration, second_migration], mock_db)
+
+    assert result is False
+    mock_migrations_collection.find_one_and_update.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_run_migrations_failure_unordered_versions():
+    with pytest.raises(ValueError):
+        await run_migrations(
+            [RecordingMigration(2), RecordingMigration(1)], AsyncMock()
+        )
@@ -0,0 +1,22 @@
+from typing import Any, Dict, List
+
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import PROJECTS_COLLECTION
+from app.db.project import db_backfill_project_child_refs
+from app.migrations.base import Migration
+
+
+class ProjectChildRefs(Migration):
+    version = 1
+    name = "project_child_refs"
+    collection = PROJECTS_COLLECTION
+    projection = {"todo_ids": 1}
+
+    def query(self) -> Dict[str, Any]:
+        return {"child_refs_migrated": {"$ne": True}}
+
+    async def migrate_batch(
+        self, documents: List[Dict[str, Any]], db: AsyncDatabase
+    ) -> None:
+        await db_backfill_project_child_refs(documents, db)
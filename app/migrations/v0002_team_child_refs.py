@@ -0,0 +1,22 @@
+from typing import Any, Dict, List
+
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import TEAMS_COLLECTION
+from app.db.team import db_backfill_team_child_refs
+from app.migrations.base import Migration
+
+
+class TeamChildRefs(Migration):
+    version = 2
+    name = "team_child_refs"
+    collection = TEAMS_COLLECTION
+    projection = {"project_ids": 1, "event_ids": 1}
+
+    def query(self) -> Dict[str, Any]:
+        return {"child_refs_migrated": {"$ne": True}}
+
+    async def migrate_batch(
+        self, documents: List[Dict[str, Any]], db: AsyncDatabase
+    ) -> None:
+        await db_backfill_team_child_refs(documents, db)
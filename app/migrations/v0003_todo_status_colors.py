@@ -0,0 +1,53 @@
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import (
+    DEFAULT_TODO_STATUS_COLOR,
+    DEFAULT_TODO_STATUSES,
+    PROJECTS_COLLECTION,
+)
+from app.migrations.base import Migration
+
+
+class TodoStatusColors(Migration):
+    """Gives statuses created before colors existed, or stripped of their color
+    by an old reorder, the color of the default status with the same name."""
+
+    version = 3
+    name = "todo_status_colors"
+    collection = PROJECTS_COLLECTION
+    projection = {"todo_statuses": 1}
+
+    def query(self) -> Dict[str, Any]:
+        return {"todo_statuses": {"$elemMatch": {"color": {"$exists": False}}}}
+
+    async def migrate_batch(
+        self, documents: List[Dict[str, Any]], db: AsyncDatabase
+    ) -> None:
+        default_colors = dict(DEFAULT_TODO_STATUSES)
+
+        updates = []
+        for project in documents:
+            todo_statuses = [
+                {
+                    **status,
+                    "color": status.get(
+                        "color",
+                        default_colors.get(status["name"], DEFAULT_TODO_STATUS_COLOR),
+                    ),
+                }
+                for status in project["todo_statuses"]
+            ]
+            # Guarded on the statuses read, so a concurrent edit is not overwritten.
+            # A skipped project still matches query() and is picked up next run.
+            updates.append(
+                UpdateOne(
+                    {"_id": project["_id"], "todo_statuses": project["todo_statuses"]},
+                    {"$set": {"todo_statuses": todo_statuses}},
+                )
+            )
+
+        if updates:
+            await db[PROJECTS_COLLECTION].bulk_write(updates, ordered=False)
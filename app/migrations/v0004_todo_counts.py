@@ -0,0 +1,30 @@
+from typing import Any, Dict, List
+
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import PROJECTS_COLLECTION
+from app.db.project import db_recompute_todo_counts
+from app.migrations.base import Migration
+
+
+class TodoCounts(Migration):
+    """Initialises todo_counts on projects created before the counters existed.
+
+    Counts are aggregated by project_id, so this has to run after
+    ProjectChildRefs has stamped it onto every todo.
+    """
+
+    version = 4
+    name = "todo_counts"
+    collection = PROJECTS_COLLECTION
+    projection = {"_id": 1}
+    batch_size = 100
+
+    def query(self) -> Dict[str, Any]:
+        return {"todo_counts": {"$exists": False}}
+
+    async def migrate_batch(
+        self, documents: List[Dict[str, Any]], db: AsyncDatabase
+    ) -> None:
+        for project in documents:
+            await db_recompute_todo_counts(str(project["_id"]), db)
@@ -0,0 +1,44 @@
+from typing import Any, Dict, List
+
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.common import generate_team_short_id
+from app.core.constants import TEAMS_COLLECTION
+from app.db.indexes import db_ensure_indexes
+from app.migrations.base import Migration
+
+
+class UniqueTeamShortIds(Migration):
+    """Gives a fresh short_id to every team but the oldest sharing one, so the
+    unique short_id index can be built. Teams created while the old probe loop
+    raced with another request are the only ones affected."""
+
+    version = 5
+    name = "unique_team_short_ids"
+    collection = TEAMS_COLLECTION
+    projection = {"short_id": 1}
+
+    async def migrate_batch(
+        self, documents: List[Dict[str, Any]], db: AsyncDatabase
+    ) -> None:
+        for team in documents:
+            older_team = await db[TEAMS_COLLECTION].find_one(
+                {"short_id": team["short_id"], "_id": {"$lt": team["_id"]}},
+                {"_id": 1},
+            )
+            if older_team is None:
+                continue
+
+            # The unique index is not there to reject a taken id yet, so probe
+            short_id = generate_team_short_id()
+            while await db[TEAMS_COLLECTION].find_one(
+                {"short_id": short_id}, {"_id": 1}
+            ):
+                short_id = generate_team_short_id()
+
+            await db[TEAMS_COLLECTION].update_one(
+                {"_id": team["_id"]}, {"$set": {"short_id": short_id}}
+            )
+
+    async def complete(self, db: AsyncDatabase) -> None:
+        await db_ensure_indexes(db)
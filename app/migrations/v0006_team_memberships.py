@@ -0,0 +1,24 @@
+from typing import Any, Dict, List
+
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import TEAMS_COLLECTION
+from app.db.team import db_backfill_team_memberships
+from app.migrations.base import Migration
+
+
+class TeamMemberships(Migration):
+    version = 6
+    name = "team_memberships"
+    collection = TEAMS_COLLECTION
+    projection = {"member_ids": 1, "exec_member_ids": 1}
+    # Large clubs carry thousands of members, so keep batches of teams small
+    batch_size = 50
+
+    def query(self) -> Dict[str, Any]:
+        return {"memberships_migrated": {"$ne": True}}
+
+    async def migrate_batch(
+        self, documents: List[Dict[str, Any]], db: AsyncDatabase
+    ) -> None:
+        await db_backfill_team_memberships(documents, db)
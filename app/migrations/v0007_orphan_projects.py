@@ -0,0 +1,32 @@
+from typing import Any, Dict, List
+
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import PROJECTS_COLLECTION, TEAMS_COLLECTION
+from app.db.deletion import (
+    DELETION_PROJECT,
+    PROJECT_DELETION_PROJECTION,
+    db_delete_orphans,
+)
+from app.migrations.base import Migration
+
+
+# Projects left behind by teams deleted before deletions cascaded. Their todos are
+# handed to deletion jobs rather than removed here.
+class OrphanProjects(Migration):
+    version = 7
+    name = "orphan_projects"
+    collection = PROJECTS_COLLECTION
+    projection = {"team_id": 1, **PROJECT_DELETION_PROJECTION}
+
+    async def migrate_batch(
+        self, documents: List[Dict[str, Any]], db: AsyncDatabase
+    ) -> None:
+        await db_delete_orphans(
+            documents,
+            PROJECTS_COLLECTION,
+            "team_id",
+            TEAMS_COLLECTION,
+            db,
+            DELETION_PROJECT,
+        )
@@ -0,0 +1,28 @@
+from typing import Any, Dict, List
+
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import EVENTS_COLLECTION, TEAMS_COLLECTION
+from app.db.deletion import DELETION_EVENT, EVENT_DELETION_PROJECTION, db_delete_orphans
+from app.migrations.base import Migration
+
+
+# Events left behind by teams deleted before deletions cascaded, with their RSVPs
+# handed to deletion jobs
+class OrphanEvents(Migration):
+    version = 8
+    name = "orphan_events"
+    collection = EVENTS_COLLECTION
+    projection = {"team_id": 1, **EVENT_DELETION_PROJECTION}
+
+    async def migrate_batch(
+        self, documents: List[Dict[str, Any]], db: AsyncDatabase
+    ) -> None:
+        await db_delete_orphans(
+            documents,
+            EVENTS_COLLECTION,
+            "team_id",
+            TEAMS_COLLECTION,
+            db,
+            DELETION_EVENT,
+        )
@@ -0,0 +1,21 @@
+from typing import Any, Dict, List
+
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import PROJECTS_COLLECTION, TODOS_COLLECTION
+from app.db.deletion import db_delete_orphans
+from app.migrations.base import Migration
+
+
+class OrphanTodos(Migration):
+    version = 9
+    name = "orphan_todos"
+    collection = TODOS_COLLECTION
+    projection = {"project_id": 1}
+
+    async def migrate_batch(
+        self, documents: List[Dict[str, Any]], db: AsyncDatabase
+    ) -> None:
+        await db_delete_orphans(
+            documents, TODOS_COLLECTION, "project_id", PROJECTS_COLLECTION, db
+        )
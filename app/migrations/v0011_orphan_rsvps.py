@@ -0,0 +1,19 @@
+from typing import Any, Dict, List
+
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import RSVPS_COLLECTION
+from app.db.deletion import db_delete_orphan_rsvps
+from app.migrations.base import Migration
+
+
+class OrphanRsvps(Migration):
+    version = 11
+    name = "orphan_rsvps"
+    collection = RSVPS_COLLECTION
+    projection = {"_id": 1, "event_id": 1}
+
+    async def migrate_batch(
+        self, documents: List[Dict[str, Any]], db: AsyncDatabase
+    ) -> None:
+        await db_delete_orphan_rsvps(documents, db)
@@ -0,0 +1,61 @@
+import logging
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import EVENTS_COLLECTION
+from app.migrations.base import Migration
+from app.schemas.event import parse_event_time
+
+logger = logging.getLogger(__name__)
+
+
+class EventDatetimes(Migration):
+    """Converts event start and end times stored as ISO strings to dates, so
+    they can be range queried and sorted on server side."""
+
+    version = 12
+    name = "event_datetimes"
+    collection = EVENTS_COLLECTION
+    projection = {"start": 1, "end": 1}
+
+    def query(self) -> Dict[str, Any]:
+        return {
+            "$or": [
+                {"start": {"$type": "string"}},
+                {"end": {"$type": "string"}},
+            ]
+        }
+
+    async def migrate_batch(
+        self, documents: List[Dict[str, Any]], db: AsyncDatabase
+    ) -> None:
+        updates = []
+        for event in documents:
+            start = parse_event_time(event.get("start"))
+            end = parse_event_time(event.get("end"))
+            if start is None or end is None:
+                # Left as is for a manual fix, the API cannot serve it either way
+                logger.warning(
+                    "Skipping event with unparseable times | event_id=%s start=%r end=%r",
+                    event["_id"],
+                    event.get("start"),
+                    event.get("end"),
+                )
+                continue
+
+            # Guarded on the times read, so a concurrent edit is not overwritten
+            updates.append(
+                UpdateOne(
+                    {
+                        "_id": event["_id"],
+                        "start": event.get("start"),
+                        "end": event.get("end"),
+                    },
+                    {"$set": {"start": start, "end": end}},
+                )
+            )
+
+        if updates:
+            await db[EVENTS_COLLECTION].bulk_write(updates, ordered=False)
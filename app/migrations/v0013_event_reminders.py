@@ -0,0 +1,54 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import EVENTS_COLLECTION, REMINDERS_COLLECTION
+from app.db.reminder import REMINDER_PENDING
+from app.migrations.base import Migration
+from app.schemas.event import as_utc
+from app.service.event import REMINDER_OFFSETS
+
+
+class EventReminders(Migration):
+    """Persists the reminders of upcoming events, which were only ever held by
+    the in-memory scheduler of whichever instance created the event."""
+
+    version = 13
+    name = "event_reminders"
+    collection = EVENTS_COLLECTION
+    projection = {"start": 1}
+
+    def query(self) -> Dict[str, Any]:
+        return {"start": {"$gt": datetime.now(timezone.utc)}}
+
+    async def migrate_batch(
+        self, documents: List[Dict[str, Any]], db: AsyncDatabase
+    ) -> None:
+        now = datetime.now(timezone.utc)
+        updates = []
+        for event in documents:
+            start = as_utc(event["start"])
+            for label, offset in REMINDER_OFFSETS.items():
+                if start - offset <= now:
+                    continue
+
+                # Only inserted, a reminder scheduled since is left alone
+                updates.append(
+                    UpdateOne(
+                        {"event_id": event["_id"], "label": label},
+                        {
+                            "$setOnInsert": {
+                                "due_at": start - offset,
+                                "state": REMINDER_PENDING,
+                                "attempts": 0,
+                                "lease_expires_at": None,
+                            }
+                        },
+                        upsert=True,
+                    )
+                )
+
+        if updates:
+            await db[REMINDERS_COLLECTION].bulk_write(updates, ordered=False)
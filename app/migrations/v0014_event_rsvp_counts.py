@@ -0,0 +1,39 @@
+from typing import Any, Dict, List
+
+from bson import ObjectId
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import EVENTS_COLLECTION, RSVPS_COLLECTION
+from app.db.event import db_recompute_rsvp_counts
+from app.migrations.base import Migration
+
+
+class EventRsvpCounts(Migration):
+    """Stamps event_id onto each event's RSVPs and counts them by status into
+    rsvp_counts, then flags the event so both are relied on from then on."""
+
+    version = 14
+    name = "event_rsvp_counts"
+    collection = EVENTS_COLLECTION
+    projection = {"rsvp_ids": 1}
+
+    def query(self) -> Dict[str, Any]:
+        return {"rsvp_refs_migrated": {"$ne": True}}
+
+    async def migrate_batch(
+        self, documents: List[Dict[str, Any]], db: AsyncDatabase
+    ) -> None:
+        for event in documents:
+            # rsvp_ids are stored as strings on the event
+            rsvp_ids = [ObjectId(rsvp_id) for rsvp_id in event.get("rsvp_ids", [])]
+            if rsvp_ids:
+                await db[RSVPS_COLLECTION].update_many(
+                    {"_id": {"$in": rsvp_ids}}, {"$set": {"event_id": event["_id"]}}
+                )
+
+            # Not atomic with replies, one landing mid count can leave its status
+            # off by one. POST /recompute-event-rsvp-counts/{event_id} repairs it.
+            await db_recompute_rsvp_counts(str(event["_id"]), db)
+            await db[EVENTS_COLLECTION].update_one(
+                {"_id": event["_id"]}, {"$set": {"rsvp_refs_migrated": True}}
+            )
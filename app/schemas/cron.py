@@ -0,0 +1,30 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class MigrationStatus(BaseModel):
+    version: int
+    name: str
+    state: str
+    processed_count: int = 0
+
+
+class RunMigrationsResponse(BaseModel):
+    complete: bool
+    migrations: List[MigrationStatus]
+
+
+class CollectDeletionsResponse(BaseModel):
+    complete: bool
+    pending_jobs: int
+
+
+class DrainEmailOutboxResponse(BaseModel):
+    complete: bool
+    pending_emails: int
+
+
+class DispatchRemindersResponse(BaseModel):
+    complete: bool
+    due_reminders: int
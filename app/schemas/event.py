@@ -1,6 +1,30 @@
+from datetime import datetime, timezone
 from enum import Enum
-from typing import List
-from pydantic import BaseModel, EmailStr
+from typing import Any, List
+from dateutil import parser
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+
+from app.core.constants import RSVP_BULK_INVITE_MAX_EMAILS
+
+
+# Event times are kept in UTC. Mongo hands dates back without a zone, and a
+# request may send a naive time, both of which are taken as UTC.
+def as_utc(time: datetime) -> datetime:
+    if time.tzinfo is None:
+        return time.replace(tzinfo=timezone.utc)
+    return time.astimezone(timezone.utc)
+
+
+# Older events stored their times as ISO strings, and the event datetimes
+# migration leaves any it cannot parse in place. Every reader of a stored time
+# goes through here, with None meaning the time is unusable.
+def parse_event_time(value: Any) -> datetime | None:
+    if isinstance(value, datetime):
+        return as_utc(value)
+    try:
+        return as_utc(parser.isoparse(value))
+    except (ValueError, TypeError, OverflowError):
+        return None
 
 
 class RSVPStatus(str, Enum):
@@ -15,17 +39,30 @@ class RSVP(BaseModel):
     rsvp_status: RSVPStatus
 
 
+class RSVPCounts(BaseModel):
+    pending: int = 0
+    accepted: int = 0
+    declined: int = 0
+
+
 class Event(BaseModel):
     id: str
     name: str
     description: str
-    start: str
-    end: str
+    start: datetime
+    end: datetime
     colour: str
     location: str
     rsvp_ids: List[str]
     public: bool = False
 
+    @field_validator("start", "end", mode="before")
+    def validate_time(cls, time: Any) -> datetime:
+        parsed = parse_event_time(time)
+        if parsed is None:
+            raise ValueError(f"Invalid event time: {time!r}")
+        return parsed
+
 
 # Pass event_id through path
 class GetEventRequest(BaseModel):
@@ -46,6 +83,29 @@ class SendRSVPEmailResponse(BaseModel):
     rsvp_id: str
 
 
+class RSVPInviteStatus(str, Enum):
+    INVITED = "invited"
+    ALREADY_INVITED = "already_invited"
+    INVALID_EMAIL = "invalid_email"
+
+
+class RSVPInviteResult(BaseModel):
+    email: str
+    status: RSVPInviteStatus
+    rsvp_id: str | None = None
+
+
+# Emails are validated one by one, so a bad address is reported in its result
+# rather than failing the whole request
+class SendRSVPEmailsRequest(BaseModel):
+    emails: List[str] = Field(min_length=1, max_length=RSVP_BULK_INVITE_MAX_EMAILS)
+
+
+# One result per distinct address, in request order
+class SendRSVPEmailsResponse(BaseModel):
+    results: List[RSVPInviteResult]
+
+
 # For event attendees to confirm or deny event attendance
 # Pass rsvp_id through path
 class ReplyRSVPRequest(BaseModel):
@@ -65,10 +125,38 @@ class GetEventRSVPsResponse(BaseModel):
     rsvps: List[RSVP]
 
 
+# Pass event_id through path
+class GetEventRSVPCountsResponse(BaseModel):
+    counts: RSVPCounts
+
+
+class RecomputeEventRSVPCountsResponse(BaseModel):
+    counts: RSVPCounts
+
+
+# Pass event_id through path, status, cursor and limit through the query
+class GetEventGuestListResponse(BaseModel):
+    rsvps: List[RSVP]
+    next_cursor: str | None = None
+
+
 class UpdateEventDetailsRequest(BaseModel):
     name: str
     description: str
     public: bool
+    # Left as they are when not given
+    start: datetime | None = None
+    end: datetime | None = None
+
+    @field_validator("start", "end")
+    def validate_time(cls, time: datetime | None) -> datetime | None:
+        return as_utc(time) if time is not None else None
+
+    @model_validator(mode="after")
+    def validate_time_range(self) -> "UpdateEventDetailsRequest":
+        if self.start and self.end and self.end < self.start:
+            raise ValueError("Event end must not be before its start")
+        return self
 
 
 class UpdateEventDetailsResponse(BaseModel):
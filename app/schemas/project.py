@@ -1,6 +1,9 @@
+from datetime import datetime
 from pydantic import BaseModel
 
-from typing import List
+from typing import Dict, List
+
+from app.core.constants import ARCHIVE_TODOS_DEFAULT_AGE_DAYS
 
 
 class TodoStatus(BaseModel):
@@ -18,6 +21,15 @@ class Todo(BaseModel):
     approved: bool = False
 
 
+class ArchivedTodo(Todo):
+    archived_at: datetime
+
+
+class TodoCounts(BaseModel):
+    by_status: Dict[str, int] = {}
+    by_assignee: Dict[str, int] = {}
+
+
 class Project(BaseModel):
     id: str
     name: str
@@ -95,6 +107,7 @@ class AddTodoStatusRequest(BaseModel):
     name: str
     color: str
 
+
 class AddTodoStatusResponse(BaseModel):
     pass
 
@@ -153,6 +166,93 @@ class GetProposedTodosResponse(BaseModel):
     proposed_todos: List[Todo]
 
 
+class CountProposedTodosResponse(BaseModel):
+    count: int
+
+
+# Will pass project_id through path
+class ReviewProposedTodosRequest(BaseModel):
+    approve_todo_ids: List[str] = []
+    reject_todo_ids: List[str] = []
+
+
+class ReviewProposedTodosResponse(BaseModel):
+    approved_count: int
+    rejected_count: int
+
+
+class GetTodoCountsRequest(BaseModel):
+    pass
+
+
+class GetTodoCountsResponse(BaseModel):
+    todo_counts: TodoCounts
+
+
+class RecomputeTodoCountsRequest(BaseModel):
+    pass
+
+
+class RecomputeTodoCountsResponse(BaseModel):
+    todo_counts: TodoCounts
+
+
+class TodoSearchResult(BaseModel):
+    todo: Todo
+    project_id: str
+    project_name: str
+    status_name: str | None = None
+    score: float
+
+
+# Will pass query, cursor and limit through query parameters
+class SearchTodosRequest(BaseModel):
+    pass
+
+
+class SearchTodosResponse(BaseModel):
+    results: List[TodoSearchResult]
+    next_cursor: str | None = None
+
+
+class AssignedTodo(BaseModel):
+    todo: Todo
+    project_id: str
+    project_name: str
+    status_name: str | None = None
+
+
+# Will pass status_id, cursor and limit through query parameters
+class GetMyTodosRequest(BaseModel):
+    pass
+
+
+class GetMyTodosResponse(BaseModel):
+    todos: List[AssignedTodo]
+    next_cursor: str | None = None
+
+
+# Will pass project_id through path
+# Archives todos in status_id, or the project's done status if not given
+class ArchiveTodosRequest(BaseModel):
+    older_than_days: int = ARCHIVE_TODOS_DEFAULT_AGE_DAYS
+    status_id: str | None = None
+
+
+class ArchiveTodosResponse(BaseModel):
+    archived_count: int
+
+
+# Will pass project_id through path, and cursor and limit through query parameters
+class GetArchivedTodosRequest(BaseModel):
+    pass
+
+
+class GetArchivedTodosResponse(BaseModel):
+    todos: List[ArchivedTodo]
+    next_cursor: str | None = None
+
+
 class IncreaseBudgetRequest(BaseModel):
     amount: float
 
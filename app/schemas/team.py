@@ -1,9 +1,11 @@
+from datetime import datetime
+from enum import Enum
 from typing import List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator, model_validator
 
 from app.schemas.project import Project
-from app.schemas.event import Event
+from app.schemas.event import Event, as_utc
 
 
 class TeamModel(BaseModel):
@@ -16,6 +18,36 @@ class TeamModel(BaseModel):
     event_ids: List[str]
 
 
+class TeamRole(str, Enum):
+    MEMBER = "member"
+    EXEC = "exec"
+
+
+class TeamMember(BaseModel):
+    user_id: str
+    role: TeamRole
+    # Unknown for members who joined before memberships
+    joined_at: datetime | None = None
+    email: str | None = None
+    first_name: str = ""
+    last_name: str = ""
+
+
+class TeamSummary(BaseModel):
+    id: str
+    short_id: str
+    name: str
+    member_count: int
+    role: TeamRole  # The caller's role in the team
+
+
+class ProjectSummary(BaseModel):
+    id: str
+    name: str
+    description: str
+    todo_count: int = 0
+
+
 class CreateTeamRequest(BaseModel):
     name: str
 
@@ -61,7 +93,8 @@ class LeaveTeamRequest(BaseModel):
 
 
 class LeaveTeamResponse(BaseModel):
-    pass
+    # True when the caller was the last executive, so the team was deleted
+    team_deleted: bool = False
 
 
 class DeleteTeamRequest(BaseModel):
@@ -100,11 +133,21 @@ class DeleteProjectResponse(BaseModel):
 class CreateEventRequest(BaseModel):
     name: str
     description: str
-    start: str
-    end: str
+    start: datetime
+    end: datetime
     colour: str
     location: str
 
+    @field_validator("start", "end")
+    def validate_time(cls, time: datetime) -> datetime:
+        return as_utc(time)
+
+    @model_validator(mode="after")
+    def validate_time_range(self) -> "CreateEventRequest":
+        if self.end < self.start:
+            raise ValueError("Event end must not be before its start")
+        return self
+
 
 class CreateEventResponse(BaseModel):
     event: Event
@@ -124,3 +167,30 @@ class GetTeamEventsRequest(BaseModel):
 
 class GetTeamEventsResponse(BaseModel):
     events: List[Event]
+    next_cursor: str | None = None
+
+
+class GetTeamMembersResponse(BaseModel):
+    members: List[TeamMember]
+    next_cursor: str | None = None
+
+
+class GetTeamDashboardResponse(BaseModel):
+    team: TeamSummary
+    projects: List[ProjectSummary]
+    upcoming_events: List[Event]
+    member_preview: List[TeamMember]
+
+
+class GetTeamCalendarUrlResponse(BaseModel):
+    url: str
+
+
+class RegenerateTeamCalendarUrlResponse(BaseModel):
+    url: str
+
+
+# body is None when the client's copy, named by If-None-Match, is current
+class TeamCalendarFeed(BaseModel):
+    etag: str
+    body: str | None = None
@@ -0,0 +1,89 @@
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import (
+    DELETION_CRON_TIME_BUDGET_SECONDS,
+    EMAIL_BACKGROUND_TIME_BUDGET_SECONDS,
+    EMAIL_CRON_TIME_BUDGET_SECONDS,
+    MIGRATION_CRON_TIME_BUDGET_SECONDS,
+    REMINDER_CRON_TIME_BUDGET_SECONDS,
+)
+from app.db.deletion import db_collect_deletions, db_count_pending_deletions
+from app.db.outbox import db_count_pending_emails
+from app.db.reminder import db_count_due_reminders
+from app.migrations import MIGRATIONS
+from app.migrations.runner import (
+    MIGRATION_PENDING,
+    get_migration_records,
+    run_migrations,
+)
+from app.schemas.cron import (
+    CollectDeletionsResponse,
+    DispatchRemindersResponse,
+    DrainEmailOutboxResponse,
+    MigrationStatus,
+    RunMigrationsResponse,
+)
+from app.service.event import dispatch_due_reminders
+from app.service.mail import drain_email_outbox
+
+
+async def run_migrations_service(db: AsyncDatabase) -> RunMigrationsResponse:
+
+    complete = await run_migrations(MIGRATIONS, db, MIGRATION_CRON_TIME_BUDGET_SECONDS)
+
+    records = {record["_id"]: record for record in await get_migration_records(db)}
+    return RunMigrationsResponse(
+        complete=complete,
+        migrations=[
+            MigrationStatus(
+                version=migration.version,
+                name=migration.name,
+                state=records.get(migration.version, {}).get(
+                    "state", MIGRATION_PENDING
+                ),
+                processed_count=records.get(migration.version, {}).get(
+                    "processed_count", 0
+                ),
+            )
+            for migration in MIGRATIONS
+        ],
+    )
+
+
+async def collect_deletions_service(
+    db: AsyncDatabase,
+    time_budget_seconds: float = DELETION_CRON_TIME_BUDGET_SECONDS,
+) -> CollectDeletionsResponse:
+
+    complete = await db_collect_deletions(db, time_budget_seconds)
+
+    return CollectDeletionsResponse(
+        complete=complete, pending_jobs=await db_count_pending_deletions(db)
+    )
+
+
+async def drain_email_outbox_service(
+    db: AsyncDatabase,
+    time_budget_seconds: float = EMAIL_CRON_TIME_BUDGET_SECONDS,
+) -> DrainEmailOutboxResponse:
+
+    complete = await drain_email_outbox(db, time_budget_seconds)
+
+    return DrainEmailOutboxResponse(
+        complete=complete, pending_emails=await db_count_pending_emails(db)
+    )
+
+
+async def dispatch_reminders_service(
+    db: AsyncDatabase,
+    time_budget_seconds: float = REMINDER_CRON_TIME_BUDGET_SECONDS,
+) -> DispatchRemindersResponse:
+
+    complete = await dispatch_due_reminders(db, time_budget_seconds)
+
+    # Starts on the reminder emails straight away rather than at the next drain
+    await drain_email_outbox(db, EMAIL_BACKGROUND_TIME_BUDGET_SECONDS)
+
+    return DispatchRemindersResponse(
+        complete=complete, due_reminders=await db_count_due_reminders(db)
+    )
@@ -1,27 +1,62 @@
+import logging
+import time
 from datetime import datetime, timedelta, timezone
-import os
+from bson import ObjectId
+from bson.errors import InvalidId
 from fastapi import HTTPException
 from pymongo.asynchronous.database import AsyncDatabase
-from typing import List
-from dateutil import parser
+from pydantic import EmailStr, TypeAdapter, ValidationError
+from typing import Dict, List
 
 from app.db.event import (
     db_add_rsvp_id_to_event,
     db_create_rsvp_invite,
+    db_create_rsvp_invites,
+    db_count_rsvps_by_status,
     db_get_event_or_none,
+    db_get_event_for_rsvp_reads,
+    db_get_event_rsvps_page,
+    db_get_rsvp_ids_by_email,
     db_get_rsvps_by_ids,
+    db_iter_accepted_rsvp_batches,
+    db_recompute_rsvp_counts,
     db_record_rsvp_response,
     db_update_event_details,
 )
-from app.schemas.event import RSVP, Event, RSVPStatus, UpdateEventDetailsRequest
-
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
-
-from app.core.constants import BASE_URL
-from app.core.scheduler import scheduler
+from app.db.reminder import (
+    db_cancel_reminders,
+    db_claim_reminders,
+    db_get_event_reminders,
+    db_mark_reminder_sent,
+    db_schedule_reminders,
+)
+from app.schemas.event import (
+    RSVP,
+    Event,
+    GetEventGuestListResponse,
+    RSVPCounts,
+    RSVPInviteResult,
+    RSVPInviteStatus,
+    RSVPStatus,
+    UpdateEventDetailsRequest,
+    as_utc,
+    parse_event_time,
+)
+from app.service.mail import enqueue_batch_email, enqueue_email
+
+from app.core.common import decode_cursor, encode_cursor
+from app.core.constants import (
+    BASE_URL,
+    EMAIL_BATCH_MAX_RECIPIENTS,
+    REMINDER_CLAIM_BATCH_SIZE,
+    RSVP_REPLY_LINK_GRACE_DAYS,
+)
+from app.core.metrics import RSVP_REPLY_REJECTED, metrics
+from app.core.security import sign_rsvp_reply, verify_rsvp_reply_signature
 from app.core.templates import env
 
+logger = logging.getLogger(__name__)
+
 
 async def get_event_service(event_id: str, db: AsyncDatabase) -> Event:
 
@@ -44,20 +79,34 @@ async def get_event_service(event_id: str, db: AsyncDatabase) -> Event:
     )
 
 
-# This should never fail outside of infrastructure / network related errors
-# It will still return as normal if the email is invalid
-def send_rsvp_invite_email(email: str, event: Event, rsvp_id: str) -> int:
-    start_dt_local = parser.isoparse(event.start).astimezone()
+# Stand in for the RSVP id and its reply signature in a batch invite, each
+# recipient gets their own
+RSVP_ID_SUBSTITUTION = "-rsvp_id-"
+RSVP_SIGNATURE_SUBSTITUTION = "-rsvp_signature-"
+RSVP_INVITE_SUBJECT = "You're invited to an event!"
+
+_email_adapter = TypeAdapter(EmailStr)
+
+
+def _rsvp_reply_expiry(event: Event) -> int:
+    return int((event.end + timedelta(days=RSVP_REPLY_LINK_GRACE_DAYS)).timestamp())
+
+
+def _render_rsvp_invite(
+    event: Event, rsvp_id: str, expires: int, signature: str
+) -> str:
+    start_dt_local = event.start.astimezone()
     formatted_start = start_dt_local.strftime("%A, %B %d, %Y at %I:%M %p %Z")
 
-    end_dt_local = parser.isoparse(event.end).astimezone()
+    end_dt_local = event.end.astimezone()
     formatted_end = end_dt_local.strftime("%A, %B %d, %Y at %I:%M %p %Z")
 
-    accept_url = f"{BASE_URL}/events/reply-rsvp/{rsvp_id}/accepted"
-    decline_url = f"{BASE_URL}/events/reply-rsvp/{rsvp_id}/declined"
+    reply_query = f"expires={expires}&signature={signature}"
+    accept_url = f"{BASE_URL}/events/reply-rsvp/{rsvp_id}/accepted?{reply_query}"
+    decline_url = f"{BASE_URL}/events/reply-rsvp/{rsvp_id}/declined?{reply_query}"
 
     template = env.get_template("rsvp_request_email.html")
-    html_content = template.render(
+    return template.render(
         event_name=event.name,
         event_description=event.description,
         event_start=formatted_start,
@@ -67,37 +116,120 @@ def send_rsvp_invite_email(email: str, event: Event, rsvp_id: str) -> int:
         decline_url=decline_url,
     )
 
-    message = Mail(
-        from_email="admin@clubsync.club",
-        to_emails=email,
-        subject="You're invited to an event!",
-        html_content=html_content,
+
+# Only queued here, the outbox drain delivers it
+async def send_rsvp_invite_email(
+    email: str, event: Event, rsvp_id: str, db: AsyncDatabase
+) -> None:
+    expires = _rsvp_reply_expiry(event)
+    await enqueue_email(
+        email,
+        RSVP_INVITE_SUBJECT,
+        _render_rsvp_invite(event, rsvp_id, expires, sign_rsvp_reply(rsvp_id, expires)),
+        db,
     )
-    try:
-        sg = SendGridAPIClient(os.environ["SENDGRID_KEY"])
-        response = sg.send(message)
-        return response.status_code
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to send email: {str(e)}")
 
 
 async def send_rsvp_email_service(event_id: str, email: str, db: AsyncDatabase) -> str:
     event = await get_event_service(event_id, db)
 
-    rsvp_in_db_dict = await db_create_rsvp_invite(email, db)
+    rsvp_in_db_dict = await db_create_rsvp_invite(event_id, email, db)
     rsvp_id = rsvp_in_db_dict["_id"]
 
     await db_add_rsvp_id_to_event(event_id, rsvp_id, db)
 
-    send_rsvp_invite_email(email, event, rsvp_id)
+    await send_rsvp_invite_email(email, event, rsvp_id, db)
 
     return rsvp_id
 
 
+async def send_rsvp_emails_service(
+    event_id: str, emails: List[str], db: AsyncDatabase
+) -> List[RSVPInviteResult]:
+    event = await get_event_service(event_id, db)
+
+    # Distinct addresses in request order, compared case insensitively
+    results: Dict[str, RSVPInviteResult] = {}
+    valid_emails = []
+    for email in emails:
+        email = email.strip()
+        if email.lower() in results:
+            continue
+
+        try:
+            _email_adapter.validate_python(email)
+        except ValidationError:
+            results[email.lower()] = RSVPInviteResult(
+                email=email, status=RSVPInviteStatus.INVALID_EMAIL
+            )
+            continue
+
+        results[email.lower()] = RSVPInviteResult(
+            email=email, status=RSVPInviteStatus.INVITED
+        )
+        valid_emails.append(email)
+
+    invited_rsvp_ids = await db_get_rsvp_ids_by_email(event.rsvp_ids, valid_emails, db)
+    for email, rsvp_id in invited_rsvp_ids.items():
+        results[email] = RSVPInviteResult(
+            email=results[email].email,
+            status=RSVPInviteStatus.ALREADY_INVITED,
+            rsvp_id=rsvp_id,
+        )
+
+    new_emails = [
+        email for email in valid_emails if email.lower() not in invited_rsvp_ids
+    ]
+    rsvps_in_db = await db_create_rsvp_invites(event_id, new_emails, db)
+    for rsvp_in_db_dict in rsvps_in_db:
+        results[rsvp_in_db_dict["email"].lower()].rsvp_id = rsvp_in_db_dict["_id"]
+
+    if rsvps_in_db:
+        expires = _rsvp_reply_expiry(event)
+        await enqueue_batch_email(
+            [
+                {
+                    "to_email": rsvp_in_db_dict["email"],
+                    "substitutions": {
+                        RSVP_ID_SUBSTITUTION: rsvp_in_db_dict["_id"],
+                        RSVP_SIGNATURE_SUBSTITUTION: sign_rsvp_reply(
+                            rsvp_in_db_dict["_id"], expires
+                        ),
+                    },
+                }
+                for rsvp_in_db_dict in rsvps_in_db
+            ],
+            RSVP_INVITE_SUBJECT,
+            _render_rsvp_invite(
+                event, RSVP_ID_SUBSTITUTION, expires, RSVP_SIGNATURE_SUBSTITUTION
+            ),
+            db,
+        )
+
+    return list(results.values())
+
+
 async def reply_rsvp_service(
-    rsvp_id: str, rsvp_status: RSVPStatus, db: AsyncDatabase
+    rsvp_id: str,
+    rsvp_status: RSVPStatus,
+    expires: int | None,
+    signature: str | None,
+    db: AsyncDatabase,
 ) -> None:
 
+    # Checked before the RSVP is touched, so a forged or stale link costs no write
+    if (
+        expires is None
+        or signature is None
+        or not verify_rsvp_reply_signature(rsvp_id, expires, signature)
+    ):
+        metrics.increment(RSVP_REPLY_REJECTED)
+        raise HTTPException(
+            status_code=403,
+            detail=f"Invalid or expired RSVP link: rsvp_id={rsvp_id}",
+        )
+
+    # A repeated click matches no RSVP and writes nothing
     await db_record_rsvp_response(rsvp_id, rsvp_status, db)
 
 
@@ -125,6 +257,96 @@ async def get_event_rsvps_service(event_id: str, db: AsyncDatabase) -> List[RSVP
     return rsvps
 
 
+async def get_event_rsvp_counts_service(event_id: str, db: AsyncDatabase) -> RSVPCounts:
+
+    event_in_db_dict = await db_get_event_for_rsvp_reads(event_id, db)
+    if event_in_db_dict is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Could not find an event for this id: id={event_id}",
+        )
+
+    # Counted on the fly until the event's counts are kept
+    if "rsvp_ids" in event_in_db_dict:
+        return RSVPCounts(
+            **await db_count_rsvps_by_status(event_in_db_dict["rsvp_ids"], db)
+        )
+
+    return RSVPCounts(**event_in_db_dict.get("rsvp_counts", {}))
+
+
+async def recompute_event_rsvp_counts_service(
+    event_id: str, db: AsyncDatabase
+) -> RSVPCounts:
+
+    event_in_db_dict = await db_get_event_for_rsvp_reads(event_id, db)
+    if event_in_db_dict is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Could not find an event for this id: id={event_id}",
+        )
+
+    # Its RSVPs are only found by event_id once the counts backfill has run
+    if "rsvp_ids" in event_in_db_dict:
+        raise HTTPException(
+            status_code=409,
+            detail=f"RSVP counts are not kept for this event yet: event_id={event_id}",
+        )
+
+    return RSVPCounts(**await db_recompute_rsvp_counts(event_id, db))
+
+
+async def get_event_guest_list_service(
+    event_id: str,
+    rsvp_status: RSVPStatus | None,
+    cursor: str | None,
+    limit: int,
+    db: AsyncDatabase,
+) -> GetEventGuestListResponse:
+
+    after_rsvp_id = None
+    if cursor:
+        try:
+            after_rsvp_id = str(ObjectId(decode_cursor(cursor)["id"]))
+        except (ValueError, KeyError, TypeError, InvalidId):
+            raise HTTPException(
+                status_code=400, detail=f"Invalid cursor: cursor={cursor}"
+            )
+
+    event_in_db_dict = await db_get_event_for_rsvp_reads(event_id, db)
+    if event_in_db_dict is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Could not find an event for this id: id={event_id}",
+        )
+
+    # Fetch one extra RSVP to find out whether there is another page
+    rsvps_in_db = await db_get_event_rsvps_page(
+        event_id,
+        event_in_db_dict.get("rsvp_ids"),
+        rsvp_status,
+        limit + 1,
+        db,
+        after_rsvp_id,
+    )
+    has_more = len(rsvps_in_db) > limit
+    rsvps_in_db = rsvps_in_db[:limit]
+
+    return GetEventGuestListResponse(
+        rsvps=[
+            RSVP(
+                id=rsvp_in_db_dict["_id"],
+                email=rsvp_in_db_dict["email"],
+                rsvp_status=RSVPStatus(rsvp_in_db_dict["status"]),
+            )
+            for rsvp_in_db_dict in rsvps_in_db
+        ],
+        next_cursor=(
+            encode_cursor({"id": rsvps_in_db[-1]["_id"]}) if has_more else None
+        ),
+    )
+
+
 async def update_event_details_service(
     event_id: str,
     update_event_details_request: UpdateEventDetailsRequest,
@@ -143,69 +365,182 @@ async def update_event_details_service(
         "public": update_event_details_request.public,
     }
 
+    request_start = update_event_details_request.start
+    request_end = update_event_details_request.end
+    stored_start = parse_event_time(event_in_db_dict.get("start"))
+    if request_start is not None or request_end is not None:
+        start = request_start or stored_start
+        end = request_end or parse_event_time(event_in_db_dict.get("end"))
+        if start is None or end is None:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Event has no valid stored start and end, send both: event_id={event_id}",
+            )
+        if end < start:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Event end must not be before its start: event_id={event_id}",
+            )
+        new_event_details["start"] = start
+        new_event_details["end"] = end
+
     await db_update_event_details(event_id, new_event_details, db)
 
+    if request_start is not None and request_start != stored_start:
+        await reschedule_event_reminders(event_id, request_start, db)
+
+
+REMINDER_SUBJECT = "Reminder: You have an event coming up!"
+
+# How long before the event each reminder goes out, keyed by the label used in
+# the email
+REMINDER_OFFSETS = {
+    "10 minutes": timedelta(minutes=10),
+    "1 hour": timedelta(hours=1),
+    "1 day": timedelta(days=1),
+    "1 week": timedelta(weeks=1),
+}
+
 
 # Reminder email scheduling logic
-async def send_reminder_email(event_id: str, when: str, db: AsyncDatabase):
+async def send_reminder_email(
+    event_id: str, when: str, db: AsyncDatabase, dedupe_key: str | None = None
+) -> None:
+    """Fans the reminder out to the event's accepted guests.
 
-    event = await get_event_service(event_id, db)
-    if not event:
+    Accepted RSVPs are streamed from Mongo in batches, each queued as one batch
+    email, so a large event is reminded in a handful of sends. Nothing is sent
+    for an event which has since been deleted or has already started. Given a
+    dedupe_key, a retry after a failed batch does not queue the earlier batches
+    again.
+    """
+
+    event_in_db_dict = await db_get_event_or_none(event_id, db)
+    if event_in_db_dict is None:
         return
 
-    rsvps = await get_event_rsvps_service(event_id, db)
+    event_start = parse_event_time(event_in_db_dict.get("start"))
+    if event_start is None:
+        logger.warning(
+            "Skipping reminder for event with unparseable start | event_id=%s start=%r",
+            event_id,
+            event_in_db_dict.get("start"),
+        )
+        return
+    if event_start <= datetime.now(timezone.utc):
+        return
 
-    start_dt_local = parser.isoparse(event.start).astimezone()
-    formatted_start = start_dt_local.strftime("%A, %B %d, %Y at %I:%M %p %Z")
+    formatted_start = event_start.astimezone().strftime("%A, %B %d, %Y at %I:%M %p %Z")
 
     template = env.get_template("event_reminder_email.html")
     html_content = template.render(
-        event_name=event.name,
+        event_name=event_in_db_dict["name"],
         when=when,
-        event_location=event.location,
+        event_location=event_in_db_dict["location"],
         event_time=formatted_start,
     )
 
-    for rsvp in rsvps:
-        if rsvp.rsvp_status != RSVPStatus.ACCEPTED:
-            continue
-
-        message = Mail(
-            from_email="admin@clubsync.club",
-            to_emails=rsvp.email,
-            subject=f"Reminder: You have an event coming up!",
-            html_content=html_content,
+    batch_index = 0
+    async for rsvps in db_iter_accepted_rsvp_batches(
+        event_id,
+        (
+            None
+            if event_in_db_dict.get("rsvp_refs_migrated")
+            else event_in_db_dict["rsvp_ids"]
+        ),
+        EMAIL_BATCH_MAX_RECIPIENTS,
+        db,
+    ):
+        await enqueue_batch_email(
+            [{"to_email": rsvp["email"], "rsvp_id": rsvp["_id"]} for rsvp in rsvps],
+            REMINDER_SUBJECT,
+            html_content,
+            db,
+            f"{dedupe_key}:{batch_index}" if dedupe_key is not None else None,
         )
-        try:
-            sg = SendGridAPIClient(os.environ["SENDGRID_KEY"])
-            response = sg.send(message)
-            return response.status_code
-        except Exception as e:
-            raise HTTPException(
-                status_code=500, detail=f"Failed to send email: {str(e)}"
-            )
+        batch_index += 1
+
 
+# The reminders still ahead of now for an event starting at event_start
+def _reminder_slots(event_start: datetime) -> Dict[str, datetime]:
+    now = datetime.now(timezone.utc)
+    return {
+        label: event_start - offset
+        for label, offset in REMINDER_OFFSETS.items()
+        if event_start - offset > now
+    }
 
-# TODO: Make the scheduling reconfigurable if event details change
-def schedule_event_reminders(
-    event_id: str, event_start: str, db: AsyncDatabase
+
+async def schedule_event_reminders(
+    event_id: str, event_start: datetime, db: AsyncDatabase
 ) -> None:
-    event_start_time = parser.isoparse(event_start)
 
-    reminders = {
-        "10 minutes": event_start_time - timedelta(minutes=10),
-        "1 hour": event_start_time - timedelta(hours=1),
-        "1 day": event_start_time - timedelta(days=1),
-        "1 week": event_start_time - timedelta(weeks=1),
-    }
+    await db_schedule_reminders(
+        event_id, list(_reminder_slots(event_start).items()), db
+    )
 
-    for label, run_time in reminders.items():
-        if run_time > datetime.now(timezone.utc):
-            scheduler.add_job(
-                send_reminder_email,
-                trigger="date",
-                run_date=run_time,
-                args=[event_id, label, db],
-                id=f"{event_id}-{label}",
-                replace_existing=True,
-            )
+
+# Brings an event's reminders in line with its new start. Only slots whose due
+# time moved are rewritten, which also rearms one already sent for the old time,
+# and pending slots which are no longer ahead are cancelled.
+async def reschedule_event_reminders(
+    event_id: str, event_start: datetime, db: AsyncDatabase
+) -> None:
+
+    slots = _reminder_slots(event_start)
+    reminders = await db_get_event_reminders(event_id, db)
+
+    await db_schedule_reminders(
+        event_id,
+        [
+            (label, due_at)
+            for label, due_at in slots.items()
+            if label not in reminders or as_utc(reminders[label]["due_at"]) != due_at
+        ],
+        db,
+    )
+    await db_cancel_reminders(
+        event_id, [label for label in reminders if label not in slots], db
+    )
+
+
+async def dispatch_due_reminders(
+    db: AsyncDatabase, time_budget_seconds: float | None = None
+) -> bool:
+    """Sends the reminders which have come due, a claimed batch at a time.
+
+    Reminders are leased as they are claimed, so concurrent dispatches never
+    pick up the same one. Returns True when no due reminder was left to claim,
+    or False when the time budget ran out first.
+    """
+    deadline = (
+        time.monotonic() + time_budget_seconds
+        if time_budget_seconds is not None
+        else None
+    )
+
+    while deadline is None or time.monotonic() < deadline:
+        reminders = await db_claim_reminders(REMINDER_CLAIM_BATCH_SIZE, db)
+        if not reminders:
+            return True
+
+        for reminder in reminders:
+            try:
+                await send_reminder_email(
+                    str(reminder["event_id"]),
+                    reminder["label"],
+                    db,
+                    f"reminder:{reminder['_id']}",
+                )
+            except Exception:
+                # Left to its lease, the next dispatch retries it
+                logger.exception(
+                    "Reminder failed | reminder_id=%s event_id=%s",
+                    reminder["_id"],
+                    reminder["event_id"],
+                )
+                continue
+
+            await db_mark_reminder_sent(reminder["_id"], db)
+
+    return False
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.core.constants import (
+    EMAIL_BATCH_MAX_RECIPIENTS,
+    EMAIL_CLAIM_BATCH_SIZE,
+    EMAIL_MAX_ATTEMPTS,
+    EMAIL_RATE_LIMIT_PER_SECOND,
+    EMAIL_RETRY_BASE_SECONDS,
+    EMAIL_RETRY_MAX_SECONDS,
+    EMAIL_WORKER_COUNT,
+)
+from app.core.mail import EmailDeliveryError, EmailTransport, RateLimiter, get_transport
+from app.core.metrics import EMAIL_FAILED, EMAIL_RETRIED, EMAIL_SENT, metrics
+from app.db.outbox import (
+    db_claim_emails,
+    db_enqueue_emails,
+    db_fail_exhausted_emails,
+    db_mark_email_failed,
+    db_mark_email_sent,
+    db_record_delivered_recipients,
+    db_schedule_email_retry,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def enqueue_email(
+    to_email: str, subject: str, html_content: str, db: AsyncDatabase
+) -> None:
+    await db_enqueue_emails(
+        [{"to_email": to_email, "subject": subject, "html_content": html_content}],
+        db,
+    )
+
+
+# One outbox email per chunk of recipients, each delivered in a single send where
+# the transport supports it. Given a dedupe_key, each chunk is keyed off it so
+# queueing the same recipients again is a no-op.
+async def enqueue_batch_email(
+    recipients: List[Dict[str, Any]],
+    subject: str,
+    html_content: str,
+    db: AsyncDatabase,
+    dedupe_key: str | None = None,
+) -> None:
+    messages = []
+    for index, start in enumerate(
+        range(0, len(recipients), EMAIL_BATCH_MAX_RECIPIENTS)
+    ):
+        message = {
+            "recipients": recipients[start : start + EMAIL_BATCH_MAX_RECIPIENTS],
+            "subject": subject,
+            "html_content": html_content,
+        }
+        if dedupe_key is not None:
+            message["dedupe_key"] = f"{dedupe_key}:{index}"
+        messages.append(message)
+
+    await db_enqueue_emails(messages, db)
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(
+        seconds=min(
+            EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1), EMAIL_RETRY_MAX_SECONDS
+        )
+    )
+
+
+async def _record_failed_attempt(
+    email: Dict[str, Any], error: str, retryable: bool, db: AsyncDatabase
+) -> None:
+    # The claim already counted this attempt
+    attempts = email["attempts"]
+    if not retryable or attempts >= EMAIL_MAX_ATTEMPTS:
+        metrics.increment(EMAIL_FAILED)
+        logger.warning(
+            "Email failed | email_id=%s attempts=%s error=%s",
+            email["_id"],
+            attempts,
+            error,
+        )
+        await db_mark_email_failed(email["_id"], error, db)
+        return
+
+    metrics.increment(EMAIL_RETRIED)
+    await db_schedule_email_retry(
+        email["_id"],
+        datetime.now(timezone.utc) + _retry_delay(attempts),
+        error,
+        db,
+    )
+
+
+async def _deliver_email(
+    email: Dict[str, Any],
+    transport: EmailTransport,
+    rate_limiter: RateLimiter,
+    db: AsyncDatabase,
+) -> None:
+    await rate_limiter.wait()
+    try:
+        if "recipients" in email:
+            await transport.send_batch(
+                email["recipients"], email["subject"], email["html_content"]
+            )
+        else:
+            await transport.send(
+                email["to_email"], email["subject"], email["html_content"]
+            )
+    except EmailDeliveryError as e:
+        if "recipients" in email and e.delivered:
+            await db_record_delivered_recipients(
+                email["_id"],
+                email["recipients"][: e.delivered],
+                email["recipients"][e.delivered :],
+                db,
+            )
+        await _record_failed_attempt(email, str(e), e.retryable, db)
+        return
+    except Exception as e:
+        # A transport bug is retried like any other failure rather than
+        # aborting the drain
+        logger.exception("Email send raised | email_id=%s", email["_id"])
+        await _record_failed_attempt(email, repr(e), True, db)
+        return
+
+    metrics.increment(EMAIL_SENT)
+    await db_mark_email_sent(email["_id"], db)
+
+
+async def _deliver_batch(
+    emails: List[Dict[str, Any]],
+    transport: EmailTransport,
+    rate_limiter: RateLimiter,
+    db: AsyncDatabase,
+) -> None:
+    queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue()
+    for email in emails:
+        queue.put_nowait(email)
+
+    async def worker() -> None:
+        while not queue.empty():
+            email = queue.get_nowait()
+            try:
+                await _deliver_email(email, transport, rate_limiter, db)
+            except Exception:
+                # Recording the outcome failed, the lease runs out and a later
+                # drain picks the email up again
+                logger.exception("Email delivery failed | email_id=%s", email["_id"])
+
+    await asyncio.gather(
+        *(worker() for _ in range(min(EMAIL_WORKER_COUNT, len(emails))))
+    )
+
+
+async def drain_email_outbox(
+    db: AsyncDatabase,
+    time_budget_seconds: float | None = None,
+    transport: EmailTransport | None = None,
+) -> bool:
+    """Delivers due emails from the outbox, a claimed batch at a time.
+
+    A batch is shared by a pool of workers behind one rate limit. The limit is
+    per drain, not global: drains running at once, such as an overlapping cron
+    run and a background drain, each send up to EMAIL_RATE_LIMIT_PER_SECOND.
+    Returns True when no due email was left to claim, or False when the time
+    budget ran out first.
+    """
+    deadline = (
+        time.monotonic() + time_budget_seconds
+        if time_budget_seconds is not None
+        else None
+    )
+    transport = transport or get_transport()
+    rate_limiter = RateLimiter(EMAIL_RATE_LIMIT_PER_SECOND)
+    await db_fail_exhausted_emails(db)
+
+    while deadline is None or time.monotonic() < deadline:
+        emails = await db_claim_emails(EMAIL_CLAIM_BATCH_SIZE, db)
+        if not emails:
+            return True
+
+        await _deliver_batch(emails, transport, rate_limiter, db)
+
+    return False
@@ -1,46 +1,80 @@
-from typing import List
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
 from fastapi import HTTPException
 from pymongo.asynchronous.database import AsyncDatabase
 
+from app.core.common import decode_cursor, encode_cursor, parse_object_id
+from app.core.constants import ARCHIVE_TODOS_BATCH_SIZE
+from app.core.realtime import publish_project_event
+from app.db.user import db_get_user_project_ids
+
 from app.schemas.project import (
     AddTodoRequest,
     AddTodoResponse,
     AddTodoStatusRequest,
     AddTodoStatusResponse,
+    ArchiveTodosRequest,
+    ArchiveTodosResponse,
+    ArchivedTodo,
+    AssignedTodo,
+    CountProposedTodosResponse,
     DeleteTodoRequest,
     DeleteTodoResponse,
     DeleteTodoStatusRequest,
     DeleteTodoStatusResponse,
+    GetArchivedTodosResponse,
+    GetMyTodosResponse,
     GetProjectResponse,
+    GetTodoCountsResponse,
     GetTodoItemsResponse,
     Project,
+    RecomputeTodoCountsResponse,
     ReorderTodoItemsRequest,
     ReorderTodoItemsResponse,
     ReorderTodoStatusesRequest,
     ReorderTodoStatusesResponse,
+    ReviewProposedTodosRequest,
+    ReviewProposedTodosResponse,
+    SearchTodosResponse,
     UpdateTodoRequest,
     UpdateTodoResponse,
     Todo,
+    TodoCounts,
+    TodoSearchResult,
     UpdateTodoStatusRequest,
     UpdateTodoStatusResponse,
 )
+from app.schemas.team import TeamRole
 from app.db.project import (
     db_add_todo,
     db_add_todo_status,
     db_approve_todo,
+    db_approve_todos,
+    db_archive_todos,
     db_assign_todo,
+    db_count_proposed_todos,
     db_delete_todo,
     db_delete_todo_status,
-    db_get_team_by_project_id,
+    db_get_archived_todos,
+    db_get_projects_by_ids,
+    db_get_proposed_todos,
+    db_get_project_team_id,
+    db_get_todo_counts,
     db_get_todo_items,
+    db_get_todos_by_assignee,
+    db_project_has_todo,
+    db_recompute_todo_counts,
+    db_reject_todos,
     db_reorder_todo_items,
     db_reorder_todo_statuses,
+    db_search_todos,
     db_update_budget_available,
     db_update_budget_spent,
     db_update_todo,
     db_update_todo_statuses,
 )
 from app.db.project import db_get_project
+from app.db.team import db_get_team_membership
 
 
 async def get_project_service(project_id: str, db: AsyncDatabase) -> GetProjectResponse:
@@ -84,16 +118,17 @@ async def add_todo_service(
             todo_request.status_id = project_in_db_dict["todo_statuses"][0]["id"]
 
     # Get the team of the project to check if user is exec or not
-    team_in_db_dict = await db_get_team_by_project_id(project_id, db)
-    if not team_in_db_dict:
+    team_id = await db_get_project_team_id(project_id, db)
+    if not team_id:
         raise HTTPException(
             status_code=404,
             detail=f"Project's team does not exist: project_id={project_id}",
         )
 
-    await db_add_todo(
-        project_id, todo_request, user_id in team_in_db_dict["exec_member_ids"], db
-    )
+    membership = await db_get_team_membership(team_id, user_id, db)
+    is_exec = membership is not None and membership["role"] == TeamRole.EXEC
+    todo_in_db_dict = await db_add_todo(project_id, todo_request, is_exec, db)
+    await publish_project_event(project_id, "todo_added", todo_in_db_dict)
 
     return AddTodoResponse()
 
@@ -117,7 +152,17 @@ async def update_todo_service(
             detail=f"Invalid status_id: {update_todo_request.status_id}",
         )
 
+    # Check if todo exists, db_update_todo moves this project's counters
+    if not await db_project_has_todo(project_id, update_todo_request.todo_id, db):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Todo does not exist in project: todo_id={update_todo_request.todo_id}, project_id={project_id}",
+        )
+
     await db_update_todo(project_id, update_todo_request, db)
+    await publish_project_event(
+        project_id, "todo_updated", update_todo_request.model_dump()
+    )
 
     return UpdateTodoResponse()
 
@@ -136,13 +181,16 @@ async def delete_todo_service(
         )
 
     # Check if todo exists
-    if delete_todo_request.todo_id not in project_in_db_dict["todo_ids"]:
+    if not await db_project_has_todo(project_id, delete_todo_request.todo_id, db):
         raise HTTPException(
             status_code=404,
             detail=f"Todo does not exist in project: todo_id={delete_todo_request.todo_id}, project_id={project_id}",
         )
 
     await db_delete_todo(project_id, delete_todo_request.todo_id, db)
+    await publish_project_event(
+        project_id, "todo_deleted", {"todo_id": delete_todo_request.todo_id}
+    )
 
     return DeleteTodoResponse()
 
@@ -192,6 +240,9 @@ async def reorder_todo_items_service(
     )
 
     await db_reorder_todo_items(project_id, new_todos, db)
+    await publish_project_event(
+        project_id, "todos_reordered", {"todo_ids": new_todo_ids}
+    )
 
     return ReorderTodoItemsResponse()
 
@@ -199,15 +250,18 @@ async def reorder_todo_items_service(
 async def add_todo_status_service(
     project_id: str, todo_status_request: AddTodoStatusRequest, db: AsyncDatabase
 ) -> AddTodoStatusResponse:
-    
+
     # Check if project exists
     project_in_db_dict = await db_get_project(project_id, db)
     if not project_in_db_dict:
         raise HTTPException(
             status_code=404, detail=f"Project does not exist: project_id={project_id}"
         )
-    
-    await db_add_todo_status(project_id, todo_status_request.name, todo_status_request.color, db)
+
+    todo_status_in_db_dict = await db_add_todo_status(
+        project_id, todo_status_request.name, todo_status_request.color, db
+    )
+    await publish_project_event(project_id, "todo_status_added", todo_status_in_db_dict)
 
     return AddTodoStatusResponse()
 
@@ -233,6 +287,11 @@ async def delete_todo_status_service(
         )
 
     await db_delete_todo_status(project_id, delete_todo_status_request.status_id, db)
+    await publish_project_event(
+        project_id,
+        "todo_status_deleted",
+        {"status_id": delete_todo_status_request.status_id},
+    )
 
     return DeleteTodoStatusResponse()
 
@@ -267,13 +326,17 @@ async def reorder_todo_statuses_service(
     )
 
     await db_reorder_todo_statuses(project_id, new_statuses, db)
+    await publish_project_event(
+        project_id, "todo_statuses_reordered", {"status_ids": new_status_ids}
+    )
 
     return ReorderTodoStatusesResponse()
 
 
 async def update_todo_status_service(
-    project_id: str, update_todo_status_request: UpdateTodoStatusRequest, 
-    db: AsyncDatabase
+    project_id: str,
+    update_todo_status_request: UpdateTodoStatusRequest,
+    db: AsyncDatabase,
 ) -> UpdateTodoStatusResponse:
 
     # Check if project exists
@@ -299,6 +362,9 @@ async def update_todo_status_service(
         update_todo_status_request.color,
         db,
     )
+    await publish_project_event(
+        project_id, "todo_status_updated", update_todo_status_request.model_dump()
+    )
 
     return UpdateTodoStatusResponse()
 
@@ -318,36 +384,283 @@ async def assign_todo_service(
         )
 
     # Check if todo exists
-    if todo_id not in project_in_db_dict["todo_ids"]:
+    if not await db_project_has_todo(project_id, todo_id, db):
         raise HTTPException(
             status_code=404,
             detail=f"Todo does not exist in project: todo_id={todo_id}, project_id={project_id}",
         )
 
     # Check if assignee exists in project team
-    team_in_db_dict = await db_get_team_by_project_id(project_id, db)
-    if not team_in_db_dict:
+    team_id = await db_get_project_team_id(project_id, db)
+    if not team_id:
         raise HTTPException(
             status_code=404,
             detail=f"Project's team does not exist: project_id={project_id}",
         )
 
-    if assignee_id not in team_in_db_dict["member_ids"]:
+    if not await db_get_team_membership(team_id, assignee_id, db):
         raise HTTPException(
             status_code=404,
             detail=f"Assignee does not exist in project team: assignee_id={assignee_id}, project_id={project_id}",
         )
 
-    await db_assign_todo(todo_id, assignee_id, db)
+    await db_assign_todo(project_id, todo_id, assignee_id, db)
+    await publish_project_event(
+        project_id, "todo_assigned", {"todo_id": todo_id, "assignee_id": assignee_id}
+    )
 
 
-async def approve_todo_service(todo_id: str, db: AsyncDatabase) -> None:
+async def approve_todo_service(
+    project_id: str, todo_id: str, db: AsyncDatabase
+) -> None:
+
+    # Check if todo exists
+    if not await db_project_has_todo(project_id, todo_id, db):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Todo does not exist in project: todo_id={todo_id}, project_id={project_id}",
+        )
 
     await db_approve_todo(todo_id, db)
+    await publish_project_event(project_id, "todos_approved", {"todo_ids": [todo_id]})
 
 
 async def get_proposed_todos_service(project_id: str, db: AsyncDatabase) -> List[Todo]:
 
+    proposed_todos_in_db_list = await db_get_proposed_todos(project_id, db)
+
+    return [_todo_from_dict(todo) for todo in proposed_todos_in_db_list]
+
+
+async def count_proposed_todos_service(
+    project_id: str, db: AsyncDatabase
+) -> CountProposedTodosResponse:
+
+    return CountProposedTodosResponse(
+        count=await db_count_proposed_todos(project_id, db)
+    )
+
+
+async def review_proposed_todos_service(
+    project_id: str,
+    review_proposed_todos_request: ReviewProposedTodosRequest,
+    db: AsyncDatabase,
+) -> ReviewProposedTodosResponse:
+
+    approve_todo_ids = set(review_proposed_todos_request.approve_todo_ids)
+    reject_todo_ids = set(review_proposed_todos_request.reject_todo_ids)
+
+    conflicting_todo_ids = approve_todo_ids & reject_todo_ids
+    if conflicting_todo_ids:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Todos cannot be both approved and rejected: todo_ids={sorted(conflicting_todo_ids)}",
+        )
+
+    approved_count = (
+        await db_approve_todos(project_id, list(approve_todo_ids), db)
+        if approve_todo_ids
+        else 0
+    )
+    rejected_count = (
+        await db_reject_todos(project_id, list(reject_todo_ids), db)
+        if reject_todo_ids
+        else 0
+    )
+
+    if approved_count:
+        await publish_project_event(
+            project_id, "todos_approved", {"todo_ids": sorted(approve_todo_ids)}
+        )
+    if rejected_count:
+        await publish_project_event(
+            project_id, "todos_rejected", {"todo_ids": sorted(reject_todo_ids)}
+        )
+
+    return ReviewProposedTodosResponse(
+        approved_count=approved_count, rejected_count=rejected_count
+    )
+
+
+async def get_todo_counts_service(
+    project_id: str, db: AsyncDatabase
+) -> GetTodoCountsResponse:
+
+    todo_counts_in_db_dict = await db_get_todo_counts(project_id, db)
+    if todo_counts_in_db_dict is None:
+        raise HTTPException(
+            status_code=404, detail=f"Project does not exist: project_id={project_id}"
+        )
+
+    return GetTodoCountsResponse(todo_counts=TodoCounts(**todo_counts_in_db_dict))
+
+
+async def recompute_todo_counts_service(
+    project_id: str, db: AsyncDatabase
+) -> RecomputeTodoCountsResponse:
+
+    todo_counts_in_db_dict = await db_recompute_todo_counts(project_id, db)
+    if todo_counts_in_db_dict is None:
+        raise HTTPException(
+            status_code=404, detail=f"Project does not exist: project_id={project_id}"
+        )
+
+    return RecomputeTodoCountsResponse(todo_counts=TodoCounts(**todo_counts_in_db_dict))
+
+
+def _todo_from_dict(todo: Dict[str, Any]) -> Todo:
+    return Todo(
+        id=todo["_id"],
+        name=todo["name"],
+        description=todo["description"],
+        status_id=todo["status_id"],
+        assignee_id=todo["assignee_id"],
+        approved=todo["approved"],
+    )
+
+
+# Loads the names of the projects and statuses a page of todos refers to, using a
+# single projects query for the whole page
+async def _get_project_and_status_names(
+    todos_in_db_list: List[Dict[str, Any]], db: AsyncDatabase
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+
+    projects_in_db_list = await db_get_projects_by_ids(
+        list({todo["project_id"] for todo in todos_in_db_list}),
+        {"name": 1, "todo_statuses": 1},
+        db,
+    )
+
+    project_names = {project["_id"]: project["name"] for project in projects_in_db_list}
+    status_names = {
+        status["id"]: status["name"]
+        for project in projects_in_db_list
+        for status in project.get("todo_statuses", [])
+    }
+
+    return project_names, status_names
+
+
+async def search_todos_service(
+    user_id: str, query: str, cursor: str | None, limit: int, db: AsyncDatabase
+) -> SearchTodosResponse:
+
+    after_score, after_todo_id = None, None
+    if cursor:
+        try:
+            decoded_cursor = decode_cursor(cursor)
+            after_score = float(decoded_cursor["score"])
+            after_todo_id = parse_object_id(decoded_cursor["id"])
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(
+                status_code=400, detail=f"Invalid cursor: cursor={cursor}"
+            )
+
+    # Only search the projects the user can access through their teams
+    project_ids = await db_get_user_project_ids(user_id, db)
+    if not project_ids or not query.strip():
+        return SearchTodosResponse(results=[])
+
+    # Fetch one extra todo to find out whether there is another page
+    todos_in_db_list = await db_search_todos(
+        project_ids, query, limit + 1, db, after_score, after_todo_id
+    )
+    has_more = len(todos_in_db_list) > limit
+    todos_in_db_list = todos_in_db_list[:limit]
+
+    project_names, status_names = await _get_project_and_status_names(
+        todos_in_db_list, db
+    )
+
+    results = [
+        TodoSearchResult(
+            todo=_todo_from_dict(todo),
+            project_id=todo["project_id"],
+            project_name=project_names.get(todo["project_id"], ""),
+            status_name=status_names.get(todo["status_id"]),
+            score=todo["score"],
+        )
+        for todo in todos_in_db_list
+    ]
+
+    next_cursor = (
+        encode_cursor({"score": results[-1].score, "id": results[-1].todo.id})
+        if has_more
+        else None
+    )
+
+    return SearchTodosResponse(results=results, next_cursor=next_cursor)
+
+
+async def get_my_todos_service(
+    user_id: str,
+    status_id: str | None,
+    cursor: str | None,
+    limit: int,
+    db: AsyncDatabase,
+) -> GetMyTodosResponse:
+
+    after_todo_id = None
+    if cursor:
+        try:
+            after_todo_id = parse_object_id(decode_cursor(cursor)["id"])
+        except (ValueError, KeyError):
+            raise HTTPException(
+                status_code=400, detail=f"Invalid cursor: cursor={cursor}"
+            )
+
+    if status_id is not None:
+        try:
+            parse_object_id(status_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=400, detail=f"Invalid status_id: {status_id}"
+            )
+
+    # Todos left assigned in projects the user can no longer access are excluded
+    project_ids = await db_get_user_project_ids(user_id, db)
+    if not project_ids:
+        return GetMyTodosResponse(todos=[])
+
+    todos_in_db_list = await db_get_todos_by_assignee(
+        user_id, project_ids, limit + 1, db, status_id, after_todo_id
+    )
+    has_more = len(todos_in_db_list) > limit
+    todos_in_db_list = todos_in_db_list[:limit]
+
+    project_names, status_names = await _get_project_and_status_names(
+        todos_in_db_list, db
+    )
+
+    todos = [
+        AssignedTodo(
+            todo=_todo_from_dict(todo),
+            project_id=todo["project_id"],
+            project_name=project_names.get(todo["project_id"], ""),
+            status_name=status_names.get(todo["status_id"]),
+        )
+        for todo in todos_in_db_list
+    ]
+
+    next_cursor = encode_cursor({"id": todos[-1].todo.id}) if has_more else None
+
+    return GetMyTodosResponse(todos=todos, next_cursor=next_cursor)
+
+
+def _get_done_status_id(todo_statuses: List[Dict[str, Any]]) -> str | None:
+    # Statuses are user defined, so only one called "Done" is taken as done
+    for todo_status in todo_statuses:
+        if todo_status["name"].strip().lower() == "done":
+            return todo_status["id"]
+    return None
+
+
+async def archive_todos_service(
+    project_id: str,
+    archive_todos_request: ArchiveTodosRequest,
+    db: AsyncDatabase,
+) -> ArchiveTodosResponse:
+
     # Check if project exists
     project_in_db_dict = await db_get_project(project_id, db)
     if not project_in_db_dict:
@@ -355,13 +668,73 @@ async def get_proposed_todos_service(project_id: str, db: AsyncDatabase) -> List
             status_code=404, detail=f"Project does not exist: project_id={project_id}"
         )
 
-    proposed_todos = [
-        todo
-        for todo in (await get_todo_items_service(project_id, db)).todos
-        if todo.approved is False
+    if archive_todos_request.older_than_days < 0:
+        raise HTTPException(
+            status_code=400,
+            detail=f"older_than_days must not be negative: older_than_days={archive_todos_request.older_than_days}",
+        )
+
+    status_ids = [str(status["id"]) for status in project_in_db_dict["todo_statuses"]]
+    status_id = archive_todos_request.status_id or _get_done_status_id(
+        project_in_db_dict["todo_statuses"]
+    )
+    if status_id is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Project has no Done status, pass a status_id: project_id={project_id}",
+        )
+    if status_id not in status_ids:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid status_id: {status_id}",
+        )
+
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        days=archive_todos_request.older_than_days
+    )
+    archived_count = await db_archive_todos(
+        project_id, status_id, cutoff, ARCHIVE_TODOS_BATCH_SIZE, db
+    )
+
+    if archived_count:
+        await publish_project_event(
+            project_id,
+            "todos_archived",
+            {"status_id": status_id, "archived_count": archived_count},
+        )
+
+    return ArchiveTodosResponse(archived_count=archived_count)
+
+
+async def get_archived_todos_service(
+    project_id: str, cursor: str | None, limit: int, db: AsyncDatabase
+) -> GetArchivedTodosResponse:
+
+    before_todo_id = None
+    if cursor:
+        try:
+            before_todo_id = parse_object_id(decode_cursor(cursor)["id"])
+        except (ValueError, KeyError):
+            raise HTTPException(
+                status_code=400, detail=f"Invalid cursor: cursor={cursor}"
+            )
+
+    todos_in_db_list = await db_get_archived_todos(
+        project_id, limit + 1, db, before_todo_id
+    )
+    has_more = len(todos_in_db_list) > limit
+    todos_in_db_list = todos_in_db_list[:limit]
+
+    todos = [
+        ArchivedTodo(
+            **_todo_from_dict(todo).model_dump(), archived_at=todo["archived_at"]
+        )
+        for todo in todos_in_db_list
     ]
 
-    return proposed_todos
+    next_cursor = encode_cursor({"id": todos[-1].id}) if has_more else None
+
+    return GetArchivedTodosResponse(todos=todos, next_cursor=next_cursor)
 
 
 async def increase_budget_service(
@@ -1,55 +1,141 @@
-import random
-import string
 from fastapi import HTTPException
 from pymongo.asynchronous.database import AsyncDatabase
-
-from typing import List
-
-from app.db.event import db_get_events_by_ids
+from pymongo.errors import DuplicateKeyError
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from app.core.cache import TTLCache
+from app.core.common import (
+    decode_cursor,
+    encode_cursor,
+    etag_matches,
+    generate_team_short_id,
+    parse_object_id,
+)
+from app.core.constants import (
+    BASE_URL,
+    TEAM_CALENDAR_CACHE_SIZE,
+    TEAM_CALENDAR_CACHE_TTL_SECONDS,
+    TEAM_DASHBOARD_MEMBER_PREVIEW_LIMIT,
+    TEAM_DASHBOARD_UPCOMING_EVENTS_LIMIT,
+    TEAM_SHORT_ID_CACHE_SIZE,
+    TEAM_SHORT_ID_CACHE_TTL_SECONDS,
+    TEAM_SHORT_ID_MAX_ATTEMPTS,
+    TEAM_SHORT_ID_NEGATIVE_CACHE_TTL_SECONDS,
+)
+from app.core.ical import (
+    render_calendar_event,
+    render_calendar_footer,
+    render_calendar_header,
+)
+from app.core.metrics import (
+    TEAM_SHORT_ID_ALLOCATED,
+    TEAM_SHORT_ID_CACHE_HITS,
+    TEAM_SHORT_ID_CACHE_MISSES,
+    TEAM_SHORT_ID_COLLISIONS,
+    TEAM_SHORT_ID_EXHAUSTED,
+    metrics,
+)
+from app.core.security import sign_team_calendar, verify_team_calendar_signature
+from app.db.event import (
+    db_get_events_by_ids,
+    db_get_events_by_team_id,
+    db_get_team_events_page,
+    db_iter_team_calendar_events,
+)
 from app.db.team import (
     db_create_event_for_team,
     db_create_team,
     db_delete_event,
     db_delete_project,
     db_delete_team,
-    db_get_event_by_id,
-    db_get_project_by_id,
-    db_get_team_by_short_id,
+    db_count_team_members_by_role,
     db_get_team_id_by_short_id,
+    db_get_team_members,
+    db_get_team_membership,
     db_join_team,
     db_create_project,
     db_get_team_by_id,
+    db_get_team_dashboard,
+    db_get_team_for_member,
     db_promote_team_member,
     db_leave_team,
     db_kick_team_member,
+    db_rotate_team_calendar_token,
+    db_team_lists_child,
 )
-from app.schemas.event import Event
+from app.db.user import db_get_users_by_ids
+from app.schemas.event import Event, as_utc, parse_event_time
 from app.schemas.project import Project
 from app.schemas.team import (
     CreateEventRequest,
     CreateProjectRequest,
     CreateProjectResponse,
     CreateTeamResponse,
+    GetTeamDashboardResponse,
+    GetTeamEventsResponse,
     GetTeamResponse,
     JoinTeamResponse,
     KickTeamMemberResponse,
     LeaveTeamResponse,
+    GetTeamMembersResponse,
+    ProjectSummary,
     PromoteTeamMemberResponse,
+    TeamCalendarFeed,
+    TeamMember,
     TeamModel,
+    TeamRole,
+    TeamSummary,
 )
 from app.schemas.user import UserModel
 from app.service.event import schedule_event_reminders
 
 
+async def _is_team_exec(team_id: str, user_id: str, db: AsyncDatabase) -> bool:
+    membership = await db_get_team_membership(team_id, user_id, db)
+    return membership is not None and membership["role"] == TeamRole.EXEC
+
+
+async def _require_team_exists(team_id: str, db: AsyncDatabase) -> None:
+    if not await db_get_team_by_id(team_id, db, {"_id": 1}):
+        raise HTTPException(
+            status_code=404, detail=f"Team does not exist: team_id={team_id}"
+        )
+
+
+# Raised when a guarded update missed but every condition holds on a second look,
+# meaning the team changed in between
+def _team_changed_error(team_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail=f"Team was modified concurrently, retry the request: team_id={team_id}",
+    )
+
+
 async def create_team_service(
     creator_id: str, team_name: str, db: AsyncDatabase
 ) -> CreateTeamResponse:
 
-    short_id = "".join(random.choices(string.ascii_lowercase, k=6))
-    while await db_get_team_by_short_id(short_id, db) is not None:
-        short_id = "".join(random.choices(string.ascii_lowercase, k=6))
+    # The unique index on short_id rejects a taken id, so allocating one costs a
+    # single insert unless there is a collision
+    for _ in range(TEAM_SHORT_ID_MAX_ATTEMPTS):
+        short_id = generate_team_short_id()
+        try:
+            team_in_db_dict = await db_create_team(creator_id, short_id, team_name, db)
+            break
+        except DuplicateKeyError:
+            metrics.increment(TEAM_SHORT_ID_COLLISIONS)
+    else:
+        metrics.increment(TEAM_SHORT_ID_EXHAUSTED)
+        raise HTTPException(
+            status_code=503,
+            detail=f"Could not allocate a team short id after {TEAM_SHORT_ID_MAX_ATTEMPTS} attempts",
+        )
 
-    team_in_db_dict = await db_create_team(creator_id, short_id, team_name, db)
+    metrics.increment(TEAM_SHORT_ID_ALLOCATED)
+    # Other workers let a cached miss for the id expire
+    _unknown_team_short_ids.invalidate(short_id)
 
     return CreateTeamResponse(
         team=TeamModel(
@@ -64,39 +150,78 @@ async def create_team_service(
     )
 
 
+def _already_in_team_error(user_id: str, team_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=f"User is already in the team: user_id={user_id}, team_id={team_id}",
+    )
+
+
 async def join_team_service(
     team_id: str, user_id: str, db: AsyncDatabase
 ) -> JoinTeamResponse:
-    existing_team = await db_get_team_by_id(team_id, db)
-    if not existing_team:
+
+    joined = await db_join_team(team_id, user_id, db)
+    if joined is None:
         raise HTTPException(
             status_code=404, detail=f"Team does not exist: team_id={team_id}"
         )
+    if not joined:
+        raise _already_in_team_error(user_id, team_id)
 
-    user_already_in_team = user_id in existing_team["member_ids"]
-    if user_already_in_team:
-        raise HTTPException(
-            status_code=400,
-            detail=f"User is already in the team: user_id={user_id}, team_id={team_id}",
-        )
+    return JoinTeamResponse()
 
-    await db_join_team(team_id, user_id, db)
 
-    return JoinTeamResponse()
+# Invite codes are shared in group chats, so the same code tends to be resolved
+# many times within seconds
+_team_id_by_short_id: TTLCache[str] = TTLCache(
+    TEAM_SHORT_ID_CACHE_SIZE, TEAM_SHORT_ID_CACHE_TTL_SECONDS
+)
+_unknown_team_short_ids: TTLCache[bool] = TTLCache(
+    TEAM_SHORT_ID_CACHE_SIZE, TEAM_SHORT_ID_NEGATIVE_CACHE_TTL_SECONDS
+)
+
+
+def _unknown_short_id_error(team_short_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=404,
+        detail=f"Team does not exist: team_short_id={team_short_id}",
+    )
+
+
+async def _resolve_team_short_id(team_short_id: str, db: AsyncDatabase) -> str:
+    team_id = _team_id_by_short_id.get(team_short_id)
+    if team_id is not None:
+        metrics.increment(TEAM_SHORT_ID_CACHE_HITS)
+        return team_id
+
+    if _unknown_team_short_ids.get(team_short_id):
+        metrics.increment(TEAM_SHORT_ID_CACHE_HITS)
+        raise _unknown_short_id_error(team_short_id)
+
+    metrics.increment(TEAM_SHORT_ID_CACHE_MISSES)
+    team_id = await db_get_team_id_by_short_id(team_short_id, db)
+    if not team_id:
+        _unknown_team_short_ids.set(team_short_id, True)
+        raise _unknown_short_id_error(team_short_id)
+
+    _team_id_by_short_id.set(team_short_id, team_id)
+    return team_id
 
 
 async def join_team_by_short_id_service(
     team_short_id: str, user_id: str, db: AsyncDatabase
 ) -> None:
 
-    team_long_id = await db_get_team_id_by_short_id(team_short_id, db)
-    if not team_long_id:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Team does not exist: team_short_id={team_short_id}",
-        )
+    team_id = await _resolve_team_short_id(team_short_id, db)
 
-    await join_team_service(team_long_id, user_id, db)
+    joined = await db_join_team(team_id, user_id, db)
+    if joined is None:
+        # The team was deleted since its short id was cached
+        _team_id_by_short_id.invalidate(team_short_id)
+        raise _unknown_short_id_error(team_short_id)
+    if not joined:
+        raise _already_in_team_error(user_id, team_id)
 
 
 async def get_team_service(
@@ -131,40 +256,34 @@ async def get_team_service(
 async def promote_team_member_service(
     team_id: str, promote_member_id: str, caller_id: str, db: AsyncDatabase
 ) -> PromoteTeamMemberResponse:
-    existing_team = await db_get_team_by_id(team_id, db)
-    if not existing_team:
-        raise HTTPException(
-            status_code=404, detail=f"Team does not exist: team_id={team_id}"
-        )
+    if await db_promote_team_member(team_id, promote_member_id, caller_id, db):
+        return PromoteTeamMemberResponse()
+
+    # The guarded update matched nothing, work out which condition failed
+    await _require_team_exists(team_id, db)
 
-    if promote_member_id not in existing_team["member_ids"]:
+    if not await db_get_team_membership(team_id, promote_member_id, db):
         raise HTTPException(
             status_code=403,
             detail=f"Member is not in the team: member_id={promote_member_id}, team_id={team_id}",
         )
 
-    if caller_id not in existing_team["exec_member_ids"]:
+    if not await _is_team_exec(team_id, caller_id, db):
         raise HTTPException(
             status_code=403,
             detail=f"User does not have permission to promote members in team: user_id={caller_id}, team_id={team_id}",
         )
 
-    await db_promote_team_member(team_id, promote_member_id, db)
-
-    return PromoteTeamMemberResponse()
+    raise _team_changed_error(team_id)
 
 
 async def leave_team_service(
     team_id: str, user_id: str, db: AsyncDatabase
 ) -> LeaveTeamResponse:
-    existing_team = await db_get_team_by_id(team_id, db)
-    if not existing_team:
-        raise HTTPException(
-            status_code=404, detail=f"Team does not exist: team_id={team_id}"
-        )
+    await _require_team_exists(team_id, db)
 
-    user_in_team = user_id in existing_team["member_ids"]
-    if not user_in_team:
+    membership = await db_get_team_membership(team_id, user_id, db)
+    if not membership:
         raise HTTPException(
             status_code=403,
             detail=f"User is not a member of the team: user_id={user_id}, team_id={team_id}",
@@ -172,64 +291,61 @@ async def leave_team_service(
 
     # If the last executive member of a team leaves, the team is deleted
     if (
-        user_id in existing_team["exec_member_ids"]
-        and len(existing_team["exec_member_ids"]) == 1
+        membership["role"] == TeamRole.EXEC
+        and await db_count_team_members_by_role(team_id, TeamRole.EXEC, db) == 1
     ):
-        await delete_team_service(team_id, user_id, db)
-        return LeaveTeamResponse()
+        return LeaveTeamResponse(
+            team_deleted=await delete_team_service(team_id, user_id, db)
+        )
 
     await db_leave_team(team_id, user_id, db)
 
     return LeaveTeamResponse()
 
 
-async def delete_team_service(team_id: str, user_id: str, db: AsyncDatabase) -> None:
-    existing_team = await db_get_team_by_id(team_id, db)
-    if not existing_team:
-        raise HTTPException(
-            status_code=404, detail=f"Team does not exist: team_id={team_id}"
-        )
+# Returns whether the team was deleted here, and so left a deletion job queued
+async def delete_team_service(team_id: str, user_id: str, db: AsyncDatabase) -> bool:
+    await _require_team_exists(team_id, db)
 
     # User must be an executive member to delete the team
-    if user_id not in existing_team["exec_member_ids"]:
+    if not await _is_team_exec(team_id, user_id, db):
         raise HTTPException(
             status_code=403,
             detail=f"User does not have permission to delete team: user_id={user_id}, team_id={team_id}",
         )
 
-    await db_delete_team(team_id, db)
+    return await db_delete_team(team_id, db)
 
 
 async def kick_team_member_service(
     team_id: str, kick_member_id: str, caller_id: str, db: AsyncDatabase
 ) -> KickTeamMemberResponse:
-    existing_team = await db_get_team_by_id(team_id, db)
-    if not existing_team:
-        raise HTTPException(
-            status_code=404, detail=f"Team does not exist: team_id={team_id}"
-        )
+    if await db_kick_team_member(team_id, kick_member_id, caller_id, db):
+        return KickTeamMemberResponse()
+
+    # The guarded update matched nothing, work out which condition failed
+    await _require_team_exists(team_id, db)
 
-    if kick_member_id not in existing_team["member_ids"]:
+    kick_membership = await db_get_team_membership(team_id, kick_member_id, db)
+    if not kick_membership:
         raise HTTPException(
             status_code=403,
             detail=f"Member is not in the team: member_id={kick_member_id}, team_id={team_id}",
         )
 
-    if kick_member_id in existing_team["exec_member_ids"]:
+    if kick_membership["role"] == TeamRole.EXEC:
         raise HTTPException(
             status_code=403,
             detail=f"Member is an executive and cannot be kicked: member_id={kick_member_id}, team_id={team_id}",
         )
 
-    if caller_id not in existing_team["exec_member_ids"]:
+    if not await _is_team_exec(team_id, caller_id, db):
         raise HTTPException(
             status_code=403,
             detail=f"User does not have permission to kick members from team: user_id={caller_id}, team_id={team_id}",
         )
 
-    await db_kick_team_member(team_id, kick_member_id, db)
-
-    return KickTeamMemberResponse()
+    raise _team_changed_error(team_id)
 
 
 async def create_project_service(
@@ -252,28 +368,27 @@ async def create_project_service(
 async def delete_project_service(
     team_id: str, project_id: str, user_id: str, db: AsyncDatabase
 ) -> None:
-    existing_team = await db_get_team_by_id(team_id, db)
-    if not existing_team:
-        raise HTTPException(
-            status_code=404, detail=f"Team does not exist: team_id={team_id}"
-        )
+    if await db_delete_project(team_id, project_id, user_id, db):
+        return
 
-    if (
-        user_id not in existing_team["exec_member_ids"]
+    # The guarded delete matched nothing, work out which condition failed
+    await _require_team_exists(team_id, db)
+
+    if not await _is_team_exec(
+        team_id, user_id, db
     ):  # Implicitly checks for existing in team
         raise HTTPException(
             status_code=403,
             detail=f"User does not have permission to delete project: user_id={user_id}, project_id={project_id}",
         )
 
-    existing_project = await db_get_project_by_id(project_id, db)
-    if not existing_project or project_id not in existing_team["project_ids"]:
+    if not await db_team_lists_child(team_id, "project_ids", project_id, db):
         raise HTTPException(
             status_code=404,
             detail=f"Project does not exist: project_id={project_id}, team_id={team_id}",
         )
 
-    await db_delete_project(project_id, db)
+    raise _team_changed_error(team_id)
 
 
 async def create_event_for_team_service(
@@ -282,8 +397,9 @@ async def create_event_for_team_service(
 
     event_in_db_dict = await db_create_event_for_team(team_id, create_event_request, db)
 
-    # Schedule event reminders
-    schedule_event_reminders(event_in_db_dict["_id"], create_event_request.start, db)
+    await schedule_event_reminders(
+        event_in_db_dict["_id"], create_event_request.start, db
+    )
 
     return Event(
         id=event_in_db_dict["_id"],
@@ -300,49 +416,69 @@ async def create_event_for_team_service(
 async def delete_event_service(
     team_id: str, event_id: str, user_id: str, db: AsyncDatabase
 ) -> None:
-    existing_team = await db_get_team_by_id(team_id, db)
-    if not existing_team:
-        raise HTTPException(
-            status_code=404, detail=f"Team does not exist: team_id={team_id}"
-        )
+    if await db_delete_event(team_id, event_id, user_id, db):
+        return
 
-    if (
-        user_id not in existing_team["exec_member_ids"]
+    # The guarded delete matched nothing, work out which condition failed
+    await _require_team_exists(team_id, db)
+
+    if not await _is_team_exec(
+        team_id, user_id, db
     ):  # Implicitly checks for existing in team
         raise HTTPException(
             status_code=403,
             detail=f"User does not have permission to delete event: user_id={user_id}, event_id={event_id}",
         )
 
-    existing_event = await db_get_event_by_id(event_id, db)
-    if not existing_event or event_id not in existing_team["event_ids"]:
+    if not await db_team_lists_child(team_id, "event_ids", event_id, db):
         raise HTTPException(
             status_code=404,
             detail=f"Event does not exist: event_id={event_id}, team_id={team_id}",
         )
 
-    await db_delete_event(team_id, event_id, db)
+    raise _team_changed_error(team_id)
 
 
-async def get_team_events_service(
+# Reads the team for a member viewing its events. event_ids are only shipped for
+# teams whose events predate team_id.
+async def _get_team_for_event_reads(
     team_id: str, user_id: str, db: AsyncDatabase
-) -> List[Event]:
-
-    existing_team = await db_get_team_by_id(team_id, db)
+) -> Dict[str, Any]:
+    existing_team = await db_get_team_for_member(
+        team_id,
+        user_id,
+        db,
+        {
+            "child_refs_migrated": 1,
+            "event_ids": {
+                "$cond": [
+                    {"$eq": ["$child_refs_migrated", True]},
+                    "$$REMOVE",
+                    "$event_ids",
+                ]
+            },
+        },
+    )
     if not existing_team:
-        raise HTTPException(
-            status_code=404, detail=f"Team does not exist: team_id={team_id}"
-        )
-
-    if (
-        user_id not in existing_team["member_ids"]
-    ):  # Implicitly checks for existing in team
+        await _require_team_exists(team_id, db)
         raise HTTPException(
             status_code=403,
             detail=f"User does not have permission to view events: user_id={user_id}, team_id={team_id}",
         )
 
-    event_ids = existing_team["event_ids"]
+    return existing_team
+
+
+async def get_team_events_service(
+    team_id: str, user_id: str, db: AsyncDatabase
+) -> List[Event]:
+
+    existing_team = await _get_team_for_event_reads(team_id, user_id, db)
+
+    if existing_team.get("child_refs_migrated"):
+        events_in_db = await db_get_events_by_team_id(team_id, db)
+    else:
+        events_in_db = await db_get_events_by_ids(existing_team["event_ids"], db)
 
     events = [
         Event(
@@ -355,7 +491,318 @@ async def get_team_events_service(
             location=event_in_db_dict["location"],
             rsvp_ids=event_in_db_dict["rsvp_ids"],
         )
-        for event_in_db_dict in await db_get_events_by_ids(event_ids, db)
+        for event_in_db_dict in events_in_db
     ]
 
     return events
+
+
+async def get_team_events_page_service(
+    team_id: str,
+    user_id: str,
+    start_from: datetime | None,
+    start_to: datetime | None,
+    cursor: str | None,
+    limit: int,
+    db: AsyncDatabase,
+) -> GetTeamEventsResponse:
+
+    range_from = as_utc(start_from) if start_from is not None else None
+    range_to = as_utc(start_to) if start_to is not None else None
+    if range_from is not None and range_to is not None and range_from >= range_to:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid event range: from={range_from.isoformat()}, to={range_to.isoformat()}",
+        )
+
+    after_start, after_event_id = None, None
+    if cursor:
+        try:
+            decoded_cursor = decode_cursor(cursor)
+            after_start = as_utc(datetime.fromisoformat(decoded_cursor["start"]))
+            after_event_id = parse_object_id(decoded_cursor["id"])
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(
+                status_code=400, detail=f"Invalid cursor: cursor={cursor}"
+            )
+
+    existing_team = await _get_team_for_event_reads(team_id, user_id, db)
+
+    # Fetch one extra event to find out whether there is another page
+    events_in_db = await db_get_team_events_page(
+        team_id,
+        (
+            None
+            if existing_team.get("child_refs_migrated")
+            else existing_team["event_ids"]
+        ),
+        range_from,
+        range_to,
+        limit + 1,
+        db,
+        after_start,
+        after_event_id,
+    )
+    has_more = len(events_in_db) > limit
+    events_in_db = events_in_db[:limit]
+
+    return GetTeamEventsResponse(
+        events=[
+            Event(
+                id=event_in_db_dict["_id"],
+                name=event_in_db_dict["name"],
+                description=event_in_db_dict["description"],
+                start=event_in_db_dict["start"],
+                end=event_in_db_dict["end"],
+                colour=event_in_db_dict["colour"],
+                location=event_in_db_dict["location"],
+                rsvp_ids=event_in_db_dict["rsvp_ids"],
+            )
+            for event_in_db_dict in events_in_db
+        ],
+        next_cursor=(
+            encode_cursor(
+                {
+                    "start": events_in_db[-1]["start"].isoformat(),
+                    "id": events_in_db[-1]["_id"],
+                }
+            )
+            if has_more
+            else None
+        ),
+    )
+
+
+async def get_team_members_service(
+    team_id: str,
+    user_id: str,
+    role: TeamRole | None,
+    cursor: str | None,
+    limit: int,
+    db: AsyncDatabase,
+) -> GetTeamMembersResponse:
+
+    await _require_team_exists(team_id, db)
+
+    if not await db_get_team_membership(team_id, user_id, db):
+        raise HTTPException(
+            status_code=403,
+            detail=f"User is not a member of the team: user_id={user_id}, team_id={team_id}",
+        )
+
+    after_user_id = None
+    if cursor:
+        try:
+            after_user_id = parse_object_id(decode_cursor(cursor)["user_id"])
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(
+                status_code=400, detail=f"Invalid cursor: cursor={cursor}"
+            )
+
+    memberships = await db_get_team_members(team_id, role, limit + 1, db, after_user_id)
+    has_next_page = len(memberships) > limit
+    memberships = memberships[:limit]
+
+    users_by_id = {
+        user["_id"]: user
+        for user in await db_get_users_by_ids(
+            [membership["user_id"] for membership in memberships], db
+        )
+    }
+
+    members = []
+    for membership in memberships:
+        user = users_by_id.get(membership["user_id"], {})
+        members.append(
+            TeamMember(
+                user_id=membership["user_id"],
+                role=membership["role"],
+                joined_at=membership.get("joined_at"),
+                email=user.get("email"),
+                first_name=user.get("first_name", ""),
+                last_name=user.get("last_name", ""),
+            )
+        )
+
+    return GetTeamMembersResponse(
+        members=members,
+        next_cursor=(
+            encode_cursor({"user_id": memberships[-1]["user_id"]})
+            if has_next_page
+            else None
+        ),
+    )
+
+
+async def get_team_dashboard_service(
+    team_id: str, user_id: str, db: AsyncDatabase
+) -> GetTeamDashboardResponse:
+
+    dashboard = await db_get_team_dashboard(
+        team_id,
+        user_id,
+        datetime.now(timezone.utc),
+        TEAM_DASHBOARD_UPCOMING_EVENTS_LIMIT,
+        TEAM_DASHBOARD_MEMBER_PREVIEW_LIMIT,
+        db,
+    )
+    if not dashboard:
+        await _require_team_exists(team_id, db)
+        raise HTTPException(
+            status_code=403,
+            detail=f"User is not a member of the team: user_id={user_id}, team_id={team_id}",
+        )
+
+    return GetTeamDashboardResponse(
+        team=TeamSummary(
+            id=dashboard["_id"],
+            short_id=dashboard["short_id"],
+            name=dashboard["name"],
+            member_count=dashboard["member_count"],
+            role=dashboard["role"],
+        ),
+        projects=[
+            ProjectSummary(
+                id=project["_id"],
+                name=project["name"],
+                description=project["description"],
+                todo_count=project.get("todo_count", 0),
+            )
+            for project in dashboard["projects"]
+        ],
+        upcoming_events=[
+            Event(
+                id=event["_id"],
+                name=event["name"],
+                description=event["description"],
+                start=event["start"],
+                end=event["end"],
+                colour=event["colour"],
+                location=event["location"],
+                rsvp_ids=event["rsvp_ids"],
+            )
+            for event in dashboard["upcoming_events"]
+        ],
+        member_preview=[
+            TeamMember(
+                user_id=member["user_id"],
+                role=member["role"],
+                email=member.get("email"),
+                first_name=member.get("first_name", ""),
+                last_name=member.get("last_name", ""),
+            )
+            for member in dashboard["member_preview"]
+        ],
+    )
+
+
+# Keyed by team id, each entry holds the calendar_version it was rendered at
+_team_calendar_cache: TTLCache[Tuple[int, str]] = TTLCache(
+    TEAM_CALENDAR_CACHE_SIZE, TEAM_CALENDAR_CACHE_TTL_SECONDS
+)
+
+
+def _team_calendar_etag(team_id: str, calendar_version: int) -> str:
+    return f'"{team_id}-{calendar_version}"'
+
+
+def _team_calendar_url(team_id: str, token_version: int) -> str:
+    signature = sign_team_calendar(team_id, token_version)
+    return f"{BASE_URL}/teams/calendar/{team_id}.ics?signature={signature}"
+
+
+async def get_team_calendar_url_service(
+    team_id: str, user_id: str, db: AsyncDatabase
+) -> str:
+
+    team = await db_get_team_for_member(
+        team_id, user_id, db, {"calendar_token_version": 1}
+    )
+    if not team:
+        await _require_team_exists(team_id, db)
+        raise HTTPException(
+            status_code=403,
+            detail=f"User does not have permission to view events: user_id={user_id}, team_id={team_id}",
+        )
+
+    return _team_calendar_url(team_id, team.get("calendar_token_version", 0))
+
+
+# Revokes every calendar URL of the team, for a member whose link has leaked
+async def regenerate_team_calendar_url_service(
+    team_id: str, user_id: str, db: AsyncDatabase
+) -> str:
+
+    if not await db_get_team_for_member(team_id, user_id, db, {"_id": 1}):
+        await _require_team_exists(team_id, db)
+        raise HTTPException(
+            status_code=403,
+            detail=f"User does not have permission to view events: user_id={user_id}, team_id={team_id}",
+        )
+
+    token_version = await db_rotate_team_calendar_token(team_id, db)
+    if token_version is None:
+        raise HTTPException(
+            status_code=404, detail=f"Team does not exist: team_id={team_id}"
+        )
+
+    return _team_calendar_url(team_id, token_version)
+
+
+async def get_team_calendar_service(
+    team_id: str, signature: str, if_none_match: str | None, db: AsyncDatabase
+) -> TeamCalendarFeed:
+
+    # Every event write bumps calendar_version after writing the event, so a feed
+    # rendered after reading the version is never older than it
+    team = await db_get_team_by_id(
+        team_id,
+        db,
+        {
+            "name": 1,
+            "calendar_version": 1,
+            "calendar_token_version": 1,
+            "child_refs_migrated": 1,
+            "event_ids": {
+                "$cond": [
+                    {"$eq": ["$child_refs_migrated", True]},
+                    "$$REMOVE",
+                    "$event_ids",
+                ]
+            },
+        },
+    )
+    # A missing team gets the same answer as a bad signature, so the URL cannot be
+    # used to probe for team ids
+    if not team or not verify_team_calendar_signature(
+        team_id, team.get("calendar_token_version", 0), signature
+    ):
+        raise HTTPException(
+            status_code=403,
+            detail=f"Invalid calendar signature: team_id={team_id}",
+        )
+
+    calendar_version = team.get("calendar_version", 0)
+    etag = _team_calendar_etag(team_id, calendar_version)
+    if etag_matches(etag, if_none_match):
+        return TeamCalendarFeed(etag=etag)
+
+    cached = _team_calendar_cache.get(team_id)
+    if cached is not None and cached[0] == calendar_version:
+        return TeamCalendarFeed(etag=etag, body=cached[1])
+
+    chunks = [render_calendar_header(team["name"])]
+    async for event in db_iter_team_calendar_events(
+        team_id,
+        None if team.get("child_refs_migrated") else team["event_ids"],
+        db,
+    ):
+        start = parse_event_time(event.get("start"))
+        end = parse_event_time(event.get("end"))
+        if start is not None and end is not None:
+            chunks.append(render_calendar_event({**event, "start": start, "end": end}))
+    chunks.append(render_calendar_footer())
+
+    body = "".join(chunks)
+    _team_calendar_cache.set(team_id, (calendar_version, body))
+    return TeamCalendarFeed(etag=etag, body=body)
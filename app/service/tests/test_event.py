@@ -1,12 +1,31 @@
+from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, patch
 import pytest
+from bson import ObjectId
+from fastapi import HTTPException
 
-from app.schemas.event import Event, RSVPStatus, UpdateEventDetailsRequest
+from app.core.security import sign_rsvp_reply
+from app.schemas.event import (
+    Event,
+    RSVPCounts,
+    RSVPInviteStatus,
+    RSVPStatus,
+    UpdateEventDetailsRequest,
+)
 from app.service.event import (
+    get_event_guest_list_service,
+    get_event_rsvp_counts_service,
+    dispatch_due_reminders,
     get_event_rsvps_service,
     get_event_service,
+    recompute_event_rsvp_counts_service,
     reply_rsvp_service,
+    reschedule_event_reminders,
+    schedule_event_reminders,
     send_rsvp_email_service,
+    send_rsvp_emails_service,
+    send_reminder_email,
+    send_rsvp_invite_email,
     update_event_details_service,
 )
 from app.service.team import get_team_events_service
@@ -83,9 +102,129 @@ async def test_send_rsvp_email_service_success(
     mock_db_add_rsvp_id_to_event.return_value = None
     mock_send_rsvp_invite_email.return_value = None
 
-    result = await send_rsvp_email_service(MOCK_USER_EMAIL, MOCK_EVENT_ID, mock_db)
+    result = await send_rsvp_email_service(MOCK_EVENT_ID, MOCK_USER_EMAIL, mock_db)
 
     assert result == MOCK_INSERTED_ID
+    mock_db_create_rsvp_invite.assert_called_once_with(
+        MOCK_EVENT_ID, MOCK_USER_EMAIL, mock_db
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.enqueue_email")
+async def test_send_rsvp_invite_email_success(mock_enqueue_email):
+    mock_db = AsyncMock()
+    event = Event(
+        id=MOCK_EVENT_ID,
+        name=MOCK_EVENT_NAME,
+        description=MOCK_EVENT_DESCRIPTION,
+        start=MOCK_EVENT_START,
+        end=MOCK_EVENT_END,
+        colour=MOCK_EVENT_COLOUR,
+        location=MOCK_EVENT_LOCATION,
+        rsvp_ids=[],
+    )
+
+    await send_rsvp_invite_email(MOCK_USER_EMAIL, event, MOCK_RSVP_ID, mock_db)
+
+    to_email, subject, html_content, db = mock_enqueue_email.call_args.args
+    assert to_email == MOCK_USER_EMAIL
+    assert subject == "You're invited to an event!"
+    assert f"/events/reply-rsvp/{MOCK_RSVP_ID}/accepted?expires=" in html_content
+    expires = int(html_content.split("expires=")[1].split("&")[0])
+    assert f"signature={sign_rsvp_reply(MOCK_RSVP_ID, expires)}" in html_content
+    assert db is mock_db
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.enqueue_batch_email")
+@patch("app.service.event.db_create_rsvp_invites")
+@patch("app.service.event.db_get_rsvp_ids_by_email")
+@patch("app.service.event.get_event_service")
+async def test_send_rsvp_emails_service_success(
+    mock_get_event_service,
+    mock_db_get_rsvp_ids_by_email,
+    mock_db_create_rsvp_invites,
+    mock_enqueue_batch_email,
+):
+    mock_db = AsyncMock()
+    invited_email, new_email = "invited@example.com", "new@example.com"
+    new_rsvp_id = MOCK_RSVP_2_ID
+    mock_get_event_service.return_value = Event(
+        id=MOCK_EVENT_ID,
+        name=MOCK_EVENT_NAME,
+        description=MOCK_EVENT_DESCRIPTION,
+        start=MOCK_EVENT_START,
+        end=MOCK_EVENT_END,
+        colour=MOCK_EVENT_COLOUR,
+        location=MOCK_EVENT_LOCATION,
+        rsvp_ids=[MOCK_RSVP_ID],
+    )
+    mock_db_get_rsvp_ids_by_email.return_value = {invited_email: MOCK_RSVP_ID}
+    mock_db_create_rsvp_invites.return_value = [
+        {"_id": new_rsvp_id, "email": new_email, "status": RSVPStatus.PENDING}
+    ]
+
+    result = await send_rsvp_emails_service(
+        MOCK_EVENT_ID,
+        [invited_email, new_email, "NEW@example.com", "not-an-email"],
+        mock_db,
+    )
+
+    assert [(item.email, item.status, item.rsvp_id) for item in result] == [
+        (invited_email, RSVPInviteStatus.ALREADY_INVITED, MOCK_RSVP_ID),
+        (new_email, RSVPInviteStatus.INVITED, new_rsvp_id),
+        ("not-an-email", RSVPInviteStatus.INVALID_EMAIL, None),
+    ]
+    mock_db_create_rsvp_invites.assert_called_once_with(
+        MOCK_EVENT_ID, [new_email], mock_db
+    )
+    recipients, subject, html_content, _ = mock_enqueue_batch_email.call_args.args
+    (recipient,) = recipients
+    assert recipient["to_email"] == new_email
+    assert recipient["substitutions"]["-rsvp_id-"] == new_rsvp_id
+    assert "-rsvp_signature-" in recipient["substitutions"]
+    assert (
+        "/events/reply-rsvp/-rsvp_id-/accepted?expires=" in html_content
+        and "signature=-rsvp_signature-" in html_content
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.enqueue_batch_email")
+@patch("app.service.event.db_create_rsvp_invites")
+@patch("app.service.event.db_get_rsvp_ids_by_email")
+@patch("app.service.event.get_event_service")
+async def test_send_rsvp_emails_service_already_invited_other_case(
+    mock_get_event_service,
+    mock_db_get_rsvp_ids_by_email,
+    mock_db_create_rsvp_invites,
+    mock_enqueue_batch_email,
+):
+    mock_db = AsyncMock()
+    mock_get_event_service.return_value = Event(
+        id=MOCK_EVENT_ID,
+        name=MOCK_EVENT_NAME,
+        description=MOCK_EVENT_DESCRIPTION,
+        start=MOCK_EVENT_START,
+        end=MOCK_EVENT_END,
+        colour=MOCK_EVENT_COLOUR,
+        location=MOCK_EVENT_LOCATION,
+        rsvp_ids=[MOCK_RSVP_ID],
+    )
+    # alice@example.com was invited before
+    mock_db_get_rsvp_ids_by_email.return_value = {"alice@example.com": MOCK_RSVP_ID}
+    mock_db_create_rsvp_invites.return_value = []
+
+    result = await send_rsvp_emails_service(
+        MOCK_EVENT_ID, ["Alice@Example.com"], mock_db
+    )
+
+    assert [(item.email, item.status, item.rsvp_id) for item in result] == [
+        ("Alice@Example.com", RSVPInviteStatus.ALREADY_INVITED, MOCK_RSVP_ID),
+    ]
+    mock_db_create_rsvp_invites.assert_called_once_with(MOCK_EVENT_ID, [], mock_db)
+    mock_enqueue_batch_email.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -93,10 +232,50 @@ async def test_send_rsvp_email_service_success(
 async def test_reply_rsvp_service(mock_db_record_rsvp_response):
     mock_db = AsyncMock()
     mock_db_record_rsvp_response.return_value = None
+    expires = int((datetime.now(timezone.utc) + timedelta(days=1)).timestamp())
 
-    result = await reply_rsvp_service(MOCK_RSVP_ID, RSVPStatus.ACCEPTED, mock_db)
+    result = await reply_rsvp_service(
+        MOCK_RSVP_ID,
+        RSVPStatus.ACCEPTED,
+        expires,
+        sign_rsvp_reply(MOCK_RSVP_ID, expires),
+        mock_db,
+    )
 
     assert result is None
+    mock_db_record_rsvp_response.assert_called_once_with(
+        MOCK_RSVP_ID, RSVPStatus.ACCEPTED, mock_db
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "rsvp_id, expires_in, signed",
+    [
+        # Signed for another RSVP
+        (MOCK_RSVP_2_ID, timedelta(days=1), True),
+        (MOCK_RSVP_ID, -timedelta(minutes=1), True),
+        (MOCK_RSVP_ID, timedelta(days=1), False),
+    ],
+)
+@patch("app.service.event.db_record_rsvp_response")
+async def test_reply_rsvp_service_failure_bad_link(
+    mock_db_record_rsvp_response, rsvp_id, expires_in, signed
+):
+    mock_db = AsyncMock()
+    expires = int((datetime.now(timezone.utc) + expires_in).timestamp())
+
+    with pytest.raises(HTTPException) as exc_info:
+        await reply_rsvp_service(
+            rsvp_id,
+            RSVPStatus.ACCEPTED,
+            expires,
+            sign_rsvp_reply(MOCK_RSVP_ID, expires) if signed else None,
+            mock_db,
+        )
+
+    assert exc_info.value.status_code == 403
+    mock_db_record_rsvp_response.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -138,13 +317,13 @@ async def test_get_event_rsvps_service_success(
 
 
 @pytest.mark.asyncio
-@patch("app.service.team.db_get_team_by_id")
+@patch("app.service.team.db_get_team_for_member")
 @patch("app.service.team.db_get_events_by_ids")
 async def test_get_team_events_service_success(
-    mock_db_get_events_by_ids, mock_db_get_team_by_id
+    mock_db_get_events_by_ids, mock_db_get_team_for_member
 ):
     mock_db = AsyncMock()
-    mock_db_get_team_by_id.return_value = {
+    mock_db_get_team_for_member.return_value = {
         "_id": MOCK_EVENT_ID,
         "name": MOCK_EVENT_NAME,
         "description": MOCK_EVENT_DESCRIPTION,
@@ -202,3 +381,429 @@ async def test_update_event_details_service(
     )
 
     assert result is None
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.reschedule_event_reminders")
+@patch("app.service.event.db_update_event_details")
+@patch("app.service.event.db_get_event_or_none")
+async def test_update_event_details_service_moves_start(
+    mock_db_get_event_or_none,
+    mock_db_update_event_details,
+    mock_reschedule_event_reminders,
+):
+    mock_db = AsyncMock()
+    old_start = datetime(2030, 1, 1, 10)
+    new_start = datetime(2030, 1, 1, 11, tzinfo=timezone.utc)
+    mock_db_get_event_or_none.return_value = {
+        "_id": MOCK_EVENT_ID,
+        "start": old_start,
+        "end": datetime(2030, 1, 1, 12),
+    }
+
+    await update_event_details_service(
+        MOCK_EVENT_ID,
+        UpdateEventDetailsRequest(
+            name=MOCK_NEW_EVENT_NAME,
+            description=MOCK_NEW_EVENT_DESCRIPTION,
+            public=True,
+            start=new_start,
+        ),
+        mock_db,
+    )
+
+    new_event_details = mock_db_update_event_details.call_args.args[1]
+    assert new_event_details["start"] == new_start
+    assert new_event_details["end"] == datetime(2030, 1, 1, 12, tzinfo=timezone.utc)
+    mock_reschedule_event_reminders.assert_called_once_with(
+        MOCK_EVENT_ID, new_start, mock_db
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.db_update_event_details")
+@patch("app.service.event.db_get_event_or_none")
+async def test_update_event_details_service_failure_end_before_start(
+    mock_db_get_event_or_none, mock_db_update_event_details
+):
+    mock_db = AsyncMock()
+    mock_db_get_event_or_none.return_value = {
+        "_id": MOCK_EVENT_ID,
+        "start": datetime(2030, 1, 1, 10),
+        "end": datetime(2030, 1, 1, 12),
+    }
+
+    with pytest.raises(HTTPException) as exc_info:
+        await update_event_details_service(
+            MOCK_EVENT_ID,
+            UpdateEventDetailsRequest(
+                name=MOCK_NEW_EVENT_NAME,
+                description=MOCK_NEW_EVENT_DESCRIPTION,
+                public=True,
+                end=datetime(2030, 1, 1, 9),
+            ),
+            mock_db,
+        )
+
+    assert exc_info.value.status_code == 400
+    mock_db_update_event_details.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.reschedule_event_reminders")
+@patch("app.service.event.db_update_event_details")
+@patch("app.service.event.db_get_event_or_none")
+async def test_update_event_details_service_string_times(
+    mock_db_get_event_or_none,
+    mock_db_update_event_details,
+    mock_reschedule_event_reminders,
+):
+    mock_db = AsyncMock()
+    # Not yet reached by the event datetimes migration
+    mock_db_get_event_or_none.return_value = {
+        "_id": MOCK_EVENT_ID,
+        "start": "2030-01-01T10:00:00Z",
+        "end": "2030-01-01T12:00:00Z",
+    }
+
+    await update_event_details_service(
+        MOCK_EVENT_ID,
+        UpdateEventDetailsRequest(
+            name=MOCK_NEW_EVENT_NAME,
+            description=MOCK_NEW_EVENT_DESCRIPTION,
+            public=True,
+            start=datetime(2030, 1, 1, 10, tzinfo=timezone.utc),
+            end=datetime(2030, 1, 1, 13, tzinfo=timezone.utc),
+        ),
+        mock_db,
+    )
+
+    new_event_details = mock_db_update_event_details.call_args.args[1]
+    assert new_event_details["end"] == datetime(2030, 1, 1, 13, tzinfo=timezone.utc)
+    mock_reschedule_event_reminders.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.db_update_event_details")
+@patch("app.service.event.db_get_event_or_none")
+async def test_update_event_details_service_failure_unparseable_stored_time(
+    mock_db_get_event_or_none, mock_db_update_event_details
+):
+    mock_db = AsyncMock()
+    mock_db_get_event_or_none.return_value = {
+        "_id": MOCK_EVENT_ID,
+        "start": "not a date",
+        "end": datetime(2030, 1, 1, 12),
+    }
+
+    with pytest.raises(HTTPException) as exc_info:
+        await update_event_details_service(
+            MOCK_EVENT_ID,
+            UpdateEventDetailsRequest(
+                name=MOCK_NEW_EVENT_NAME,
+                description=MOCK_NEW_EVENT_DESCRIPTION,
+                public=True,
+                end=datetime(2030, 1, 1, 13),
+            ),
+            mock_db,
+        )
+
+    assert exc_info.value.status_code == 400
+    mock_db_update_event_details.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.db_cancel_reminders")
+@patch("app.service.event.db_schedule_reminders")
+@patch("app.service.event.db_get_event_reminders")
+async def test_reschedule_event_reminders_success(
+    mock_db_get_event_reminders,
+    mock_db_schedule_reminders,
+    mock_db_cancel_reminders,
+):
+    mock_db = AsyncMock()
+    event_start = (datetime.now(timezone.utc) + timedelta(hours=2)).replace(
+        microsecond=0
+    )
+    # Mongo hands dates back without a zone
+    unchanged_due_at = (event_start - timedelta(minutes=10)).replace(tzinfo=None)
+    mock_db_get_event_reminders.return_value = {
+        "10 minutes": {"due_at": unchanged_due_at},
+        "1 hour": {"due_at": unchanged_due_at},
+        "1 day": {"due_at": unchanged_due_at},
+    }
+
+    await reschedule_event_reminders(MOCK_EVENT_ID, event_start, mock_db)
+
+    mock_db_schedule_reminders.assert_called_once_with(
+        MOCK_EVENT_ID, [("1 hour", event_start - timedelta(hours=1))], mock_db
+    )
+    mock_db_cancel_reminders.assert_called_once_with(MOCK_EVENT_ID, ["1 day"], mock_db)
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.enqueue_batch_email")
+@patch("app.service.event.db_iter_accepted_rsvp_batches")
+@patch("app.service.event.db_get_event_or_none")
+async def test_send_reminder_email_success(
+    mock_db_get_event_or_none,
+    mock_db_iter_accepted_rsvp_batches,
+    mock_enqueue_batch_email,
+):
+    mock_db = AsyncMock()
+    mock_db_get_event_or_none.return_value = {
+        "_id": MOCK_EVENT_ID,
+        "name": MOCK_EVENT_NAME,
+        "start": datetime.now(timezone.utc) + timedelta(hours=1),
+        "location": MOCK_EVENT_LOCATION,
+        "rsvp_ids": [MOCK_RSVP_ID, MOCK_RSVP_2_ID],
+    }
+
+    async def batches(*args):
+        yield [{"_id": MOCK_RSVP_ID, "email": MOCK_USER_EMAIL}]
+        yield [{"_id": MOCK_RSVP_2_ID, "email": MOCK_USER_2_EMAIL}]
+
+    mock_db_iter_accepted_rsvp_batches.side_effect = batches
+
+    await send_reminder_email(MOCK_EVENT_ID, "1 hour", mock_db, "reminder:1")
+
+    assert mock_enqueue_batch_email.call_count == 2
+    recipients = mock_enqueue_batch_email.call_args_list[0].args[0]
+    assert recipients == [{"to_email": MOCK_USER_EMAIL, "rsvp_id": MOCK_RSVP_ID}]
+    # Each batch is keyed so a retried reminder does not queue it twice
+    assert [call.args[4] for call in mock_enqueue_batch_email.call_args_list] == [
+        "reminder:1:0",
+        "reminder:1:1",
+    ]
+    assert mock_db_iter_accepted_rsvp_batches.call_args.args[:2] == (
+        MOCK_EVENT_ID,
+        [MOCK_RSVP_ID, MOCK_RSVP_2_ID],
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.enqueue_batch_email")
+@patch("app.service.event.db_get_event_or_none")
+async def test_send_reminder_email_skips_started_event(
+    mock_db_get_event_or_none, mock_enqueue_batch_email
+):
+    mock_db = AsyncMock()
+    mock_db_get_event_or_none.return_value = {
+        "_id": MOCK_EVENT_ID,
+        "start": datetime.now(timezone.utc) - timedelta(minutes=1),
+    }
+
+    await send_reminder_email(MOCK_EVENT_ID, "10 minutes", mock_db)
+
+    mock_enqueue_batch_email.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.enqueue_batch_email")
+@patch("app.service.event.db_get_event_or_none")
+async def test_send_reminder_email_skips_unparseable_start(
+    mock_db_get_event_or_none, mock_enqueue_batch_email
+):
+    mock_db = AsyncMock()
+    mock_db_get_event_or_none.return_value = {
+        "_id": MOCK_EVENT_ID,
+        "start": "not a date",
+    }
+
+    await send_reminder_email(MOCK_EVENT_ID, "10 minutes", mock_db)
+
+    mock_enqueue_batch_email.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.db_schedule_reminders")
+async def test_schedule_event_reminders_success(mock_db_schedule_reminders):
+    mock_db = AsyncMock()
+    event_start = datetime.now(timezone.utc) + timedelta(hours=2)
+
+    await schedule_event_reminders(MOCK_EVENT_ID, event_start, mock_db)
+
+    # The 1 day and 1 week reminders would already be due
+    _, reminders, _ = mock_db_schedule_reminders.call_args.args
+    assert reminders == [
+        ("10 minutes", event_start - timedelta(minutes=10)),
+        ("1 hour", event_start - timedelta(hours=1)),
+    ]
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.db_mark_reminder_sent")
+@patch("app.service.event.send_reminder_email")
+@patch("app.service.event.db_claim_reminders")
+async def test_dispatch_due_reminders_success(
+    mock_db_claim_reminders, mock_send_reminder_email, mock_db_mark_reminder_sent
+):
+    mock_db = AsyncMock()
+    sent = {"_id": ObjectId(), "event_id": ObjectId(MOCK_EVENT_ID), "label": "1 hour"}
+    failed = {"_id": ObjectId(), "event_id": ObjectId(), "label": "1 day"}
+    mock_db_claim_reminders.side_effect = [[sent, failed], []]
+    mock_send_reminder_email.side_effect = [None, RuntimeError("boom")]
+
+    result = await dispatch_due_reminders(mock_db)
+
+    assert result is True
+    mock_send_reminder_email.assert_any_call(
+        MOCK_EVENT_ID, "1 hour", mock_db, f"reminder:{sent['_id']}"
+    )
+    # The failed reminder is left to its lease for a later dispatch
+    mock_db_mark_reminder_sent.assert_called_once_with(sent["_id"], mock_db)
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.db_claim_reminders")
+async def test_dispatch_due_reminders_stops_at_time_budget(mock_db_claim_reminders):
+    mock_db = AsyncMock()
+
+    result = await dispatch_due_reminders(mock_db, 0)
+
+    assert result is False
+    mock_db_claim_reminders.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.db_count_rsvps_by_status")
+@patch("app.service.event.db_get_event_for_rsvp_reads")
+async def test_get_event_rsvp_counts_service_success(
+    mock_db_get_event_for_rsvp_reads, mock_db_count_rsvps_by_status
+):
+    mock_db = AsyncMock()
+    mock_db_get_event_for_rsvp_reads.return_value = {
+        "_id": MOCK_EVENT_ID,
+        "rsvp_counts": {"pending": 2, "accepted": 5},
+    }
+
+    result = await get_event_rsvp_counts_service(MOCK_EVENT_ID, mock_db)
+
+    assert result == RSVPCounts(pending=2, accepted=5, declined=0)
+    mock_db_count_rsvps_by_status.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.db_count_rsvps_by_status")
+@patch("app.service.event.db_get_event_for_rsvp_reads")
+async def test_get_event_rsvp_counts_service_legacy_event(
+    mock_db_get_event_for_rsvp_reads, mock_db_count_rsvps_by_status
+):
+    mock_db = AsyncMock()
+    mock_db_get_event_for_rsvp_reads.return_value = {
+        "_id": MOCK_EVENT_ID,
+        "rsvp_ids": [MOCK_RSVP_ID],
+    }
+    mock_db_count_rsvps_by_status.return_value = {"declined": 1}
+
+    result = await get_event_rsvp_counts_service(MOCK_EVENT_ID, mock_db)
+
+    assert result == RSVPCounts(declined=1)
+    mock_db_count_rsvps_by_status.assert_called_once_with([MOCK_RSVP_ID], mock_db)
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.db_get_event_for_rsvp_reads")
+async def test_get_event_rsvp_counts_service_failure_not_found(
+    mock_db_get_event_for_rsvp_reads,
+):
+    mock_db = AsyncMock()
+    mock_db_get_event_for_rsvp_reads.return_value = None
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_event_rsvp_counts_service(MOCK_EVENT_ID, mock_db)
+
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.db_recompute_rsvp_counts")
+@patch("app.service.event.db_get_event_for_rsvp_reads")
+async def test_recompute_event_rsvp_counts_service_success(
+    mock_db_get_event_for_rsvp_reads, mock_db_recompute_rsvp_counts
+):
+    mock_db = AsyncMock()
+    mock_db_get_event_for_rsvp_reads.return_value = {
+        "_id": MOCK_EVENT_ID,
+        "rsvp_counts": {"pending": 3},
+    }
+    mock_db_recompute_rsvp_counts.return_value = {
+        "pending": 2,
+        "accepted": 1,
+        "declined": 0,
+    }
+
+    result = await recompute_event_rsvp_counts_service(MOCK_EVENT_ID, mock_db)
+
+    assert result == RSVPCounts(pending=2, accepted=1)
+    mock_db_recompute_rsvp_counts.assert_called_once_with(MOCK_EVENT_ID, mock_db)
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.db_recompute_rsvp_counts")
+@patch("app.service.event.db_get_event_for_rsvp_reads")
+async def test_recompute_event_rsvp_counts_service_failure_legacy_event(
+    mock_db_get_event_for_rsvp_reads, mock_db_recompute_rsvp_counts
+):
+    mock_db = AsyncMock()
+    mock_db_get_event_for_rsvp_reads.return_value = {
+        "_id": MOCK_EVENT_ID,
+        "rsvp_ids": [MOCK_RSVP_ID],
+    }
+
+    with pytest.raises(HTTPException) as exc_info:
+        await recompute_event_rsvp_counts_service(MOCK_EVENT_ID, mock_db)
+
+    assert exc_info.value.status_code == 409
+    mock_db_recompute_rsvp_counts.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.db_get_event_rsvps_page")
+@patch("app.service.event.db_get_event_for_rsvp_reads")
+async def test_get_event_guest_list_service_success(
+    mock_db_get_event_for_rsvp_reads, mock_db_get_event_rsvps_page
+):
+    mock_db = AsyncMock()
+    mock_db_get_event_for_rsvp_reads.return_value = {"_id": MOCK_EVENT_ID}
+    mock_db_get_event_rsvps_page.return_value = [
+        {"_id": MOCK_RSVP_ID, "email": MOCK_USER_EMAIL, "status": "accepted"},
+        {"_id": MOCK_RSVP_2_ID, "email": MOCK_USER_2_EMAIL, "status": "accepted"},
+    ]
+
+    first_page = await get_event_guest_list_service(
+        MOCK_EVENT_ID, RSVPStatus.ACCEPTED, None, 1, mock_db
+    )
+
+    assert [rsvp.id for rsvp in first_page.rsvps] == [MOCK_RSVP_ID]
+    assert first_page.next_cursor is not None
+    mock_db_get_event_rsvps_page.assert_called_once_with(
+        MOCK_EVENT_ID, None, RSVPStatus.ACCEPTED, 2, mock_db, None
+    )
+
+    mock_db_get_event_rsvps_page.return_value = (
+        mock_db_get_event_rsvps_page.return_value[1:]
+    )
+    second_page = await get_event_guest_list_service(
+        MOCK_EVENT_ID, RSVPStatus.ACCEPTED, first_page.next_cursor, 1, mock_db
+    )
+
+    assert [rsvp.id for rsvp in second_page.rsvps] == [MOCK_RSVP_2_ID]
+    assert second_page.next_cursor is None
+    assert mock_db_get_event_rsvps_page.call_args.args[5] == MOCK_RSVP_ID
+
+
+@pytest.mark.asyncio
+@patch("app.service.event.db_get_event_for_rsvp_reads")
+async def test_get_event_guest_list_service_failure_invalid_cursor(
+    mock_db_get_event_for_rsvp_reads,
+):
+    mock_db = AsyncMock()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_event_guest_list_service(
+            MOCK_EVENT_ID, None, "not-a-cursor", 5, mock_db
+        )
+
+    assert exc_info.value.status_code == 400
+    mock_db_get_event_for_rsvp_reads.assert_not_called()
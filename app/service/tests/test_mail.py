@@ -0,0 +1,172 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from bson import ObjectId
+
+from app.core.constants import EMAIL_BATCH_MAX_RECIPIENTS, EMAIL_MAX_ATTEMPTS
+from app.core.mail import EmailDeliveryError
+from app.service.mail import drain_email_outbox, enqueue_batch_email
+from app.test_shared.constants import MOCK_USER_2_EMAIL, MOCK_USER_EMAIL
+
+
+def _outbox_email(attempts=1):
+    return {
+        "_id": ObjectId(),
+        "to_email": MOCK_USER_EMAIL,
+        "subject": "Verify your account",
+        "html_content": "<p>123456</p>",
+        "attempts": attempts,
+    }
+
+
+@pytest.mark.asyncio
+@patch("app.service.mail.db_fail_exhausted_emails", AsyncMock())
+@patch("app.service.mail.db_mark_email_sent")
+@patch("app.service.mail.db_claim_emails")
+async def test_drain_email_outbox_success(
+    mock_db_claim_emails, mock_db_mark_email_sent
+):
+    mock_db = AsyncMock()
+    mock_transport = AsyncMock()
+    emails = [_outbox_email(), _outbox_email()]
+    mock_db_claim_emails.side_effect = [emails, []]
+
+    result = await drain_email_outbox(mock_db, transport=mock_transport)
+
+    assert result is True
+    assert mock_transport.send.call_count == 2
+    mock_transport.send.assert_any_call(
+        MOCK_USER_EMAIL, "Verify your account", "<p>123456</p>"
+    )
+    assert {call.args[0] for call in mock_db_mark_email_sent.call_args_list} == {
+        email["_id"] for email in emails
+    }
+
+
+@pytest.mark.asyncio
+@patch("app.service.mail.db_fail_exhausted_emails", AsyncMock())
+@patch("app.service.mail.db_schedule_email_retry")
+@patch("app.service.mail.db_claim_emails")
+async def test_drain_email_outbox_retries_retryable_error(
+    mock_db_claim_emails, mock_db_schedule_email_retry
+):
+    mock_db = AsyncMock()
+    mock_transport = AsyncMock()
+    mock_transport.send.side_effect = EmailDeliveryError("Timed out")
+    email = _outbox_email()
+    mock_db_claim_emails.side_effect = [[email], []]
+
+    await drain_email_outbox(mock_db, transport=mock_transport)
+
+    mock_db_schedule_email_retry.assert_called_once()
+    assert mock_db_schedule_email_retry.call_args.args[0] == email["_id"]
+    assert mock_db_schedule_email_retry.call_args.args[2] == "Timed out"
+
+
+@pytest.mark.asyncio
+@patch("app.service.mail.db_fail_exhausted_emails", AsyncMock())
+@patch("app.service.mail.db_schedule_email_retry")
+@patch("app.service.mail.db_record_delivered_recipients")
+@patch("app.service.mail.db_claim_emails")
+async def test_drain_email_outbox_records_partial_batch_delivery(
+    mock_db_claim_emails,
+    mock_db_record_delivered_recipients,
+    mock_db_schedule_email_retry,
+):
+    mock_db = AsyncMock()
+    mock_transport = AsyncMock()
+    mock_transport.send_batch.side_effect = EmailDeliveryError("Timed out", delivered=1)
+    recipients = [{"to_email": MOCK_USER_EMAIL}, {"to_email": MOCK_USER_2_EMAIL}]
+    email = {**_outbox_email(), "recipients": recipients}
+    mock_db_claim_emails.side_effect = [[email], []]
+
+    await drain_email_outbox(mock_db, transport=mock_transport)
+
+    mock_db_record_delivered_recipients.assert_called_once_with(
+        email["_id"], recipients[:1], recipients[1:], mock_db
+    )
+    mock_db_schedule_email_retry.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("app.service.mail.db_fail_exhausted_emails", AsyncMock())
+@patch("app.service.mail.db_mark_email_failed")
+@patch("app.service.mail.db_claim_emails")
+async def test_drain_email_outbox_fails_after_last_attempt(
+    mock_db_claim_emails, mock_db_mark_email_failed
+):
+    mock_db = AsyncMock()
+    mock_transport = AsyncMock()
+    mock_transport.send.side_effect = EmailDeliveryError("Timed out")
+    rejected_transport = AsyncMock()
+    rejected_transport.send.side_effect = EmailDeliveryError(
+        "Bad address", retryable=False
+    )
+    mock_db_claim_emails.side_effect = [
+        [_outbox_email(attempts=EMAIL_MAX_ATTEMPTS)],
+        [],
+        [_outbox_email()],
+        [],
+    ]
+
+    await drain_email_outbox(mock_db, transport=mock_transport)
+    await drain_email_outbox(mock_db, transport=rejected_transport)
+
+    assert mock_db_mark_email_failed.call_count == 2
+
+
+@pytest.mark.asyncio
+@patch("app.service.mail.db_fail_exhausted_emails", AsyncMock())
+@patch("app.service.mail.db_mark_email_sent")
+@patch("app.service.mail.db_schedule_email_retry")
+@patch("app.service.mail.db_claim_emails")
+async def test_drain_email_outbox_retries_unexpected_error(
+    mock_db_claim_emails, mock_db_schedule_email_retry, mock_db_mark_email_sent
+):
+    mock_db = AsyncMock()
+    mock_transport = AsyncMock()
+    mock_transport.send.side_effect = [RuntimeError("boom"), None]
+    emails = [_outbox_email(), _outbox_email()]
+    mock_db_claim_emails.side_effect = [emails, []]
+
+    result = await drain_email_outbox(mock_db, transport=mock_transport)
+
+    # The error is recorded as a failed attempt and the drain carries on
+    assert result is True
+    mock_db_schedule_email_retry.assert_called_once()
+    mock_db_mark_email_sent.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("app.service.mail.db_fail_exhausted_emails", AsyncMock())
+@patch("app.service.mail.db_claim_emails")
+async def test_drain_email_outbox_stops_at_time_budget(mock_db_claim_emails):
+    mock_db = AsyncMock()
+
+    result = await drain_email_outbox(mock_db, 0, transport=AsyncMock())
+
+    assert result is False
+    mock_db_claim_emails.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.service.mail.db_enqueue_emails")
+async def test_enqueue_batch_email_dedupe_key(mock_db_enqueue_emails):
+    mock_db = AsyncMock()
+    recipients = [
+        {"to_email": MOCK_USER_EMAIL} for _ in range(EMAIL_BATCH_MAX_RECIPIENTS + 1)
+    ]
+
+    await enqueue_batch_email(
+        recipients, "Reminder", "<p>Soon</p>", mock_db, "reminder:1:0"
+    )
+
+    messages, _ = mock_db_enqueue_emails.call_args.args
+    assert [len(message["recipients"]) for message in messages] == [
+        EMAIL_BATCH_MAX_RECIPIENTS,
+        1,
+    ]
+    assert [message["dedupe_key"] for message in messages] == [
+        "reminder:1:0:0",
+        "reminder:1:0:1",
+    ]
@@ -1,21 +1,35 @@
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, patch
 import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from app.core.common import encode_cursor
 from app.schemas.project import (
     AddTodoRequest,
+    ArchiveTodosRequest,
     AddTodoStatusRequest,
     DeleteTodoRequest,
     DeleteTodoStatusRequest,
     GetProjectResponse,
     GetTodoItemsResponse,
     ReorderTodoStatusesRequest,
+    ReviewProposedTodosRequest,
     UpdateTodoRequest,
 )
+from app.schemas.team import TeamRole
 from app.service.project import (
     approve_todo_service,
+    assign_todo_service,
+    archive_todos_service,
+    get_archived_todos_service,
+    count_proposed_todos_service,
+    get_my_todos_service,
     get_project_service,
     add_todo_service,
     get_proposed_todos_service,
+    get_todo_counts_service,
     increase_budget_service,
+    recompute_todo_counts_service,
     spend_budget_service,
     update_todo_service,
     delete_todo_service,
@@ -23,11 +37,15 @@ from app.service.project import (
     add_todo_status_service,
     delete_todo_status_service,
     reorder_todo_statuses_service,
+    review_proposed_todos_service,
+    search_todos_service,
 )
 from app.test_shared.constants import (
     MOCK_PROJECT_ID,
+    MOCK_PROJECT_NAME,
     MOCK_STATUS_2_ID,
     MOCK_STATUS_ID,
+    MOCK_TEAM_ID,
     MOCK_TODO_DESCRIPTION,
     MOCK_TODO_ID,
     MOCK_TODO_NAME,
@@ -63,10 +81,14 @@ async def test_get_project_service_success(mock_db_get_project):
 
 @pytest.mark.asyncio
 @patch("app.service.project.db_add_todo")
-@patch("app.service.project.db_get_team_by_project_id")
+@patch("app.service.project.db_get_team_membership")
+@patch("app.service.project.db_get_project_team_id")
 @patch("app.service.project.db_get_project")
 async def test_add_todo_service_success(
-    mock_db_get_project, mock_db_get_team_by_project_id, mock_db_add_todo
+    mock_db_get_project,
+    mock_db_get_project_team_id,
+    mock_db_get_team_membership,
+    mock_db_add_todo,
 ):
     mock_db = AsyncMock()
     todo_req = AddTodoRequest(
@@ -76,27 +98,21 @@ async def test_add_todo_service_success(
         assignee_id=MOCK_USER_ID,
     )
     mock_db_get_project.return_value = {"_id": MOCK_PROJECT_ID}
-    mock_db_get_team_by_project_id.return_value = {"exec_member_ids": []}
+    mock_db_get_project_team_id.return_value = MOCK_TEAM_ID
+    mock_db_get_team_membership.return_value = {"role": TeamRole.EXEC}
     mock_db_add_todo.return_value = None
 
     result = await add_todo_service(MOCK_PROJECT_ID, todo_req, MOCK_USER_ID, mock_db)
 
     assert result is not None
+    mock_db_get_team_membership.assert_called_once_with(
+        MOCK_TEAM_ID, MOCK_USER_ID, mock_db
+    )
+    mock_db_add_todo.assert_called_once_with(MOCK_PROJECT_ID, todo_req, True, mock_db)
 
 
-@pytest.mark.asyncio
-@patch("app.service.project.db_update_todo")
-@patch("app.service.project.db_get_project")
-async def test_update_todo_service_success(mock_db_get_project, mock_db_update_todo):
-    mock_db = AsyncMock()
-    update_req = UpdateTodoRequest(
-        todo_id=MOCK_TODO_ID,
-        name=MOCK_TODO_NAME,
-        description=MOCK_TODO_DESCRIPTION,
-        status_id=MOCK_STATUS_ID,
-        assignee_id=MOCK_USER_ID,
-    )
-    mock_db_get_project.return_value = {
+def _mock_project_with_statuses() -> dict:
+    return {
         "_id": MOCK_PROJECT_ID,
         "todo_statuses": [
             {
@@ -109,22 +125,74 @@ async def test_update_todo_service_success(mock_db_get_project, mock_db_update_t
             },
         ],
     }
+
+
+@pytest.mark.asyncio
+@patch("app.service.project.db_update_todo")
+@patch("app.service.project.db_project_has_todo")
+@patch("app.service.project.db_get_project")
+async def test_update_todo_service_success(
+    mock_db_get_project, mock_db_project_has_todo, mock_db_update_todo
+):
+    mock_db = AsyncMock()
+    update_req = UpdateTodoRequest(
+        todo_id=MOCK_TODO_ID,
+        name=MOCK_TODO_NAME,
+        description=MOCK_TODO_DESCRIPTION,
+        status_id=MOCK_STATUS_ID,
+        assignee_id=MOCK_USER_ID,
+    )
+    mock_db_get_project.return_value = _mock_project_with_statuses()
+    mock_db_project_has_todo.return_value = True
     mock_db_update_todo.return_value = None
     result = await update_todo_service(MOCK_PROJECT_ID, update_req, mock_db)
 
     assert result is not None
 
 
+@pytest.mark.asyncio
+@patch("app.service.project.db_update_todo")
+@patch("app.service.project.db_project_has_todo")
+@patch("app.service.project.db_get_project")
+async def test_update_todo_service_failure_todo_in_other_project(
+    mock_db_get_project, mock_db_project_has_todo, mock_db_update_todo
+):
+    mock_db = AsyncMock()
+    other_todo_id = str(ObjectId())
+    update_req = UpdateTodoRequest(
+        todo_id=other_todo_id,
+        name=MOCK_TODO_NAME,
+        description=MOCK_TODO_DESCRIPTION,
+        status_id=MOCK_STATUS_ID,
+        assignee_id=MOCK_USER_ID,
+    )
+    mock_db_get_project.return_value = _mock_project_with_statuses()
+    mock_db_project_has_todo.return_value = False
+
+    with pytest.raises(HTTPException) as exc_info:
+        await update_todo_service(MOCK_PROJECT_ID, update_req, mock_db)
+
+    assert exc_info.value.status_code == 404
+    mock_db_project_has_todo.assert_called_once_with(
+        MOCK_PROJECT_ID, other_todo_id, mock_db
+    )
+    mock_db_update_todo.assert_not_called()
+
+
 @pytest.mark.asyncio
 @patch("app.service.project.db_delete_todo")
+@patch("app.service.project.db_project_has_todo")
 @patch("app.service.project.db_get_project")
-async def test_delete_todo_service_success(mock_db_get_project, mock_db_delete_todo):
+async def test_delete_todo_service_success(
+    mock_db_get_project, mock_db_project_has_todo, mock_db_delete_todo
+):
     mock_db = AsyncMock()
     delete_req = DeleteTodoRequest(todo_id=MOCK_TODO_ID)
     mock_db_get_project.return_value = {
         "_id": MOCK_PROJECT_ID,
         "todo_ids": [MOCK_TODO_ID],
     }
+    mock_db_project_has_todo.return_value = True
     mock_db_delete_todo.return_value = None
 
     result = await delete_todo_service(MOCK_PROJECT_ID, delete_req, mock_db)
@@ -229,27 +297,326 @@ async def test_reorder_todo_statuses_service_success(
 
 @pytest.mark.asyncio
 @patch("app.service.project.db_approve_todo")
-async def test_approve_todo_service_success(mock_db_approve_todo):
+@patch("app.service.project.db_project_has_todo")
+async def test_approve_todo_service_success(
+    mock_db_project_has_todo, mock_db_approve_todo
+):
     mock_db = AsyncMock()
+    mock_db_project_has_todo.return_value = True
     mock_db_approve_todo.return_value = None
 
-    result = await approve_todo_service(MOCK_PROJECT_ID, mock_db)
+    result = await approve_todo_service(MOCK_PROJECT_ID, MOCK_TODO_ID, mock_db)
 
     assert result is None
 
 
 @pytest.mark.asyncio
-@patch("app.service.project.get_todo_items_service")
-@patch("app.service.project.db_get_project")
-async def test_get_proposed_todos_service_success(
-    mock_db_get_project, mock_get_todo_items_service
+@patch("app.service.project.db_approve_todo")
+@patch("app.service.project.db_project_has_todo")
+async def test_approve_todo_service_failure_todo_in_other_project(
+    mock_db_project_has_todo, mock_db_approve_todo
 ):
     mock_db = AsyncMock()
-    mock_db_get_project.return_value = {"_id": MOCK_PROJECT_ID}
-    mock_get_todo_items_service.return_value = GetTodoItemsResponse(todos=[])
+    mock_db_project_has_todo.return_value = False
+
+    with pytest.raises(HTTPException) as exc_info:
+        await approve_todo_service(MOCK_PROJECT_ID, MOCK_TODO_ID, mock_db)
+
+    assert exc_info.value.status_code == 404
+    mock_db_approve_todo.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.service.project.db_get_proposed_todos")
+async def test_get_proposed_todos_service_success(mock_db_get_proposed_todos):
+    mock_db = AsyncMock()
+    mock_db_get_proposed_todos.return_value = [
+        {
+            "_id": MOCK_TODO_ID,
+            "name": MOCK_TODO_NAME,
+            "description": MOCK_TODO_DESCRIPTION,
+            "status_id": MOCK_STATUS_ID,
+            "assignee_id": None,
+            "approved": False,
+        }
+    ]
+
     result = await get_proposed_todos_service(MOCK_PROJECT_ID, mock_db)
 
-    assert result is not None
+    assert len(result) == 1
+    assert result[0].id == MOCK_TODO_ID
+    assert result[0].approved is False
+
+
+@pytest.mark.asyncio
+@patch("app.service.project.db_count_proposed_todos")
+async def test_count_proposed_todos_service_success(mock_db_count_proposed_todos):
+    mock_db = AsyncMock()
+    mock_db_count_proposed_todos.return_value = 2
+
+    result = await count_proposed_todos_service(MOCK_PROJECT_ID, mock_db)
+
+    assert result.count == 2
+
+
+@pytest.mark.asyncio
+@patch("app.service.project.db_reject_todos")
+@patch("app.service.project.db_approve_todos")
+async def test_review_proposed_todos_service_success(
+    mock_db_approve_todos, mock_db_reject_todos
+):
+    mock_db = AsyncMock()
+    mock_db_approve_todos.return_value = 1
+    mock_db_reject_todos.return_value = 0
+    review_req = ReviewProposedTodosRequest(approve_todo_ids=[MOCK_TODO_ID])
+
+    result = await review_proposed_todos_service(MOCK_PROJECT_ID, review_req, mock_db)
+
+    assert result.approved_count == 1
+    assert result.rejected_count == 0
+    mock_db_reject_todos.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.service.project.db_get_todo_counts")
+async def test_get_todo_counts_service_success(mock_db_get_todo_counts):
+    mock_db = AsyncMock()
+    mock_db_get_todo_counts.return_value = {
+        "by_status": {MOCK_STATUS_ID: 2},
+        "by_assignee": {MOCK_USER_ID: 1},
+    }
+
+    result = await get_todo_counts_service(MOCK_PROJECT_ID, mock_db)
+
+    assert result.todo_counts.by_status == {MOCK_STATUS_ID: 2}
+    assert result.todo_counts.by_assignee == {MOCK_USER_ID: 1}
+
+
+@pytest.mark.asyncio
+@patch("app.service.project.db_recompute_todo_counts")
+async def test_recompute_todo_counts_service_success(mock_db_recompute_todo_counts):
+    mock_db = AsyncMock()
+    mock_db_recompute_todo_counts.return_value = {
+        "by_status": {MOCK_STATUS_ID: 1},
+        "by_assignee": {},
+    }
+
+    result = await recompute_todo_counts_service(MOCK_PROJECT_ID, mock_db)
+
+    assert result.todo_counts.by_status == {MOCK_STATUS_ID: 1}
+
+
+@pytest.mark.asyncio
+@patch("app.service.project.db_recompute_todo_counts")
+async def test_recompute_todo_counts_service_failure_project_not_found(
+    mock_db_recompute_todo_counts,
+):
+    mock_db = AsyncMock()
+    mock_db_recompute_todo_counts.return_value = None
+
+    with pytest.raises(HTTPException) as exc_info:
+        await recompute_todo_counts_service(MOCK_PROJECT_ID, mock_db)
+
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.asyncio
+@patch("app.service.project.db_get_projects_by_ids")
+@patch("app.service.project.db_search_todos")
+@patch("app.service.project.db_get_user_project_ids")
+async def test_search_todos_service_success(
+    mock_db_get_user_project_ids, mock_db_search_todos, mock_db_get_projects_by_ids
+):
+    mock_db = AsyncMock()
+    mock_db_get_user_project_ids.return_value = [MOCK_PROJECT_ID]
+    mock_db_search_todos.return_value = [
+        {
+            "_id": MOCK_TODO_ID,
+            "project_id": MOCK_PROJECT_ID,
+            "name": MOCK_TODO_NAME,
+            "description": MOCK_TODO_DESCRIPTION,
+            "status_id": MOCK_STATUS_ID,
+            "assignee_id": None,
+            "approved": True,
+            "score": 1.5,
+        },
+        {
+            "_id": MOCK_TODO_ID,
+            "project_id": MOCK_PROJECT_ID,
+            "name": MOCK_TODO_NAME,
+            "description": MOCK_TODO_DESCRIPTION,
+            "status_id": MOCK_STATUS_ID,
+            "assignee_id": None,
+            "approved": True,
+            "score": 1.0,
+        },
+    ]
+    mock_db_get_projects_by_ids.return_value = [
+        {
+            "_id": MOCK_PROJECT_ID,
+            "name": MOCK_PROJECT_NAME,
+            "todo_statuses": [{"id": MOCK_STATUS_ID, "name": MOCK_TODO_STATUS_NAME}],
+        }
+    ]
+
+    result = await search_todos_service(MOCK_USER_ID, "mock", None, 1, mock_db)
+
+    assert len(result.results) == 1
+    assert result.results[0].project_name == MOCK_PROJECT_NAME
+    assert result.results[0].status_name == MOCK_TODO_STATUS_NAME
+    assert result.next_cursor is not None
+    mock_db_get_projects_by_ids.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("app.service.project.db_get_projects_by_ids")
+@patch("app.service.project.db_get_todos_by_assignee")
+@patch("app.service.project.db_get_user_project_ids")
+async def test_get_my_todos_service_success(
+    mock_db_get_user_project_ids,
+    mock_db_get_todos_by_assignee,
+    mock_db_get_projects_by_ids,
+):
+    mock_db = AsyncMock()
+    mock_db_get_user_project_ids.return_value = [MOCK_PROJECT_ID]
+    mock_db_get_todos_by_assignee.return_value = [
+        {
+            "_id": MOCK_TODO_ID,
+            "project_id": MOCK_PROJECT_ID,
+            "name": MOCK_TODO_NAME,
+            "description": MOCK_TODO_DESCRIPTION,
+            "status_id": MOCK_STATUS_ID,
+            "assignee_id": MOCK_USER_ID,
+            "approved": True,
+        }
+    ]
+    mock_db_get_projects_by_ids.return_value = [
+        {
+            "_id": MOCK_PROJECT_ID,
+            "name": MOCK_PROJECT_NAME,
+            "todo_statuses": [{"id": MOCK_STATUS_ID, "name": MOCK_TODO_STATUS_NAME}],
+        }
+    ]
+
+    result = await get_my_todos_service(MOCK_USER_ID, None, None, 20, mock_db)
+
+    assert len(result.todos) == 1
+    assert result.todos[0].project_name == MOCK_PROJECT_NAME
+    assert result.todos[0].status_name == MOCK_TODO_STATUS_NAME
+    assert result.next_cursor is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "status_id, cursor",
+    [
+        ("not-an-id", None),
+        (None, encode_cursor({"id": "not-an-id"})),
+    ],
+)
+@patch("app.service.project.db_get_todos_by_assignee")
+async def test_get_my_todos_service_failure_invalid_id(
+    mock_db_get_todos_by_assignee, status_id, cursor
+):
+    mock_db = AsyncMock()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_my_todos_service(MOCK_USER_ID, status_id, cursor, 20, mock_db)
+
+    assert exc_info.value.status_code == 400
+    mock_db_get_todos_by_assignee.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.service.project.db_search_todos")
+async def test_search_todos_service_failure_invalid_cursor_id(
+    mock_db_search_todos,
+):
+    mock_db = AsyncMock()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await search_todos_service(
+            MOCK_USER_ID,
+            "mock",
+            encode_cursor({"score": 1.0, "id": "not-an-id"}),
+            20,
+            mock_db,
+        )
+
+    assert exc_info.value.status_code == 400
+    mock_db_search_todos.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.service.project.db_archive_todos")
+@patch("app.service.project.db_get_project")
+async def test_archive_todos_service_success(
+    mock_db_get_project, mock_db_archive_todos
+):
+    mock_db = AsyncMock()
+    mock_db_get_project.return_value = {
+        "_id": MOCK_PROJECT_ID,
+        "todo_statuses": [
+            {"id": MOCK_STATUS_ID, "name": "Done"},
+            {"id": MOCK_STATUS_2_ID, "name": MOCK_TODO_STATUS_2_NAME},
+        ],
+    }
+    mock_db_archive_todos.return_value = 2
+
+    result = await archive_todos_service(
+        MOCK_PROJECT_ID, ArchiveTodosRequest(older_than_days=7), mock_db
+    )
+
+    assert result.archived_count == 2
+    assert mock_db_archive_todos.call_args.args[1] == MOCK_STATUS_ID
+
+
+@pytest.mark.asyncio
+@patch("app.service.project.db_archive_todos")
+@patch("app.service.project.db_get_project")
+async def test_archive_todos_service_failure_no_done_status(
+    mock_db_get_project, mock_db_archive_todos
+):
+    mock_db = AsyncMock()
+    mock_db_get_project.return_value = {
+        "_id": MOCK_PROJECT_ID,
+        "todo_statuses": [
+            {"id": MOCK_STATUS_ID, "name": "To Do"},
+            {"id": MOCK_STATUS_2_ID, "name": MOCK_TODO_STATUS_2_NAME},
+        ],
+    }
+
+    with pytest.raises(HTTPException) as exc_info:
+        await archive_todos_service(
+            MOCK_PROJECT_ID, ArchiveTodosRequest(older_than_days=7), mock_db
+        )
+
+    assert exc_info.value.status_code == 400
+    mock_db_archive_todos.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.service.project.db_get_archived_todos")
+async def test_get_archived_todos_service_success(mock_db_get_archived_todos):
+    mock_db = AsyncMock()
+    mock_db_get_archived_todos.return_value = [
+        {
+            "_id": MOCK_TODO_ID,
+            "project_id": MOCK_PROJECT_ID,
+            "name": MOCK_TODO_NAME,
+            "description": MOCK_TODO_DESCRIPTION,
+            "status_id": MOCK_STATUS_ID,
+            "assignee_id": None,
+            "approved": True,
+            "archived_at": datetime.now(timezone.utc),
+        }
+    ]
+
+    result = await get_archived_todos_service(MOCK_PROJECT_ID, None, 20, mock_db)
+
+    assert len(result.todos) == 1
+    assert result.todos[0].id == MOCK_TODO_ID
+    assert result.next_cursor is None
 
 
 @pytest.mark.asyncio
@@ -291,3 +658,21 @@ async def test_spend_budget_service_success(
     result = await spend_budget_service(MOCK_PROJECT_ID, 50.0, mock_db)
 
     assert result is None
+
+
+@pytest.mark.asyncio
+@patch("app.service.project.db_assign_todo")
+@patch("app.service.project.db_project_has_todo")
+@patch("app.service.project.db_get_project")
+async def test_assign_todo_service_failure_todo_in_other_project(
+    mock_db_get_project, mock_db_project_has_todo, mock_db_assign_todo
+):
+    mock_db = AsyncMock()
+    mock_db_get_project.return_value = {"_id": MOCK_PROJECT_ID}
+    mock_db_project_has_todo.return_value = False
+
+    with pytest.raises(HTTPException) as exc_info:
+        await assign_todo_service(MOCK_PROJECT_ID, MOCK_TODO_ID, MOCK_USER_ID, mock_db)
+
+    assert exc_info.value.status_code == 404
+    mock_db_assign_todo.assert_not_called()
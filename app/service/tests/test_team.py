@@ -1,9 +1,17 @@
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, patch
 
 from bson import ObjectId
 from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
 import pytest
 
+from app.core.cache import TTLCache
+from app.core.constants import TEAM_SHORT_ID_MAX_ATTEMPTS
+from app.core.common import decode_cursor
+from app.core.metrics import TEAM_SHORT_ID_ALLOCATED, TEAM_SHORT_ID_COLLISIONS, metrics
+from app.core.security import sign_team_calendar
+
 from app.schemas.event import Event
 from app.schemas.team import (
     CreateEventRequest,
@@ -13,6 +21,7 @@ from app.schemas.team import (
     LeaveTeamResponse,
     PromoteTeamMemberResponse,
     TeamModel,
+    TeamRole,
 )
 from app.service.team import (
     create_event_for_team_service,
@@ -20,10 +29,18 @@ from app.service.team import (
     delete_event_service,
     delete_project_service,
     delete_team_service,
+    get_team_calendar_service,
+    get_team_calendar_url_service,
+    get_team_dashboard_service,
+    get_team_events_page_service,
+    get_team_events_service,
+    get_team_members_service,
+    join_team_by_short_id_service,
     join_team_service,
     kick_team_member_service,
     leave_team_service,
     promote_team_member_service,
+    regenerate_team_calendar_url_service,
 )
 
 from app.test_shared.constants import (
@@ -45,14 +62,25 @@ from app.test_shared.constants import (
 )
 
 
+# Answers membership lookups from the member arrays of a mocked team document
+def _memberships_of(team_dict):
+    async def get_team_membership(team_id, user_id, db):
+        if user_id not in team_dict.get("member_ids", []):
+            return None
+        role = (
+            TeamRole.EXEC
+            if user_id in team_dict.get("exec_member_ids", [])
+            else TeamRole.MEMBER
+        )
+        return {"team_id": team_id, "user_id": user_id, "role": role}
+
+    return get_team_membership
+
+
 @pytest.mark.asyncio
 @patch("app.service.team.db_create_team")
-@patch("app.service.team.db_get_team_by_short_id")
-async def test_create_team_service_success(
-    mock_db_get_team_by_short_id, mock_db_create_team
-):
+async def test_create_team_service_success(mock_db_create_team):
     mock_db = AsyncMock()
-    mock_db_get_team_by_short_id.return_value = None
     mock_db_create_team.return_value = {
         "_id": MOCK_TEAM_ID,
         "short_id": MOCK_TEAM_SHORT_ID,
@@ -76,49 +104,75 @@ async def test_create_team_service_success(
     assert result.team.event_ids == []
 
 
+@pytest.mark.asyncio
+@patch("app.service.team.db_create_team")
+async def test_create_team_service_retries_short_id_collision(mock_db_create_team):
+    mock_db = AsyncMock()
+    metrics.reset()
+    mock_db_create_team.side_effect = [
+        DuplicateKeyError("duplicate key"),
+        {
+            "_id": MOCK_TEAM_ID,
+            "short_id": MOCK_TEAM_SHORT_ID,
+            "name": MOCK_TEAM_NAME,
+            "member_ids": [MOCK_USER_ID],
+            "exec_member_ids": [MOCK_USER_ID],
+            "project_ids": [],
+            "event_ids": [],
+        },
+    ]
+
+    result = await create_team_service(MOCK_USER_ID, MOCK_TEAM_NAME, mock_db)
+
+    assert result.team.id == MOCK_TEAM_ID
+    assert mock_db_create_team.call_count == 2
+    assert metrics.get(TEAM_SHORT_ID_COLLISIONS) == 1
+    assert metrics.get(TEAM_SHORT_ID_ALLOCATED) == 1
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_create_team")
+async def test_create_team_service_failure_short_ids_exhausted(mock_db_create_team):
+    mock_db = AsyncMock()
+    mock_db_create_team.side_effect = DuplicateKeyError("duplicate key")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await create_team_service(MOCK_USER_ID, MOCK_TEAM_NAME, mock_db)
+
+    assert exc_info.value.status_code == 503
+    assert mock_db_create_team.call_count == TEAM_SHORT_ID_MAX_ATTEMPTS
+
+
 @pytest.mark.asyncio
 @patch("app.service.team.db_join_team")
-@patch("app.service.team.db_get_team_by_id")
-async def test_join_team_service_success(mock_db_get_team_by_id, mock_db_join_team):
+async def test_join_team_service_success(mock_db_join_team):
     mock_db = AsyncMock()
-    mock_db_get_team_by_id.return_value = {
-        "_id": MOCK_TEAM_ID,
-        "name": MOCK_TEAM_NAME,
-        "member_ids": [MOCK_USER_ID],
-        "exec_member_ids": [MOCK_USER_ID],
-        "event_ids": [],
-    }
-    mock_db_join_team.return_value = None
+    mock_db_join_team.return_value = True
 
     result = await join_team_service(MOCK_TEAM_ID, MOCK_USER_2_ID, mock_db)
 
     assert isinstance(result, JoinTeamResponse)
+    mock_db_join_team.assert_called_once_with(MOCK_TEAM_ID, MOCK_USER_2_ID, mock_db)
 
 
 @pytest.mark.asyncio
-@patch("app.service.team.db_get_team_by_id")
-async def test_join_team_service_failure_team_not_exist(mock_db_get_team_by_id):
+@patch("app.service.team.db_join_team")
+async def test_join_team_service_failure_team_not_exist(mock_db_join_team):
     mock_db = AsyncMock()
-    mock_db_get_team_by_id.return_value = None
+    mock_db_join_team.return_value = None
 
     with pytest.raises(HTTPException) as exc_info:
         await join_team_service(MOCK_TEAM_ID, MOCK_USER_2_ID, mock_db)
 
-        assert exc_info.value.status_code == 404
-        assert exc_info.value.detail == f"Team does not exist: team_id={MOCK_TEAM_ID}"
+    assert exc_info.value.status_code == 404
+    assert exc_info.value.detail == f"Team does not exist: team_id={MOCK_TEAM_ID}"
 
 
 @pytest.mark.asyncio
-@patch("app.service.team.db_get_team_by_id")
-async def test_join_team_service_failure_user_already_in_team(mock_db_get_team_by_id):
+@patch("app.service.team.db_join_team")
+async def test_join_team_service_failure_user_already_in_team(mock_db_join_team):
     mock_db = AsyncMock()
-    mock_db_get_team_by_id.return_value = {
-        "_id": MOCK_TEAM_ID,
-        "name": MOCK_TEAM_NAME,
-        "member_ids": [MOCK_USER_ID, MOCK_USER_2_ID],
-        "exec_member_ids": [MOCK_USER_ID],
-        "event_ids": [],
-    }
+    mock_db_join_team.return_value = False
 
     with pytest.raises(HTTPException) as exc_info:
         await join_team_service(MOCK_TEAM_ID, MOCK_USER_2_ID, mock_db)
@@ -130,11 +184,68 @@ async def test_join_team_service_failure_user_already_in_team(mock_db_get_team_b
     )
 
 
+@pytest.mark.asyncio
+@patch("app.service.team._team_id_by_short_id", TTLCache(maxsize=8, ttl_seconds=60))
+@patch("app.service.team.db_join_team")
+@patch("app.service.team.db_get_team_id_by_short_id")
+async def test_join_team_by_short_id_service_caches_team_id(
+    mock_db_get_team_id_by_short_id, mock_db_join_team
+):
+    mock_db = AsyncMock()
+    mock_db_get_team_id_by_short_id.return_value = MOCK_TEAM_ID
+    mock_db_join_team.return_value = True
+
+    await join_team_by_short_id_service(MOCK_TEAM_SHORT_ID, MOCK_USER_ID, mock_db)
+    await join_team_by_short_id_service(MOCK_TEAM_SHORT_ID, MOCK_USER_2_ID, mock_db)
+
+    mock_db_get_team_id_by_short_id.assert_called_once_with(MOCK_TEAM_SHORT_ID, mock_db)
+    assert mock_db_join_team.call_count == 2
+
+
+@pytest.mark.asyncio
+@patch("app.service.team._unknown_team_short_ids", TTLCache(maxsize=8, ttl_seconds=60))
+@patch("app.service.team._team_id_by_short_id", TTLCache(maxsize=8, ttl_seconds=60))
+@patch("app.service.team.db_get_team_id_by_short_id")
+async def test_join_team_by_short_id_service_caches_unknown_short_id(
+    mock_db_get_team_id_by_short_id,
+):
+    mock_db = AsyncMock()
+    mock_db_get_team_id_by_short_id.return_value = None
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            await join_team_by_short_id_service(
+                MOCK_TEAM_SHORT_ID, MOCK_USER_ID, mock_db
+            )
+        assert exc_info.value.status_code == 404
+
+    mock_db_get_team_id_by_short_id.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_join_team")
+async def test_join_team_by_short_id_service_failure_team_deleted(mock_db_join_team):
+    mock_db = AsyncMock()
+    team_id_cache = TTLCache(maxsize=8, ttl_seconds=60)
+    team_id_cache.set(MOCK_TEAM_SHORT_ID, MOCK_TEAM_ID)
+    mock_db_join_team.return_value = None
+
+    with patch("app.service.team._team_id_by_short_id", team_id_cache):
+        with pytest.raises(HTTPException) as exc_info:
+            await join_team_by_short_id_service(
+                MOCK_TEAM_SHORT_ID, MOCK_USER_ID, mock_db
+            )
+
+    assert exc_info.value.status_code == 404
+    assert team_id_cache.get(MOCK_TEAM_SHORT_ID) is None
+
+
 @pytest.mark.asyncio
 @patch("app.service.team.db_promote_team_member")
 @patch("app.service.team.db_get_team_by_id")
+@patch("app.service.team.db_get_team_membership")
 async def test_promote_team_member_service_success(
-    mock_db_get_team_by_id, mock_db_promote_team_member
+    mock_db_get_team_membership, mock_db_get_team_by_id, mock_db_promote_team_member
 ):
     mock_db = AsyncMock()
     mock_db_get_team_by_id.return_value = {
@@ -144,20 +255,30 @@ async def test_promote_team_member_service_success(
         "exec_member_ids": [MOCK_USER_ID],
         "event_ids": [],
     }
-    mock_db_promote_team_member.return_value = None
+    mock_db_get_team_membership.side_effect = _memberships_of(
+        mock_db_get_team_by_id.return_value
+    )
+    mock_db_promote_team_member.return_value = True
 
     result = await promote_team_member_service(
         MOCK_TEAM_ID, MOCK_USER_2_ID, MOCK_USER_ID, mock_db
     )
 
     assert isinstance(result, PromoteTeamMemberResponse)
+    mock_db_promote_team_member.assert_called_once_with(
+        MOCK_TEAM_ID, MOCK_USER_2_ID, MOCK_USER_ID, mock_db
+    )
+    # A guarded update which applies needs no further reads
+    mock_db_get_team_by_id.assert_not_called()
+    mock_db_get_team_membership.assert_not_called()
 
 
 @pytest.mark.asyncio
 @patch("app.service.team.db_promote_team_member")
 @patch("app.service.team.db_get_team_by_id")
+@patch("app.service.team.db_get_team_membership")
 async def test_promote_team_member_service_failure_no_permission(
-    mock_db_get_team_by_id, mock_db_promote_team_member
+    mock_db_get_team_membership, mock_db_get_team_by_id, mock_db_promote_team_member
 ):
     mock_db = AsyncMock()
     mock_db_get_team_by_id.return_value = {
@@ -167,7 +288,10 @@ async def test_promote_team_member_service_failure_no_permission(
         "exec_member_ids": [MOCK_USER_ID],
         "event_ids": [],
     }
-    mock_db_promote_team_member.return_value = None
+    mock_db_get_team_membership.side_effect = _memberships_of(
+        mock_db_get_team_by_id.return_value
+    )
+    mock_db_promote_team_member.return_value = False
 
     with pytest.raises(HTTPException) as exc_info:
         await promote_team_member_service(
@@ -184,7 +308,10 @@ async def test_promote_team_member_service_failure_no_permission(
 @pytest.mark.asyncio
 @patch("app.service.team.db_leave_team")
 @patch("app.service.team.db_get_team_by_id")
-async def test_leave_team_service_success(mock_db_get_team_by_id, mock_db_leave_team):
+@patch("app.service.team.db_get_team_membership")
+async def test_leave_team_service_success(
+    mock_db_get_team_membership, mock_db_get_team_by_id, mock_db_leave_team
+):
     mock_db = AsyncMock()
     mock_db_get_team_by_id.return_value = {
         "_id": MOCK_TEAM_ID,
@@ -193,6 +320,9 @@ async def test_leave_team_service_success(mock_db_get_team_by_id, mock_db_leave_
         "exec_member_ids": [MOCK_USER_ID],
         "event_ids": [],
     }
+    mock_db_get_team_membership.side_effect = _memberships_of(
+        mock_db_get_team_by_id.return_value
+    )
     mock_db_leave_team.return_value = None
 
     result = await leave_team_service(MOCK_TEAM_ID, MOCK_USER_2_ID, mock_db)
@@ -203,10 +333,16 @@ async def test_leave_team_service_success(mock_db_get_team_by_id, mock_db_leave_
 @pytest.mark.asyncio
 @patch("app.service.team.db_delete_team")
 @patch("app.service.team.db_get_team_by_id")
+@patch("app.service.team.db_get_team_membership")
+@patch("app.service.team.db_count_team_members_by_role")
 async def test_leave_team_service_last_executive(
-    mock_db_get_team_by_id, mock_db_delete_team
+    mock_db_count_team_members_by_role,
+    mock_db_get_team_membership,
+    mock_db_get_team_by_id,
+    mock_db_delete_team,
 ):
     mock_db = AsyncMock()
+    mock_db_count_team_members_by_role.return_value = 1
     mock_db_get_team_by_id.return_value = {
         "_id": MOCK_TEAM_ID,
         "name": MOCK_TEAM_NAME,
@@ -214,17 +350,23 @@ async def test_leave_team_service_last_executive(
         "exec_member_ids": [MOCK_USER_ID],
         "event_ids": [],
     }
-    mock_db_delete_team.return_value = None
+    mock_db_get_team_membership.side_effect = _memberships_of(
+        mock_db_get_team_by_id.return_value
+    )
+    mock_db_delete_team.return_value = True
 
     result = await leave_team_service(MOCK_TEAM_ID, MOCK_USER_ID, mock_db)
 
-    assert isinstance(result, LeaveTeamResponse)
+    assert result.team_deleted is True
 
 
 @pytest.mark.asyncio
 @patch("app.service.team.db_delete_team")
 @patch("app.service.team.db_get_team_by_id")
-async def test_db_delete_team_success(mock_db_get_team_by_id, mock_db_delete_team):
+@patch("app.service.team.db_get_team_membership")
+async def test_db_delete_team_success(
+    mock_db_get_team_membership, mock_db_get_team_by_id, mock_db_delete_team
+):
     mock_db = AsyncMock()
     mock_db_get_team_by_id.return_value = {
         "_id": MOCK_TEAM_ID,
@@ -233,18 +375,22 @@ async def test_db_delete_team_success(mock_db_get_team_by_id, mock_db_delete_tea
         "exec_member_ids": [MOCK_USER_ID],
         "event_ids": [],
     }
-    mock_db_delete_team.return_value = None
+    mock_db_get_team_membership.side_effect = _memberships_of(
+        mock_db_get_team_by_id.return_value
+    )
+    mock_db_delete_team.return_value = True
 
     result = await delete_team_service(MOCK_TEAM_ID, MOCK_USER_ID, mock_db)
 
-    assert result is None
+    assert result is True
 
 
 @pytest.mark.asyncio
 @patch("app.service.team.db_kick_team_member")
 @patch("app.service.team.db_get_team_by_id")
+@patch("app.service.team.db_get_team_membership")
 async def test_kick_team_member_service_success(
-    mock_db_get_team_by_id, mock_db_kick_team_member
+    mock_db_get_team_membership, mock_db_get_team_by_id, mock_db_kick_team_member
 ):
     mock_db = AsyncMock()
     mock_db_get_team_by_id.return_value = {
@@ -254,19 +400,28 @@ async def test_kick_team_member_service_success(
         "exec_member_ids": [MOCK_USER_ID],
         "event_ids": [],
     }
-    mock_db_kick_team_member.return_value = None
+    mock_db_get_team_membership.side_effect = _memberships_of(
+        mock_db_get_team_by_id.return_value
+    )
+    mock_db_kick_team_member.return_value = True
 
     result = await kick_team_member_service(
         MOCK_TEAM_ID, MOCK_USER_2_ID, MOCK_USER_ID, mock_db
     )
 
     assert isinstance(result, KickTeamMemberResponse)
+    mock_db_get_team_membership.assert_not_called()
 
 
 @pytest.mark.asyncio
+@patch("app.service.team.db_kick_team_member")
 @patch("app.service.team.db_get_team_by_id")
-async def test_kick_team_member_service_failure_kick_exec(mock_db_get_team_by_id):
+@patch("app.service.team.db_get_team_membership")
+async def test_kick_team_member_service_failure_kick_exec(
+    mock_db_get_team_membership, mock_db_get_team_by_id, mock_db_kick_team_member
+):
     mock_db = AsyncMock()
+    mock_db_kick_team_member.return_value = False
     mock_db_get_team_by_id.return_value = {
         "_id": MOCK_TEAM_ID,
         "name": MOCK_TEAM_NAME,
@@ -274,6 +429,9 @@ async def test_kick_team_member_service_failure_kick_exec(mock_db_get_team_by_id
         "exec_member_ids": [MOCK_USER_ID, MOCK_USER_2_ID],
         "event_ids": [],
     }
+    mock_db_get_team_membership.side_effect = _memberships_of(
+        mock_db_get_team_by_id.return_value
+    )
 
     with pytest.raises(HTTPException) as exc_info:
         await kick_team_member_service(
@@ -289,43 +447,97 @@ async def test_kick_team_member_service_failure_kick_exec(mock_db_get_team_by_id
 
 @pytest.mark.asyncio
 @patch("app.service.team.db_delete_project")
-@patch("app.service.team.db_get_project_by_id")
 @patch("app.service.team.db_get_team_by_id")
 async def test_delete_project_service_success(
-    mock_db_get_team_by_id, mock_db_get_project_by_id, mock_db_delete_project
+    mock_db_get_team_by_id, mock_db_delete_project
 ):
     mock_db = AsyncMock()
+    mock_db_delete_project.return_value = True
+
+    result = await delete_project_service(
+        MOCK_TEAM_ID, MOCK_PROJECT_ID, MOCK_USER_ID, mock_db
+    )
+
+    assert result is None
+    mock_db_delete_project.assert_called_once_with(
+        MOCK_TEAM_ID, MOCK_PROJECT_ID, MOCK_USER_ID, mock_db
+    )
+    mock_db_get_team_by_id.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_delete_project")
+@patch("app.service.team.db_get_team_by_id")
+@patch("app.service.team.db_get_team_membership")
+@patch("app.service.team.db_team_lists_child")
+async def test_delete_project_service_failure_no_permission(
+    mock_db_team_lists_child,
+    mock_db_get_team_membership,
+    mock_db_get_team_by_id,
+    mock_db_delete_project,
+):
+    mock_db = AsyncMock()
+    mock_db_delete_project.return_value = False
+    mock_db_team_lists_child.return_value = True
     mock_db_get_team_by_id.return_value = {
         "_id": MOCK_TEAM_ID,
-        "name": MOCK_TEAM_NAME,
         "member_ids": [MOCK_USER_ID, MOCK_USER_2_ID],
         "exec_member_ids": [MOCK_USER_ID],
-        "project_ids": [MOCK_PROJECT_ID],
-        "event_ids": [],
-    }
-    mock_db_get_project_by_id.return_value = {
-        "_id": MOCK_PROJECT_ID,
-        "name": MOCK_PROJECT_NAME,
-        "description": MOCK_PROJECT_DESCRIPTION,
-        "todo_statuses": [
-            {"id": ObjectId(), "name": "To Do"},
-            {"id": ObjectId(), "name": "In Progress"},
-            {"id": ObjectId(), "name": "Done"},
-        ],
-        "todo_ids": [],
     }
-    mock_db_delete_project.return_value = None
+    mock_db_get_team_membership.side_effect = _memberships_of(
+        mock_db_get_team_by_id.return_value
+    )
 
-    result = await delete_project_service(
-        MOCK_TEAM_ID, MOCK_PROJECT_ID, MOCK_USER_ID, mock_db
+    with pytest.raises(HTTPException) as exc_info:
+        await delete_project_service(
+            MOCK_TEAM_ID, MOCK_PROJECT_ID, MOCK_USER_2_ID, mock_db
+        )
+
+    assert exc_info.value.status_code == 403
+    assert (
+        exc_info.value.detail
+        == f"User does not have permission to delete project: user_id={MOCK_USER_2_ID}, project_id={MOCK_PROJECT_ID}"
     )
 
-    assert result is None
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_delete_project")
+@patch("app.service.team.db_get_team_by_id")
+@patch("app.service.team.db_get_team_membership")
+@patch("app.service.team.db_team_lists_child")
+async def test_delete_project_service_failure_team_changed(
+    mock_db_team_lists_child,
+    mock_db_get_team_membership,
+    mock_db_get_team_by_id,
+    mock_db_delete_project,
+):
+    mock_db = AsyncMock()
+    # The guard missed, yet every condition holds when checked again
+    mock_db_delete_project.return_value = False
+    mock_db_team_lists_child.return_value = True
+    mock_db_get_team_by_id.return_value = {
+        "_id": MOCK_TEAM_ID,
+        "member_ids": [MOCK_USER_ID],
+        "exec_member_ids": [MOCK_USER_ID],
+    }
+    mock_db_get_team_membership.side_effect = _memberships_of(
+        mock_db_get_team_by_id.return_value
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        await delete_project_service(
+            MOCK_TEAM_ID, MOCK_PROJECT_ID, MOCK_USER_ID, mock_db
+        )
+
+    assert exc_info.value.status_code == 409
 
 
 @pytest.mark.asyncio
+@patch("app.service.team.schedule_event_reminders")
 @patch("app.service.team.db_create_event_for_team")
-async def test_create_event_for_team_service_success(mock_db_create_event_for_team):
+async def test_create_event_for_team_service_success(
+    mock_db_create_event_for_team, mock_schedule_event_reminders
+):
     mock_db = AsyncMock()
     mock_db_create_event_for_team.return_value = {
         "_id": MOCK_EVENT_ID,
@@ -355,33 +567,533 @@ async def test_create_event_for_team_service_success(mock_db_create_event_for_te
     assert result.name == MOCK_EVENT_NAME
     assert result.description == MOCK_EVENT_DESCRIPTION
     assert result.rsvp_ids == []
+    mock_schedule_event_reminders.assert_called_once_with(
+        MOCK_EVENT_ID, mock_create_event_request.start, mock_db
+    )
 
 
 @pytest.mark.asyncio
 @patch("app.service.team.db_delete_event")
-@patch("app.service.team.db_get_event_by_id")
 @patch("app.service.team.db_get_team_by_id")
 async def test_delete_event_service_success(
-    mock_db_get_team_by_id, mock_db_get_event_by_id, mock_db_delete_event
+    mock_db_get_team_by_id, mock_db_delete_event
+):
+    mock_db = AsyncMock()
+    mock_db_delete_event.return_value = True
+
+    result = await delete_event_service(
+        MOCK_TEAM_ID, MOCK_EVENT_ID, MOCK_USER_ID, mock_db
+    )
+
+    assert result is None
+    mock_db_delete_event.assert_called_once_with(
+        MOCK_TEAM_ID, MOCK_EVENT_ID, MOCK_USER_ID, mock_db
+    )
+    mock_db_get_team_by_id.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_get_events_by_team_id")
+@patch("app.service.team.db_get_team_for_member")
+async def test_get_team_events_service_migrated_team_success(
+    mock_db_get_team_for_member, mock_db_get_events_by_team_id
+):
+    mock_db = AsyncMock()
+    mock_db_get_team_for_member.return_value = {
+        "_id": MOCK_TEAM_ID,
+        "child_refs_migrated": True,
+    }
+    mock_db_get_events_by_team_id.return_value = [
+        {
+            "_id": MOCK_EVENT_ID,
+            "team_id": MOCK_TEAM_ID,
+            "name": MOCK_EVENT_NAME,
+            "description": MOCK_EVENT_DESCRIPTION,
+            "start": MOCK_EVENT_START,
+            "end": MOCK_EVENT_END,
+            "colour": MOCK_EVENT_COLOUR,
+            "location": MOCK_EVENT_LOCATION,
+            "rsvp_ids": [],
+        }
+    ]
+
+    result = await get_team_events_service(MOCK_TEAM_ID, MOCK_USER_ID, mock_db)
+
+    assert [event.id for event in result] == [MOCK_EVENT_ID]
+    mock_db_get_events_by_team_id.assert_called_once_with(MOCK_TEAM_ID, mock_db)
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_get_team_by_id")
+@patch("app.service.team.db_get_team_for_member")
+async def test_get_team_events_service_failure_not_member(
+    mock_db_get_team_for_member, mock_db_get_team_by_id
+):
+    mock_db = AsyncMock()
+    mock_db_get_team_for_member.return_value = None
+    mock_db_get_team_by_id.return_value = {"_id": MOCK_TEAM_ID}
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_team_events_service(MOCK_TEAM_ID, MOCK_USER_2_ID, mock_db)
+
+    assert exc_info.value.status_code == 403
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_delete_event")
+@patch("app.service.team.db_team_lists_child")
+@patch("app.service.team.db_get_team_by_id")
+@patch("app.service.team.db_get_team_membership")
+async def test_delete_event_service_failure_event_of_other_team(
+    mock_db_get_team_membership,
+    mock_db_get_team_by_id,
+    mock_db_team_lists_child,
+    mock_db_delete_event,
 ):
     mock_db = AsyncMock()
+    mock_db_delete_event.return_value = False
+    mock_db_team_lists_child.return_value = False
     mock_db_get_team_by_id.return_value = {
         "_id": MOCK_TEAM_ID,
-        "name": MOCK_TEAM_NAME,
-        "member_ids": [MOCK_USER_ID, MOCK_USER_2_ID],
+        "member_ids": [MOCK_USER_ID],
         "exec_member_ids": [MOCK_USER_ID],
-        "event_ids": [MOCK_EVENT_ID],
+        "event_ids": [],
+        "child_refs_migrated": True,
     }
-    mock_db_get_event_by_id.return_value = {
-        "_id": MOCK_EVENT_ID,
+    mock_db_get_team_membership.side_effect = _memberships_of(
+        mock_db_get_team_by_id.return_value
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        await delete_event_service(MOCK_TEAM_ID, MOCK_EVENT_ID, MOCK_USER_ID, mock_db)
+
+    assert exc_info.value.status_code == 404
+    mock_db_team_lists_child.assert_called_once_with(
+        MOCK_TEAM_ID, "event_ids", MOCK_EVENT_ID, mock_db
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_get_users_by_ids")
+@patch("app.service.team.db_get_team_members")
+@patch("app.service.team.db_get_team_membership")
+@patch("app.service.team.db_get_team_by_id")
+async def test_get_team_members_service_success(
+    mock_db_get_team_by_id,
+    mock_db_get_team_membership,
+    mock_db_get_team_members,
+    mock_db_get_users_by_ids,
+):
+    mock_db = AsyncMock()
+    mock_db_get_team_by_id.return_value = {"_id": MOCK_TEAM_ID}
+    mock_db_get_team_membership.return_value = {"role": TeamRole.MEMBER}
+    mock_db_get_team_members.return_value = [
+        {"user_id": MOCK_USER_ID, "role": TeamRole.EXEC, "joined_at": None},
+        {"user_id": MOCK_USER_2_ID, "role": TeamRole.MEMBER, "joined_at": None},
+    ]
+    mock_db_get_users_by_ids.return_value = [
+        {"_id": MOCK_USER_ID, "email": "exec@example.com", "first_name": "Exec"}
+    ]
+
+    result = await get_team_members_service(
+        MOCK_TEAM_ID, MOCK_USER_2_ID, None, None, 1, mock_db
+    )
+
+    assert [member.user_id for member in result.members] == [MOCK_USER_ID]
+    assert result.members[0].first_name == "Exec"
+    assert result.next_cursor is not None
+    mock_db_get_team_members.assert_called_once_with(
+        MOCK_TEAM_ID, None, 2, mock_db, None
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_get_team_membership")
+@patch("app.service.team.db_get_team_by_id")
+async def test_get_team_members_service_failure_not_member(
+    mock_db_get_team_by_id, mock_db_get_team_membership
+):
+    mock_db = AsyncMock()
+    mock_db_get_team_by_id.return_value = {"_id": MOCK_TEAM_ID}
+    mock_db_get_team_membership.return_value = None
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_team_members_service(
+            MOCK_TEAM_ID, MOCK_USER_2_ID, None, None, 10, mock_db
+        )
+
+    assert exc_info.value.status_code == 403
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_get_team_dashboard")
+async def test_get_team_dashboard_service_success(mock_db_get_team_dashboard):
+    mock_db = AsyncMock()
+    mock_db_get_team_dashboard.return_value = {
+        "_id": MOCK_TEAM_ID,
+        "short_id": MOCK_TEAM_SHORT_ID,
+        "name": MOCK_TEAM_NAME,
+        "member_count": 2,
+        "role": TeamRole.EXEC.value,
+        "projects": [
+            {
+                "_id": MOCK_PROJECT_ID,
+                "name": MOCK_PROJECT_NAME,
+                "description": MOCK_PROJECT_DESCRIPTION,
+                "todo_count": 4,
+            }
+        ],
+        "upcoming_events": [
+            {
+                "_id": MOCK_EVENT_ID,
+                "name": MOCK_EVENT_NAME,
+                "description": MOCK_EVENT_DESCRIPTION,
+                "start": MOCK_EVENT_START,
+                "end": MOCK_EVENT_END,
+                "colour": MOCK_EVENT_COLOUR,
+                "location": MOCK_EVENT_LOCATION,
+                "rsvp_ids": [],
+            }
+        ],
+        "member_preview": [
+            {"user_id": MOCK_USER_ID, "role": TeamRole.EXEC.value, "first_name": "A"},
+            {"user_id": MOCK_USER_2_ID, "role": TeamRole.MEMBER.value},
+        ],
+    }
+
+    result = await get_team_dashboard_service(MOCK_TEAM_ID, MOCK_USER_ID, mock_db)
+
+    assert result.team.role == TeamRole.EXEC
+    assert result.team.member_count == 2
+    assert result.projects[0].todo_count == 4
+    assert [event.id for event in result.upcoming_events] == [MOCK_EVENT_ID]
+    assert [member.role for member in result.member_preview] == [
+        TeamRole.EXEC,
+        TeamRole.MEMBER,
+    ]
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_get_team_by_id")
+@patch("app.service.team.db_get_team_dashboard")
+async def test_get_team_dashboard_service_failure_not_member(
+    mock_db_get_team_dashboard, mock_db_get_team_by_id
+):
+    mock_db = AsyncMock()
+    mock_db_get_team_dashboard.return_value = None
+    mock_db_get_team_by_id.return_value = {"_id": MOCK_TEAM_ID}
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_team_dashboard_service(MOCK_TEAM_ID, MOCK_USER_2_ID, mock_db)
+
+    assert exc_info.value.status_code == 403
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_get_team_by_id")
+@patch("app.service.team.db_get_team_dashboard")
+async def test_get_team_dashboard_service_failure_no_team(
+    mock_db_get_team_dashboard, mock_db_get_team_by_id
+):
+    mock_db = AsyncMock()
+    mock_db_get_team_dashboard.return_value = None
+    mock_db_get_team_by_id.return_value = None
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_team_dashboard_service(MOCK_TEAM_ID, MOCK_USER_ID, mock_db)
+
+    assert exc_info.value.status_code == 404
+
+
+def _mock_event_dict(event_id, start):
+    return {
+        "_id": event_id,
         "name": MOCK_EVENT_NAME,
         "description": MOCK_EVENT_DESCRIPTION,
+        "start": start,
+        "end": MOCK_EVENT_END,
+        "colour": MOCK_EVENT_COLOUR,
+        "location": MOCK_EVENT_LOCATION,
         "rsvp_ids": [],
     }
-    mock_db_delete_event.return_value = None
 
-    result = await delete_event_service(
-        MOCK_TEAM_ID, MOCK_EVENT_ID, MOCK_USER_ID, mock_db
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_get_team_events_page")
+@patch("app.service.team.db_get_team_for_member")
+async def test_get_team_events_page_service_success(
+    mock_db_get_team_for_member, mock_db_get_team_events_page
+):
+    mock_db = AsyncMock()
+    second_event_id = str(ObjectId())
+    mock_db_get_team_for_member.return_value = {
+        "_id": MOCK_TEAM_ID,
+        "child_refs_migrated": True,
+    }
+    mock_db_get_team_events_page.return_value = [
+        # Mongo hands dates back without a zone
+        _mock_event_dict(MOCK_EVENT_ID, datetime(2023, 10, 10, 10)),
+        _mock_event_dict(second_event_id, datetime(2023, 10, 11, 10)),
+    ]
+
+    result = await get_team_events_page_service(
+        MOCK_TEAM_ID,
+        MOCK_USER_ID,
+        datetime(2023, 10, 1, tzinfo=timezone.utc),
+        datetime(2023, 11, 1, tzinfo=timezone.utc),
+        None,
+        1,
+        mock_db,
     )
 
-    assert result is None
+    assert [event.id for event in result.events] == [MOCK_EVENT_ID]
+    assert result.events[0].start == datetime(2023, 10, 10, 10, tzinfo=timezone.utc)
+    assert decode_cursor(result.next_cursor) == {
+        "start": "2023-10-10T10:00:00",
+        "id": MOCK_EVENT_ID,
+    }
+    mock_db_get_team_events_page.assert_called_once_with(
+        MOCK_TEAM_ID,
+        None,
+        datetime(2023, 10, 1, tzinfo=timezone.utc),
+        datetime(2023, 11, 1, tzinfo=timezone.utc),
+        2,
+        mock_db,
+        None,
+        None,
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_get_team_events_page")
+@patch("app.service.team.db_get_team_for_member")
+async def test_get_team_events_page_service_legacy_team(
+    mock_db_get_team_for_member, mock_db_get_team_events_page
+):
+    mock_db = AsyncMock()
+    mock_db_get_team_for_member.return_value = {
+        "_id": MOCK_TEAM_ID,
+        "event_ids": [MOCK_EVENT_ID],
+    }
+    mock_db_get_team_events_page.return_value = []
+
+    result = await get_team_events_page_service(
+        MOCK_TEAM_ID, MOCK_USER_ID, None, None, None, 10, mock_db
+    )
+
+    assert result.events == []
+    assert result.next_cursor is None
+    assert mock_db_get_team_events_page.call_args.args[1] == [MOCK_EVENT_ID]
+
+
+@pytest.mark.asyncio
+async def test_get_team_events_page_service_failure_invalid_range():
+    mock_db = AsyncMock()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_team_events_page_service(
+            MOCK_TEAM_ID,
+            MOCK_USER_ID,
+            datetime(2023, 11, 1, tzinfo=timezone.utc),
+            datetime(2023, 10, 1, tzinfo=timezone.utc),
+            None,
+            10,
+            mock_db,
+        )
+
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_team_events_page_service_failure_invalid_cursor():
+    mock_db = AsyncMock()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_team_events_page_service(
+            MOCK_TEAM_ID, MOCK_USER_ID, None, None, "not-a-cursor", 10, mock_db
+        )
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Invalid cursor: cursor=not-a-cursor"
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_get_team_by_id")
+async def test_get_team_calendar_service_failure_invalid_signature(
+    mock_db_get_team_by_id,
+):
+    mock_db = AsyncMock()
+    mock_db_get_team_by_id.return_value = {
+        "_id": MOCK_TEAM_ID,
+        "name": MOCK_TEAM_NAME,
+        "calendar_token_version": 1,
+    }
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_team_calendar_service(MOCK_TEAM_ID, "forged", None, mock_db)
+
+    assert exc_info.value.status_code == 403
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_get_team_by_id")
+async def test_get_team_calendar_service_failure_revoked_signature(
+    mock_db_get_team_by_id,
+):
+    mock_db = AsyncMock()
+    # A member left after the URL was signed at version 0
+    mock_db_get_team_by_id.return_value = {
+        "_id": MOCK_TEAM_ID,
+        "name": MOCK_TEAM_NAME,
+        "calendar_token_version": 1,
+    }
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_team_calendar_service(
+            MOCK_TEAM_ID, sign_team_calendar(MOCK_TEAM_ID, 0), None, mock_db
+        )
+
+    assert exc_info.value.status_code == 403
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_get_team_by_id")
+async def test_get_team_calendar_service_failure_team_not_found(
+    mock_db_get_team_by_id,
+):
+    mock_db = AsyncMock()
+    mock_db_get_team_by_id.return_value = None
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_team_calendar_service(
+            MOCK_TEAM_ID, sign_team_calendar(MOCK_TEAM_ID, 0), None, mock_db
+        )
+
+    assert exc_info.value.status_code == 403
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_get_team_for_member")
+async def test_get_team_calendar_url_service_success(mock_db_get_team_for_member):
+    mock_db = AsyncMock()
+    mock_db_get_team_for_member.return_value = {
+        "_id": MOCK_TEAM_ID,
+        "calendar_token_version": 2,
+    }
+
+    result = await get_team_calendar_url_service(MOCK_TEAM_ID, MOCK_USER_ID, mock_db)
+
+    assert result.endswith(
+        f"/teams/calendar/{MOCK_TEAM_ID}.ics?signature={sign_team_calendar(MOCK_TEAM_ID, 2)}"
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_rotate_team_calendar_token")
+@patch("app.service.team.db_get_team_for_member")
+async def test_regenerate_team_calendar_url_service_success(
+    mock_db_get_team_for_member, mock_db_rotate_team_calendar_token
+):
+    mock_db = AsyncMock()
+    mock_db_get_team_for_member.return_value = {"_id": MOCK_TEAM_ID}
+    mock_db_rotate_team_calendar_token.return_value = 3
+
+    result = await regenerate_team_calendar_url_service(
+        MOCK_TEAM_ID, MOCK_USER_ID, mock_db
+    )
+
+    assert result.endswith(f"?signature={sign_team_calendar(MOCK_TEAM_ID, 3)}")
+    mock_db_rotate_team_calendar_token.assert_called_once_with(MOCK_TEAM_ID, mock_db)
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_rotate_team_calendar_token")
+@patch("app.service.team.db_get_team_by_id")
+@patch("app.service.team.db_get_team_for_member")
+async def test_regenerate_team_calendar_url_service_failure_not_member(
+    mock_db_get_team_for_member,
+    mock_db_get_team_by_id,
+    mock_db_rotate_team_calendar_token,
+):
+    mock_db = AsyncMock()
+    mock_db_get_team_for_member.return_value = None
+    mock_db_get_team_by_id.return_value = {"_id": MOCK_TEAM_ID}
+
+    with pytest.raises(HTTPException) as exc_info:
+        await regenerate_team_calendar_url_service(
+            MOCK_TEAM_ID, MOCK_USER_2_ID, mock_db
+        )
+
+    assert exc_info.value.status_code == 403
+    mock_db_rotate_team_calendar_token.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.service.team._team_calendar_cache", TTLCache(maxsize=8, ttl_seconds=60))
+@patch("app.service.team.db_iter_team_calendar_events")
+@patch("app.service.team.db_get_team_by_id")
+async def test_get_team_calendar_service_success(
+    mock_db_get_team_by_id, mock_db_iter_team_calendar_events
+):
+    mock_db = AsyncMock()
+    mock_db_get_team_by_id.return_value = {
+        "_id": MOCK_TEAM_ID,
+        "name": MOCK_TEAM_NAME,
+        "calendar_version": 3,
+        "child_refs_migrated": True,
+    }
+
+    legacy_event_id = str(ObjectId())
+
+    async def mock_events(*_):
+        yield {
+            **_mock_event_dict(MOCK_EVENT_ID, datetime(2023, 10, 10, 10)),
+            "end": datetime(2023, 10, 10, 12),
+        }
+        # Not yet reached by the event datetimes migration
+        yield _mock_event_dict(legacy_event_id, MOCK_EVENT_START)
+        # Left in place by the migration as unparseable
+        yield _mock_event_dict(str(ObjectId()), "not a date")
+
+    mock_db_iter_team_calendar_events.side_effect = mock_events
+
+    result = await get_team_calendar_service(
+        MOCK_TEAM_ID, sign_team_calendar(MOCK_TEAM_ID, 0), None, mock_db
+    )
+    cached_result = await get_team_calendar_service(
+        MOCK_TEAM_ID, sign_team_calendar(MOCK_TEAM_ID, 0), None, mock_db
+    )
+
+    assert result.etag == f'"{MOCK_TEAM_ID}-3"'
+    assert result.body.count("BEGIN:VEVENT") == 2
+    assert f"UID:{MOCK_EVENT_ID}@clubsync.club" in result.body
+    assert f"UID:{legacy_event_id}@clubsync.club" in result.body
+    assert cached_result == result
+    mock_db_iter_team_calendar_events.assert_called_once_with(
+        MOCK_TEAM_ID, None, mock_db
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.service.team.db_iter_team_calendar_events")
+@patch("app.service.team.db_get_team_by_id")
+async def test_get_team_calendar_service_not_modified(
+    mock_db_get_team_by_id, mock_db_iter_team_calendar_events
+):
+    mock_db = AsyncMock()
+    mock_db_get_team_by_id.return_value = {
+        "_id": MOCK_TEAM_ID,
+        "name": MOCK_TEAM_NAME,
+        "calendar_version": 3,
+        "child_refs_migrated": True,
+    }
+
+    result = await get_team_calendar_service(
+        MOCK_TEAM_ID,
+        sign_team_calendar(MOCK_TEAM_ID, 0),
+        f'W/"{MOCK_TEAM_ID}-2", "{MOCK_TEAM_ID}-3"',
+        mock_db,
+    )
+
+    assert result.body is None
+    mock_db_iter_team_calendar_events.assert_not_called()
@@ -1,5 +1,4 @@
 from datetime import datetime, timedelta
-import os
 import random
 from dotenv import load_dotenv
 from fastapi import HTTPException
@@ -31,9 +30,7 @@ from app.schemas.user import (
     VerifyCodeRequest,
     VerifyCodeResponse,
 )
-
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+from app.service.mail import enqueue_email
 
 import ssl
 
@@ -46,9 +43,10 @@ def generate_random_verification_code() -> str:
     return str(random.randint(100000, 999999))
 
 
-# This should never fail outside of infrastructure / network related errors
-# It will still return as normal if the email is invalid
-def send_verification_code_email(email: str, verification_code: str) -> int:
+# Only queued here, the outbox drain delivers it
+async def send_verification_code_email(
+    email: str, verification_code: str, db: AsyncDatabase
+) -> None:
 
     template = env.get_template("verification_code_email.html")
     html_content = template.render(
@@ -56,18 +54,7 @@ def send_verification_code_email(email: str, verification_code: str) -> int:
         expiry_minutes=VERIFICATION_CODE_EXPIRE_MINUTES,
     )
 
-    message = Mail(
-        from_email="admin@clubsync.club",
-        to_emails=email,
-        subject="Verify your account",
-        html_content=html_content,
-    )
-    try:
-        sg = SendGridAPIClient(os.environ["SENDGRID_KEY"])
-        response = sg.send(message)
-        return response.status_code
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to send email: {str(e)}")
+    await enqueue_email(email, "Verify your account", html_content, db)
 
 
 async def create_user_service(
@@ -83,8 +70,8 @@ async def create_user_service(
     random_verification_code = generate_random_verification_code()
 
     if create_user_request.send_email:
-        send_verification_code_email(
-            create_user_request.email, random_verification_code
+        await send_verification_code_email(
+            create_user_request.email, random_verification_code, db
         )
 
     hashed_password = hash_password(create_user_request.password)